@@ -8,34 +8,94 @@ from dotenv import load_dotenv
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from storage import LocalStorage
+from shared_state import SharedStateStore
 from vpn_manager import VPNManager
 from exploit_searcher import ExploitSearcher
+from scanner import NetworkScanner
+from scan_jobs import ScanJobManager
+from discovery import HostDiscovery, set_default_discovery
+from timing import TimingModel, set_default_timing_model
+from services import LazyService, start_warmup
+from retention import RetentionCompactor
+from scheduler import ScanScheduler
 from routes import api
+import http_cache
+import metrics
+from json_provider import FastJSONProvider
 
 # 환경 변수 로드
 load_dotenv()
 
 # Flask 앱 인스턴스 생성
 app = Flask(__name__)
+# jsonify / request.get_json 에 orjson 사용 (설치되지 않았으면 표준 json)
+app.json = FastJSONProvider(app)
 CORS(app)  # CORS 설정
 
 # 데이터 및 설정 디렉토리 경로 설정
 base_dir = os.path.abspath(os.path.dirname(__file__))
 data_path = os.path.join(base_dir, 'data')
 vpn_configs_path = os.path.join(base_dir, 'vpn_configs')
+# 워커 간 공유 상태 디렉토리 (VPN 세션, 작업 상태)
+state_path = os.environ.get('SHARED_STATE_DIR', os.path.join(data_path, 'state'))
 
-# 애플리케이션의 핵심 컴포넌트들 초기화
-storage = LocalStorage(data_dir=data_path)
-vpn_manager = VPNManager(config_dir=vpn_configs_path, storage_manager=storage)
-exploit_searcher = ExploitSearcher()
+# 애플리케이션의 핵심 컴포넌트들 등록 (지연 초기화)
+# VPNManager 초기화는 pkill, OpenVPN 설치, TUN 디바이스 생성 등으로 수십 초가 걸릴 수 있어
+# 임포트 시점에 생성하지 않고 첫 사용 또는 백그라운드 워밍업 시 생성합니다.
+shared_state = SharedStateStore(state_dir=state_path)
+# 호스트 탐색 결과 캐시를 워커 간 공유
+set_default_discovery(HostDiscovery(shared_state=shared_state))
+storage = LazyService('storage', lambda: LocalStorage(data_dir=data_path))
+# 대상별 RTT 기록 / 추정 보정 계수를 워커 간 공유 (기록이 없으면 저장된 스캔에서 초기화)
+set_default_timing_model(TimingModel(shared_state=shared_state, storage=storage))
+vpn_manager = LazyService('vpn', lambda: VPNManager(
+    config_dir=vpn_configs_path,
+    storage_manager=storage.get(),
+    shared_state=shared_state,
+))
+exploit_searcher = LazyService('exploit_searcher', ExploitSearcher)
+nmap_environment = LazyService('nmap', NetworkScanner.probe_environment)
+# 배치 스캔 작업 풀 (동시 nmap 프로세스 수: SCAN_MAX_WORKERS, 기본 CPU 코어 수)
+scan_jobs = LazyService('scan_jobs', lambda: ScanJobManager(
+    storage=storage,
+    shared_state=shared_state,
+    vpn_manager=vpn_manager,
+))
 
-# 앱 설정에 객체들 등록
+# 앱 설정에 객체들 등록 (routes 의 get_* 헬퍼가 LazyService 를 풀어서 사용)
 app.config['STORAGE'] = storage
+app.config['SHARED_STATE'] = shared_state
 app.config['VPN_MANAGER'] = vpn_manager
 app.config['EXPLOIT_SEARCHER'] = exploit_searcher
+app.config['SCAN_JOBS'] = scan_jobs
+# 프로필 내보내기/가져오기에서 VPN 설정 디렉토리 접근 (VPNManager 초기화 없이)
+app.config['VPN_CONFIGS_DIR'] = vpn_configs_path
+# 보존 정책 압축 (RETENTION_INTERVAL 초마다, 여러 워커 중 하나만 실행)
+app.config['RETENTION'] = RetentionCompactor(storage)
+# 정기 스캔 스케줄러 (SCHEDULER_TICK 초마다 확인, 여러 워커 중 리더 하나만 실행)
+app.config['SCHEDULER'] = ScanScheduler(shared_state, scan_jobs, storage, vpn_manager)
+app.config['SERVICES'] = {
+    'storage': storage,
+    'vpn': vpn_manager,
+    'exploit_searcher': exploit_searcher,
+    'nmap': nmap_environment,
+    'scan_jobs': scan_jobs,
+}
+
+# 백그라운드 워밍업 (WARMUP_ON_START=0 이면 첫 사용 시에만 초기화)
+if os.environ.get('WARMUP_ON_START', '1') != '0':
+    start_warmup(app.config['SERVICES'].values())
+# 보존 정책 백그라운드 압축 (RETENTION_INTERVAL=0 이면 비활성화)
+app.config['RETENTION'].start()
+# 정기 스캔 실행 (SCHEDULER_TICK=0 이면 비활성화, 스케줄 관리 API 는 그대로 사용 가능)
+app.config['SCHEDULER'].start()
 
 # 블루프린트 등록
 app.register_blueprint(api, url_prefix='/api')
+# GET /metrics (Prometheus) 와 요청 시간 기록 (압축 시간까지 포함되도록 압축 훅보다 먼저 등록)
+metrics.init_app(app, shared_state)
+# 큰 JSON 응답 gzip/brotli 압축 (ETag 304 처리는 각 조회 엔드포인트에서)
+http_cache.init_app(app)
 
 # 기본 홈 라우트
 @app.route('/')
@@ -53,4 +113,6 @@ if __name__ == '__main__':
    - 환경변수 설정: set FLASK_APP=app.py 
    - 디버그 모드: set FLASK_DEBUG=1 
    - 서버 시작: flask run
+3. 운영 모드 (gunicorn, 'backend' 디렉토리에서):
+   - gunicorn -c gunicorn.conf.py WSGI:application
 """ 
\ No newline at end of file
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# async_scanner.py
+# ──────────────────────────────────────────────────────────
+# asyncio 기반 TCP connect 포트 스캐너 (비-root 모드용)
+#  • 동시 연결 수 제한 (워커 코루틴 N개가 (호스트, 포트) 작업을 나눠 처리)
+#  • 호스트별 속도 제한 (토큰 버킷)
+#  • 관측 RTT 기반 적응형 타임아웃 (RFC 6298 의 SRTT/RTTVAR 방식)
+# 열린 포트만 nmap -sV 로 넘겨 버전 탐지를 수행하고,
+# 호스트 탐색 스윕과 네트워크 테스트의 TCP 연결 확인도 이 엔진을 사용합니다.
+# ──────────────────────────────────────────────────────────
+import asyncio
+import errno
+import os
+import socket
+import struct
+import time
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 동시 연결 수
+ASYNC_SCAN_CONCURRENCY = int(os.environ.get("ASYNC_SCAN_CONCURRENCY", "1000"))
+# 호스트당 초당 연결 시도 수 (0 = 제한 없음)
+ASYNC_SCAN_RATE_PER_HOST = float(os.environ.get("ASYNC_SCAN_RATE_PER_HOST", "0"))
+# RTT 관측 전 초기 타임아웃, 적응형 타임아웃 하한/상한(초)
+ASYNC_SCAN_INITIAL_TIMEOUT = float(os.environ.get("ASYNC_SCAN_INITIAL_TIMEOUT", "1.0"))
+ASYNC_SCAN_MIN_TIMEOUT = float(os.environ.get("ASYNC_SCAN_MIN_TIMEOUT", "0.1"))
+ASYNC_SCAN_MAX_TIMEOUT = float(os.environ.get("ASYNC_SCAN_MAX_TIMEOUT", "3.0"))
+# 응답 없는(filtered) 포트 재시도 횟수
+ASYNC_SCAN_RETRIES = int(os.environ.get("ASYNC_SCAN_RETRIES", "1"))
+
+OPEN, CLOSED, FILTERED = "open", "closed", "filtered"
+
+
+def _fd_limited_concurrency(requested: int) -> int:
+    """열린 파일 수 제한(RLIMIT_NOFILE)을 넘지 않도록 동시 연결 수 조정 (EMFILE 을 filtered 로 오인하지 않도록)"""
+    try:
+        import resource
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    except (ImportError, ValueError, OSError):
+        return requested
+    if soft == resource.RLIM_INFINITY:
+        return requested
+    return max(1, min(requested, soft - 128))
+
+
+def parse_ports(ports: str) -> List[int]:
+    """
+    nmap 포트 표현식을 포트 번호 목록으로 변환 (예: "22,80,1000-1010", "T:80,U:53")
+    UDP(U:) 항목은 TCP connect 스캔 대상이 아니므로 제외합니다.
+    """
+    result = set()
+    protocol = "T"
+    for token in (ports or "").replace(" ", "").split(","):
+        if not token:
+            continue
+        if ":" in token:
+            protocol, token = token.split(":", 1)
+            protocol = protocol.upper()
+        if protocol != "T" or not token:
+            continue
+        if "-" in token:
+            start, end = token.split("-", 1)
+            start_port = int(start) if start else 1
+            end_port = int(end) if end else 65535
+            result.update(range(max(start_port, 1), min(end_port, 65535) + 1))
+        else:
+            port = int(token)
+            if 1 <= port <= 65535:
+                result.add(port)
+    return sorted(result)
+
+
+def format_ports(ports: Iterable[int]) -> str:
+    """포트 번호 목록을 nmap -p 인자 문자열로 변환"""
+    return ",".join(str(p) for p in sorted(set(ports)))
+
+
+class RttEstimator:
+    """호스트별 RTT 추정 및 적응형 연결 타임아웃 (SRTT + 4 * RTTVAR)"""
+
+    def __init__(self, initial: float, minimum: float, maximum: float):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.srtt: Optional[float] = None
+        self.rttvar: Optional[float] = None
+        self.samples = 0
+
+    def sample(self, rtt: float) -> None:
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        self.samples += 1
+
+    @property
+    def timeout(self) -> float:
+        if self.srtt is None:
+            return self.initial
+        return min(self.maximum, max(self.minimum, self.srtt + 4 * self.rttvar))
+
+
+class TokenBucket:
+    """호스트별 연결 속도 제한 (이벤트 루프 단일 스레드에서만 사용)"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncPortScanner:
+    """
+    asyncio TCP connect 스캐너
+
+    사용 예:
+        engine = AsyncPortScanner()
+        results = engine.scan(["10.0.0.5"], parse_ports("1-1000"))
+        # {"10.0.0.5": {"open": [22, 80], "closed": 997, "filtered": 1, "rtt_ms": 0.42}}
+    """
+
+    def __init__(
+        self,
+        concurrency: int = ASYNC_SCAN_CONCURRENCY,
+        rate_per_host: float = ASYNC_SCAN_RATE_PER_HOST,
+        initial_timeout: float = ASYNC_SCAN_INITIAL_TIMEOUT,
+        min_timeout: float = ASYNC_SCAN_MIN_TIMEOUT,
+        max_timeout: float = ASYNC_SCAN_MAX_TIMEOUT,
+        retries: int = ASYNC_SCAN_RETRIES,
+    ):
+        self.concurrency = _fd_limited_concurrency(max(1, concurrency))
+        self.rate_per_host = rate_per_host
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.retries = retries
+
+    # ------------------------------------------------------------------
+    # 동기 API (Flask 요청 스레드 / 스캔 작업 스레드에서 호출)
+    # ------------------------------------------------------------------
+
+    def scan(self, hosts: List[str], ports: List[int]) -> Dict[str, Dict[str, Any]]:
+        """호스트 × 포트 TCP connect 스캔"""
+        if not hosts or not ports:
+            return {}
+        return asyncio.run(self.scan_hosts(hosts, ports))
+
+    def live_hosts(self, hosts: List[str], probe_ports: List[int]) -> List[str]:
+        """probe_ports 중 하나라도 응답(open/closed)한 호스트 목록"""
+        if not hosts:
+            return []
+        return asyncio.run(self.find_live_hosts(hosts, probe_ports))
+
+    def probe(self, host: str, port: int, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """단일 포트 연결 확인"""
+        return asyncio.run(self.probe_port(host, port, timeout))
+
+    # ------------------------------------------------------------------
+    # 비동기 API
+    # ------------------------------------------------------------------
+
+    async def probe_port(self, host: str, port: int, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """단일 포트 연결 확인 결과 {"state", "elapsed_ms", "error_code"}"""
+        address = await self._resolve(host)
+        if address is None:
+            return {"state": FILTERED, "elapsed_ms": 0.0, "error_code": errno.EHOSTUNREACH,
+                    "error": f"호스트 이름을 확인할 수 없습니다: {host}"}
+        state, elapsed, code = await self._connect(address, port, timeout or self.initial_timeout)
+        return {"state": state, "elapsed_ms": round(elapsed * 1000, 2), "error_code": code}
+
+    async def scan_hosts(self, hosts: List[str], ports: List[int]) -> Dict[str, Dict[str, Any]]:
+        """여러 호스트의 포트 상태 스캔"""
+        addresses = await self._resolve_all(hosts)
+        estimators = {h: RttEstimator(self.initial_timeout, self.min_timeout, self.max_timeout) for h in addresses}
+        buckets = {h: TokenBucket(self.rate_per_host) for h in addresses} if self.rate_per_host > 0 else {}
+        results: Dict[str, Dict[str, Any]] = {
+            h: {"open": [], "closed": 0, "filtered": 0, "rtt_ms": None} for h in addresses
+        }
+
+        # 포트 우선 순회: 같은 호스트에 연속으로 몰리지 않도록 호스트를 교차 배치
+        work: Iterator[Tuple[str, int]] = ((h, p) for p in ports for h in addresses)
+
+        async def worker() -> None:
+            for host, port in work:
+                state = await self._probe_with_retry(
+                    addresses[host], port, estimators[host], buckets.get(host)
+                )
+                entry = results[host]
+                if state == OPEN:
+                    entry["open"].append(port)
+                elif state == CLOSED:
+                    entry["closed"] += 1
+                else:
+                    entry["filtered"] += 1
+
+        workers = min(self.concurrency, len(addresses) * len(ports)) or 1
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+        for host, entry in results.items():
+            entry["open"].sort()
+            srtt = estimators[host].srtt
+            entry["rtt_ms"] = round(srtt * 1000, 3) if srtt is not None else None
+        return results
+
+    async def find_live_hosts(self, hosts: List[str], probe_ports: List[int]) -> List[str]:
+        """호스트 생존 확인 (포트 하나라도 응답하면 즉시 다음 호스트로)"""
+        addresses = await self._resolve_all(hosts)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def check(host: str) -> Optional[str]:
+            estimator = RttEstimator(self.initial_timeout, self.min_timeout, self.max_timeout)
+
+            async def one(port: int) -> bool:
+                async with semaphore:
+                    state, _, _ = await self._connect(addresses[host], port, estimator.timeout)
+                return state in (OPEN, CLOSED)
+
+            tasks = [asyncio.ensure_future(one(p)) for p in probe_ports]
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    if await finished:
+                        return host
+            finally:
+                for task in tasks:
+                    task.cancel()
+            return None
+
+        found = await asyncio.gather(*(check(h) for h in addresses))
+        return [h for h in found if h]
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    async def _probe_with_retry(self, address, port: int, estimator: RttEstimator,
+                                bucket: Optional[TokenBucket]) -> str:
+        timeout = estimator.timeout
+        for _ in range(self.retries + 1):
+            if bucket:
+                await bucket.acquire()
+            state, elapsed, _ = await self._connect(address, port, timeout)
+            if state != FILTERED:
+                # RST 응답도 왕복 시간이므로 RTT 표본으로 사용
+                estimator.sample(elapsed)
+                return state
+            timeout = min(self.max_timeout, timeout * 2)
+        return FILTERED
+
+    @staticmethod
+    async def _connect(address, port: int, timeout: float) -> Tuple[str, float, int]:
+        """(상태, 소요 시간(초), errno) 반환"""
+        family, host_addr = address
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        # 닫을 때 RST 로 즉시 종료 → 대량 스캔 시 TIME_WAIT 로 로컬 포트가 고갈되지 않도록
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (host_addr, port)), timeout)
+            return OPEN, time.perf_counter() - start, 0
+        except ConnectionRefusedError:
+            return CLOSED, time.perf_counter() - start, errno.ECONNREFUSED
+        except asyncio.TimeoutError:
+            return FILTERED, time.perf_counter() - start, errno.ETIMEDOUT
+        except OSError as e:
+            return FILTERED, time.perf_counter() - start, e.errno or errno.EHOSTUNREACH
+        finally:
+            sock.close()
+
+    @staticmethod
+    async def _resolve(host: str):
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        except socket.gaierror:
+            return None
+        if not infos:
+            return None
+        family, _, _, _, sockaddr = infos[0]
+        return family, sockaddr[0]
+
+    async def _resolve_all(self, hosts: List[str]) -> Dict[str, Any]:
+        resolved = await asyncio.gather(*(self._resolve(h) for h in hosts))
+        addresses = {}
+        for host, address in zip(hosts, resolved):
+            if address is None:
+                logger.warning(f"호스트 이름을 확인할 수 없어 제외합니다: {host}")
+                continue
+            addresses[host] = address
+        return addresses
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# atomic_io.py
+# ──────────────────────────────────────────────────────────
+# 충돌(크래시)에 안전한 파일 쓰기 (LocalStorage, migrate_reports.py)
+#  • 같은 디렉토리의 임시 파일에 쓰고 os.replace → 읽는 쪽은 이전 내용 또는 새 내용만 봄
+#  • 파일별 잠금: 디렉토리의 .locks/ 아래 해시 스트라이프 잠금 파일(flock)로
+#    여러 gunicorn 워커가 같은 파일을 동시에 쓰지 않도록 직렬화
+#  • fsync 정책 (STORAGE_FSYNC)
+#      off    : fsync 하지 않음 (기본값, OS 가 나중에 기록, 전원 장애 시 최근 쓰기 유실 가능)
+#      always : 쓰기마다 임시 파일 fsync → rename → 디렉토리 fsync
+#      group  : always 와 같은 순서지만 짧은 시간(STORAGE_FSYNC_WINDOW_MS) 동안 모인 쓰기의
+#               임시 파일/디렉토리 fsync 를 한 스레드가 묶어 처리 (대기는 파일 잠금 밖에서)
+#  • 시작 시 복구 검사: 손상된 JSON 과 남은 임시 파일을 quarantine/ 으로 격리
+# ──────────────────────────────────────────────────────────
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+import logging
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import json_provider
+from shared_state import file_lock
+
+logger = logging.getLogger(__name__)
+
+STORAGE_FSYNC = os.environ.get("STORAGE_FSYNC", "off").lower()
+STORAGE_FSYNC_WINDOW = float(os.environ.get("STORAGE_FSYNC_WINDOW_MS", "5")) / 1000.0
+
+# 디렉토리별 잠금 파일 수 (파일마다 잠금 파일을 만들지 않도록 해시로 나눔)
+LOCK_STRIPES = 64
+LOCK_DIR_NAME = ".locks"
+TMP_SUFFIX = ".tmp"
+
+# 이 시간(초)보다 오래된 임시 파일은 중단된 쓰기로 보고 격리
+STALE_TMP_SECONDS = 3600
+
+
+class _GroupSync:
+    """
+    동시에 들어온 fsync 요청을 모아 한 스레드가 한꺼번에 처리 (group commit)
+
+    먼저 온 스레드가 잠깐 기다렸다가 그 사이 등록된 요청의 파일 fd 와 디렉토리를 모두 fsync 하고
+    (같은 디렉토리는 한 번만), 나머지 스레드는 자기 요청이 포함된 처리가 끝나기를 기다립니다.
+    os.sync() 와 달리 요청된 파일/디렉토리만 디스크에 기록합니다.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._cond = threading.Condition()
+        # (ticket, fds, dirs)
+        self._pending: List[Tuple[int, List[int], List[str]]] = []
+        self._errors: Dict[int, OSError] = {}
+        self._requested = 0
+        self._completed = 0
+        self._running = False
+        self.batches = 0
+
+    def sync(self, fds: Iterable[int] = (), dirs: Iterable[str] = ()) -> None:
+        """
+        fds 와 dirs 가 디스크에 기록될 때까지 대기 (fd 는 반환될 때까지 닫지 말 것)
+
+        Raises:
+            OSError: 이 요청의 fsync 실패
+        """
+        with self._cond:
+            self._requested += 1
+            ticket = self._requested
+            self._pending.append((ticket, list(fds), list(dirs)))
+            while self._completed < ticket:
+                if self._running:
+                    self._cond.wait()
+                    continue
+                self._running = True
+                self._cond.release()
+                batch: List[Tuple[int, List[int], List[str]]] = []
+                errors: Dict[int, OSError] = {}
+                try:
+                    if self.window > 0:
+                        time.sleep(self.window)
+                    with self._cond:
+                        batch, self._pending = self._pending, []
+                    errors = self._flush(batch)
+                finally:
+                    self._cond.acquire()
+                    if batch:
+                        self._completed = max(self._completed, batch[-1][0])
+                    self._errors.update(errors)
+                    self._running = False
+                    self.batches += 1
+                    self._cond.notify_all()
+            error = self._errors.pop(ticket, None)
+        if error is not None:
+            raise error
+
+    @staticmethod
+    def _flush(batch: List[Tuple[int, List[int], List[str]]]) -> Dict[int, OSError]:
+        errors: Dict[int, OSError] = {}
+        dir_tickets: Dict[str, List[int]] = {}
+        for ticket, fds, dirs in batch:
+            for fd in fds:
+                try:
+                    os.fsync(fd)
+                except OSError as e:
+                    errors[ticket] = e
+            for dir_path in dirs:
+                dir_tickets.setdefault(dir_path, []).append(ticket)
+        for dir_path, tickets in dir_tickets.items():
+            try:
+                _fsync_dir(dir_path)
+            except OSError as e:
+                for ticket in tickets:
+                    errors.setdefault(ticket, e)
+        return errors
+
+
+_group_sync = _GroupSync(STORAGE_FSYNC_WINDOW)
+
+
+def _fsync_dir(dir_path: str) -> None:
+    if os.name == "nt":
+        return
+    fd = os.open(dir_path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def path_lock(path: str) -> Iterator[None]:
+    """파일별 프로세스 간 배타 잠금"""
+    lock_dir = os.path.join(os.path.dirname(os.path.abspath(path)), LOCK_DIR_NAME)
+    os.makedirs(lock_dir, exist_ok=True)
+    stripe = zlib.crc32(os.path.basename(path).encode()) % LOCK_STRIPES
+    with file_lock(os.path.join(lock_dir, f"{stripe}.lock")):
+        yield
+
+
+def atomic_write(path: str, data: bytes, fsync: Optional[str] = None, lock: bool = True) -> None:
+    """
+    임시 파일에 쓴 뒤 rename 으로 교체
+
+    임시 파일 쓰기와 fsync 대기는 잠금 밖에서 하고, 파일별 잠금은 rename 할 때만 잡습니다.
+
+    Args:
+        path: 대상 파일
+        data: 파일 내용
+        fsync: fsync 정책 (기본값: STORAGE_FSYNC)
+        lock: False 면 호출자가 이미 path_lock 을 잡고 있음 (읽기-수정-쓰기)
+    """
+    mode = fsync or STORAGE_FSYNC
+    dir_path = os.path.dirname(os.path.abspath(path))
+
+    fd, tmp_path = tempfile.mkstemp(dir=dir_path, prefix=f".{os.path.basename(path)}.", suffix=TMP_SUFFIX)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if mode in ("always", "group"):
+                f.flush()
+                # 데이터를 rename 전에 디스크에 기록 → 잘린 파일이 남지 않음
+                if mode == "always":
+                    os.fsync(f.fileno())
+                else:
+                    _group_sync.sync(fds=[f.fileno()])
+        with (path_lock(path) if lock else nullcontext()):
+            os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    # rename 자체를 디스크에 기록
+    if mode == "always":
+        _fsync_dir(dir_path)
+    elif mode == "group":
+        _group_sync.sync(dirs=[dir_path])
+
+
+def write_json(path: str, obj: Any, fsync: Optional[str] = None) -> None:
+    """JSON 을 원자적으로 저장 (json_provider 형식)"""
+    atomic_write(path, json_provider.dumps(obj), fsync=fsync)
+
+
+def quarantine(path: str, quarantine_dir: str) -> Optional[str]:
+    """
+    손상된 파일을 격리 디렉토리로 이동
+
+    Returns:
+        이동된 경로 (이미 사라졌으면 None)
+    """
+    os.makedirs(quarantine_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    target = os.path.join(quarantine_dir, f"{os.path.basename(path)}.{stamp}")
+    try:
+        shutil.move(path, target)
+    except FileNotFoundError:
+        return None
+    logger.warning(f"손상된 파일 격리: {path} → {target}")
+    return target
+
+
+def recover_directory(dir_path: str, quarantine_dir: str, since: float = 0.0) -> Dict[str, int]:
+    """
+    디렉토리의 JSON 파일 검사 (시작 시 복구)
+
+    Args:
+        dir_path: 검사할 디렉토리
+        quarantine_dir: 격리 디렉토리
+        since: 이 시각(mtime) 이후에 바뀐 파일만 파싱 (이전 검사 이후 변경분)
+
+    Returns:
+        {"checked", "quarantined", "stale_tmp"}
+    """
+    counts = {"checked": 0, "quarantined": 0, "stale_tmp": 0}
+    if not os.path.isdir(dir_path):
+        return counts
+    now = time.time()
+    for entry in os.scandir(dir_path):
+        if not entry.is_file():
+            continue
+        try:
+            mtime = entry.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        if entry.name.endswith(TMP_SUFFIX):
+            # 진행 중인 쓰기일 수 있으므로 충분히 오래된 임시 파일만 정리
+            if now - mtime > STALE_TMP_SECONDS and quarantine(entry.path, quarantine_dir):
+                counts["stale_tmp"] += 1
+            continue
+        if not entry.name.endswith(".json") or mtime < since:
+            continue
+        counts["checked"] += 1
+        try:
+            json_provider.read_json(entry.path)
+        except FileNotFoundError:
+            continue
+        except Exception:
+            if quarantine(entry.path, quarantine_dir):
+                counts["quarantined"] += 1
+    return counts
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# benchmarks/connect_scan_bench.py
+# ──────────────────────────────────────────────────────────
+# asyncio connect 스캔 엔진(async_scanner) vs nmap -sT 비교
+#
+# 로컬 대상(기본 127.0.0.1)에 임의 포트 몇 개를 열어 두고 같은 포트 범위를
+# 두 방식으로 스캔해 소요 시간과 찾은 열린 포트가 일치하는지 확인합니다.
+#
+#   python benchmarks/connect_scan_bench.py --ports 1-10000 --runs 3
+# ──────────────────────────────────────────────────────────
+import argparse
+import os
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from async_scanner import AsyncPortScanner, parse_ports  # noqa: E402
+
+
+def open_listeners(host: str, count: int, ports):
+    """포트 범위 안에서 count 개의 리스닝 소켓을 엽니다."""
+    listeners = []
+    for port in ports:
+        if len(listeners) >= count:
+            break
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.bind((host, port))
+            sock.listen(128)
+            listeners.append(sock)
+        except OSError:
+            sock.close()
+    return listeners
+
+
+def run_engine(host: str, ports, concurrency: int):
+    start = time.perf_counter()
+    result = AsyncPortScanner(concurrency=concurrency).scan([host], ports)
+    return time.perf_counter() - start, set(result.get(host, {}).get("open", []))
+
+
+def run_nmap(host: str, port_expr: str):
+    start = time.perf_counter()
+    proc = subprocess.run(
+        ["nmap", "-sT", "-Pn", "-n", "--unprivileged", "-p", port_expr, "-oG", "-", host],
+        capture_output=True, text=True, timeout=600,
+    )
+    elapsed = time.perf_counter() - start
+    found = {int(m) for m in re.findall(r"(\d+)/open/tcp", proc.stdout)}
+    return elapsed, found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="connect 스캔 엔진 vs nmap -sT")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--ports", default="1-10000")
+    parser.add_argument("--listeners", type=int, default=20, help="벤치마크 동안 열어 둘 포트 수")
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    ports = parse_ports(args.ports)
+    # 잘 알려진 포트와 겹치지 않도록 범위 뒤쪽부터 리스너 배치
+    listeners = open_listeners(args.host, args.listeners, reversed(ports))
+    print(f"대상 {args.host}, 포트 {len(ports)}개, 리스너 {len(listeners)}개, 동시 연결 {args.concurrency}")
+
+    try:
+        engine_times, engine_found = [], set()
+        for _ in range(args.runs):
+            elapsed, engine_found = run_engine(args.host, ports, args.concurrency)
+            engine_times.append(elapsed)
+        print(f"  async_scanner  median {statistics.median(engine_times) * 1000:9.1f} ms  "
+              f"열린 포트 {len(engine_found)}개")
+
+        if not shutil.which("nmap"):
+            print("  nmap -sT       (nmap 미설치 - 비교 생략)")
+            return
+
+        nmap_times, nmap_found = [], set()
+        for _ in range(args.runs):
+            elapsed, nmap_found = run_nmap(args.host, args.ports)
+            nmap_times.append(elapsed)
+        print(f"  nmap -sT       median {statistics.median(nmap_times) * 1000:9.1f} ms  "
+              f"열린 포트 {len(nmap_found)}개")
+        print(f"  속도 비율      {statistics.median(nmap_times) / statistics.median(engine_times):.2f}x, "
+              f"결과 일치: {'예' if engine_found == nmap_found else '아니오'}")
+    finally:
+        for sock in listeners:
+            sock.close()
+
+
+if __name__ == "__main__":
+    main()
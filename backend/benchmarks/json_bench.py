@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# benchmarks/json_bench.py
+# ──────────────────────────────────────────────────────────
+# JSON 직렬화/파싱 마이크로 벤치마크
+#  • stdlib indent=2 : 이전 LocalStorage 저장 방식
+#  • stdlib compact  : json_provider 의 표준 json 대체 경로
+#  • json_provider   : orjson (설치되어 있으면)
+#
+# 보고서(참조형, 수 KB), 일반 스캔(호스트 50개), 큰 스캔(호스트 2000개, 수 MB) 크기로
+# dumps / loads 중앙값을 비교합니다.
+#
+#   python benchmarks/json_bench.py --runs 20
+# ──────────────────────────────────────────────────────────
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import json_provider  # noqa: E402
+from benchmarks.passthrough_bench import make_scan  # noqa: E402
+from report_builder import build_report  # noqa: E402
+
+
+def _stdlib_pretty(obj):
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _stdlib_compact(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _stdlib_loads(data):
+    return json.loads(data.decode("utf-8"))
+
+
+def median_ms(func, arg, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(arg)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="JSON 직렬화 마이크로 벤치마크")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    typical_scan = make_scan(50)
+    documents = {
+        "report": build_report(typical_scan, scan_id="scan_bench"),
+        "scan (50 hosts)": typical_scan,
+        "scan (2000 hosts)": make_scan(2000),
+    }
+    encoders = [
+        ("stdlib indent=2", _stdlib_pretty, _stdlib_loads),
+        ("stdlib compact", _stdlib_compact, _stdlib_loads),
+        (f"json_provider ({json_provider.BACKEND})", json_provider.dumps, json_provider.loads),
+    ]
+
+    print(f"{'문서':<20}{'방식':<26}{'bytes':>10}{'dumps(ms)':>12}{'loads(ms)':>12}")
+    for doc_name, doc in documents.items():
+        for enc_name, encode, decode in encoders:
+            data = encode(doc)
+            dump_ms = median_ms(encode, doc, args.runs)
+            load_ms = median_ms(decode, data, args.runs)
+            print(f"{doc_name:<20}{enc_name:<26}{len(data):>10}{dump_ms:>12.3f}{load_ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
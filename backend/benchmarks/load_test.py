@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# benchmarks/load_test.py
+# ──────────────────────────────────────────────────────────
+# 목록/상태 엔드포인트 부하 테스트 (requests/sec, 지연 시간 분포)
+#
+# 사용 예 (서버를 먼저 띄운 뒤):
+#   gunicorn -c gunicorn.conf.py WSGI:application
+#   python benchmarks/load_test.py --url http://127.0.0.1:5000 --duration 20 --concurrency 32
+# ──────────────────────────────────────────────────────────
+import argparse
+import http.client
+import threading
+import time
+from typing import Dict, List
+from urllib.parse import urlparse
+
+DEFAULT_ENDPOINTS = ["/api/scans", "/api/reports", "/api/vpn/status", "/api/profiles"]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def run_endpoint(base_url: str, path: str, duration: float, concurrency: int) -> Dict:
+    """하나의 엔드포인트에 concurrency 개의 keep-alive 연결로 duration 초 동안 요청"""
+    parsed = urlparse(base_url)
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker() -> None:
+        conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+        local_lat: List[float] = []
+        local_err = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path, headers={"Connection": "keep-alive"})
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status >= 400:
+                    local_err += 1
+                else:
+                    local_lat.append(time.perf_counter() - start)
+            except Exception:
+                local_err += 1
+                conn.close()
+                conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+        conn.close()
+        with lock:
+            latencies.extend(local_lat)
+            errors[0] += local_err
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "path": path,
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="PortSookhee 백엔드 부하 테스트")
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="서버 주소")
+    parser.add_argument("--duration", type=float, default=10.0, help="엔드포인트별 측정 시간(초)")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 연결 수")
+    parser.add_argument("--endpoint", action="append", help="측정할 경로 (여러 번 지정 가능)")
+    args = parser.parse_args()
+
+    endpoints = args.endpoint or DEFAULT_ENDPOINTS
+    print(f"대상: {args.url}, 동시 연결: {args.concurrency}, 측정 시간: {args.duration}초")
+    print(f"{'endpoint':<24}{'req/s':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'errors':>8}")
+    for path in endpoints:
+        r = run_endpoint(args.url, path, args.duration, args.concurrency)
+        print(f"{r['path']:<24}{r['rps']:>10.1f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+              f"{r['p99_ms']:>10.2f}{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# benchmarks/passthrough_bench.py
+# ──────────────────────────────────────────────────────────
+# GET /api/scans/<id> 응답 방식 비교
+#  • parse:       json.load → scan_id 추가 → jsonify (이전 방식, 이전 형식 파일)
+#  • passthrough: 응답 형식으로 저장된 파일을 그대로 전송 (send_file)
+#  • 각 방식의 gzip 응답 (passthrough 는 ETag 별 압축본 캐시 사용)
+#
+# 임시 데이터 디렉토리에 수 MB 크기의 스캔을 만들어 Flask 테스트 클라이언트로
+# 요청 지연 시간(wall)과 CPU 시간(process_time)을 측정합니다.
+#
+#   python benchmarks/passthrough_bench.py --hosts 2000 --runs 20
+# ──────────────────────────────────────────────────────────
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from flask import Flask  # noqa: E402
+
+import http_cache  # noqa: E402
+from routes import api  # noqa: E402
+from storage import LocalStorage  # noqa: E402
+
+
+def make_scan(hosts: int) -> dict:
+    """호스트마다 포트 10개 + 스크립트 출력이 있는 스캔"""
+    return {
+        "target": "10.0.0.0/16",
+        "hosts": [
+            {
+                "host": f"10.0.{i // 256}.{i % 256}",
+                "state": "up",
+                "os": {"name": "Linux 5.X", "accuracy": "95"},
+                "hostscript": [],
+                "ports": [
+                    {
+                        "port": port,
+                        "state": "open",
+                        "service": "http",
+                        "product": "nginx",
+                        "version": "1.18.0",
+                        "extrainfo": "Ubuntu",
+                        "scripts": [{"id": "http-title", "output": f"Site {i}:{port} - " + "x" * 80}],
+                    }
+                    for port in range(8000, 8010)
+                ],
+            }
+            for i in range(hosts)
+        ],
+    }
+
+
+def measure(client, url: str, headers: dict, runs: int):
+    walls, cpus = [], []
+    size = 0
+    for _ in range(runs):
+        wall, cpu = time.perf_counter(), time.process_time()
+        response = client.get(url, headers=headers)
+        size = len(response.get_data())
+        walls.append(time.perf_counter() - wall)
+        cpus.append(time.process_time() - cpu)
+        assert response.status_code == 200, response.status_code
+    return statistics.median(walls) * 1000, statistics.median(cpus) * 1000, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="저장 문서 passthrough 전송 벤치마크")
+    parser.add_argument("--hosts", type=int, default=2000, help="스캔 호스트 수 (2000 ≈ 5MB)")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="passthrough-bench-")
+    try:
+        storage = LocalStorage(data_dir=data_dir)
+        scan = make_scan(args.hosts)
+        path = storage.save_scan_result(scan)
+        scan_id = os.path.basename(path).split(".")[0]
+
+        # 같은 내용을 이전 형식(scan_id 미포함, indent=2)으로도 저장
+        legacy_id = "scan_legacy"
+        with open(os.path.join(os.path.dirname(path), f"{legacy_id}.json"), "w", encoding="utf-8") as f:
+            json.dump(scan, f, ensure_ascii=False, indent=2)
+
+        app = Flask(__name__)
+        app.config["STORAGE"] = storage
+        app.register_blueprint(api, url_prefix="/api")
+        http_cache.init_app(app)
+        client = app.test_client()
+
+        print(f"스캔 파일 크기: {os.path.getsize(path) / 1024 / 1024:.2f} MB "
+              f"(이전 형식 {os.path.getsize(os.path.join(os.path.dirname(path), legacy_id + '.json')) / 1024 / 1024:.2f} MB)")
+        print(f"{'방식':<24}{'wall(ms)':>10}{'cpu(ms)':>10}{'bytes':>12}")
+        cases = [
+            ("parse", legacy_id, {}),
+            ("passthrough", scan_id, {}),
+            ("parse + gzip", legacy_id, {"Accept-Encoding": "gzip"}),
+            ("passthrough + gzip", scan_id, {"Accept-Encoding": "gzip"}),
+        ]
+        for name, doc_id, headers in cases:
+            wall, cpu, size = measure(client, f"/api/scans/{doc_id}", headers, args.runs)
+            print(f"{name:<24}{wall:>10.2f}{cpu:>10.2f}{size:>12}")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
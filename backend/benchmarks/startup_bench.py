@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# benchmarks/startup_bench.py
+# ──────────────────────────────────────────────────────────
+# 콜드 스타트 측정: 앱 임포트 시간과 첫 요청까지 걸리는 시간(time-to-first-request)
+#
+# 매 회차마다 새 파이썬 프로세스에서 app 을 임포트하고 Flask 테스트 클라이언트로
+# 첫 요청을 보냅니다. 워밍업 스레드 사용 여부(WARMUP_ON_START)에 따라 비교합니다.
+#
+#   python benchmarks/startup_bench.py --runs 5 --path /api/health --path /api/scans
+# ──────────────────────────────────────────────────────────
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD_SCRIPT = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from app import app
+t_import = time.perf_counter() - t0
+client = app.test_client()
+first = {}
+for path in sys.argv[1:]:
+    t = time.perf_counter()
+    resp = client.get(path)
+    first[path] = {"ms": (time.perf_counter() - t) * 1000, "status": resp.status_code}
+print(json.dumps({"import_ms": t_import * 1000, "ttfr_ms": (time.perf_counter() - t0) * 1000, "requests": first}))
+"""
+
+
+def run_once(paths, warmup: bool, data_dir: str) -> dict:
+    env = dict(os.environ)
+    env["WARMUP_ON_START"] = "1" if warmup else "0"
+    env["SHARED_STATE_DIR"] = os.path.join(data_dir, "state")
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, *paths],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=600,
+    )
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError(f"측정 실패:\n{result.stderr[-2000:]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="백엔드 콜드 스타트 벤치마크")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", action="append", help="첫 요청 경로 (기본 /api/health)")
+    parser.add_argument("--warmup", choices=["on", "off", "both"], default="both")
+    args = parser.parse_args()
+
+    paths = args.path or ["/api/health"]
+    modes = {"on": [True], "off": [False], "both": [False, True]}[args.warmup]
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        for warmup in modes:
+            samples = [run_once(paths, warmup, data_dir) for _ in range(args.runs)]
+            imports = [s["import_ms"] for s in samples]
+            ttfr = [s["ttfr_ms"] for s in samples]
+            print(f"WARMUP_ON_START={'1' if warmup else '0'} ({args.runs}회)")
+            print(f"  import          median {statistics.median(imports):8.1f} ms  max {max(imports):8.1f} ms")
+            print(f"  first request   median {statistics.median(ttfr):8.1f} ms  max {max(ttfr):8.1f} ms")
+            for path in paths:
+                ms = [s["requests"][path]["ms"] for s in samples]
+                codes = sorted({s["requests"][path]["status"] for s in samples})
+                print(f"    {path:<20} median {statistics.median(ms):8.1f} ms  status {codes}")
+
+
+if __name__ == "__main__":
+    main()
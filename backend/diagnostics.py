@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# diagnostics.py
+# ──────────────────────────────────────────────────────────
+# 네트워크 연결 진단 (POST /api/network/test, GET /api/network/test/stream)
+#  • ping / TCP 연결 / traceroute / mini-nmap 을 스레드 풀에서 동시에 실행
+#  • 전체 제한 시간(NETWORK_TEST_DEADLINE) 안에 끝난 결과만 반환하고
+#    나머지는 timeout 으로 표시
+#  • 완료되는 순서대로 (이름, 결과) 를 내보내므로 SSE 스트리밍에도 그대로 사용
+# ──────────────────────────────────────────────────────────
+import os
+import subprocess
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+from async_scanner import AsyncPortScanner
+
+# 진단 전체 제한 시간(초)
+NETWORK_TEST_DEADLINE = float(os.environ.get("NETWORK_TEST_DEADLINE", "8"))
+
+# 진단 작업용 스레드 풀 (요청마다 최대 4개 작업)
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="net-test")
+
+
+def check_ping(target: str) -> Dict[str, Any]:
+    """PING 테스트"""
+    try:
+        if os.name == 'nt':  # Windows
+            ping_cmd = subprocess.run(['ping', '-n', '1', '-w', '2000', target],
+                                      capture_output=True, text=True, timeout=3)
+        else:  # Linux/Docker
+            ping_cmd = subprocess.run(['ping', '-c', '1', '-W', '2', target],
+                                      capture_output=True, text=True, timeout=3)
+        return {"success": ping_cmd.returncode == 0, "output": ping_cmd.stdout}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def check_tcp_connect(target: str, port: Any) -> Dict[str, Any]:
+    """TCP 연결 테스트 (asyncio connect 엔진, 타임아웃 2초)"""
+    try:
+        probe = AsyncPortScanner().probe(target, int(port), timeout=2)
+        return {
+            "success": probe["state"] == "open",
+            "port": port,
+            "elapsed_ms": probe["elapsed_ms"],
+            "error_code": probe["error_code"],
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def check_traceroute(target: str) -> Dict[str, Any]:
+    """traceroute 테스트 (Linux만)"""
+    try:
+        traceroute_cmd = subprocess.run(['traceroute', '-w', '1', '-m', '10', target],
+                                        capture_output=True, text=True, timeout=5)
+        return {"output": traceroute_cmd.stdout}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def check_nmap(target: str, port: Any, end: float) -> Dict[str, Any]:
+    """
+    mini-nmap 테스트 (결과 간소화)
+
+    호스트 탐색/취약점 추가 스캔 없이 nmap 한 번만 실행하고,
+    진단 제한 시각(end, time.monotonic 기준)까지 남은 시간을 nmap 제한 시간으로 사용합니다.
+    (제한 시간이 지나면 python-nmap 이 nmap 프로세스를 종료 → 진단이 끝난 뒤에 스캔이 남지 않음)
+    """
+    from scanner import NetworkScanner
+
+    remaining = int(end - time.monotonic())
+    if remaining < 1:
+        return {"error": "진단 제한 시간이 지나 nmap 테스트를 실행하지 않았습니다.", "timed_out": True}
+    try:
+        scanner = NetworkScanner()
+        scan_result = scanner.scan_target(target, str(port), "-sV --unprivileged -T4",
+                                          timeout=remaining, discover=False, vuln_scan=False)
+        if "error" in scan_result:
+            return {"error": scan_result["error"]}
+
+        simplified = {"hosts": len(scan_result.get("hosts", [])), "ports": []}
+        for host in scan_result.get("hosts", []):
+            for port_info in host.get("ports", []):
+                simplified["ports"].append({
+                    "port": port_info.get("port"),
+                    "state": port_info.get("state"),
+                    "service": port_info.get("service"),
+                    "product": port_info.get("product"),
+                })
+        return simplified
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def _timed(check: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    result = check()
+    result["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+def run_diagnostics(
+    target: str, port: Any = "80", deadline: float = NETWORK_TEST_DEADLINE
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    진단 항목을 동시에 실행하고 완료되는 순서대로 (이름, 결과) 를 내보냅니다.
+
+    Args:
+        target: 대상 호스트
+        port: TCP 연결/nmap 테스트 포트
+        deadline: 전체 제한 시간(초)
+
+    Yields:
+        ("ping" | "tcp_connect" | "traceroute" | "nmap", 결과 dict)
+        제한 시간 안에 끝나지 않은 항목은 {"error": ..., "timed_out": True}
+    """
+    end = time.monotonic() + deadline
+    checks: Dict[str, Callable[[], Dict[str, Any]]] = {
+        "ping": lambda: check_ping(target),
+        "tcp_connect": lambda: check_tcp_connect(target, port),
+        "nmap": lambda: check_nmap(target, port, end),
+    }
+    if os.name != 'nt':
+        checks["traceroute"] = lambda: check_traceroute(target)
+
+    pending = {_executor.submit(_timed, check): name for name, check in checks.items()}
+
+    while pending:
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            break
+        done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = pending.pop(future)
+            try:
+                yield name, future.result()
+            except Exception as e:
+                yield name, {"error": str(e)}
+
+    # 제한 시간 초과: 실행 중인 작업은 각자의 타임아웃(nmap 은 남은 진단 시간)으로 정리되도록 두고 결과만 포기
+    for future, name in pending.items():
+        future.cancel()
+        yield name, {"error": f"제한 시간({deadline}초) 안에 완료되지 않았습니다.", "timed_out": True}
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# discovery.py
+# ──────────────────────────────────────────────────────────
+# 호스트 탐색(Host Discovery) 사전 단계
+#  • root        : nmap -sn (ARP/ICMP/TCP-SYN/ACK ping) 으로 살아있는 호스트 탐색
+#  • 비-root     : async_scanner 의 TCP connect 스윕 (RST 응답도 "살아있음"으로 판단)
+#  • 결과는 대상 범위별로 TTL 캐시 (SharedStateStore 가 있으면 워커 간 공유)
+# 스캐너는 이 결과의 살아있는 호스트에만 -sV/-sC 등 정밀 스캔을 수행합니다.
+# ──────────────────────────────────────────────────────────
+import ipaddress
+import os
+import re
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from async_scanner import AsyncPortScanner
+
+logger = logging.getLogger(__name__)
+
+# 탐색 결과 캐시 유지 시간(초)
+DISCOVERY_CACHE_TTL = float(os.environ.get("DISCOVERY_CACHE_TTL", "900"))
+# 비-root 스윕: 호스트 생존 확인에 사용할 포트
+DISCOVERY_PROBE_PORTS = [
+    int(p) for p in os.environ.get("DISCOVERY_PROBE_PORTS", "22,80,443,445,3389,8080").split(",") if p.strip()
+]
+# 비-root 스윕: 동시 연결 수와 연결 타임아웃(초)
+DISCOVERY_CONCURRENCY = int(os.environ.get("DISCOVERY_CONCURRENCY", "512"))
+DISCOVERY_CONNECT_TIMEOUT = float(os.environ.get("DISCOVERY_CONNECT_TIMEOUT", "1.0"))
+# 한 번에 전개할 수 있는 최대 주소 수 (/16)
+MAX_EXPANDED_HOSTS = 65536
+
+# root 권한 nmap 호스트 탐색 인자
+NMAP_DISCOVERY_ARGS = "-sn -n -PE -PP -PS21,22,23,25,80,443,445,3389,8080 -PA80,443"
+
+_LAST_OCTET_RANGE = re.compile(r"^(\d{1,3}\.\d{1,3}\.\d{1,3}\.)(\d{1,3})-(\d{1,3})$")
+
+
+def split_target_expression(target: str) -> List[str]:
+    """nmap 대상 표현식을 토큰으로 분리 (공백/쉼표 구분)"""
+    return [t for t in re.split(r"[\s,]+", target.strip()) if t]
+
+
+def expand_targets(target: str) -> Optional[List[str]]:
+    """
+    대상 표현식을 개별 주소 목록으로 전개합니다.
+
+    지원: 단일 IP, 호스트명, CIDR(10.0.0.0/24), 마지막 옥텟 범위(10.0.0.1-50)
+    nmap 고유 문법(와일드카드, 옥텟별 범위 등)은 None 을 반환 → nmap 으로 탐색
+
+    Returns:
+        주소 목록 또는 None
+    """
+    hosts: List[str] = []
+    for token in split_target_expression(target):
+        if "/" in token:
+            try:
+                network = ipaddress.ip_network(token, strict=False)
+            except ValueError:
+                return None
+            if network.num_addresses > MAX_EXPANDED_HOSTS:
+                return None
+            if network.num_addresses <= 2:
+                hosts.extend(str(ip) for ip in network)
+            else:
+                hosts.extend(str(ip) for ip in network.hosts())
+            continue
+
+        match = _LAST_OCTET_RANGE.match(token)
+        if match:
+            prefix, start, end = match.group(1), int(match.group(2)), int(match.group(3))
+            if start > end or end > 255:
+                return None
+            hosts.extend(f"{prefix}{i}" for i in range(start, end + 1))
+            continue
+
+        if "*" in token or re.search(r"\d-\d", token):
+            return None  # nmap 고유 범위 문법
+        hosts.append(token)
+
+        if len(hosts) > MAX_EXPANDED_HOSTS:
+            return None
+    return hosts
+
+
+def is_multi_host_target(target: str) -> bool:
+    """대상이 여러 호스트를 포함하는지 (범위/CIDR/목록)"""
+    tokens = split_target_expression(target)
+    if len(tokens) > 1:
+        return True
+    token = tokens[0] if tokens else ""
+    if "/" in token or "*" in token:
+        return True
+    return bool(re.search(r"\d-\d", token))
+
+
+class HostDiscovery:
+    """
+    살아있는 호스트 탐색기 (범위별 TTL 캐시 포함)
+    """
+
+    def __init__(self, shared_state=None, ttl: float = DISCOVERY_CACHE_TTL):
+        """
+        Args:
+            shared_state: SharedStateStore (있으면 캐시를 워커 간 공유)
+            ttl: 캐시 유지 시간(초)
+        """
+        self.shared_state = shared_state
+        self.ttl = ttl
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def discover(self, target: str, privileged: bool, refresh: bool = False) -> Dict[str, Any]:
+        """
+        대상 범위의 살아있는 호스트 탐색
+
+        Args:
+            target: nmap 대상 표현식
+            privileged: raw 패킷 사용 가능 여부 (root)
+            refresh: True 면 캐시를 무시하고 다시 탐색
+
+        Returns:
+            {"target", "live_hosts", "method", "cached", "elapsed", "discovered_at"}
+        """
+        key = self._cache_key(target)
+        if not refresh:
+            cached = self._get_cached(key)
+            if cached:
+                return {**cached, "cached": True}
+
+        start = time.time()
+        hosts = None if privileged else expand_targets(target)
+        if hosts is not None:
+            live_hosts = self._connect_sweep(hosts)
+            method = "tcp-connect-sweep"
+        else:
+            live_hosts = self._nmap_ping_sweep(target, privileged)
+            method = "nmap-ping" if privileged else "nmap-ping-unprivileged"
+
+        result = {
+            "target": target,
+            "live_hosts": live_hosts,
+            "method": method,
+            "elapsed": round(time.time() - start, 3),
+            "discovered_at": time.time(),
+        }
+        self._put_cached(key, result)
+        logger.info(f"호스트 탐색 완료: {target} → {len(live_hosts)}개 살아있음 ({method}, {result['elapsed']}초)")
+        return {**result, "cached": False}
+
+    def invalidate(self, target: Optional[str] = None) -> None:
+        """캐시 삭제 (target 이 없으면 전체)"""
+        with self._lock:
+            if target is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(self._cache_key(target), None)
+        if self.shared_state:
+            if target is None:
+                self.shared_state.replace("discovery", {})
+            else:
+                self.shared_state.delete("discovery", self._cache_key(target))
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _cache_key(target: str) -> str:
+        return " ".join(sorted(split_target_expression(target)))
+
+    def _get_cached(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(key)
+        # 로컬 캐시가 없거나 만료되었으면 다른 워커가 저장한 결과 확인
+        if (entry is None or now - entry.get("discovered_at", 0) >= self.ttl) and self.shared_state:
+            entry = self.shared_state.get("discovery", key)
+        if entry and now - entry.get("discovered_at", 0) < self.ttl:
+            with self._lock:
+                self._cache[key] = entry
+            return entry
+        return None
+
+    def _put_cached(self, key: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._cache[key] = result
+        if not self.shared_state:
+            return
+
+        ttl = self.ttl
+
+        def _store(state: Dict[str, Any]) -> None:
+            now = time.time()
+            # 만료된 항목 정리
+            for k in [k for k, v in state.items() if now - v.get("discovered_at", 0) >= ttl]:
+                state.pop(k, None)
+            state[key] = result
+
+        try:
+            self.shared_state.update("discovery", _store)
+        except Exception as e:
+            logger.warning(f"호스트 탐색 캐시 저장 오류: {e}")
+
+    # ------------------------------------------------------------------
+    # Discovery methods
+    # ------------------------------------------------------------------
+
+    def _nmap_ping_sweep(self, target: str, privileged: bool) -> List[str]:
+        """nmap -sn 으로 살아있는 호스트 탐색"""
+        import nmap
+
+        arguments = NMAP_DISCOVERY_ARGS if privileged else "-sn -n --unprivileged"
+        scanner = nmap.PortScanner()
+        try:
+            scanner.scan(hosts=target, arguments=arguments, timeout=300)
+        except Exception as e:
+            logger.error(f"nmap 호스트 탐색 오류: {e}")
+            return []
+        return [h for h in scanner.all_hosts() if scanner[h].state() == "up"]
+
+    def _connect_sweep(self, hosts: List[str]) -> List[str]:
+        """비-root: asyncio TCP connect 엔진으로 살아있는 호스트 탐색"""
+        engine = AsyncPortScanner(
+            concurrency=DISCOVERY_CONCURRENCY,
+            initial_timeout=DISCOVERY_CONNECT_TIMEOUT,
+            retries=0,
+        )
+        return engine.live_hosts(hosts, DISCOVERY_PROBE_PORTS)
+
+
+# 프로세스 전역 기본 탐색기 (app.py 에서 공유 상태 저장소와 함께 설정)
+_default_discovery: Optional[HostDiscovery] = None
+
+
+def get_discovery() -> HostDiscovery:
+    global _default_discovery
+    if _default_discovery is None:
+        _default_discovery = HostDiscovery()
+    return _default_discovery
+
+
+def set_default_discovery(discovery: HostDiscovery) -> None:
+    global _default_discovery
+    _default_discovery = discovery
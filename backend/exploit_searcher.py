@@ -3,6 +3,8 @@ import json
 import logging
 import os
 
+from metrics import EXPLOIT_SEARCH_SECONDS
+
 # 로거 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,6 +20,14 @@ class ExploitSearcher:
         :param query: 검색할 소프트웨어/버전 등의 키워드
         :return: searchsploit 검색 결과 (JSON) 또는 오류 메시지
         """
+        with EXPLOIT_SEARCH_SECONDS.time(result="error") as labels:
+            result = self._search(query)
+            if "error" not in result:
+                labels["result"] = "found" if result.get("RESULTS_EXPLOIT") else "empty"
+        return result
+
+    def _search(self, query: str) -> dict:
+        """searchsploit 실행 (search 참고)"""
         if not query:
             return {"error": "검색어가 제공되지 않았습니다."}
 
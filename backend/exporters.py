@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# exporters.py
+# ──────────────────────────────────────────────────────────
+# 저장된 스캔을 다른 도구용 형식으로 내보내기 (GET /api/scans/export, /api/scans/<id>/export)
+#  • xml   : nmap XML 출력 형식 (nmaprun/host/ports/port/service/script, os, times, trace)
+#  • csv   : 호스트, 포트, 서비스, 버전, CVE, CVSS 한 줄씩 (취약점이 없으면 포트당 한 줄)
+#  • sarif : SARIF 2.1.0 (스캔마다 run 하나, 취약점마다 result 하나)
+# 모든 렌더러는 제너레이터로 스캔을 하나씩 받아 바로 출력하므로
+# 수천 개 스캔을 내보내도 전체 출력이 메모리에 쌓이지 않습니다. (청크 단위 bytes)
+# ──────────────────────────────────────────────────────────
+import csv
+import io
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+import json_provider
+from report_builder import severity_bucket
+
+# 응답으로 내보낼 청크 크기 (작은 조각을 모아서 전송)
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+TOOL_NAME = "PortSookhee"
+
+CSV_COLUMNS = [
+    "scan_id", "timestamp", "target", "host", "port", "protocol", "state",
+    "service", "product", "version", "cve_id", "cvss_score", "severity",
+]
+
+ScanItem = Tuple[str, Dict[str, Any]]
+
+
+def _naive_local(dt: datetime) -> datetime:
+    """시간대가 있는 시각은 로컬 시각으로 바꾸고 시간대를 떼어냄 (저장된 timestamp 는 로컬 naive)"""
+    return dt.astimezone().replace(tzinfo=None) if dt.tzinfo is not None else dt
+
+
+def _parse_bound(value: str) -> datetime:
+    """since/until 파싱 ("Z" 접미사 포함)"""
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    return _naive_local(datetime.fromisoformat(value))
+
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    try:
+        return _parse_bound(str(value))
+    except ValueError:
+        return None
+
+
+def filter_entries(entries: List[Dict[str, Any]], ids: Optional[List[str]] = None, target: Optional[str] = None,
+                   since: Optional[str] = None, until: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    스캔 목록 항목(LocalStorage.list_entries) 필터 - 파일을 열지 않고 인덱스 요약만 사용
+
+    Args:
+        ids: 스캔 ID 목록
+        target: 대상 문자열 (부분 일치)
+        since, until: ISO 시각 범위 (포함, 시간대가 있으면 로컬 시각으로 변환해 비교)
+
+    Raises:
+        ValueError: 잘못된 시각 형식
+    """
+    start = _parse_bound(since) if since else None
+    end = _parse_bound(until) if until else None
+    wanted = set(ids) if ids else None
+    selected = []
+    for entry in entries:
+        if wanted is not None and entry["id"] not in wanted:
+            continue
+        if target and target not in str(entry.get("target") or ""):
+            continue
+        if start or end:
+            ts = _timestamp(entry.get("timestamp"))
+            if ts is None or (start and ts < start) or (end and ts > end):
+                continue
+        selected.append(entry)
+    return selected
+
+
+def _chunked(parts: Iterable[str]) -> Iterator[bytes]:
+    """문자열 조각을 EXPORT_CHUNK_SIZE 정도의 bytes 청크로 묶기"""
+    buffer: List[str] = []
+    size = 0
+    for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= EXPORT_CHUNK_SIZE:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def _iter_ports(scan: Dict[str, Any]) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    for host in scan.get("hosts", []) or []:
+        for port in host.get("ports", []) or []:
+            yield host, port
+
+
+# ──────────────────────────────────────────────────────────
+# nmap XML
+# ──────────────────────────────────────────────────────────
+
+# XML 1.0 에서 허용되지 않는 제어 문자 (스크립트 출력에 섞여 있을 수 있음)
+_XML_INVALID = {c: None for c in range(0x20) if c not in (0x09, 0x0A, 0x0D)}
+
+
+def _attrs(**values: Any) -> str:
+    return "".join(
+        f" {k}={quoteattr(str(v).translate(_XML_INVALID))}" for k, v in values.items() if v not in (None, "")
+    )
+
+
+def _address_type(addr: str) -> str:
+    return "ipv6" if ":" in addr else "ipv4"
+
+
+def _xml_host(start: int, host: Dict[str, Any]) -> Iterator[str]:
+    addr = host.get("host", "")
+    yield f'<host{_attrs(starttime=start, endtime=start)}><status{_attrs(state=host.get("state", "unknown"))}/>\n'
+    yield f'<address{_attrs(addr=addr, addrtype=_address_type(addr))}/>\n<hostnames>\n</hostnames>\n'
+    ports = host.get("ports", []) or []
+    if ports:
+        yield "<ports>"
+        for port in ports:
+            yield f'<port{_attrs(protocol=port.get("protocol", "tcp"), portid=port.get("port"))}>'
+            yield f'<state{_attrs(state=port.get("state", "unknown"))}/>'
+            service = _attrs(name=port.get("service"), product=port.get("product"), version=port.get("version"),
+                             extrainfo=port.get("extrainfo"), method="probed", conf=10)
+            yield f'<service{service}/>'
+            for script in port.get("scripts", []) or []:
+                yield f'<script{_attrs(id=script.get("id"), output=script.get("output") or "")}/>'
+            yield "</port>\n"
+        yield "</ports>\n"
+    os_info = host.get("os") or {}
+    if os_info.get("name") and os_info.get("name") != "Unknown":
+        yield f'<os><osmatch{_attrs(name=os_info["name"], accuracy=os_info.get("accuracy", "0"))}/></os>\n'
+    hostscript = host.get("hostscript") or []
+    if hostscript:
+        yield "<hostscript>"
+        for script in hostscript:
+            yield f'<script{_attrs(id=script.get("id"), output=script.get("output") or "")}/>'
+        yield "</hostscript>\n"
+    trace = host.get("trace") or []
+    if trace:
+        yield "<trace>"
+        for hop in trace:
+            yield f'<hop{_attrs(ttl=hop.get("ttl"), ipaddr=hop.get("ip"), rtt=hop.get("rtt_ms"), host=hop.get("hostname"))}/>'
+        yield "</trace>\n"
+    if host.get("rtt_ms") is not None:
+        srtt = int(float(host["rtt_ms"]) * 1000)
+        yield f'<times{_attrs(srtt=srtt, rttvar=0, to=max(100000, srtt * 4))}/>\n'
+    yield "</host>\n"
+
+
+def _render_xml(scans: Iterable[ScanItem]) -> Iterator[str]:
+    started = int(time.time())
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE nmaprun>\n'
+    yield f'<nmaprun{_attrs(scanner="nmap", args=f"{TOOL_NAME} export", start=started, version="7.94", xmloutputversion="1.05")}>\n'
+    total = up = 0
+    for scan_id, scan in scans:
+        ts = _timestamp(scan.get("timestamp"))
+        start = int(ts.timestamp()) if ts else started
+        yield f"<!-- {escape(scan_id).replace('--', '- -')} target={escape(str(scan.get('target', ''))).replace('--', '- -')} -->\n"
+        for host in scan.get("hosts", []) or []:
+            total += 1
+            up += host.get("state") == "up"
+            yield from _xml_host(start, host)
+    yield (f'<runstats><finished{_attrs(time=int(time.time()), timestr=time.ctime(), elapsed=int(time.time()) - started, exit="success")}/>'
+           f'<hosts{_attrs(up=up, down=total - up, total=total)}/></runstats>\n</nmaprun>\n')
+
+
+# ──────────────────────────────────────────────────────────
+# CSV
+# ──────────────────────────────────────────────────────────
+
+def _render_csv(scans: Iterable[ScanItem]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for scan_id, scan in scans:
+        base = [scan_id, scan.get("timestamp", ""), scan.get("target", "")]
+        for host, port in _iter_ports(scan):
+            row = base + [host.get("host", ""), port.get("port", ""), port.get("protocol", "tcp"), port.get("state", ""),
+                          port.get("service", ""), port.get("product", ""), port.get("version", "")]
+            vulnerabilities = port.get("vulnerabilities") or []
+            if not vulnerabilities:
+                writer.writerow(row + ["", "", ""])
+            for vuln in vulnerabilities:
+                score = vuln.get("cvss_score")
+                writer.writerow(row + [vuln.get("cve_id", ""), "" if score is None else score, severity_bucket(score)])
+        # 스캔 하나가 끝날 때마다 버퍼를 비움
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+# ──────────────────────────────────────────────────────────
+# SARIF
+# ──────────────────────────────────────────────────────────
+
+_SARIF_LEVELS = {"critical": "error", "high": "error", "medium": "warning", "low": "note", "none": "note"}
+
+
+def _sarif_result(scan_id: str, host: Dict[str, Any], port: Dict[str, Any], vuln: Dict[str, Any]) -> Dict[str, Any]:
+    score = vuln.get("cvss_score")
+    addr = host.get("host", "")
+    service = " ".join(p for p in (port.get("product"), port.get("version")) if p) or port.get("service") or "unknown"
+    return {
+        "ruleId": vuln.get("cve_id") or "unknown",
+        "level": _SARIF_LEVELS[severity_bucket(score)],
+        "message": {"text": f"{vuln.get('cve_id', '취약점')} ({service}) - {addr}:{port.get('port')}"
+                            + (f", CVSS {score}" if score is not None else "")},
+        "locations": [{
+            "physicalLocation": {"artifactLocation": {"uri": f"{port.get('protocol', 'tcp')}://{addr}:{port.get('port')}"}},
+        }],
+        "properties": {
+            "scan_id": scan_id,
+            "host": addr,
+            "port": port.get("port"),
+            "service": port.get("service"),
+            "product": port.get("product"),
+            "version": port.get("version"),
+            "cvss_score": score,
+            "source": vuln.get("source"),
+        },
+    }
+
+
+def _render_sarif(scans: Iterable[ScanItem]) -> Iterator[str]:
+    yield f'{{"version":"2.1.0","$schema":"{SARIF_SCHEMA}","runs":['
+    first_run = True
+    for scan_id, scan in scans:
+        run_head = {
+            "tool": {"driver": {"name": TOOL_NAME, "informationUri": "https://nmap.org/"}},
+            "automationDetails": {"id": f"{scan_id}/"},
+            "properties": {"target": scan.get("target"), "timestamp": scan.get("timestamp")},
+        }
+        # results 를 스트리밍으로 채우기 위해 run 객체의 닫는 괄호를 떼고 이어 씀
+        yield ("" if first_run else ",") + json_provider.dumps(run_head).decode("utf-8")[:-1] + ',"results":['
+        first_run = False
+        first_result = True
+        for host, port in _iter_ports(scan):
+            for vuln in port.get("vulnerabilities") or []:
+                yield ("" if first_result else ",") + json_provider.dumps(_sarif_result(scan_id, host, port, vuln)).decode("utf-8")
+                first_result = False
+        yield "]}"
+    yield "]}\n"
+
+
+# 형식 이름 → (렌더러, MIME 타입, 확장자)
+FORMATS: Dict[str, Tuple[Callable[[Iterable[ScanItem]], Iterator[str]], str, str]] = {
+    "xml": (_render_xml, "application/xml", "xml"),
+    "csv": (_render_csv, "text/csv", "csv"),
+    "sarif": (_render_sarif, "application/sarif+json", "sarif"),
+}
+
+
+def render(fmt: str, scans: Iterable[ScanItem]) -> Iterator[bytes]:
+    """
+    스캔 (scan_id, scan_data) 스트림을 지정 형식의 bytes 청크로 변환
+
+    Raises:
+        ValueError: 지원하지 않는 형식
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt} (가능: {', '.join(FORMATS)})")
+    return _chunked(FORMATS[fmt][0](scans))
@@ -0,0 +1,51 @@
+"""
+gunicorn 운영 설정
+
+실행 ('backend' 디렉토리에서):
+    gunicorn -c gunicorn.conf.py WSGI:application
+
+환경 변수로 조정 가능:
+    PORT                  바인딩 포트 (기본 5000)
+    WEB_CONCURRENCY       워커 프로세스 수 (기본 CPU 코어 수 * 2 + 1, 최대 8)
+    GUNICORN_THREADS      워커당 스레드 수 (기본 8)
+    GUNICORN_WORKER_CLASS gthread(기본) 또는 gevent
+    GUNICORN_TIMEOUT      요청 타임아웃(초, 기본 300 - 동기 스캔 요청 고려)
+
+VPN 세션 상태는 data/state/vpn.json (SharedStateStore) 로 모든 워커가 공유합니다.
+OpenVPN 프로세스 자체는 연결을 요청받은 워커 하나가 소유하며 헬스 키퍼도 그 워커에서 동작합니다.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# ── 워커 구성 ─────────────────────────────────────────────
+# 스캔 요청은 nmap 서브프로세스를 기다리는 I/O 대기 위주이므로 스레드/그린렛 워커가 적합합니다.
+workers = int(os.environ.get("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+if worker_class == "gevent":
+    try:
+        import gevent  # noqa: F401
+        worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", "200"))
+    except ImportError:
+        print("gevent 가 설치되어 있지 않아 gthread 워커를 사용합니다. (pip install gevent)")
+        worker_class = "gthread"
+
+# ── 타임아웃 ──────────────────────────────────────────────
+# POST /api/scan 은 nmap 이 끝날 때까지 응답을 기다리므로 기본값(30초)보다 길게 잡습니다.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "300"))
+graceful_timeout = 30
+keepalive = 5
+
+# VPNManager 는 워커별로 생성되어야 하므로(헬스 키퍼 스레드, OpenVPN 프로세스 소유)
+# 마스터에서 앱을 미리 로드하지 않습니다.
+preload_app = False
+# max_requests 로 워커를 재활용하면 VPN 을 소유한 워커가 재시작될 수 있어 사용하지 않습니다.
+max_requests = 0
+
+# ── 로깅 ──────────────────────────────────────────────────
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# http_cache.py
+# ──────────────────────────────────────────────────────────
+# 큰 JSON 응답용 HTTP 캐시/압축
+#  • 응답 압축: Accept-Encoding 에 따라 br(brotli 설치 시) 또는 gzip
+#  • 강한 ETag: 저장 파일의 (경로, inode, mtime, 크기) 해시 → 파일을 읽지 않고 계산
+#  • If-None-Match 가 일치하면 파일을 읽거나 파싱하지 않고 304 반환
+#  • 응답 형식으로 저장된 문서는 파싱/직렬화 없이 파일 바이트를 그대로 전송
+#    (압축이 필요 없으면 send_file → gunicorn sendfile, 압축본은 ETag 별로 메모리 캐시)
+# 압축된 응답은 ETag 뒤에 "-gzip" / "-br" 을 붙여 인코딩별로 구분합니다. (강한 ETag 규칙)
+# ──────────────────────────────────────────────────────────
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Iterator, Optional, Tuple
+
+from flask import Flask, Response, request, send_file
+
+try:
+    import brotli  # 선택 의존성 (pip install brotli)
+except ImportError:
+    brotli = None
+
+# 이 크기(바이트) 미만 응답은 압축하지 않음
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", "1024"))
+# gzip 압축 레벨(1~9) / brotli 품질(0~11)
+COMPRESS_LEVEL = int(os.environ.get("COMPRESS_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "5"))
+
+COMPRESS_MIMETYPES = {"application/json", "application/xml", "text/csv", "text/plain", "text/html"}
+
+_ENCODINGS = ("br", "gzip")
+
+# 파일 전송 시 압축본 메모리 캐시 크기(바이트, 워커별)와 스트리밍 청크 크기
+COMPRESS_CACHE_BYTES = int(os.environ.get("COMPRESS_CACHE_BYTES", str(32 * 1024 * 1024)))
+FILE_CHUNK_SIZE = 64 * 1024
+
+_compressed_cache: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+_compressed_cache_size = 0
+_compressed_cache_lock = threading.Lock()
+
+
+def file_etag(*paths: Optional[str]) -> str:
+    """
+    파일들의 stat 정보로 강한 ETag 계산 (내용을 읽지 않음)
+
+    없는 파일(None 포함)도 "없음" 상태로 반영되므로, 참조 대상이 삭제되면 ETag 가 바뀝니다.
+    """
+    digest = hashlib.sha1()
+    for path in paths:
+        try:
+            st = os.stat(path) if path else None
+        except OSError:
+            st = None
+        state = f"{st.st_ino}:{st.st_mtime_ns}:{st.st_size}" if st else "missing"
+        digest.update(f"{path}|{state};".encode())
+    return digest.hexdigest()[:32]
+
+
+def not_modified(etag: str) -> Optional[Response]:
+    """If-None-Match 가 ETag(인코딩별 변형 포함)와 일치하면 304 응답, 아니면 None"""
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return None
+    candidates = (etag,) + tuple(f"{etag}-{encoding}" for encoding in _ENCODINGS)
+    matched = next((candidate for candidate in candidates if if_none_match.contains(candidate)), None)
+    if matched is None:
+        return None
+    # 304 에는 200 이었다면 보냈을 (인코딩별) ETag 를 그대로 돌려줌
+    response = with_etag(Response(status=304), matched)
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    """응답에 ETag 설정 (브라우저가 매번 재검증하도록 no-cache)"""
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _choose_encoding() -> Optional[str]:
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESS_LEVEL)
+
+
+def _cached_compress(key: Tuple[str, str], read_body) -> bytes:
+    """ETag+인코딩별 압축본 LRU 캐시 (같은 파일을 다시 받을 때 압축 비용 없음)"""
+    global _compressed_cache_size
+    with _compressed_cache_lock:
+        cached = _compressed_cache.get(key)
+        if cached is not None:
+            _compressed_cache.move_to_end(key)
+            return cached
+
+    compressed = _compress(read_body(), key[1])
+    if len(compressed) > COMPRESS_CACHE_BYTES // 4:
+        return compressed
+    with _compressed_cache_lock:
+        if key not in _compressed_cache:
+            _compressed_cache[key] = compressed
+            _compressed_cache_size += len(compressed)
+        while _compressed_cache_size > COMPRESS_CACHE_BYTES and _compressed_cache:
+            _, evicted = _compressed_cache.popitem(last=False)
+            _compressed_cache_size -= len(evicted)
+    return compressed
+
+
+def _iter_parts(prefix: bytes, path: str, suffix: bytes) -> Iterator[bytes]:
+    if prefix:
+        yield prefix
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(FILE_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    if suffix:
+        yield suffix
+
+
+def file_response(path: str, etag: str, prefix: bytes = b"", suffix: bytes = b"") -> Response:
+    """
+    저장된 JSON 파일을 파싱하지 않고 그대로 전송
+
+    Args:
+        path: JSON 파일 (또는 prefix/suffix 사이에 끼울 JSON 값)
+        etag: file_etag 결과
+        prefix / suffix: 파일 앞뒤에 붙일 바이트 (참조형 보고서에 스캔 본문을 끼울 때)
+    """
+    size = len(prefix) + os.path.getsize(path) + len(suffix)
+    encoding = _choose_encoding() if size >= COMPRESS_MIN_SIZE else None
+
+    if encoding is not None:
+        body = _cached_compress((etag, encoding), lambda: b"".join(_iter_parts(prefix, path, suffix)))
+        response = Response(body, mimetype="application/json")
+        response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        return with_etag(response, f"{etag}-{encoding}")
+
+    if not prefix and not suffix:
+        # wsgi.file_wrapper 사용 → gunicorn 에서는 sendfile(2) 로 커널이 직접 전송
+        response = send_file(path, mimetype="application/json", conditional=False, etag=False)
+    else:
+        response = Response(_iter_parts(prefix, path, suffix), mimetype="application/json")
+        response.content_length = size
+    response.vary.add("Accept-Encoding")
+    return with_etag(response, etag)
+
+
+def compress_response(response: Response) -> Response:
+    """after_request 훅: 조건에 맞는 응답 본문을 압축"""
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESS_MIMETYPES
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    response.set_data(_compress(body, encoding))
+    response.headers["Content-Encoding"] = encoding
+
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
+
+
+def init_app(app: Flask) -> None:
+    """앱에 응답 압축 훅 등록"""
+    app.after_request(compress_response)
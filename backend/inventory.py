@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# inventory.py
+# ──────────────────────────────────────────────────────────
+# 프로필별 자산 인벤토리 (SQLite: profiles/<p>/index/inventory.db)
+#  • 스캔이 저장될 때마다 증분 갱신 (LocalStorage.save_scan_result)
+#  • 호스트 → 포트별 최신 관측 상태(서비스/제품/버전) → CVE
+#  • 서비스/제품/버전, CVE ID 보조 인덱스로 "OpenSSH < 8 을 노출한 호스트" 같은
+#    질의를 스캔 JSON 을 읽지 않고 처리
+# ──────────────────────────────────────────────────────────
+import re
+import sqlite3
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hosts (
+    host        TEXT PRIMARY KEY,
+    state       TEXT,
+    os_name     TEXT,
+    first_seen  TEXT,
+    last_seen   TEXT,
+    scan_id     TEXT
+);
+CREATE TABLE IF NOT EXISTS ports (
+    host        TEXT NOT NULL,
+    port        INTEGER NOT NULL,
+    state       TEXT,
+    service     TEXT,
+    product     TEXT,
+    version     TEXT,
+    extrainfo   TEXT,
+    first_seen  TEXT,
+    last_seen   TEXT,
+    scan_id     TEXT,
+    PRIMARY KEY (host, port)
+);
+CREATE TABLE IF NOT EXISTS port_cves (
+    host        TEXT NOT NULL,
+    port        INTEGER NOT NULL,
+    cve_id      TEXT NOT NULL,
+    cvss_score  REAL,
+    source      TEXT,
+    scan_id     TEXT,
+    PRIMARY KEY (host, port, cve_id)
+);
+CREATE INDEX IF NOT EXISTS idx_ports_service ON ports (service);
+CREATE INDEX IF NOT EXISTS idx_ports_product ON ports (product COLLATE NOCASE, version);
+CREATE INDEX IF NOT EXISTS idx_ports_scan ON ports (scan_id);
+CREATE INDEX IF NOT EXISTS idx_port_cves_cve ON port_cves (cve_id);
+CREATE INDEX IF NOT EXISTS idx_port_cves_scan ON port_cves (scan_id);
+"""
+
+
+def version_tuple(version: Optional[str]) -> Tuple[int, ...]:
+    """버전 문자열의 숫자 부분 비교용 튜플 ("7.4p1" → (7, 4, 1))"""
+    return tuple(int(n) for n in re.findall(r"\d+", version or ""))
+
+
+class AssetInventory:
+    """
+    자산 인벤토리
+
+    사용 예:
+        inventory = storage.get_inventory()
+        inventory.find_services(product="OpenSSH", version_lt="8")
+        inventory.hosts_by_cve("CVE-2018-15473")
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # 여러 gunicorn 워커가 같은 DB 를 쓰므로 WAL + busy_timeout
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # 갱신
+    # ------------------------------------------------------------------
+
+    def record_scan(self, scan_id: str, scan_data: Dict[str, Any]) -> None:
+        """
+        스캔 결과 반영 (포트별로 더 최신 관측일 때만 덮어씀)
+
+        같은 스캔을 다시 반영해도(취약점 보강 후 등) 결과는 같습니다.
+        """
+        with self._connect() as conn:
+            self._record(conn, scan_id, scan_data)
+
+    def remove_scan(self, scan_id: str) -> None:
+        """삭제된 스캔이 마지막 관측이었던 항목 제거 (이전 관측으로 되돌리려면 rebuild)"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM port_cves WHERE scan_id = ?", (scan_id,))
+            conn.execute("DELETE FROM ports WHERE scan_id = ?", (scan_id,))
+            conn.execute(
+                "DELETE FROM hosts WHERE scan_id = ? AND host NOT IN (SELECT DISTINCT host FROM ports)",
+                (scan_id,),
+            )
+
+    def rebuild(self, scans: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """전체 재구성 (scans: (scan_id, scan_data) 목록). 반영한 스캔 수 반환"""
+        count = 0
+        with self._connect() as conn:
+            conn.execute("DELETE FROM port_cves")
+            conn.execute("DELETE FROM ports")
+            conn.execute("DELETE FROM hosts")
+            for scan_id, scan_data in scans:
+                self._record(conn, scan_id, scan_data)
+                count += 1
+        return count
+
+    @staticmethod
+    def _record(conn: sqlite3.Connection, scan_id: str, scan_data: Dict[str, Any]) -> None:
+        seen = scan_data.get("timestamp", "")
+        for host in scan_data.get("hosts", []) or []:
+            address = host.get("host")
+            if not address:
+                continue
+            conn.execute(
+                """
+                INSERT INTO hosts (host, state, os_name, first_seen, last_seen, scan_id)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(host) DO UPDATE SET
+                    state = excluded.state, os_name = excluded.os_name,
+                    last_seen = excluded.last_seen, scan_id = excluded.scan_id
+                WHERE excluded.last_seen >= hosts.last_seen
+                """,
+                (address, host.get("state"), (host.get("os") or {}).get("name"), seen, seen, scan_id),
+            )
+            # 과거 스캔을 나중에 반영(재구성 등)해도 최초 관측 시각은 유지
+            conn.execute("UPDATE hosts SET first_seen = MIN(first_seen, ?) WHERE host = ?", (seen, address))
+
+            for port in host.get("ports", []) or []:
+                number = port.get("port")
+                if number is None:
+                    continue
+                cursor = conn.execute(
+                    """
+                    INSERT INTO ports (host, port, state, service, product, version, extrainfo,
+                                       first_seen, last_seen, scan_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(host, port) DO UPDATE SET
+                        state = excluded.state, service = excluded.service,
+                        product = excluded.product, version = excluded.version,
+                        extrainfo = excluded.extrainfo, last_seen = excluded.last_seen,
+                        scan_id = excluded.scan_id
+                    WHERE excluded.last_seen >= ports.last_seen
+                    """,
+                    (address, int(number), port.get("state"), port.get("service"), port.get("product"),
+                     port.get("version"), port.get("extrainfo"), seen, seen, scan_id),
+                )
+                if cursor.rowcount == 0:
+                    # 더 최신 관측이 이미 있음 → 최초 관측 시각만 갱신
+                    conn.execute("UPDATE ports SET first_seen = MIN(first_seen, ?) WHERE host = ? AND port = ?",
+                                 (seen, address, int(number)))
+                    continue
+
+                # 최신 관측의 CVE 목록으로 교체
+                conn.execute("DELETE FROM port_cves WHERE host = ? AND port = ?", (address, int(number)))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO port_cves (host, port, cve_id, cvss_score, source, scan_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (address, int(number), v["cve_id"], v.get("cvss_score"), v.get("source"), scan_id)
+                        for v in port.get("vulnerabilities", []) or [] if v.get("cve_id")
+                    ],
+                )
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def list_hosts(self, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
+        """호스트 목록 (열린 포트 수, CVE 수, 최대 CVSS 포함)"""
+        with self._connect() as conn:
+            total = conn.execute("SELECT COUNT(*) FROM hosts").fetchone()[0]
+            rows = conn.execute(
+                """
+                SELECT h.*,
+                    (SELECT COUNT(*) FROM ports p WHERE p.host = h.host AND p.state = 'open') AS open_ports,
+                    (SELECT COUNT(DISTINCT cve_id) FROM port_cves c WHERE c.host = h.host) AS cves,
+                    (SELECT MAX(cvss_score) FROM port_cves c WHERE c.host = h.host) AS max_cvss
+                FROM hosts h ORDER BY h.last_seen DESC LIMIT ? OFFSET ?
+                """,
+                (limit, offset),
+            ).fetchall()
+        return {"total": total, "limit": limit, "offset": offset, "hosts": [dict(r) for r in rows]}
+
+    def get_host(self, host: str) -> Optional[Dict[str, Any]]:
+        """호스트 상세 (포트별 최신 상태와 CVE)"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM hosts WHERE host = ?", (host,)).fetchone()
+            if row is None:
+                return None
+            ports = [dict(p) for p in conn.execute("SELECT * FROM ports WHERE host = ? ORDER BY port", (host,))]
+            cves: Dict[int, List[Dict[str, Any]]] = {}
+            for c in conn.execute(
+                "SELECT port, cve_id, cvss_score, source FROM port_cves WHERE host = ? "
+                "ORDER BY cvss_score DESC", (host,)
+            ):
+                cves.setdefault(c["port"], []).append({k: c[k] for k in ("cve_id", "cvss_score", "source")})
+        for port in ports:
+            port["vulnerabilities"] = cves.get(port["port"], [])
+        return {**dict(row), "ports": ports}
+
+    def find_services(
+        self,
+        service: Optional[str] = None,
+        product: Optional[str] = None,
+        version: Optional[str] = None,
+        version_lt: Optional[str] = None,
+        version_gte: Optional[str] = None,
+        state: Optional[str] = "open",
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """
+        서비스/제품/버전으로 호스트 포트 검색
+
+        Args:
+            service: 서비스 이름 (정확히 일치, 예: ssh)
+            product: 제품 이름 (부분 일치, 대소문자 무시, 예: OpenSSH)
+            version: 버전 접두사 (예: 7.4)
+            version_lt / version_gte: 버전 범위 (숫자 부분 비교, 예: version_lt="8")
+            state: 포트 상태 (None 이면 전체)
+        """
+        clauses, params = [], []
+        if service:
+            clauses.append("service = ?")
+            params.append(service)
+        if product:
+            clauses.append("product LIKE ? COLLATE NOCASE")
+            params.append(f"%{product}%")
+        if version:
+            clauses.append("version LIKE ?")
+            params.append(f"{version}%")
+        if state:
+            clauses.append("state = ?")
+            params.append(state)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._connect() as conn:
+            rows = [dict(r) for r in conn.execute(f"SELECT * FROM ports {where} ORDER BY host, port", params)]
+
+        # 버전 범위는 숫자 비교가 필요해 파이썬에서 필터링
+        if version_lt or version_gte:
+            upper = version_tuple(version_lt) if version_lt else None
+            lower = version_tuple(version_gte) if version_gte else None
+            filtered = []
+            for row in rows:
+                current = version_tuple(row.get("version"))
+                if not current:
+                    continue
+                if upper is not None and not current < upper:
+                    continue
+                if lower is not None and not current >= lower:
+                    continue
+                filtered.append(row)
+            rows = filtered
+        return rows[:limit]
+
+    def hosts_by_cve(self, cve_id: str) -> List[Dict[str, Any]]:
+        """CVE 가 관측된 호스트/포트 목록"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT c.host, c.port, c.cve_id, c.cvss_score, c.source, c.scan_id,
+                       p.service, p.product, p.version, p.last_seen
+                FROM port_cves c JOIN ports p ON p.host = c.host AND p.port = c.port
+                WHERE c.cve_id = ? ORDER BY c.host, c.port
+                """,
+                (cve_id.upper(),),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            return {
+                "hosts": conn.execute("SELECT COUNT(*) FROM hosts").fetchone()[0],
+                "ports": conn.execute("SELECT COUNT(*) FROM ports").fetchone()[0],
+                "open_ports": conn.execute("SELECT COUNT(*) FROM ports WHERE state = 'open'").fetchone()[0],
+                "cves": conn.execute("SELECT COUNT(DISTINCT cve_id) FROM port_cves").fetchone()[0],
+            }
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# json_provider.py
+# ──────────────────────────────────────────────────────────
+# JSON 직렬화 공통 모듈 (Flask 응답 + LocalStorage 파일 읽기/쓰기)
+#  • orjson 이 설치되어 있으면 사용하고, 없으면 표준 json 으로 같은 형식 출력
+#    (공백 없는 UTF-8, 키 순서 유지)
+#  • orjson 이 처리하지 못하는 값(큰 정수 등)은 표준 json 으로 다시 시도
+#  • FastJSONProvider: Flask JSON provider (jsonify / request.get_json 에 사용)
+#    기본 provider 와 달리 키를 정렬하지 않습니다.
+# ──────────────────────────────────────────────────────────
+import json
+from typing import IO, Any, Callable, Optional
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson  # 선택 의존성 (pip install orjson)
+except ImportError:
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """공백 없는 UTF-8 JSON 바이트"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if default is not None:
+            # 날짜 형식을 표준 json 경로(default 함수)와 같게 유지
+            option |= orjson.OPT_PASSTHROUGH_DATETIME
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=default).encode('utf-8')
+
+
+def loads(data: Any) -> Any:
+    """str / bytes JSON 파싱"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data).decode('utf-8')
+    return json.loads(data)
+
+
+def dump(obj: Any, fp: IO[bytes]) -> None:
+    """바이너리 모드 파일에 쓰기"""
+    fp.write(dumps(obj))
+
+
+def load(fp: IO[bytes]) -> Any:
+    """바이너리 모드 파일에서 읽기"""
+    return loads(fp.read())
+
+
+def read_json(path: str) -> Any:
+    with open(path, 'rb') as f:
+        return load(f)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    orjson 기반 Flask JSON provider (없으면 표준 json)
+
+    app.json = FastJSONProvider(app)
+    """
+
+    sort_keys = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # indent 등 옵션을 지정한 호출은 기본 provider 동작 유지
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, default=self.default).decode('utf-8')
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        # 디버그 모드의 들여쓰기 출력은 기본 provider 에 맡김
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(obj)
+        return self._app.response_class(dumps(obj, default=self.default), mimetype=self.mimetype)
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+# metrics.py
+# ──────────────────────────────────────────────────────────
+# Prometheus 텍스트 형식 메트릭 (GET /metrics)
+#  • 스레드별 샤드 레지스트리: 값을 기록하는 스레드는 자기 샤드(dict)만 수정 → 기록 경로에 잠금 없음
+#      수집할 때만 모든 샤드를 더함 (dict/list 복사는 GIL 아래에서 원자적)
+#      종료된 스레드의 샤드는 수집 시 한 곳(retired)으로 합쳐 샤드 수가 늘지 않게 함
+#  • 여러 gunicorn 워커: 각 워커가 METRICS_FLUSH_INTERVAL 초마다 자기 값을 state/metrics/<pid>.json 에 기록
+#      /metrics 를 받은 워커가 다른 워커 기록과 합쳐서 응답 (종료된 워커의 카운터/히스토그램은 누적 유지)
+#  • 메트릭 정의는 이 모듈에 모아 두고 각 모듈은 임포트해서 기록만 함
+#      nmap 단계별 시간, 스토리지 읽기/쓰기 시간·바이트, searchsploit 검색 시간,
+#      VPN 연결 시간·상태 전환, 라우트별 요청 시간, 진행 중인 스캔/요청 수
+# ──────────────────────────────────────────────────────────
+import bisect
+import glob
+import os
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import json_provider
+from atomic_io import write_json
+from shared_state import file_lock, pid_alive
+
+logger = logging.getLogger(__name__)
+
+# 워커별 메트릭 기록 주기(초, 0 이면 기록하지 않고 /metrics 는 응답한 워커 값만 포함)
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "15"))
+METRIC_PREFIX = "portsookhee_"
+
+LabelValues = Tuple[str, ...]
+
+# 히스토그램 구간(초)
+NMAP_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 120)
+STORAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+SEARCH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+VPN_BUCKETS = (0.5, 1, 2, 5, 10, 15, 20, 30, 60)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, registry: "MetricsRegistry", name: str, documentation: str,
+                 labelnames: Sequence[str] = ()):
+        self.registry = registry
+        self.name = METRIC_PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} 레이블은 {self.labelnames} 이어야 합니다: {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        shard = self.registry._shard()
+        key = (self.name, self._key(labels))
+        shard[key] = shard.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """
+    inc/dec (스레드별 샤드에 증감 기록, 모든 워커 합산) 또는
+    callback (수집 시 호출, 응답한 워커에서만 계산 - 공유 상태에서 읽는 값용) 중 하나로 사용
+    """
+    kind = "gauge"
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.callback: Optional[Callable[[], Dict[LabelValues, float]]] = None
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        shard = self.registry._shard()
+        key = (self.name, self._key(labels))
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels: Any) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def set_callback(self, callback: Callable[[], Dict[LabelValues, float]]) -> None:
+        """callback() → {레이블 값 튜플: 값}"""
+        self.callback = callback
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args: Any, buckets: Sequence[float] = REQUEST_BUCKETS, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        shard = self.registry._shard()
+        key = (self.name, self._key(labels))
+        values = shard.get(key)
+        if values is None:
+            # 구간별 개수(+Inf 포함, 누적 아님) + 합계
+            values = shard[key] = [0.0] * (len(self.buckets) + 2)
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[Dict[str, Any]]:
+        """
+        with 블록 실행 시간 기록
+        블록 안에서 yield 된 dict 의 레이블 값을 바꾸면 바뀐 레이블로 기록 (예: 결과에 따라 result 지정)
+        """
+        labels = dict(labels)
+        start = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+
+def _merge(into: Dict[Any, Any], values: Dict[Any, Any]) -> None:
+    for key, value in values.items():
+        current = into.get(key)
+        if current is None:
+            into[key] = list(value) if isinstance(value, list) else value
+        elif isinstance(value, list):
+            for i, v in enumerate(value):
+                current[i] += v
+        else:
+            into[key] = current + value
+
+
+class MetricsRegistry:
+    """스레드별 샤드 메트릭 레지스트리"""
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        self._local = threading.local()
+        # (스레드, 샤드) - 샤드 등록/수집에만 잠금 사용
+        self._shards: List[Tuple[threading.Thread, Dict[Any, Any]]] = []
+        self._retired: Dict[Any, Any] = {}
+        self._lock = threading.Lock()
+        self._dir: Optional[str] = None
+        self._flusher: Optional[threading.Thread] = None
+
+    def _register(self, metric: _Metric) -> Any:
+        if metric.name in self.metrics:
+            raise ValueError(f"이미 등록된 메트릭입니다: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self, name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = REQUEST_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, documentation, labelnames, buckets=buckets))
+
+    def _shard(self) -> Dict[Any, Any]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def collect(self) -> Dict[Any, Any]:
+        """이 프로세스의 모든 샤드 합계 {(메트릭 이름, 레이블 값): 값}"""
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    _merge(self._retired, shard)
+            self._shards = live
+            total: Dict[Any, Any] = {}
+            _merge(total, self._retired)
+        for _, shard in live:
+            _merge(total, dict(shard))
+        return total
+
+    # ------------------------------------------------------------------
+    # 여러 워커 합산
+    # ------------------------------------------------------------------
+
+    def _snapshot_path(self, pid: Any) -> str:
+        return os.path.join(self._dir, f"{pid}.json")
+
+    def publish(self) -> None:
+        """이 워커의 값을 기록 (다른 워커가 /metrics 응답에 합산)"""
+        if self._dir is None:
+            return
+        samples = [[name, list(labels), value] for (name, labels), value in self.collect().items()]
+        # 스크레이프/주기마다 다시 쓰는 기록이므로 fsync 없이 교체만 (storage 의 목록 인덱스와 같은 방식)
+        write_json(self._snapshot_path(os.getpid()), {"pid": os.getpid(), "updated_at": time.time(), "samples": samples},
+                   fsync="off")
+
+    def _load_snapshots(self) -> Dict[Any, Any]:
+        """
+        다른 워커들의 기록 합계
+        종료된 워커 기록은 카운터/히스토그램만 retired.json 에 합쳐 두고 삭제 (게이지는 버림)
+        """
+        total: Dict[Any, Any] = {}
+        if self._dir is None:
+            return total
+        with file_lock(os.path.join(self._dir, ".lock")):
+            retired_path = self._snapshot_path("retired")
+            retired: Dict[Any, Any] = {}
+            if os.path.exists(retired_path):
+                retired = self._decode(json_provider.read_json(retired_path))
+            changed = False
+            for path in glob.glob(os.path.join(self._dir, "[0-9]*.json")):
+                try:
+                    snapshot = json_provider.read_json(path)
+                except Exception as e:
+                    logger.warning(f"메트릭 기록 읽기 오류 ({os.path.basename(path)}): {e}")
+                    continue
+                pid = snapshot.get("pid")
+                if pid == os.getpid():
+                    continue
+                samples = self._decode(snapshot)
+                if pid_alive(pid):
+                    _merge(total, samples)
+                    continue
+                _merge(retired, {k: v for k, v in samples.items()
+                                 if getattr(self.metrics.get(k[0]), "kind", "gauge") != "gauge"})
+                os.remove(path)
+                changed = True
+            if changed:
+                write_json(retired_path, {"pid": None, "samples": [[n, list(l), v] for (n, l), v in retired.items()]},
+                           fsync="off")
+        _merge(total, retired)
+        return total
+
+    @staticmethod
+    def _decode(snapshot: Dict[str, Any]) -> Dict[Any, Any]:
+        return {(name, tuple(labels)): value for name, labels, value in snapshot.get("samples", [])}
+
+    def start_flusher(self, state_dir: str, interval: float = METRICS_FLUSH_INTERVAL) -> None:
+        """워커별 기록 시작 (interval 이 0 이면 합산하지 않음)"""
+        if interval <= 0 or self._flusher is not None:
+            return
+        self._dir = os.path.join(state_dir, "metrics")
+        os.makedirs(self._dir, exist_ok=True)
+
+        def _loop() -> None:
+            while True:
+                time.sleep(interval)
+                try:
+                    self.publish()
+                except Exception as e:
+                    logger.warning(f"메트릭 기록 오류: {e}")
+
+        self._flusher = threading.Thread(target=_loop, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    # ------------------------------------------------------------------
+    # 출력
+    # ------------------------------------------------------------------
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식 (version 0.0.4)"""
+        values = self.collect()
+        _merge(values, self._load_snapshots())
+        by_metric: Dict[str, List[Tuple[LabelValues, Any]]] = {}
+        for (name, labels), value in values.items():
+            by_metric.setdefault(name, []).append((labels, value))
+
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            series = by_metric.get(metric.name, [])
+            if isinstance(metric, Gauge) and metric.callback is not None:
+                try:
+                    series = list(metric.callback().items())
+                except Exception as e:
+                    logger.warning(f"메트릭 {metric.name} 계산 오류: {e}")
+                    series = []
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labels, value in sorted(series):
+                pairs = list(zip(metric.labelnames, labels))
+                if isinstance(metric, Histogram):
+                    cumulative = 0.0
+                    for bound, count in zip(metric.buckets + (float("inf"),), value[:-1]):
+                        cumulative += count
+                        lines.append(f"{metric.name}_bucket{_labels(pairs + [('le', _number(bound))])} {_number(cumulative)}")
+                    lines.append(f"{metric.name}_sum{_labels(pairs)} {_number(value[-1])}")
+                    lines.append(f"{metric.name}_count{_labels(pairs)} {_number(cumulative)}")
+                else:
+                    lines.append(f"{metric.name}{_labels(pairs)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: List[Tuple[str, Any]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+REGISTRY = MetricsRegistry()
+
+# ──────────────────────────────────────────────────────────
+# 메트릭 정의
+# ──────────────────────────────────────────────────────────
+
+# 스캔
+NMAP_PHASE_SECONDS = REGISTRY.histogram(
+    "nmap_phase_seconds",
+    "스캔 단계별 소요 시간 (discovery, connect, port, version, nse, vuln)",
+    ["phase"], buckets=NMAP_BUCKETS,
+)
+NMAP_TIMEOUTS = REGISTRY.counter("nmap_timeouts_total", "제한 시간을 넘긴 nmap 실행 수", ["phase"])
+SCANS_IN_FLIGHT = REGISTRY.gauge("scans_in_flight", "진행 중인 스캔 수")
+SCANS_TOTAL = REGISTRY.counter("scans_total", "끝난 스캔 수", ["result"])
+
+# 스토리지
+STORAGE_SECONDS = REGISTRY.histogram(
+    "storage_seconds", "스캔/보고서 문서 읽기·쓰기 시간", ["op", "kind"], buckets=STORAGE_BUCKETS,
+)
+STORAGE_BYTES = REGISTRY.counter("storage_bytes_total", "스캔/보고서 문서 읽기·쓰기 바이트", ["op", "kind"])
+
+# 익스플로잇 검색
+EXPLOIT_SEARCH_SECONDS = REGISTRY.histogram(
+    "exploit_search_seconds", "searchsploit 검색 시간", ["result"], buckets=SEARCH_BUCKETS,
+)
+
+# VPN
+VPN_CONNECT_SECONDS = REGISTRY.histogram(
+    "vpn_connect_seconds", "OpenVPN 프로세스 시작부터 연결 완료/실패까지 시간", ["result"], buckets=VPN_BUCKETS,
+)
+VPN_STATE_TRANSITIONS = REGISTRY.counter("vpn_state_transitions_total", "VPN 세션 상태 전환 수", ["from", "to"])
+VPN_STATE = REGISTRY.gauge("vpn_state", "현재 VPN 세션 상태 (해당 상태만 1)", ["state"])
+
+# HTTP
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_seconds", "라우트별 요청 처리 시간 (스트리밍 응답은 헤더까지)",
+    ["method", "route", "status"], buckets=REQUEST_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "처리 중인 요청 수")
+
+
+def init_app(app, shared_state=None) -> None:
+    """
+    요청 시간 기록 훅과 GET /metrics 등록
+
+    Args:
+        shared_state: SharedStateStore - 워커별 기록 디렉토리와 VPN 상태 (없으면 이 워커 값만)
+    """
+    from flask import Response, g, request
+
+    if shared_state is not None:
+        REGISTRY.start_flusher(shared_state.state_dir)
+        VPN_STATE.set_callback(lambda: {(shared_state.read("vpn").get("status") or "disconnected",): 1})
+
+    @app.before_request
+    def _start_timer() -> None:
+        g.metrics_start = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+
+    @app.teardown_request
+    def _finish_in_flight(exc: Optional[BaseException]) -> None:
+        if "metrics_start" in g:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+
+    @app.after_request
+    def _record(response):
+        start = g.get("metrics_start")
+        if start is not None:
+            # 경로 변수 대신 라우트 규칙으로 기록 (레이블 수 제한)
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=request.method,
+                                         route=route, status=response.status_code)
+        return response
+
+    def metrics_endpoint():
+        return Response(REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+    app.add_url_rule("/metrics", "metrics", metrics_endpoint, methods=["GET"])
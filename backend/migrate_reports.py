@@ -1,112 +1,60 @@
 #!/usr/bin/env python3
-import os
-import json
+# migrate_reports.py
+# ──────────────────────────────────────────────────────────
+# 저장된 보고서/스캔을 최신 스키마(schema_version)로 일괄 변환 (migrations.py 사용)
+#
+#   python migrate_reports.py                      # data/ 의 보고서
+#   python migrate_reports.py data --types reports,scans --workers 8
+#   python migrate_reports.py data --dry-run       # 표본으로 크기/시간 추정만
+#   python migrate_reports.py data --no-resume     # 진행 기록 무시하고 처음부터
+# ──────────────────────────────────────────────────────────
+import argparse
 import sys
 
-def migrate_reports(data_dir='data'):
-    """보고서 데이터의 필드 이름을 새 구조에 맞게 마이그레이션합니다."""
-    print(f"마이그레이션 시작: {data_dir}")
-    
-    # 프로필 디렉토리 확인
-    profiles_dir = os.path.join(data_dir, "profiles")
-    if not os.path.exists(profiles_dir):
-        print(f"프로필 디렉토리가 없습니다: {profiles_dir}")
-        return False
-        
-    # 모든 프로필 순회
-    profiles = [d for d in os.listdir(profiles_dir) if os.path.isdir(os.path.join(profiles_dir, d))]
-    print(f"발견된 프로필: {', '.join(profiles)}")
-    
-    migrated_count = 0
-    error_count = 0
-    
-    for profile in profiles:
-        # 보고서 디렉토리 확인
-        reports_dir = os.path.join(profiles_dir, profile, "reports")
-        if not os.path.exists(reports_dir):
-            print(f"프로필 {profile}에 reports 디렉토리가 없습니다")
-            continue
-            
-        print(f"\n프로필 '{profile}' 처리 중...")
-        report_files = [f for f in os.listdir(reports_dir) if f.endswith('.json')]
-        
-        if not report_files:
-            print(f"  - 보고서 파일이 없습니다")
-            continue
-            
-        print(f"  - {len(report_files)} 개의 보고서 파일 발견")
-        
-        # 각 보고서 파일 처리
-        for filename in report_files:
-            file_path = os.path.join(reports_dir, filename)
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                updated = False
-                updates = []
-                
-                # 1. vuln_results를 details로 변환
-                if "vuln_results" in data and "details" not in data:
-                    data["details"] = data.pop("vuln_results")
-                    updated = True
-                    updates.append("vuln_results → details")
-                
-                # 2. summary 필드 정리
-                if "summary" in data:
-                    # 기존 필드 이름 변환
-                    if "total_hosts" in data["summary"] and "hosts_scanned" not in data["summary"]:
-                        data["summary"]["hosts_scanned"] = data["summary"].pop("total_hosts")
-                        updated = True
-                        updates.append("total_hosts → hosts_scanned")
-                    
-                    if "total_vulnerabilities" in data["summary"] and "vulnerabilities_found" not in data["summary"]:
-                        data["summary"]["vulnerabilities_found"] = data["summary"].pop("total_vulnerabilities") 
-                        updated = True
-                        updates.append("total_vulnerabilities → vulnerabilities_found")
-                    
-                    # 3. target_ips 필드 추가 또는 업데이트
-                    has_target_ips = "target_ips" in data["summary"] and data["summary"]["target_ips"]
-                    
-                    if not has_target_ips and "details" in data and "hosts" in data["details"]:
-                        target_ips = []
-                        for host in data["details"].get("hosts", []):
-                            if "host" in host and host["host"]:
-                                target_ips.append(host["host"])
-                        
-                        if target_ips:
-                            data["summary"]["target_ips"] = target_ips
-                            updated = True
-                            updates.append(f"target_ips 추가 ({len(target_ips)}개)")
-                    
-                    # 4. scan_date 추가
-                    if "scan_date" not in data["summary"] and "timestamp" in data:
-                        data["summary"]["scan_date"] = data["timestamp"]
-                        updated = True
-                        updates.append("scan_date 추가")
-                
-                # 변경된 경우에만 저장
-                if updated:
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        json.dump(data, f, ensure_ascii=False, indent=2)
-                    print(f"  ✅ {filename} 업데이트됨: " + ", ".join(updates))
-                    migrated_count += 1
-                else:
-                    print(f"  ℹ️ {filename} 변경 불필요")
-                    
-            except Exception as e:
-                print(f"  ❌ {filename} 처리 중 오류: {str(e)}")
-                error_count += 1
-    
-    print(f"\n마이그레이션 완료: {migrated_count}개 파일 업데이트됨, {error_count}개 오류 발생")
-    return migrated_count > 0
+from migrations import SCHEMA_VERSIONS, run_migrations
+
+
+def migrate_reports(data_dir='data', file_types=("reports",), workers=None, dry_run=False, resume=True):
+    """보고서(및 스캔) 데이터를 최신 스키마로 마이그레이션합니다."""
+    print(f"마이그레이션 시작: {data_dir} (대상 버전: "
+          + ", ".join(f"{t} v{SCHEMA_VERSIONS[t]}" for t in file_types) + ")")
+    result = run_migrations(data_dir, file_types=file_types, workers=workers, dry_run=dry_run, resume=resume)
+
+    if dry_run:
+        print(f"\n[dry run] 파일 {result['files']}개 ({result['bytes'] / 1024 / 1024:.1f} MB), "
+              f"표본 {result['sampled']}개 중 변환 대상 비율 {result['migrate_ratio'] * 100:.1f}%")
+        print(f"  - 예상 크기: {result['estimated_bytes_after'] / 1024 / 1024:.1f} MB")
+        print(f"  - 예상 소요 시간: 약 {result['estimated_seconds']}초")
+        for error in result["errors"]:
+            print(f"  ❌ {error['path']}: {error['error']}")
+        return result["files"] > 0
+
+    for error in result["errors"]:
+        print(f"  ❌ {error['path']} 처리 중 오류: {error['error']}")
+    print(f"\n마이그레이션 완료: {result['migrated']}개 파일 업데이트됨, "
+          f"{result['skipped']}개 이전 실행에서 완료, {len(result['errors'])}개 오류 발생 ({result['elapsed']}초)")
+    return not result["errors"]
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="저장 문서 스키마 마이그레이션")
     # 커맨드라인 인자로 data_dir을 받을 수 있음
-    data_dir = sys.argv[1] if len(sys.argv) > 1 else 'data'
-    success = migrate_reports(data_dir)
-    
+    parser.add_argument("data_dir", nargs="?", default="data")
+    parser.add_argument("--types", default="reports", help="쉼표로 구분 (reports, scans)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본값: CPU 코어 수)")
+    parser.add_argument("--dry-run", action="store_true", help="파일을 쓰지 않고 추정만")
+    parser.add_argument("--no-resume", action="store_true", help="이전 진행 기록 무시")
+    args = parser.parse_args()
+
+    file_types = tuple(t.strip() for t in args.types.split(",") if t.strip())
+    unknown = [t for t in file_types if t not in SCHEMA_VERSIONS]
+    if unknown:
+        parser.error(f"알 수 없는 문서 종류: {', '.join(unknown)}")
+
+    success = migrate_reports(args.data_dir, file_types, args.workers, args.dry_run, not args.no_resume)
+
     if not success:
         print("마이그레이션할 파일이 없거나 오류가 발생했습니다.")
+        sys.exit(1)
     else:
-        print("마이그레이션이 성공적으로 완료되었습니다!") 
\ No newline at end of file
+        print("마이그레이션이 성공적으로 완료되었습니다!")
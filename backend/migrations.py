@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# migrations.py
+# ──────────────────────────────────────────────────────────
+# 저장 문서(스캔/보고서) 스키마 마이그레이션
+#  • 문서마다 schema_version 표시 (없으면 0) → 등록된 마이그레이션을 순서대로 적용
+#  • LocalStorage 는 저장할 때마다 upgrade_document 로 최신 형식을 보장
+#  • run_migrations: 프로세스 풀에서 배치 단위로 병렬 실행
+#      - 진행 기록(data/.migrations/<run>.done)으로 중단 후 이어서 실행
+#      - dry run: 표본 파일로 변환 비율/크기/소요 시간 추정 (파일을 쓰지 않음)
+#      - 쓰기는 atomic_io 로 원자적 교체
+#      - 문서를 직접 다시 쓰므로 끝나면 변환된 프로필의 목록/파생 인덱스를 다시 생성
+# 새 스키마 변경은 @migration("reports", N) 함수를 추가하고 SCHEMA_VERSIONS 를 올리면 됩니다.
+# ──────────────────────────────────────────────────────────
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import json_provider
+from atomic_io import atomic_write, path_lock, write_json
+from report_builder import stored_scan_summary
+
+# 문서 종류별 최신 스키마 버전
+SCHEMA_VERSIONS = {"scans": 1, "reports": 2}
+# 응답 형식 문서의 첫 필드 (GET 에서 파일을 그대로 전송할 때 사용)
+DOCUMENT_ID_KEYS = {"scans": "scan_id", "reports": "report_id"}
+
+MIGRATION_BATCH_SIZE = 64
+PROGRESS_DIR = ".migrations"
+
+# (문서 종류, 대상 버전) → 변환 함수(data, doc_id) → data
+_MIGRATIONS: Dict[Tuple[str, int], Callable[[Dict[str, Any], str], Dict[str, Any]]] = {}
+
+
+def migration(file_type: str, version: int):
+    """version-1 → version 변환 함수 등록"""
+    def register(func):
+        _MIGRATIONS[(file_type, version)] = func
+        return func
+    return register
+
+
+# ──────────────────────────────────────────────────────────
+# 등록된 마이그레이션
+# ──────────────────────────────────────────────────────────
+
+@migration("reports", 1)
+def _reports_v1_field_names(data: Dict[str, Any], doc_id: str) -> Dict[str, Any]:
+    """보고서 필드 이름을 새 구조에 맞게 변환 (이전 migrate_reports.py 의 변환)"""
+    # 1. vuln_results를 details로 변환
+    if "vuln_results" in data and "details" not in data:
+        data["details"] = data.pop("vuln_results")
+
+    # 2. summary 필드 정리
+    summary = data.get("summary")
+    if isinstance(summary, dict):
+        if "total_hosts" in summary and "hosts_scanned" not in summary:
+            summary["hosts_scanned"] = summary.pop("total_hosts")
+        if "total_vulnerabilities" in summary and "vulnerabilities_found" not in summary:
+            summary["vulnerabilities_found"] = summary.pop("total_vulnerabilities")
+
+        # 3. target_ips 필드 추가
+        details = data.get("details")
+        if not summary.get("target_ips") and isinstance(details, dict) and "hosts" in details:
+            target_ips = [host["host"] for host in details.get("hosts", []) if host.get("host")]
+            if target_ips:
+                summary["target_ips"] = target_ips
+
+        # 4. scan_date 추가
+        if "scan_date" not in summary and "timestamp" in data:
+            summary["scan_date"] = data["timestamp"]
+    return data
+
+
+@migration("reports", 2)
+def _reports_v2_response_form(data: Dict[str, Any], doc_id: str) -> Dict[str, Any]:
+    """응답 형식: report_id 포함 (GET 에서 파싱 없이 전송)"""
+    data["report_id"] = doc_id
+    return data
+
+
+@migration("scans", 1)
+def _scans_v1_response_form(data: Dict[str, Any], doc_id: str) -> Dict[str, Any]:
+    """응답 형식: scan_id 포함 + 저장 요약(summary) 최신화"""
+    data["scan_id"] = doc_id
+    data["summary"] = stored_scan_summary(data)
+    return data
+
+
+# ──────────────────────────────────────────────────────────
+# 문서 변환
+# ──────────────────────────────────────────────────────────
+
+def upgrade_document(file_type: str, doc_id: str, data: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    """
+    문서를 최신 스키마로 변환
+
+    Returns:
+        (저장할 문서, 변환 여부) - 저장할 문서는 ID, schema_version 이 앞에 오는 응답 형식
+    """
+    current = data.get("schema_version", 0)
+    target = SCHEMA_VERSIONS[file_type]
+    for version in range(current + 1, target + 1):
+        func = _MIGRATIONS.get((file_type, version))
+        if func is not None:
+            data = func(data, doc_id)
+
+    id_key = DOCUMENT_ID_KEYS[file_type]
+    document = {id_key: doc_id, "schema_version": max(current, target)}
+    document.update((k, v) for k, v in data.items() if k not in document)
+    return document, current < target
+
+
+def _file_type(path: str) -> str:
+    return os.path.basename(os.path.dirname(path))
+
+
+def _migrate_file(path: str, dry_run: bool) -> Dict[str, Any]:
+    start = time.perf_counter()
+    result = {"path": path, "bytes_in": 0, "bytes_out": 0, "migrated": False, "error": None}
+    try:
+        # 실행 중인 서버가 같은 파일을 갱신해도 변경이 유실되지 않도록 읽기-쓰기 전체를 잠금
+        with path_lock(path):
+            with open(path, 'rb') as f:
+                raw = f.read()
+            result["bytes_in"] = len(raw)
+            doc_id = os.path.basename(path).split('.')[0]
+            document, changed = upgrade_document(_file_type(path), doc_id, json_provider.loads(raw))
+            if changed:
+                encoded = json_provider.dumps(document)
+                result["bytes_out"] = len(encoded)
+                result["migrated"] = True
+                if not dry_run:
+                    atomic_write(path, encoded, lock=False)
+            else:
+                result["bytes_out"] = len(raw)
+    except Exception as e:
+        result["error"] = str(e)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def _migrate_batch(paths: List[str], dry_run: bool) -> List[Dict[str, Any]]:
+    """프로세스 풀 작업 단위"""
+    return [_migrate_file(path, dry_run) for path in paths]
+
+
+# ──────────────────────────────────────────────────────────
+# 일괄 실행
+# ──────────────────────────────────────────────────────────
+
+def find_documents(data_dir: str, file_types: Iterable[str], profiles: Optional[List[str]] = None) -> List[str]:
+    """profiles/<p>/<scans|reports>/*.json 경로 목록"""
+    profiles_dir = os.path.join(data_dir, "profiles")
+    if not os.path.isdir(profiles_dir):
+        return []
+    names = profiles or sorted(
+        d for d in os.listdir(profiles_dir) if os.path.isdir(os.path.join(profiles_dir, d))
+    )
+    paths = []
+    for profile in names:
+        for file_type in file_types:
+            dir_path = os.path.join(profiles_dir, profile, file_type)
+            if os.path.isdir(dir_path):
+                paths.extend(
+                    os.path.join(dir_path, f) for f in sorted(os.listdir(dir_path)) if f.endswith('.json')
+                )
+    return paths
+
+
+def _run_key(file_types: Iterable[str]) -> str:
+    return "_".join(f"{t}-v{SCHEMA_VERSIONS[t]}" for t in sorted(file_types))
+
+
+def _read_done(done_path: str) -> set:
+    if not os.path.exists(done_path):
+        return set()
+    with open(done_path, 'r', encoding='utf-8') as f:
+        return {line.rstrip('\n') for line in f if line.strip()}
+
+
+def estimate(paths: List[str], workers: int, sample: int = 200) -> Dict[str, Any]:
+    """
+    dry run: 표본 파일을 메모리에서 변환해 전체 소요 시간/크기 추정
+
+    Returns:
+        {"files", "bytes", "sampled", "migrate_ratio", "estimated_bytes_after",
+         "estimated_seconds", "errors"}
+    """
+    total_bytes = sum(os.path.getsize(p) for p in paths)
+    picked = random.sample(paths, min(sample, len(paths)))
+    results = _migrate_batch(picked, dry_run=True)
+
+    sampled_in = sum(r["bytes_in"] for r in results) or 1
+    sampled_out = sum(r["bytes_out"] for r in results)
+    sampled_seconds = sum(r["seconds"] for r in results)
+    migrated = sum(1 for r in results if r["migrated"])
+    return {
+        "files": len(paths),
+        "bytes": total_bytes,
+        "sampled": len(results),
+        "migrate_ratio": round(migrated / len(results), 3) if results else 0.0,
+        "estimated_bytes_after": int(total_bytes * sampled_out / sampled_in),
+        # 쓰기 비용은 표본에 포함되지 않으므로 변환 시간의 2배로 잡음
+        "estimated_seconds": round(total_bytes * (sampled_seconds / sampled_in) * 2 / max(1, workers), 2),
+        "errors": [r for r in results if r["error"]],
+    }
+
+
+def _profile_of(data_dir: str, path: str) -> str:
+    """profiles/<p>/<type>/<id>.json 경로의 프로필 이름"""
+    return os.path.relpath(path, os.path.join(data_dir, "profiles")).split(os.sep)[0]
+
+
+def _reindex_profiles(data_dir: str, profiles: List[str], log: Callable[[str], None]) -> List[str]:
+    """
+    변환된 문서가 있는 프로필의 목록 인덱스(schema_version, 요약)와 인벤토리/검색/토폴로지 인덱스를 다시 생성
+    (storage 가 이 모듈을 가져오므로 함수 안에서 가져옴)
+    """
+    if not profiles:
+        return []
+    from storage import LocalStorage
+
+    storage = LocalStorage(data_dir)
+    for profile in profiles:
+        counts = storage.rebuild_index(profile)
+        log(f"  인덱스 재생성: {profile} (스캔 {counts['scans']}개, 보고서 {counts['reports']}개)")
+    return profiles
+
+
+def run_migrations(
+    data_dir: str = "data",
+    file_types: Iterable[str] = ("scans", "reports"),
+    workers: Optional[int] = None,
+    dry_run: bool = False,
+    resume: bool = True,
+    profiles: Optional[List[str]] = None,
+    sample: int = 200,
+    log: Callable[[str], None] = print,
+) -> Dict[str, Any]:
+    """
+    저장 문서를 최신 스키마로 일괄 변환
+
+    Args:
+        data_dir: 데이터 디렉토리
+        file_types: "scans" / "reports"
+        workers: 프로세스 수 (기본값: CPU 코어 수)
+        dry_run: 파일을 쓰지 않고 표본으로 추정만
+        resume: 이전에 중단된 실행의 진행 기록을 이어서 사용
+        profiles: 대상 프로필 (기본값: 전체)
+        sample: dry run 표본 파일 수
+
+    Returns:
+        dry run 이면 estimate() 결과,
+        아니면 {"files", "skipped", "migrated", "errors", "reindexed_profiles", "elapsed"}
+    """
+    file_types = tuple(file_types)
+    workers = workers or os.cpu_count() or 1
+    paths = find_documents(data_dir, file_types, profiles)
+
+    if dry_run:
+        return estimate(paths, workers, sample)
+
+    progress_dir = os.path.join(data_dir, PROGRESS_DIR)
+    os.makedirs(progress_dir, exist_ok=True)
+    run_key = _run_key(file_types)
+    done_path = os.path.join(progress_dir, f"{run_key}.done")
+    if not resume and os.path.exists(done_path):
+        os.remove(done_path)
+    done = _read_done(done_path)
+    pending = [p for p in paths if os.path.relpath(p, data_dir) not in done]
+    log(f"마이그레이션 {run_key}: 전체 {len(paths)}개, 완료 기록 {len(paths) - len(pending)}개, 대상 {len(pending)}개")
+
+    stats = {"files": len(paths), "skipped": len(paths) - len(pending), "migrated": 0, "errors": []}
+    start = time.time()
+    batches = [pending[i:i + MIGRATION_BATCH_SIZE] for i in range(0, len(pending), MIGRATION_BATCH_SIZE)]
+    processed = 0
+    # 문서를 LocalStorage 를 거치지 않고 고쳐 쓰므로 인덱스를 다시 만들어야 하는 프로필
+    touched = set()
+
+    with open(done_path, 'a', encoding='utf-8') as done_log, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_migrate_batch, batch, False) for batch in batches]
+        for future in as_completed(futures):
+            for result in future.result():
+                if result["error"]:
+                    stats["errors"].append({"path": result["path"], "error": result["error"]})
+                    continue
+                stats["migrated"] += result["migrated"]
+                if result["migrated"]:
+                    touched.add(_profile_of(data_dir, result["path"]))
+                done_log.write(os.path.relpath(result["path"], data_dir) + "\n")
+            # 배치가 끝날 때마다 진행 기록을 디스크에 남김 (중단 시 이 지점부터 재개)
+            done_log.flush()
+            os.fsync(done_log.fileno())
+            processed += MIGRATION_BATCH_SIZE
+            elapsed = time.time() - start
+            count = min(processed, len(pending))
+            eta = elapsed / count * (len(pending) - count) if count else 0
+            log(f"  진행: {count}/{len(pending)} ({elapsed:.1f}초, 남은 시간 약 {eta:.1f}초)")
+
+    stats["reindexed_profiles"] = _reindex_profiles(data_dir, sorted(touched), log)
+    stats["elapsed"] = round(time.time() - start, 2)
+    if not stats["errors"]:
+        # 모두 끝났으면 진행 기록 대신 완료 상태만 남김
+        write_json(os.path.join(progress_dir, f"{run_key}.json"), {
+            "schema_versions": {t: SCHEMA_VERSIONS[t] for t in file_types},
+            "files": len(paths),
+            "completed_at": time.time(),
+        })
+        os.remove(done_path)
+    return stats
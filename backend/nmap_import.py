@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# nmap_import.py
+# ──────────────────────────────────────────────────────────
+# 다른 곳에서 실행한 nmap XML(-oX) 결과를 스캔으로 가져오기
+#  • iterparse 로 <host> 단위 스트리밍 파싱 (처리한 요소는 바로 해제 → 큰 파일도 DOM 을 만들지 않음)
+#  • NetworkScanner._parse_scan_results 와 같은 스캔 형식으로 변환
+#      (스크립트 출력은 NetworkScanner._parse_vulnerability_data 로 취약점 추출)
+#  • 원래 스캔 시각(nmaprun start)을 timestamp 로 사용 → 보존 정책/목록 순서가 실제 스캔 시각 기준
+#  • LocalStorage.save_scan_result 로 저장 (목록/인벤토리/검색/토폴로지 인덱스 갱신)
+#  • 여러 파일은 프로세스 풀에서 병렬 처리
+#
+#   python nmap_import.py scans/*.xml
+#   python nmap_import.py --data-dir data --profile lab --workers 8 /archive/nmap/
+# ──────────────────────────────────────────────────────────
+import argparse
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+
+from scanner import NetworkScanner
+from storage import LocalStorage
+
+# 프로세스별 LocalStorage (워커 프로세스마다 한 번만 생성)
+_worker_storage = None
+
+
+def _host_address(host: ET.Element) -> Optional[str]:
+    """python-nmap 과 같은 규칙: IPv4 주소, 없으면 IPv6 주소"""
+    addresses = {a.get("addrtype"): a.get("addr") for a in host.findall("address")}
+    return addresses.get("ipv4") or addresses.get("ipv6")
+
+
+def _scripts(parent: Optional[ET.Element]) -> List[Dict[str, Any]]:
+    if parent is None:
+        return []
+    return [{"id": s.get("id"), "output": s.get("output")} for s in parent.findall("script")]
+
+
+def _host_block(host: ET.Element) -> Optional[Dict[str, Any]]:
+    """<host> 요소 → _parse_scan_results 의 host_block"""
+    addr = _host_address(host)
+    if addr is None:
+        return None
+    status = host.find("status")
+    osmatch = host.find("os/osmatch")
+    block: Dict[str, Any] = {
+        "host": addr,
+        "state": status.get("state", "unknown") if status is not None else "unknown",
+        "os": {
+            "name": osmatch.get("name", "Unknown"),
+            "accuracy": osmatch.get("accuracy", "0"),
+        } if osmatch is not None else {"name": "Unknown", "accuracy": "0"},
+        "hostscript": _scripts(host.find("hostscript")),
+        "ports": [],
+    }
+
+    for port in host.iterfind("ports/port"):
+        state = port.find("state")
+        service = port.find("service")
+        port_block: Dict[str, Any] = {
+            "port": int(port.get("portid", 0)),
+            "state": state.get("state", "unknown") if state is not None else "unknown",
+            "service": service.get("name", "") if service is not None else "",
+            "product": service.get("product", "") if service is not None else "",
+            "version": service.get("version", "") if service is not None else "",
+            "extrainfo": service.get("extrainfo", "") if service is not None else "",
+            "scripts": _scripts(port),
+        }
+        # 기존 스캔 형식은 TCP 만 저장하므로 다른 프로토콜만 표시
+        if port.get("protocol", "tcp") != "tcp":
+            port_block["protocol"] = port.get("protocol")
+        if port_block["scripts"]:
+            vulnerabilities = NetworkScanner._parse_vulnerability_data(
+                {s["id"]: s["output"] or "" for s in port_block["scripts"]}
+            )
+            if vulnerabilities:
+                port_block["vulnerabilities"] = vulnerabilities
+        block["ports"].append(port_block)
+
+    # _extract_host_timing 과 같은 RTT / traceroute 필드
+    times = host.find("times")
+    if times is not None and times.get("srtt"):
+        block["rtt_ms"] = round(int(times.get("srtt")) / 1000.0, 3)
+    trace = host.find("trace")
+    if trace is not None:
+        block["trace"] = [
+            {
+                "ttl": int(hop.get("ttl", 0)),
+                "ip": hop.get("ipaddr"),
+                "hostname": hop.get("host", ""),
+                "rtt_ms": float(hop.get("rtt")) if hop.get("rtt") else None,
+            }
+            for hop in trace.iter("hop")
+        ]
+    return block
+
+
+# 값을 다음 인자로 받는 nmap 옵션 (-p 80, -oX out.xml ...) → 그 값은 대상이 아님
+_OPTIONS_WITH_VALUE = {
+    "-iL", "-iR", "--exclude", "--excludefile", "--dns-servers",
+    "-p", "--exclude-ports", "--top-ports", "--port-ratio", "--version-intensity",
+    "--script", "--script-args", "--script-args-file", "--script-help", "--max-os-tries",
+    "-T", "--min-hostgroup", "--max-hostgroup", "--min-parallelism", "--max-parallelism",
+    "--min-rtt-timeout", "--max-rtt-timeout", "--initial-rtt-timeout", "--max-retries",
+    "--host-timeout", "--scan-delay", "--max-scan-delay", "--min-rate", "--max-rate",
+    "-sI", "-b", "-D", "-S", "-e", "-g", "--source-port", "--proxies", "--data", "--data-string",
+    "--data-length", "--ip-options", "--ttl", "--spoof-mac", "--mtu",
+    "-oN", "-oX", "-oS", "-oG", "-oA", "-oM", "--resume", "--stylesheet",
+    "--datadir", "--servicedb", "--versiondb", "--stats-every",
+}
+
+
+def _target_from_args(args: str) -> Optional[str]:
+    """nmaprun args 의 대상 인자 (옵션과 옵션 값을 제외한 나머지, 여러 개면 공백으로 연결)"""
+    tokens = args.split()[1:]
+    targets = []
+    skip_next = False
+    for token in tokens:
+        if skip_next:
+            skip_next = False
+            continue
+        if token.startswith("-"):
+            skip_next = token in _OPTIONS_WITH_VALUE
+            continue
+        targets.append(token)
+    return " ".join(targets) or None
+
+
+def parse_nmap_xml(source: Union[str, BinaryIO], target: Optional[str] = None,
+                   source_name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    nmap XML 을 스캔 데이터로 변환
+
+    Args:
+        source: 파일 경로 또는 바이너리 스트림
+        target: 스캔 대상 (기본값: nmaprun args 의 대상 인자 → <target> 요소 → 첫 호스트/<hosthint> 주소)
+        source_name: 기록할 원본 이름 (기본값: 파일 경로)
+
+    Returns:
+        {"target", "timestamp", "hosts", "imported_from"}
+
+    Raises:
+        ValueError: nmap XML 이 아니거나 파싱 실패
+    """
+    hosts: List[Dict[str, Any]] = []
+    run_info: Dict[str, str] = {}
+    # args 에 대상이 없을 때 (-iL 등) 사용: <target specification>, <hosthint> 주소
+    specifications: List[str] = []
+    hinted: List[str] = []
+    root = None
+    try:
+        for event, elem in ET.iterparse(source, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = elem
+                    if elem.tag != "nmaprun":
+                        raise ValueError(f"nmap XML 이 아닙니다 (루트 요소: {elem.tag})")
+                    run_info = dict(elem.attrib)
+                continue
+            if elem.tag == "host":
+                block = _host_block(elem)
+                if block is not None:
+                    hosts.append(block)
+                # 처리한 호스트 요소 해제
+                root.clear()
+            elif elem.tag == "target" and elem.get("specification"):
+                specifications.append(elem.get("specification"))
+            elif elem.tag == "hosthint":
+                addr = _host_address(elem)
+                if addr is not None:
+                    hinted.append(addr)
+    except ET.ParseError as e:
+        raise ValueError(f"XML 파싱 오류: {e}") from e
+    if root is None:
+        raise ValueError("빈 XML 입니다.")
+
+    started = run_info.get("start")
+    timestamp = datetime.fromtimestamp(int(started)).isoformat() if started and started.isdigit() else datetime.now().isoformat()
+    if not target:
+        target = _target_from_args(run_info.get("args", ""))
+    if not target and specifications:
+        target = " ".join(dict.fromkeys(specifications))
+    if not target:
+        target = hosts[0]["host"] if hosts else (hinted[0] if hinted else "Unknown")
+    return {
+        "target": target,
+        "timestamp": timestamp,
+        "hosts": hosts,
+        "imported_from": {
+            "source": source_name or (source if isinstance(source, str) else None),
+            "nmap_version": run_info.get("version"),
+            "args": run_info.get("args"),
+            "imported_at": datetime.now().isoformat(),
+        },
+    }
+
+
+def import_scan(storage, source: Union[str, BinaryIO], profile: Optional[str] = None,
+                target: Optional[str] = None, source_name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    nmap XML 하나를 파싱해 저장
+
+    Returns:
+        {"scan_id", "target", "hosts", "timestamp"}
+    """
+    scan_data = parse_nmap_xml(source, target, source_name)
+    path = storage.save_scan_result(scan_data, profile=profile)
+    return {
+        "scan_id": os.path.basename(path).split('.')[0],
+        "target": scan_data["target"],
+        "hosts": len(scan_data["hosts"]),
+        "timestamp": scan_data["timestamp"],
+    }
+
+
+def _import_worker(path: str, data_dir: str, profile: Optional[str], target: Optional[str]) -> Dict[str, Any]:
+    """프로세스 풀 작업 단위"""
+    global _worker_storage
+    result: Dict[str, Any] = {"path": path, "error": None}
+    try:
+        if _worker_storage is None:
+            _worker_storage = LocalStorage(data_dir=data_dir)
+        result.update(import_scan(_worker_storage, path, profile, target))
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def find_xml_files(paths: List[str]) -> List[str]:
+    """파일/디렉토리 목록 → .xml 파일 목록 (디렉토리는 하위까지)"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, n) for n in sorted(names) if n.lower().endswith(".xml"))
+        else:
+            files.append(path)
+    return files
+
+
+def import_files(paths: List[str], data_dir: str = "data", profile: Optional[str] = None,
+                 workers: Optional[int] = None, target: Optional[str] = None, log=print) -> Dict[str, Any]:
+    """
+    여러 nmap XML 파일을 병렬로 가져오기
+
+    Args:
+        paths: XML 파일 경로
+        profile: 저장할 프로필 (기본값: 현재 프로필)
+        workers: 프로세스 수 (기본값: CPU 코어 수)
+        target: 모든 파일에 같은 대상 지정 (기본값: 파일별 nmap 인자에서 추출)
+
+    Returns:
+        {"files", "imported", "hosts", "errors", "elapsed"}
+
+    Raises:
+        ValueError: 없는 프로필
+    """
+    storage = LocalStorage(data_dir=data_dir)
+    profile = profile or storage.get_current_profile()
+    if profile not in storage.get_profiles():
+        raise ValueError(f"프로필 '{profile}'이 존재하지 않습니다.")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths) or 1))
+    stats: Dict[str, Any] = {"files": len(paths), "imported": [], "hosts": 0, "errors": []}
+    start = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_import_worker, path, data_dir, profile, target) for path in paths]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            if result["error"]:
+                stats["errors"].append({"path": result["path"], "error": result["error"]})
+                log(f"  ❌ {result['path']}: {result['error']}")
+            else:
+                stats["imported"].append(result)
+                stats["hosts"] += result["hosts"]
+                log(f"  [{done}/{len(paths)}] {result['path']} → {result['scan_id']} (호스트 {result['hosts']}개)")
+    stats["elapsed"] = round(time.time() - start, 2)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="nmap XML(-oX) 결과 가져오기")
+    parser.add_argument("paths", nargs="+", help="XML 파일 또는 디렉토리")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--profile", default=None, help="저장할 프로필 (기본값: 현재 프로필)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본값: CPU 코어 수)")
+    parser.add_argument("--target", default=None, help="스캔 대상 (기본값: 파일의 nmap 인자에서 추출)")
+    args = parser.parse_args()
+
+    files = find_xml_files(args.paths)
+    if not files:
+        print("가져올 XML 파일이 없습니다.")
+        sys.exit(1)
+    print(f"nmap XML {len(files)}개 가져오기 시작")
+    try:
+        result = import_files(files, args.data_dir, args.profile, args.workers, args.target)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    print(f"\n가져오기 완료: {len(result['imported'])}개 스캔 (호스트 {result['hosts']}개), "
+          f"{len(result['errors'])}개 오류 ({result['elapsed']}초)")
+    sys.exit(1 if result["errors"] else 0)
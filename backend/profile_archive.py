@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# profile_archive.py
+# ──────────────────────────────────────────────────────────
+# 프로필 전체 내보내기/가져오기 (다른 백엔드로 작업 이전)
+#  • 내보내기: tar 스트림을 직접 만들어 청크 단위로 압축 → 응답으로 바로 전송
+#      zstd (zstandard 설치 시, .tar.zst) 또는 gzip (.tar.gz)
+#      profile/scans/, profile/reports/, profile/archive/, profile/retention.json, vpn_configs/
+#      마지막 항목 MANIFEST.json: 파일별 크기와 sha256
+#  • 가져오기: 압축 형식을 앞부분 바이트로 판별하고 tar 를 스트리밍으로 읽어 임시 디렉토리에 풀기
+#      → MANIFEST.json 과 크기/sha256 비교 → 이름 변경으로 프로필 반영 → 인덱스 재생성
+#  • 파일 하나씩 고정 크기 청크로 처리하므로 수 GB 프로필도 메모리 사용량이 일정
+# 인덱스(index/)와 격리 파일(quarantine/)은 옮기지 않습니다. (가져온 뒤 다시 생성)
+# ──────────────────────────────────────────────────────────
+import gzip
+import hashlib
+import os
+import shutil
+import tarfile
+import time
+import uuid
+import zlib
+import logging
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import json_provider
+
+try:
+    import zstandard  # 선택 의존성 (pip install zstandard)
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMAT = 1
+MANIFEST_NAME = "MANIFEST.json"
+CHUNK_SIZE = 1024 * 1024
+# zstd 압축 레벨 / gzip 압축 레벨
+ZSTD_LEVEL = int(os.environ.get("EXPORT_ZSTD_LEVEL", "3"))
+GZIP_LEVEL = int(os.environ.get("EXPORT_GZIP_LEVEL", "6"))
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_GZIP_MAGIC = b"\x1f\x8b"
+_BLOCK = tarfile.BLOCKSIZE
+
+# 프로필 디렉토리에서 내보내지 않는 항목 (다시 만들 수 있거나 이 서버에만 의미 있음)
+_SKIP_DIRS = {"index", "quarantine", ".locks"}
+
+
+class ArchiveError(Exception):
+    """가져올 수 없는 아카이브 (형식 오류, 무결성 검사 실패 등)"""
+
+
+def valid_profile_name(name: str) -> bool:
+    """LocalStorage.create_profile 과 같은 규칙 (알파벳, 숫자, 하이픈, 언더스코어, 50자 이하)"""
+    return bool(name) and len(name) <= 50 and all(c.isalnum() or c in "-_" for c in name)
+
+
+def export_format() -> Tuple[str, str]:
+    """(압축 방식, 파일 확장자) - zstandard 가 없으면 gzip"""
+    return ("zstd", "tar.zst") if zstandard is not None else ("gzip", "tar.gz")
+
+
+# ──────────────────────────────────────────────────────────
+# 내보내기
+# ──────────────────────────────────────────────────────────
+
+def _compressor(method: str):
+    if method == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    # wbits=31: gzip 헤더/트레일러 포함
+    return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+
+def _collect_files(profile_dir: str, vpn_dir: Optional[str]) -> List[Tuple[str, str]]:
+    """[(아카이브 내 경로, 실제 경로)]"""
+    files = []
+    for root, dirs, names in os.walk(profile_dir):
+        dirs[:] = sorted(d for d in dirs if d not in _SKIP_DIRS and not d.startswith("."))
+        for name in sorted(names):
+            if name.startswith(".") or name.endswith(".lock"):
+                continue
+            path = os.path.join(root, name)
+            files.append(("profile/" + os.path.relpath(path, profile_dir).replace(os.sep, "/"), path))
+    if vpn_dir and os.path.isdir(vpn_dir):
+        for name in sorted(os.listdir(vpn_dir)):
+            path = os.path.join(vpn_dir, name)
+            if os.path.isfile(path) and not name.startswith("."):
+                files.append((f"vpn_configs/{name}", path))
+    return files
+
+
+def _tar_header(name: str, size: int, mtime: float) -> bytes:
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = int(mtime)
+    info.mode = 0o644
+    return info.tobuf(format=tarfile.PAX_FORMAT)
+
+
+def _padding(size: int) -> bytes:
+    remainder = size % _BLOCK
+    return b"\0" * (_BLOCK - remainder) if remainder else b""
+
+
+def export_profile(profile_dir: str, vpn_dir: Optional[str], profile: str,
+                   method: Optional[str] = None) -> Iterator[bytes]:
+    """
+    프로필을 압축된 tar 스트림으로 내보내기 (제너레이터)
+
+    Args:
+        profile_dir: data/profiles/<profile>
+        vpn_dir: vpn_configs/<profile> (없으면 None)
+        profile: 프로필 이름 (MANIFEST 에 기록)
+        method: "zstd" 또는 "gzip" (기본값: export_format())
+
+    Yields:
+        압축된 바이트 청크
+    """
+    method = method or export_format()[0]
+    compressor = _compressor(method)
+    manifest: Dict[str, Any] = {
+        "format": ARCHIVE_FORMAT,
+        "profile": profile,
+        "created_at": datetime.now().isoformat(),
+        "files": {},
+    }
+
+    def emit(data: bytes) -> Iterator[bytes]:
+        out = compressor.compress(data)
+        if out:
+            yield out
+
+    for arcname, path in _collect_files(profile_dir, vpn_dir):
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            # 내보내는 동안 삭제된 파일
+            continue
+        with f:
+            # 크기는 열린 파일 기준 (원자적 교체로 경로가 바뀌어도 이 파일 내용은 그대로)
+            stat = os.fstat(f.fileno())
+            digest = hashlib.sha256()
+            yield from emit(_tar_header(arcname, stat.st_size, stat.st_mtime))
+            remaining = stat.st_size
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise OSError(f"파일이 내보내는 중에 잘렸습니다: {path}")
+                digest.update(chunk)
+                remaining -= len(chunk)
+                yield from emit(chunk)
+            yield from emit(_padding(stat.st_size))
+        manifest["files"][arcname] = {"size": stat.st_size, "sha256": digest.hexdigest()}
+
+    body = json_provider.dumps(manifest)
+    yield from emit(_tar_header(MANIFEST_NAME, len(body), time.time()) + body + _padding(len(body)))
+    # tar 끝 표시 (빈 블록 2개)
+    yield from emit(b"\0" * (_BLOCK * 2))
+    tail = compressor.flush()
+    if tail:
+        yield tail
+
+
+# ──────────────────────────────────────────────────────────
+# 가져오기
+# ──────────────────────────────────────────────────────────
+
+class _PrefixedReader:
+    """압축 형식 판별에 쓴 앞부분 바이트를 다시 이어 붙인 읽기 전용 스트림"""
+
+    def __init__(self, prefix: bytes, stream: BinaryIO):
+        self._prefix = prefix
+        self._stream = stream
+
+    def read(self, size: int = -1) -> bytes:
+        if self._prefix:
+            if size is None or size < 0:
+                data, self._prefix = self._prefix + self._stream.read(), b""
+                return data
+            data, self._prefix = self._prefix[:size], self._prefix[size:]
+            if len(data) < size:
+                data += self._stream.read(size - len(data))
+            return data
+        return self._stream.read(size)
+
+
+def _open_decompressed(stream: BinaryIO) -> BinaryIO:
+    head = stream.read(4)
+    reader = _PrefixedReader(head, stream)
+    if head.startswith(_ZSTD_MAGIC):
+        if zstandard is None:
+            raise ArchiveError("zstd 아카이브를 읽으려면 zstandard 패키지가 필요합니다.")
+        return zstandard.ZstdDecompressor().stream_reader(reader)
+    if head.startswith(_GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=reader, mode="rb")
+    # 압축하지 않은 tar
+    return reader
+
+
+def _safe_member_path(name: str) -> Optional[str]:
+    """허용된 아카이브 내 경로면 그대로, 아니면 None (절대 경로, .., 예상 밖 위치 거부)"""
+    parts = name.split("/")
+    if "\\" in name or name.startswith("/") or any(p in ("", ".", "..") for p in parts):
+        return None
+    if parts == [MANIFEST_NAME]:
+        return name
+    if parts[0] == "profile" and len(parts) >= 2 and parts[1] not in _SKIP_DIRS:
+        return name
+    if parts[0] == "vpn_configs" and len(parts) == 2:
+        return name
+    return None
+
+
+def import_profile(stream: BinaryIO, profiles_dir: str, vpn_base_dir: Optional[str],
+                   name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    내보낸 아카이브를 새 프로필로 가져오기
+
+    Args:
+        stream: 아카이브 바이트 스트림 (요청 본문 등)
+        profiles_dir: data/profiles
+        vpn_base_dir: vpn_configs (None 이면 VPN 설정은 건너뜀)
+        name: 새 프로필 이름 (기본값: 아카이브에 기록된 이름)
+
+    Returns:
+        {"profile", "files", "bytes", "source_profile"}
+
+    Raises:
+        ArchiveError: 형식 오류, 무결성 검사 실패, 같은 이름의 프로필이 이미 있음,
+                      vpn_configs/<profile> 에 이미 파일이 있음
+    """
+    # 프로필 목록에 보이지 않도록 data/.imports/ 에 풀기 (같은 파일 시스템 → 이름 변경으로 반영)
+    staging = os.path.join(os.path.dirname(os.path.abspath(profiles_dir)), ".imports", uuid.uuid4().hex[:8])
+    os.makedirs(staging)
+    received: Dict[str, Dict[str, Any]] = {}
+    manifest = None
+    try:
+        try:
+            with tarfile.open(fileobj=_open_decompressed(stream), mode="r|") as tar:
+                for member in tar:
+                    path = _safe_member_path(member.name)
+                    if member.isdir():
+                        continue
+                    if path is None or not member.isfile():
+                        raise ArchiveError(f"허용되지 않는 아카이브 항목: {member.name}")
+                    source = tar.extractfile(member)
+                    if path == MANIFEST_NAME:
+                        manifest = json_provider.loads(source.read())
+                        continue
+                    target = os.path.join(staging, *path.split("/"))
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    digest = hashlib.sha256()
+                    size = 0
+                    with open(target, "wb") as out:
+                        while True:
+                            chunk = source.read(CHUNK_SIZE)
+                            if not chunk:
+                                break
+                            digest.update(chunk)
+                            size += len(chunk)
+                            out.write(chunk)
+                    received[path] = {"size": size, "sha256": digest.hexdigest()}
+        except (tarfile.TarError, EOFError, OSError, ValueError) as e:
+            raise ArchiveError(f"아카이브를 읽을 수 없습니다: {e}") from e
+
+        _verify(manifest, received)
+        profile = name or manifest.get("profile")
+        if not valid_profile_name(profile or ""):
+            raise ArchiveError(f"유효하지 않은 프로필 이름입니다: {profile}")
+        return _install(staging, profiles_dir, vpn_base_dir, profile, manifest, received)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _install_vpn_dir(staged_vpn: str, vpn_dir: str) -> None:
+    """VPN 설정을 vpn_dir 옆 임시 디렉토리에 옮긴 뒤 이름 변경으로 반영 (비어 있지 않은 vpn_dir 은 거부)"""
+    parent = os.path.dirname(vpn_dir)
+    os.makedirs(parent, exist_ok=True)
+    # 데이터 디렉토리와 vpn_configs 가 다른 파일 시스템일 수 있으므로 먼저 같은 디렉토리로 복사/이동
+    pending = os.path.join(parent, f".{os.path.basename(vpn_dir)}.{uuid.uuid4().hex[:8]}.import")
+    shutil.move(staged_vpn, pending)
+    try:
+        try:
+            # 빈 디렉토리만 제거됨 → 그 사이 파일이 생겼으면 OSError
+            if os.path.isdir(vpn_dir):
+                os.rmdir(vpn_dir)
+            os.rename(pending, vpn_dir)
+        except OSError:
+            raise ArchiveError(f"VPN 설정 디렉토리 '{vpn_dir}'에 이미 파일이 있습니다.") from None
+    finally:
+        shutil.rmtree(pending, ignore_errors=True)
+
+
+def _verify(manifest: Optional[Dict[str, Any]], received: Dict[str, Dict[str, Any]]) -> None:
+    """MANIFEST 의 파일 목록/크기/sha256 과 받은 파일 비교"""
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("files"), dict):
+        raise ArchiveError(f"{MANIFEST_NAME} 이 없거나 형식이 잘못되었습니다.")
+    if manifest.get("format") != ARCHIVE_FORMAT:
+        raise ArchiveError(f"지원하지 않는 아카이브 형식입니다: {manifest.get('format')}")
+    expected = manifest["files"]
+    missing = sorted(set(expected) - set(received))
+    extra = sorted(set(received) - set(expected))
+    corrupt = sorted(p for p in set(expected) & set(received) if expected[p] != received[p])
+    if missing or extra or corrupt:
+        raise ArchiveError(
+            f"무결성 검사 실패: 누락 {len(missing)}개, 목록에 없는 파일 {len(extra)}개, 내용 불일치 {len(corrupt)}개 "
+            f"(예: {(missing + extra + corrupt)[0]})"
+        )
+
+
+def _install(staging: str, profiles_dir: str, vpn_base_dir: Optional[str], profile: str,
+             manifest: Dict[str, Any], received: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    검증이 끝난 임시 디렉토리를 프로필로 반영 (같은 파일 시스템에서 이름 변경)
+    VPN 설정도 vpn_configs 옆에 먼저 모은 뒤 디렉토리 이름 변경으로 한 번에 반영합니다.
+    이미 파일이 있는 vpn_configs/<profile> 은 덮어쓰지 않고 가져오기를 거부합니다. (인증 정보 보호)
+    """
+    profile_dir = os.path.join(profiles_dir, profile)
+    staged_profile = os.path.join(staging, "profile")
+    os.makedirs(os.path.join(staged_profile, "scans"), exist_ok=True)
+    os.makedirs(os.path.join(staged_profile, "reports"), exist_ok=True)
+
+    staged_vpn = os.path.join(staging, "vpn_configs")
+    vpn_dir = os.path.join(vpn_base_dir, profile) if vpn_base_dir and os.path.isdir(staged_vpn) else None
+    if vpn_dir and os.path.isdir(vpn_dir) and os.listdir(vpn_dir):
+        raise ArchiveError(f"VPN 설정 디렉토리 '{vpn_dir}'에 이미 파일이 있습니다.")
+
+    try:
+        # 이미 있는 프로필은 덮어쓰지 않음 (os.rename 은 비어 있지 않은 대상이면 실패)
+        if os.path.exists(profile_dir):
+            raise FileExistsError(profile_dir)
+        os.rename(staged_profile, profile_dir)
+    except FileExistsError:
+        raise ArchiveError(f"프로필 '{profile}'이 이미 존재합니다.") from None
+
+    if vpn_dir:
+        try:
+            _install_vpn_dir(staged_vpn, vpn_dir)
+        except Exception:
+            # 프로필만 반영된 상태로 남지 않도록 되돌림
+            os.rename(profile_dir, staged_profile)
+            raise
+
+    logger.info(f"프로필 가져오기 완료: {manifest.get('profile')} → {profile} ({len(received)}개 파일)")
+    return {
+        "profile": profile,
+        "source_profile": manifest.get("profile"),
+        "files": len(received),
+        "bytes": sum(item["size"] for item in received.values()),
+    }
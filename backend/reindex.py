@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# reindex.py
+# ──────────────────────────────────────────────────────────
+# 파생 인덱스 재구성 (스캔/보고서 목록 인덱스, 자산 인벤토리, 전문 검색, 토폴로지)
+# 스캔 파일을 직접 복사/수정했거나 인덱스 DB 가 손상된 경우 사용합니다.
+#
+#   python reindex.py                    # data/ 의 모든 프로필
+#   python reindex.py data default       # 특정 프로필만
+# ──────────────────────────────────────────────────────────
+import sys
+
+from storage import LocalStorage
+
+
+def reindex(data_dir='data', profiles=None):
+    """프로필별 인덱스를 처음부터 다시 만듭니다."""
+    storage = LocalStorage(data_dir=data_dir)
+    targets = profiles or storage.get_profiles()
+    print(f"인덱스 재구성 시작: {data_dir} (프로필: {', '.join(targets)})")
+
+    for profile in targets:
+        counts = storage.rebuild_index(profile)
+        print(f"  - {profile}: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+    return True
+
+
+if __name__ == "__main__":
+    # 커맨드라인 인자로 data_dir 과 프로필 목록을 받을 수 있음
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else 'data'
+    reindex(data_dir, sys.argv[2:] or None)
+    print("인덱스 재구성이 완료되었습니다!")
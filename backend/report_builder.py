@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# report_builder.py
+# ──────────────────────────────────────────────────────────
+# 보고서 생성 파이프라인 (POST /api/report)
+#  • 스캔 데이터를 한 번만 순회해 호스트 수, 취약점 수(심각도별), 최대 CVSS, 리스크 레벨,
+#    열린 포트 수, 서비스/CVE 목록, 대상 IP 계산 → 스캔 저장 시 "summary" 로 함께 저장
+#  • 스캔 ID 로 만든 보고서는 스캔 전체를 복사하지 않고 요약 + 스캔 참조(details.scan_id)만 저장
+#    → 조회 시 스캔 데이터로 details 를 채움 (hydrate_report)
+#  • 취약점 정보가 없으면 요청 안에서 스캔하지 않고 백그라운드 보강 작업으로 넘김
+# ──────────────────────────────────────────────────────────
+import datetime
+from typing import Any, Dict, Optional
+
+
+def risk_level(max_cvss: Optional[float]) -> str:
+    """최대 CVSS 점수에 따른 리스크 레벨"""
+    if max_cvss is None:
+        return "없음"
+    if max_cvss >= 9.0:
+        return "심각"
+    elif max_cvss >= 7.0:
+        return "높음"
+    elif max_cvss >= 4.0:
+        return "중간"
+    elif max_cvss > 0:
+        return "낮음"
+    return "없음"
+
+
+# summarize_scan 결과 형식 버전 (저장된 요약이 이전 형식이면 다시 계산)
+SUMMARY_VERSION = 1
+
+
+def severity_bucket(score: Any) -> str:
+    """CVSS 점수 → 심각도 구간 (critical/high/medium/low/none)"""
+    if not isinstance(score, (int, float)) or score <= 0:
+        return "none"
+    if score >= 9.0:
+        return "critical"
+    elif score >= 7.0:
+        return "high"
+    elif score >= 4.0:
+        return "medium"
+    return "low"
+
+
+def summarize_scan(scan_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    스캔 데이터를 한 번 순회해 요약을 계산합니다. (스캔 저장 시 함께 저장됨)
+
+    Returns:
+        {"version", "hosts", "target_ips", "total_vulnerabilities", "severity_counts",
+         "max_cvss", "risk_level", "open_ports", "services", "cve_ids"}
+    """
+    hosts = scan_data.get("hosts", []) or []
+    target_ips = []
+    total_vulnerabilities = 0
+    max_cvss: Optional[float] = None
+    severity_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0, "none": 0}
+    open_ports = 0
+    services = set()
+    cve_ids = set()
+
+    for host in hosts:
+        if "host" in host:
+            target_ips.append(host.get("host"))
+        for port in host.get("ports", []) or []:
+            if port.get("state") == "open":
+                open_ports += 1
+                if port.get("service"):
+                    services.add(port["service"])
+            for vuln in port.get("vulnerabilities", []) or []:
+                total_vulnerabilities += 1
+                score = vuln.get("cvss_score")
+                severity_counts[severity_bucket(score)] += 1
+                if isinstance(score, (int, float)) and (max_cvss is None or score > max_cvss):
+                    max_cvss = float(score)
+                if vuln.get("cve_id"):
+                    cve_ids.add(vuln["cve_id"])
+
+    return {
+        "version": SUMMARY_VERSION,
+        "hosts": len(hosts),
+        "target_ips": target_ips,
+        "total_vulnerabilities": total_vulnerabilities,
+        "severity_counts": severity_counts,
+        "max_cvss": max_cvss,
+        "risk_level": risk_level(max_cvss),
+        "open_ports": open_ports,
+        "services": sorted(services),
+        "cve_ids": sorted(cve_ids),
+    }
+
+
+def stored_scan_summary(scan_data: Dict[str, Any]) -> Dict[str, Any]:
+    """저장된 스캔 요약 (없거나 이전 형식이면 다시 계산)"""
+    summary = scan_data.get("summary")
+    if isinstance(summary, dict) and summary.get("version") == SUMMARY_VERSION:
+        return summary
+    return summarize_scan(scan_data)
+
+
+def build_report_summary(scan_data: Dict[str, Any], scan_summary: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """보고서 summary 블록 (기존 보고서 형식과 동일한 키)"""
+    scan_summary = scan_summary or stored_scan_summary(scan_data)
+    target_ips = scan_summary["target_ips"]
+    return {
+        "scan_date": scan_data.get("timestamp", datetime.datetime.now().isoformat()),
+        "hosts_scanned": scan_summary["hosts"],
+        "total_hosts": scan_summary["hosts"],
+        "vulnerabilities_found": scan_summary["total_vulnerabilities"],
+        "total_vulnerabilities": scan_summary["total_vulnerabilities"],
+        "max_cvss": scan_summary["max_cvss"],
+        "risk_level": scan_summary["risk_level"],
+        "target_ips": target_ips,
+        # 대표 타겟 주소 (스캔 데이터에서 직접 가져오거나 호스트 목록에서 추출)
+        "target": scan_data.get("target", target_ips[0] if target_ips else "Unknown"),
+    }
+
+
+def build_report(
+    scan_data: Dict[str, Any],
+    scan_id: Optional[str] = None,
+    scan_summary: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    저장할 보고서 생성
+
+    Args:
+        scan_data: 스캔(취약점 분석) 결과
+        scan_id: 저장된 스캔으로 만든 보고서면 스캔 ID (details 에 참조만 저장)
+        scan_summary: 미리 계산된 summarize_scan 결과
+
+    Returns:
+        {"timestamp", "summary", "details"[, "details_ref"]}
+    """
+    report = {
+        "timestamp": datetime.datetime.now().isoformat(),
+        "summary": build_report_summary(scan_data, scan_summary),
+    }
+    if scan_id:
+        report["details"] = {
+            "scan_id": scan_id,
+            "target": scan_data.get("target"),
+            "timestamp": scan_data.get("timestamp"),
+        }
+        report["details_ref"] = True
+    else:
+        report["details"] = scan_data
+    return report
+
+
+def hydrate_report(report: Dict[str, Any], scan_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """참조형 보고서의 details 를 스캔 데이터로 채워 반환 (스캔이 삭제되었으면 참조 정보만)"""
+    if not report.get("details_ref"):
+        return report
+    details = report.get("details", {})
+    hydrated = {k: v for k, v in report.items() if k != "details_ref"}
+    if scan_data is not None:
+        hydrated["details"] = {**scan_data, "scan_id": details.get("scan_id")}
+    else:
+        hydrated["details"] = {**details, "hosts": []}
+    return hydrated
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# retention.py
+# ──────────────────────────────────────────────────────────
+# 스캔/보고서 보존 정책과 백그라운드 압축(compaction)
+#  • 프로필별 규칙 (profiles/<p>/retention.json)
+#      keep_last_per_target    : 대상별 최근 N개는 항상 유지
+#      keep_days               : 최근 X일 이내 문서는 모두 유지
+#      summary_only_after_days : 이보다 오래된 문서는 요약만 보관 (hosts 제거)
+#  • 규칙 밖의 문서는 월별 압축 세그먼트로 옮기고 원본 삭제
+#      profiles/<p>/archive/<scans|reports>/YYYY-MM.jsonl.gz (실행마다 gzip 멤버 추가)
+#      profiles/<p>/archive/<scans|reports>/index.json (ID → 세그먼트, 오프셋, 줄 번호, 요약)
+#  • 보관된 문서도 GET /api/scans/<id>, /api/reports/<id> 로 그대로 조회 가능
+#  • 보관된 문서를 삭제하면 해당 월 세그먼트를 남은 문서만으로 다시 작성 (삭제한 데이터가 남지 않음)
+#  • RetentionCompactor: 주기적으로 전체 프로필 압축 (여러 워커 중 잠금을 얻은 하나만 실행)
+# ──────────────────────────────────────────────────────────
+import gzip
+import io
+import os
+import tempfile
+import threading
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import json_provider
+from atomic_io import write_json
+from migrations import DOCUMENT_ID_KEYS
+from services import resolve
+from shared_state import file_lock
+
+try:
+    import fcntl  # Linux/Mac 전용
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 백그라운드 압축 주기(초, 0 이면 비활성화)
+RETENTION_INTERVAL = float(os.environ.get("RETENTION_INTERVAL", str(6 * 3600)))
+
+DEFAULT_RULES: Dict[str, Any] = {
+    "enabled": False,
+    "keep_last_per_target": 10,
+    "keep_days": 30,
+    "summary_only_after_days": None,
+}
+
+# 요약만 보관할 때 남기는 필드
+_SUMMARY_FIELDS = {
+    "scans": ("scan_id", "schema_version", "target", "timestamp", "summary", "scan_stats"),
+    "reports": ("report_id", "schema_version", "timestamp", "summary"),
+}
+
+
+def validate_rules(rules: Dict[str, Any]) -> Dict[str, Any]:
+    """규칙 검증 (잘못된 값이면 ValueError)"""
+    merged = {**DEFAULT_RULES, **{k: v for k, v in rules.items() if k in DEFAULT_RULES}}
+    merged["enabled"] = bool(merged["enabled"])
+    for key in ("keep_last_per_target", "keep_days", "summary_only_after_days"):
+        value = merged[key]
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+            raise ValueError(f"{key} 는 0 이상의 정수 또는 null 이어야 합니다.")
+    return merged
+
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    """문서 timestamp 파싱 (시간대가 있으면 datetime.now() 와 비교할 수 있게 로컬 naive 시각으로 변환)"""
+    try:
+        ts = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    return ts.astimezone().replace(tzinfo=None) if ts.tzinfo is not None else ts
+
+
+def select_archivable(entries: List[Dict[str, Any]], rules: Dict[str, Any], now: datetime) -> List[Dict[str, Any]]:
+    """
+    보존 규칙 밖의 목록 항목 선택
+
+    Args:
+        entries: LocalStorage 목록 항목 ({"id", "timestamp", "target", "summary", ...})
+        rules: validate_rules 결과
+    """
+    keep_days = rules.get("keep_days")
+    keep_last = rules.get("keep_last_per_target")
+    cutoff = now - timedelta(days=keep_days) if keep_days is not None else None
+
+    by_target: Dict[str, List[Tuple[datetime, Dict[str, Any]]]] = {}
+    for entry in entries:
+        ts = _parse_time(entry.get("timestamp"))
+        if ts is None:
+            # 시각을 알 수 없는 문서는 보관하지 않고 유지
+            continue
+        target = entry.get("target") or (entry.get("summary") or {}).get("target") or "Unknown"
+        by_target.setdefault(target, []).append((ts, entry))
+
+    archivable = []
+    for items in by_target.values():
+        items.sort(key=lambda item: item[0], reverse=True)
+        for rank, (ts, entry) in enumerate(items):
+            if keep_last is not None and rank < keep_last:
+                continue
+            if cutoff is None or ts >= cutoff:
+                continue
+            archivable.append(entry)
+    return archivable
+
+
+def downsample(file_type: str, document: Dict[str, Any]) -> Dict[str, Any]:
+    """요약만 남긴 문서 (hosts/details 는 빈 값으로 유지해 기존 응답 형식과 호환)"""
+    reduced = {k: document[k] for k in _SUMMARY_FIELDS[file_type] if k in document}
+    if file_type == "scans":
+        reduced["hosts"] = []
+    else:
+        details = document.get("details") or {}
+        reduced["details"] = {"scan_id": details.get("scan_id"), "target": details.get("target"), "hosts": []}
+    return reduced
+
+
+class ArchiveStore:
+    """프로필의 월별 압축 세그먼트 (문서 종류별 디렉토리)"""
+
+    def __init__(self, archive_dir: str):
+        self.archive_dir = archive_dir
+
+    def _dir(self, file_type: str) -> str:
+        return os.path.join(self.archive_dir, file_type)
+
+    def index_path(self, file_type: str) -> str:
+        return os.path.join(self._dir(file_type), "index.json")
+
+    def entries(self, file_type: str) -> Dict[str, Dict[str, Any]]:
+        """ID → {"segment", "offset", "line", "timestamp", "target", "summary", "summary_only", "archived_at"}"""
+        try:
+            return json_provider.read_json(self.index_path(file_type)).get("entries", {})
+        except (OSError, ValueError):
+            return {}
+
+    def segment_path(self, file_type: str, doc_id: str) -> Optional[str]:
+        entry = self.entries(file_type).get(doc_id)
+        return os.path.join(self._dir(file_type), entry["segment"]) if entry else None
+
+    def append(self, file_type: str, documents: List[Tuple[str, Dict[str, Any], bool]]) -> int:
+        """
+        문서를 월별 세그먼트에 추가 (세그먼트마다 gzip 멤버 하나)
+
+        Args:
+            documents: [(doc_id, document, summary_only)]
+
+        Returns:
+            추가한 문서 수
+        """
+        dir_path = self._dir(file_type)
+        os.makedirs(dir_path, exist_ok=True)
+        by_month: Dict[str, List[Tuple[str, Dict[str, Any], bool]]] = {}
+        for doc_id, document, summary_only in documents:
+            ts = _parse_time(document.get("timestamp")) or datetime.now()
+            by_month.setdefault(ts.strftime("%Y-%m"), []).append((doc_id, document, summary_only))
+
+        archived_at = datetime.now().isoformat()
+        with file_lock(f"{self.index_path(file_type)}.lock"):
+            entries = self.entries(file_type)
+            for month, items in sorted(by_month.items()):
+                segment = f"{month}.jsonl.gz"
+                segment_path = os.path.join(dir_path, segment)
+                buffer = io.BytesIO()
+                with gzip.GzipFile(fileobj=buffer, mode="wb") as gz:
+                    for doc_id, document, _ in items:
+                        gz.write(json_provider.dumps(document) + b"\n")
+                with open(segment_path, "ab") as f:
+                    offset = f.tell()
+                    f.write(buffer.getvalue())
+                    f.flush()
+                    os.fsync(f.fileno())
+                for line, (doc_id, document, summary_only) in enumerate(items):
+                    entries[doc_id] = {
+                        "segment": segment,
+                        "offset": offset,
+                        "line": line,
+                        "timestamp": document.get("timestamp", "Unknown"),
+                        "target": document.get("target") or (document.get("summary") or {}).get("target"),
+                        "summary": document.get("summary", {}),
+                        "scan_id": (document.get("details") or {}).get("scan_id") if file_type == "reports" else None,
+                        "summary_only": summary_only,
+                        "archived_at": archived_at,
+                    }
+            # 세그먼트를 먼저 기록하고 인덱스를 교체 → 중간에 멈춰도 원본은 아직 삭제 전
+            write_json(self.index_path(file_type), {"version": 1, "entries": entries})
+        return len(documents)
+
+    def _read_at(self, file_type: str, doc_id: str, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """인덱스의 오프셋/줄 번호로 읽기 (해당 gzip 멤버만 앞에서부터 읽음, ID 가 다르면 None)"""
+        segment_path = os.path.join(self._dir(file_type), entry["segment"])
+        with open(segment_path, "rb") as f:
+            f.seek(entry["offset"])
+            with gzip.GzipFile(fileobj=f, mode="rb") as gz:
+                for line_no, line in enumerate(gz):
+                    if line_no == entry["line"]:
+                        document = json_provider.loads(line)
+                        return document if document.get(DOCUMENT_ID_KEYS[file_type]) == doc_id else None
+        return None
+
+    def _scan_segment(self, file_type: str, doc_id: str, segment: str) -> Optional[Dict[str, Any]]:
+        """세그먼트 전체에서 ID 로 찾기 (재작성 도중 읽었거나 인덱스가 세그먼트보다 오래된 경우, 마지막 사본)"""
+        found = None
+        with gzip.open(os.path.join(self._dir(file_type), segment), "rb") as gz:
+            for line in gz:
+                document = json_provider.loads(line)
+                if document.get(DOCUMENT_ID_KEYS[file_type]) == doc_id:
+                    found = document
+        return found
+
+    def get(self, file_type: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        """보관된 문서"""
+        entry = self.entries(file_type).get(doc_id)
+        if not entry:
+            return None
+        try:
+            document = self._read_at(file_type, doc_id, entry)
+        except (OSError, EOFError, ValueError):
+            document = None
+        if document is None:
+            try:
+                document = self._scan_segment(file_type, doc_id, entry["segment"])
+            except (OSError, EOFError, ValueError) as e:
+                logger.warning(f"보관 문서 {doc_id} 읽기 오류: {e}")
+                return None
+            if document is None:
+                return None
+        document["archived"] = {
+            "segment": entry["segment"],
+            "archived_at": entry.get("archived_at"),
+            "summary_only": entry.get("summary_only", False),
+        }
+        return document
+
+    def _last_copies(self, file_type: str, segment: str, doc_ids) -> Dict[str, int]:
+        """
+        세그먼트에서 문서별 마지막 사본의 줄 번호
+        (같은 ID 가 여러 번 추가되면 인덱스는 마지막 추가를 가리킴)
+        """
+        id_key = DOCUMENT_ID_KEYS[file_type]
+        last_copy: Dict[str, int] = {}
+        with gzip.open(os.path.join(self._dir(file_type), segment), "rb") as gz:
+            for line_no, line in enumerate(gz):
+                doc_id = json_provider.loads(line).get(id_key)
+                if doc_id in doc_ids:
+                    last_copy[doc_id] = line_no
+        return last_copy
+
+    def iter_documents(self, file_type: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """보관된 문서를 세그먼트 순서대로 (doc_id, document) 로 하나씩 반환 (인덱스에 있는 문서만)"""
+        entries = self.entries(file_type)
+        id_key = DOCUMENT_ID_KEYS[file_type]
+        for segment in sorted({e["segment"] for e in entries.values()}):
+            try:
+                wanted = {doc_id for doc_id, e in entries.items() if e["segment"] == segment}
+                last_copy = self._last_copies(file_type, segment, wanted)
+                with gzip.open(os.path.join(self._dir(file_type), segment), "rb") as gz:
+                    for line_no, line in enumerate(gz):
+                        document = json_provider.loads(line)
+                        doc_id = document.get(id_key)
+                        if last_copy.get(doc_id) == line_no:
+                            yield doc_id, document
+            except (OSError, EOFError, ValueError) as e:
+                logger.warning(f"보관 세그먼트 {segment} 읽기 오류: {e}")
+
+    def remove(self, file_type: str, doc_id: str) -> bool:
+        """인덱스에서 제거하고 해당 월 세그먼트를 남은 문서만으로 다시 작성"""
+        with file_lock(f"{self.index_path(file_type)}.lock"):
+            entries = self.entries(file_type)
+            entry = entries.pop(doc_id, None)
+            if entry is None:
+                return False
+            self._rewrite_segment(file_type, entry["segment"], entries)
+            write_json(self.index_path(file_type), {"version": 1, "entries": entries})
+        return True
+
+    def _rewrite_segment(self, file_type: str, segment: str, entries: Dict[str, Dict[str, Any]]) -> None:
+        """
+        세그먼트를 인덱스에 남은 문서만으로 다시 작성 (인덱스 잠금을 잡은 채로 호출)
+        삭제된 문서와 중단된 압축이 남긴 참조 없는 멤버도 함께 제거되고,
+        남은 문서의 offset/line 은 entries 에서 갱신됩니다. (남은 문서가 없으면 세그먼트 삭제)
+        """
+        segment_path = os.path.join(self._dir(file_type), segment)
+        keep = {doc_id for doc_id, e in entries.items() if e["segment"] == segment}
+        if not keep:
+            if os.path.exists(segment_path):
+                os.remove(segment_path)
+            return
+
+        id_key = DOCUMENT_ID_KEYS[file_type]
+        last_copy = self._last_copies(file_type, segment, keep)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self._dir(file_type), prefix=f".{segment}.", suffix=".tmp")
+        written: Dict[str, int] = {}
+        try:
+            with os.fdopen(fd, "wb") as f:
+                with gzip.GzipFile(fileobj=f, mode="wb") as out, gzip.open(segment_path, "rb") as src:
+                    for line_no, line in enumerate(src):
+                        doc_id = json_provider.loads(line).get(id_key)
+                        if last_copy.get(doc_id) == line_no:
+                            written[doc_id] = len(written)
+                            out.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, segment_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        for doc_id in keep:
+            if doc_id in written:
+                entries[doc_id].update(offset=0, line=written[doc_id])
+            else:
+                logger.warning(f"보관 문서 {doc_id} 가 세그먼트 {segment} 에 없어 인덱스에서 제거합니다.")
+                entries.pop(doc_id)
+
+
+def compact_profile(storage, profile: str, rules: Optional[Dict[str, Any]] = None,
+                    dry_run: bool = False, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    프로필 하나에 보존 규칙 적용
+
+    Args:
+        storage: LocalStorage
+        profile: 프로필
+        rules: 규칙 (기본값: 프로필에 저장된 규칙, 비활성화면 아무것도 하지 않음)
+        dry_run: 보관 대상만 계산
+
+    Returns:
+        {"profile", "scans": {"archived", "summary_only", "ids"}, "reports": {...}}
+    """
+    rules = rules or storage.get_retention_rules(profile)
+    result: Dict[str, Any] = {"profile": profile, "enabled": rules["enabled"], "dry_run": dry_run}
+    if not rules["enabled"]:
+        return result
+
+    now = now or datetime.now()
+    summary_days = rules.get("summary_only_after_days")
+    summary_cutoff = now - timedelta(days=summary_days) if summary_days is not None else None
+    archive = storage.get_archive(profile)
+
+    for file_type in ("scans", "reports"):
+        candidates = select_archivable(storage.list_entries(file_type, profile), rules, now)
+        stats = {"archived": 0, "summary_only": 0, "ids": [c["id"] for c in candidates]}
+        result[file_type] = stats
+        if dry_run or not candidates:
+            stats["archived"] = len(candidates) if dry_run else 0
+            continue
+
+        documents = []
+        for candidate in candidates:
+            document = storage.get_document(file_type, candidate["id"], profile, include_archived=False)
+            if document is None:
+                continue
+            ts = _parse_time(document.get("timestamp"))
+            summary_only = bool(summary_cutoff and ts and ts < summary_cutoff)
+            if summary_only:
+                document = downsample(file_type, document)
+                stats["summary_only"] += 1
+            documents.append((candidate["id"], document, summary_only))
+
+        archive.append(file_type, documents)
+        for doc_id, _, _ in documents:
+            storage.remove_archived_source(file_type, doc_id, profile)
+        stats["archived"] = len(documents)
+        logger.info(f"프로필 {profile}: {file_type} {len(documents)}개 보관 (요약만 {stats['summary_only']}개)")
+    return result
+
+
+class RetentionCompactor:
+    """
+    주기적으로 모든 프로필에 보존 규칙 적용 (데몬 스레드)
+
+    여러 gunicorn 워커가 각자 시작해도 비차단 잠금(data/.retention.lock)을 얻은 워커만 실행합니다.
+    """
+
+    def __init__(self, storage, interval: float = RETENTION_INTERVAL):
+        self._storage = storage
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="retention-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"보존 정책 압축 오류: {e}")
+
+    def run_once(self, profiles: Optional[List[str]] = None, dry_run: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """
+        프로필 압축 (기본값: 전체 프로필)
+
+        Returns:
+            프로필별 compact_profile 결과 (다른 워커가 압축 중이면 None)
+        """
+        storage = resolve(self._storage)
+        lock_path = os.path.join(storage.data_dir, ".retention.lock")
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return None
+            start = time.time()
+            results = [compact_profile(storage, profile, dry_run=dry_run)
+                       for profile in (profiles or storage.get_profiles())]
+            if dry_run:
+                return results
+            self.last_run = {"finished_at": datetime.now().isoformat(),
+                             "elapsed": round(time.time() - start, 2), "results": results}
+            return results
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
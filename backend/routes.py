@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 import uuid
 import datetime
 import os
@@ -7,9 +7,21 @@ from storage import LocalStorage  # 절대 경로로 변경
 from scanner import NetworkScanner  # 절대 경로로 변경
 from vpn_manager import VPNManager  # VPN 관리자 추가
 from exploit_searcher import ExploitSearcher
-from typing import Dict, List, Any
+from scan_jobs import execute_scan
+from discovery import get_discovery
+from diagnostics import NETWORK_TEST_DEADLINE, run_diagnostics
+from topology import DEFAULT_MAX_NODES, DEFAULT_SUBNET_PREFIX
+import exporters
+from nmap_import import import_scan
+from profile_archive import ArchiveError, export_format, export_profile, import_profile
+from http_cache import file_etag, file_response, not_modified, with_etag
+import json_provider
+from report_builder import SUMMARY_VERSION, build_report, hydrate_report, stored_scan_summary, summarize_scan
+from services import resolve
+from shared_state import pid_alive
+import tracing
+from typing import Dict, List, Any, Optional
 
-import nmap
 import logging
 
 # 로거 설정
@@ -20,15 +32,34 @@ logger = logging.getLogger(__name__)
 api = Blueprint('api', __name__)
 
 # 스토리지 및 VPN 매니저 접근 헬퍼 함수
+# (app.py 에서 LazyService 로 등록되므로 첫 사용 시 초기화됨)
 def get_storage():
-    return current_app.config['STORAGE']
+    return resolve(current_app.config['STORAGE'])
 
 def get_vpn_manager():
-    return current_app.config['VPN_MANAGER']
+    return resolve(current_app.config['VPN_MANAGER'])
 
 def get_exploit_searcher():
     """Get the ExploitSearcher instance from the app context."""
-    return current_app.config['EXPLOIT_SEARCHER']
+    return resolve(current_app.config['EXPLOIT_SEARCHER'])
+
+def get_scan_jobs():
+    """배치 스캔 작업 관리자"""
+    return resolve(current_app.config['SCAN_JOBS'])
+
+@api.route('/health', methods=['GET'])
+def health_check():
+    """준비 상태 확인 (모든 서비스 초기화 완료 시 200, 아니면 503)"""
+    services = current_app.config.get('SERVICES', {})
+    service_status = {name: service.status() for name, service in services.items()}
+    ready = all(service.ready for service in services.values())
+    failed = any(status["state"] == "failed" for status in service_status.values())
+
+    body = {
+        "status": "ready" if ready else ("degraded" if failed else "starting"),
+        "services": service_status,
+    }
+    return jsonify(body), 200 if ready else 503
 
 @api.route('/scan', methods=['POST'])
 def scan_network():
@@ -43,46 +74,19 @@ def scan_network():
     if not target:
         return jsonify({"error": "스캔 대상이 지정되지 않았습니다"}), 400
     
-    # VPN 연결 상태 확인
-    vpn_status = get_vpn_manager().get_status()
-    is_vpn_connected = vpn_status.get("status") == "connected"
-    print(f"VPN 연결 상태: {vpn_status.get('status', '알 수 없음')}")
-    
-    if not is_vpn_connected:
-        print("주의: VPN이 연결되어 있지 않습니다. 내부 네트워크나 공개 호스트만 스캔 가능합니다.")
-        
     ports = data.get('ports', '1-1000')  # 기본값: 1-1000
     arguments = data.get('arguments', '-sV')  # 기본값: 서비스 버전 스캔
     
-    # Windows 환경에서는 unprivileged 옵션 추가 (VPN 스캔 지원)
-    if os.name == 'nt' and '--unprivileged' not in arguments:
-        arguments = f'{arguments} --unprivileged'
-    
-    print(f"스캔 대상: {target}, 포트: {ports}, 옵션: {arguments}")
-    
-    # 스캔 수행
-    scanner = NetworkScanner()
+    # 스캔 수행 (VPN 재연결 대기 및 VPN 상태 기록 포함, 단계별 시간은 timing 블록으로 저장)
     try:
-        scan_result = scanner.scan_target(target, ports, arguments)
-        
-        # VPN 상태 정보 추가
-        scan_result["vpn_status"] = {
-            "connected": is_vpn_connected,
-            "connection_info": vpn_status.get("connection_info", {}),
-            "config": vpn_status.get("config", None)
-        }
-        
-        # 스캔 결과 요약 출력
-        host_count = len(scan_result.get("hosts", []))
-        port_count = sum(len(host.get("ports", [])) for host in scan_result.get("hosts", []))
-        print(f"스캔 결과 요약: {host_count}개 호스트, {port_count}개 포트 발견")
-        
-        if "error" in scan_result:
-            print(f"스캔 오류 발생: {scan_result['error']}")
-        
-        # 결과 저장
-        file_path = get_storage().save_scan_result(scan_result)
-        scan_id = os.path.basename(file_path).split(".")[0]
+        with tracing.start_trace("POST /api/scan", target=target) as root:
+            scan_result = execute_scan(target, ports, arguments, get_vpn_manager())
+            
+            # 결과 저장
+            file_path = get_storage().save_scan_result(scan_result)
+            scan_id = os.path.basename(file_path).split(".")[0]
+            if root:
+                root.set_attribute("scan_id", scan_id)
         
         # 응답에 스캔 ID 추가
         scan_result["scan_id"] = scan_id
@@ -92,6 +96,57 @@ def scan_network():
         print(f"스캔 중 예외 발생: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@api.route('/scans/batch', methods=['POST'])
+def batch_scan():
+    """
+    여러 대상 일괄 스캔 (비동기)
+
+    요청 예:
+        {"targets": ["10.0.0.1", {"target": "10.0.0.2", "ports": "22,80"}],
+         "ports": "1-1000", "arguments": "-sV", "timeout": 300}
+    """
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({"error": "요청 데이터가 제공되지 않았습니다"}), 400
+    
+    try:
+        batch = get_scan_jobs().submit_batch(
+            data.get('targets'),
+            ports=data.get('ports', '1-1000'),
+            arguments=data.get('arguments', '-sV'),
+            timeout=data.get('timeout'),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify(batch), 202
+
+@api.route('/scans/batch', methods=['GET'])
+def list_batch_scans():
+    """배치 스캔 목록 조회"""
+    return jsonify({"batches": get_scan_jobs().list_batches()})
+
+@api.route('/scans/batch/<batch_id>', methods=['GET'])
+def get_batch_scan(batch_id):
+    """배치 스캔 진행 상황 조회"""
+    batch = get_scan_jobs().get_batch(batch_id)
+    if not batch:
+        return jsonify({"error": f"ID {batch_id}에 해당하는 배치를 찾을 수 없습니다."}), 404
+    return jsonify(batch)
+
+@api.route('/discover', methods=['POST'])
+def discover_hosts():
+    """대상 범위의 살아있는 호스트 탐색 (캐시 사용, refresh=true 면 재탐색)"""
+    data = request.get_json()
+    
+    if not data or not data.get('target'):
+        return jsonify({"error": "탐색 대상이 지정되지 않았습니다"}), 400
+    
+    privileged = os.name != "nt" and hasattr(os, "geteuid") and os.geteuid() == 0
+    result = get_discovery().discover(data['target'], privileged=privileged, refresh=bool(data.get('refresh')))
+    return jsonify(result)
+
 @api.route('/scan/vulns', methods=['POST'])
 def check_vulnerabilities():
     """스캔 결과에 대한 취약점 분석"""
@@ -121,39 +176,28 @@ def check_vulnerabilities():
 
 @api.route('/report', methods=['POST'])
 def generate_report():
-    """취약점 분석 결과를 기반으로 보고서 생성"""
+    """
+    취약점 분석 결과를 기반으로 보고서 생성
+
+    스캔 ID 로 만든 보고서는 요약과 스캔 참조만 저장합니다.
+    스캔에 취약점 정보가 없으면 요청 안에서 재스캔하지 않고 백그라운드 보강 작업을 등록하며,
+    보강이 끝나면 스캔 결과와 보고서 요약이 갱신됩니다. (summary.enrichment 로 상태 확인)
+    """
     data = request.get_json()
     
     if not data:
         return jsonify({"error": "요청 데이터가 필요합니다."}), 400
     
+    scan_id = None
     # 스캔 ID가 제공된 경우 해당 스캔 결과 조회 (이 로직을 우선시함)
     if 'scan_id' in data:
         scan_id = data['scan_id']
         logger.info(f"스캔 ID {scan_id}로 데이터 조회 중")
         
-        scan_data = get_storage().get_scan_by_id(scan_id)
-        if not scan_data:
+        # 참조형 보고서는 요약과 참조만 저장하므로 스캔 전체 대신 인덱스 항목으로 만듦
+        vuln_data = _scan_report_source(get_storage(), scan_id)
+        if not vuln_data:
             return jsonify({"error": f"스캔 ID {scan_id}를 찾을 수 없습니다."}), 404
-        
-        # 스캔 데이터에서 취약점 정보 확인
-        has_vulnerabilities = False
-        for host in scan_data.get('hosts', []):
-            for port in host.get('ports', []):
-                if port.get('vulnerabilities') and len(port.get('vulnerabilities')) > 0:
-                    has_vulnerabilities = True
-                    break
-            if has_vulnerabilities:
-                break
-        
-        # 취약점 정보가 없는 경우에만 취약점 분석 실행
-        if not has_vulnerabilities:
-            logger.info("스캔 결과에 취약점 정보가 없어 취약점 분석 실행")
-            scanner = NetworkScanner()
-            vuln_data = scanner.check_vulns(scan_data)
-        else:
-            logger.info("스캔 결과에 이미 취약점 정보가 있음")
-            vuln_data = scan_data
     
     # 취약점 분석 결과가 직접 제공된 경우 사용
     elif 'vuln_results' in data:
@@ -162,63 +206,35 @@ def generate_report():
     else:
         return jsonify({"error": "스캔 ID 'scan_id' 또는 취약점 분석 결과 'vuln_results'가 필요합니다."}), 400
     
-    # 보고서 요약 정보 생성
-    hosts = vuln_data.get("hosts", [])
-    
-    # 호스트 및 취약점 수 계산
-    total_vulnerabilities = 0
-    
-    # 포트와 취약점 계산 (빈 포트 배열 처리)
-    if hosts:
-        for host in hosts:
-            port_list = host.get("ports", [])
-            for port in port_list:
-                vulnerabilities = port.get("vulnerabilities", [])
-                total_vulnerabilities += len(vulnerabilities)
-                
-    # 디버깅 정보 추가
-    logger.info(f"보고서 요약: 호스트 {len(hosts)}개, 취약점 {total_vulnerabilities}개")
-    for host_idx, host in enumerate(hosts):
-        logger.info(f"호스트 {host_idx+1}/{len(hosts)}: {host.get('host')}")
-        for port_idx, port in enumerate(host.get('ports', [])):
-            vulns = port.get('vulnerabilities', [])
-            if vulns:
-                logger.info(f"  - 포트 {port.get('port')}: 취약점 {len(vulns)}개")
-                for v in vulns:
-                    logger.info(f"    * {v.get('cve_id', 'N/A')} (점수: {v.get('cvss_score', 'N/A')})")
-
-    # 스캔 날짜 가져오기
-    scan_date = vuln_data.get("timestamp", datetime.datetime.now().isoformat())
-    
-    # IP 목록 추출
-    target_ips = [h.get("host") for h in hosts if "host" in h]
-    # 대표 타겟 주소 (vuln_data에서 직접 가져오거나 호스트 목록에서 추출)
-    target = vuln_data.get("target", target_ips[0] if target_ips else "Unknown")
-    
-    summary = {
-        "scan_date": scan_date,
-        "hosts_scanned": len(hosts),
-        "total_hosts": len(hosts),
-        "vulnerabilities_found": total_vulnerabilities,
-        "total_vulnerabilities": total_vulnerabilities,
-        "risk_level": calculate_risk_level(vuln_data),
-        "target_ips": target_ips,
-        "target": target
-    }
+    # 보고서 요약 정보 (스캔 저장 시 계산된 요약 사용, 없으면 한 번 순회해 계산)
+    scan_summary = vuln_data["summary"] if scan_id else summarize_scan(vuln_data)
+    logger.info(f"보고서 요약: 호스트 {scan_summary['hosts']}개, 취약점 {scan_summary['total_vulnerabilities']}개, "
+                f"리스크 {scan_summary['risk_level']}")
     
-    # 보고서 내용 생성
-    report = {
-        "timestamp": datetime.datetime.now().isoformat(),
-        "details": vuln_data,
-        "summary": summary
-    }
+    report = build_report(vuln_data, scan_id=scan_id, scan_summary=scan_summary)
+    needs_enrichment = (
+        scan_id is not None
+        and scan_summary['total_vulnerabilities'] == 0
+        and not vuln_data['vuln_enrichment']
+        and _vuln_scripts_available()
+    )
+    if needs_enrichment:
+        report["summary"]["enrichment"] = {"status": "queued"}
     
     # 보고서 저장
-    file_path = get_storage().save_report(report)
+    storage = get_storage()
+    file_path = storage.save_report(report)
     
     # 보고서 ID 추출 (파일명에서)
     report_id = os.path.basename(file_path).split('.')[0]
     
+    # 취약점 정보가 없는 경우 백그라운드 보강 작업 등록
+    if needs_enrichment:
+        logger.info("스캔 결과에 취약점 정보가 없어 취약점 보강 작업을 등록합니다.")
+        job = get_scan_jobs().submit_enrichment(scan_id, report_id, storage.get_current_profile())
+        # 저장된 보고서는 작업이 끝날 때 갱신되므로 여기서는 응답에만 job_id 를 포함
+        report["summary"]["enrichment"] = {"status": "queued", "job_id": job["job_id"]}
+    
     # 응답에 report_id 추가
     report_with_id = {
         "report_id": report_id,
@@ -229,22 +245,195 @@ def generate_report():
     
     return jsonify(report_with_id)
 
+@api.route('/report/enrichment/<job_id>', methods=['GET'])
+def get_report_enrichment(job_id):
+    """취약점 보강 작업 상태 조회"""
+    job = get_scan_jobs().get_enrichment(job_id)
+    if not job:
+        return jsonify({"error": f"ID {job_id}에 해당하는 보강 작업을 찾을 수 없습니다."}), 404
+    return jsonify(job)
+
+def _scan_report_source(storage, scan_id: str) -> Optional[Dict[str, Any]]:
+    """
+    보고서 생성에 필요한 스캔 정보 {"target", "timestamp", "summary", "vuln_enrichment"}
+    목록 인덱스 항목을 사용하고, 항목이 없거나 이전 형식이면(보관된 스캔 등) 스캔을 읽어 만듦 (없으면 None)
+    """
+    entry = storage.get_scan_index_entry(scan_id)
+    if "vuln_enrichment" in entry and entry.get("summary", {}).get("version") == SUMMARY_VERSION:
+        return {k: entry.get(k) for k in ("target", "timestamp", "summary", "vuln_enrichment")}
+    scan = storage.get_scan_by_id(scan_id)
+    if not scan:
+        return None
+    return {
+        "target": scan.get("target"),
+        "timestamp": scan.get("timestamp"),
+        "summary": stored_scan_summary(scan),
+        "vuln_enrichment": "vuln_enrichment" in scan,
+    }
+
+def _vuln_scripts_available() -> bool:
+    """취약점 스크립트(vulners/vulscan)로 보강할 수 있는 환경인지 확인 (결과는 캐시됨)"""
+    try:
+        env = NetworkScanner.probe_environment()
+    except Exception:
+        return False
+    return env["has_vulners"] or env["has_vulscan"]
+
+def _include_archived() -> bool:
+    return request.args.get('include_archived', '').lower() in ('1', 'true', 'yes')
+
 @api.route('/scans', methods=['GET'])
 def get_scan_list():
-    """저장된 스캔 결과 목록 조회"""
-    scans = get_storage().get_scan_list()
-    return jsonify({"scans": scans})
+    """저장된 스캔 결과 목록 조회 (ETag 일치 시 304, include_archived=1 이면 보관된 스캔 포함)"""
+    storage = get_storage()
+    include_archived = _include_archived()
+    etag = file_etag(*storage.get_list_paths("scans", include_archived=include_archived))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    scans = storage.get_scan_list(include_archived=include_archived)
+    return with_etag(jsonify({"scans": scans}), etag)
 
 @api.route('/reports', methods=['GET'])
 def get_report_list():
-    """저장된 보고서 목록 조회"""
-    reports = get_storage().get_report_list()
-    return jsonify({"reports": reports})
+    """저장된 보고서 목록 조회 (ETag 일치 시 304, include_archived=1 이면 보관된 보고서 포함)"""
+    storage = get_storage()
+    include_archived = _include_archived()
+    etag = file_etag(*storage.get_list_paths("reports", include_archived=include_archived))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    reports = storage.get_report_list(include_archived=include_archived)
+    return with_etag(jsonify({"reports": reports}), etag)
+
+def _archived_response(storage, file_type: str, data_id: str):
+    """보존 정책으로 보관된 스캔/보고서 응답 (보관되지 않았으면 None)"""
+    segment_path = storage.get_archived_path(file_type, data_id)
+    if not segment_path:
+        return None
+    # 참조형 보고서는 스캔(원본 파일 또는 보관 세그먼트)으로 채워지므로 그 상태도 ETag 에 반영
+    ref_paths = []
+    ref_scan_id = storage.get_archive().entries(file_type).get(data_id, {}).get("scan_id") if file_type == "reports" else None
+    if ref_scan_id:
+        ref_paths = [storage.get_scan_path(ref_scan_id), storage.get_archived_path("scans", ref_scan_id)]
+    etag = file_etag(segment_path, *ref_paths)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    data = storage.get_document(file_type, data_id)
+    if not data:
+        return None
+    if file_type == "reports" and data.get("details_ref"):
+        scan_id = data.get("details", {}).get("scan_id")
+        data = hydrate_report(data, storage.get_scan_by_id(scan_id) if scan_id else None)
+    return with_etag(jsonify(data), etag)
+
+def _export_response(fmt: str, scans, name: str):
+    """exporters 렌더링 결과를 스트리밍 응답으로"""
+    _, mimetype, extension = exporters.FORMATS[fmt]
+    return Response(
+        stream_with_context(exporters.render(fmt, scans)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{extension}"'},
+    )
+
+@api.route('/scans/export', methods=['GET'])
+def export_scans():
+    """
+    저장된 스캔들을 nmap XML / CSV / SARIF 로 스트리밍 내보내기
+    쿼리: format(xml/csv/sarif, 기본 xml), ids(쉼표 구분), target(부분 일치), since/until(ISO 시각),
+          include_archived(보관된 스캔 포함)
+    """
+    storage = get_storage()
+    fmt = request.args.get('format', 'xml')
+    if fmt not in exporters.FORMATS:
+        return jsonify({"error": f"format 은 {', '.join(exporters.FORMATS)} 중 하나여야 합니다."}), 400
+    ids = [i for i in request.args.get('ids', '').split(',') if i]
+    try:
+        entries = exporters.filter_entries(
+            storage.list_entries("scans", include_archived=_include_archived()),
+            ids=ids, target=request.args.get('target'),
+            since=request.args.get('since'), until=request.args.get('until'),
+        )
+    except ValueError:
+        return jsonify({"error": "since, until 은 ISO 8601 시각이어야 합니다."}), 400
+    profile = storage.get_current_profile()
+
+    def scans():
+        # 오래된 스캔부터 하나씩 읽어서 바로 렌더링
+        for entry in reversed(entries):
+            scan_data = storage.get_document("scans", entry["id"], profile)
+            if scan_data is not None:
+                yield entry["id"], scan_data
+
+    name = f"scans_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    return _export_response(fmt, scans(), name)
+
+@api.route('/scans/import', methods=['POST'])
+def import_nmap_scans():
+    """
+    nmap XML(-oX) 결과를 스캔으로 가져오기 (현재 프로필)
+    본문: XML 그대로, 또는 multipart 'file' (여러 개 가능)
+    쿼리: target (스캔 대상, 기본값: nmap 인자에서 추출)
+    많은 파일은 CLI(python nmap_import.py)로 병렬 처리하세요.
+    """
+    storage = get_storage()
+    target = request.args.get('target') or None
+    if request.mimetype == 'multipart/form-data':
+        uploads = [(f.filename, f.stream) for f in request.files.getlist('file')]
+        if not uploads:
+            return jsonify({"error": "파일이 제공되지 않았습니다"}), 400
+    else:
+        uploads = [(None, request.stream)]
+
+    imported, errors = [], []
+    for name, stream in uploads:
+        try:
+            imported.append({"file": name, **import_scan(storage, stream, target=target, source_name=name)})
+        except ValueError as e:
+            errors.append({"file": name, "error": str(e)})
+    if not imported:
+        return jsonify({"error": "가져온 스캔이 없습니다.", "errors": errors}), 400
+    return jsonify({"imported": imported, "errors": errors})
+
+@api.route('/scans/<scan_id>/export', methods=['GET'])
+def export_scan(scan_id):
+    """특정 스캔을 nmap XML / CSV / SARIF 로 내보내기 (쿼리: format)"""
+    fmt = request.args.get('format', 'xml')
+    if fmt not in exporters.FORMATS:
+        return jsonify({"error": f"format 은 {', '.join(exporters.FORMATS)} 중 하나여야 합니다."}), 400
+    scan_data = get_storage().get_scan_by_id(scan_id)
+    if not scan_data:
+        return jsonify({"error": f"ID {scan_id}에 해당하는 스캔을 찾을 수 없습니다."}), 404
+    return _export_response(fmt, [(scan_id, scan_data)], scan_id)
 
 @api.route('/scans/<scan_id>', methods=['GET'])
 def get_scan(scan_id):
-    """특정 스캔 결과 조회"""
-    scan_data = get_storage().get_scan_by_id(scan_id)
+    """
+    특정 스캔 결과 조회 (ETag 일치 시 파일을 읽지 않고 304)
+    응답 형식으로 저장된 스캔은 파싱하지 않고 파일을 그대로 전송합니다.
+    """
+    storage = get_storage()
+    scan_path = storage.get_scan_path(scan_id)
+    if not scan_path:
+        archived = _archived_response(storage, "scans", scan_id)
+        if archived is not None:
+            return archived
+        return jsonify({"error": f"ID {scan_id}에 해당하는 스캔을 찾을 수 없습니다."}), 404
+    etag = file_etag(scan_path)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    document = storage.get_scan_document(scan_id)
+    if document:
+        try:
+            return file_response(document, etag)
+        except OSError as e:
+            logger.warning(f"스캔 파일 전송 실패, JSON 파싱으로 대체: {e}")
+    
+    # 이전 형식(scan_id 미포함) 파일
+    scan_data = storage.get_scan_by_id(scan_id)
     if not scan_data:
         return jsonify({"error": f"ID {scan_id}에 해당하는 스캔을 찾을 수 없습니다."}), 404
     
@@ -253,7 +442,7 @@ def get_scan(scan_id):
         scan_data['scan_id'] = scan_id
         print(f"API: scan_id 필드를 추가했습니다 - {scan_id}")
     
-    return jsonify(scan_data)
+    return with_etag(jsonify(scan_data), etag)
 
 @api.route('/scans/<scan_id>', methods=['DELETE'])
 def delete_scan(scan_id):
@@ -265,11 +454,55 @@ def delete_scan(scan_id):
 
 @api.route('/reports/<report_id>', methods=['GET'])
 def get_report(report_id):
-    """특정 보고서 조회"""
-    report_data = get_storage().get_report_by_id(report_id)
+    """
+    특정 보고서 조회 (ETag 일치 시 파일을 읽지 않고 304)
+    응답 형식으로 저장된 보고서는 파일을 그대로, 참조형 보고서는 스캔 파일을 details 로 끼워 전송합니다.
+    """
+    storage = get_storage()
+    report_path = storage.get_report_path(report_id)
+    if not report_path:
+        archived = _archived_response(storage, "reports", report_id)
+        if archived is not None:
+            return archived
+        return jsonify({"error": f"ID {report_id}에 해당하는 보고서를 찾을 수 없습니다."}), 404
+    # 참조형 보고서는 스캔 내용으로 채워지므로 스캔 파일 상태도 ETag 에 반영
+    entry = storage.get_report_index_entry(report_id)
+    ref_scan_id = entry.get("scan_id")
+    etag = file_etag(report_path, storage.get_scan_path(ref_scan_id) if ref_scan_id else None)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    try:
+        passthrough = _report_passthrough(storage, report_id, report_path, entry, etag)
+        if passthrough is not None:
+            return passthrough
+    except OSError as e:
+        logger.warning(f"보고서 파일 전송 실패, JSON 파싱으로 대체: {e}")
+    
+    # 이전 형식 파일이거나 참조 스캔이 이전 형식/삭제된 경우
+    report_data = storage.get_report_by_id(report_id)
     if not report_data:
         return jsonify({"error": f"ID {report_id}에 해당하는 보고서를 찾을 수 없습니다."}), 404
-    return jsonify(report_data)
+    if report_data.get("details_ref"):
+        scan_id = report_data.get("details", {}).get("scan_id")
+        report_data = hydrate_report(report_data, storage.get_scan_by_id(scan_id) if scan_id else None)
+    return with_etag(jsonify(report_data), etag)
+
+def _report_passthrough(storage, report_id, report_path, entry, etag):
+    """보고서를 파싱/직렬화 없이 전송할 수 있으면 응답, 아니면 None"""
+    if not storage.get_report_document(report_id):
+        return None
+    if entry.get("details_ref") is False:
+        return file_response(report_path, etag)
+    scan_document = storage.get_scan_document(entry["scan_id"]) if entry.get("details_ref") and entry.get("scan_id") else None
+    if not scan_document:
+        return None
+    # 참조형 보고서 자체는 작으므로 읽어서 details 앞부분만 만들고, 스캔 파일은 그대로 이어 붙임
+    report_data = storage.get_report_by_id(report_id) or {}
+    head = {k: v for k, v in report_data.items() if k not in ("details", "details_ref")}
+    prefix = json_provider.dumps(head)[:-1] + b',"details":'
+    return file_response(scan_document, etag, prefix=prefix, suffix=b'}')
 
 @api.route('/reports/<report_id>', methods=['DELETE'])
 def delete_report(report_id):
@@ -281,31 +514,215 @@ def delete_report(report_id):
 
 def calculate_risk_level(vuln_results):
     """취약점 결과에 따른 리스크 레벨 계산"""
-    # 모든 취약점의 CVSS 점수 추출
-    cvss_scores = []
-    for host in vuln_results.get("hosts", []):
-        for port in host.get("ports", []):
-            for vuln in port.get("vulnerabilities", []):
-                if "cvss_score" in vuln:
-                    cvss_scores.append(vuln["cvss_score"])
-    
-    if not cvss_scores:
-        return "없음"
-    
-    # 최대 CVSS 점수
-    max_cvss = max(cvss_scores) if cvss_scores else 0
-    
-    # CVSS 점수에 따른 리스크 레벨 결정
-    if max_cvss >= 9.0:
-        return "심각"
-    elif max_cvss >= 7.0:
-        return "높음"
-    elif max_cvss >= 4.0:
-        return "중간"
-    elif max_cvss > 0:
-        return "낮음"
-    else:
-        return "없음"
+    return stored_scan_summary(vuln_results)["risk_level"]
+
+# 자산 인벤토리 엔드포인트 (현재 프로필, 스캔 저장 시 증분 갱신됨)
+@api.route('/inventory', methods=['GET'])
+def get_inventory_stats():
+    """인벤토리 통계 (호스트/포트/CVE 수)"""
+    return jsonify(get_storage().get_inventory().stats())
+
+@api.route('/inventory/hosts', methods=['GET'])
+def list_inventory_hosts():
+    """인벤토리 호스트 목록 (limit/offset 페이지)"""
+    limit, offset = _page_args(default_limit=100)
+    return jsonify(get_storage().get_inventory().list_hosts(limit=limit, offset=offset))
+
+@api.route('/inventory/hosts/<host>', methods=['GET'])
+def get_inventory_host(host):
+    """호스트별 포트 최신 상태와 CVE"""
+    result = get_storage().get_inventory().get_host(host)
+    if result is None:
+        return jsonify({"error": f"호스트 {host}가 인벤토리에 없습니다."}), 404
+    return jsonify(result)
+
+@api.route('/inventory/services', methods=['GET'])
+def find_inventory_services():
+    """
+    서비스/제품/버전으로 검색
+    예: /api/inventory/services?product=OpenSSH&version_lt=8
+    쿼리: service, product, version(접두사), version_lt, version_gte, state(기본 open, 'any' 는 전체), limit
+    """
+    args = request.args
+    state = args.get('state', 'open')
+    limit, _ = _page_args(default_limit=1000)
+    results = get_storage().get_inventory().find_services(
+        service=args.get('service'),
+        product=args.get('product'),
+        version=args.get('version'),
+        version_lt=args.get('version_lt'),
+        version_gte=args.get('version_gte'),
+        state=None if state == 'any' else state,
+        limit=limit,
+    )
+    return jsonify({"count": len(results), "results": results})
+
+@api.route('/inventory/cves/<cve_id>', methods=['GET'])
+def find_inventory_cve(cve_id):
+    """CVE 가 관측된 호스트/포트 목록"""
+    results = get_storage().get_inventory().hosts_by_cve(cve_id)
+    return jsonify({"cve_id": cve_id.upper(), "count": len(results), "results": results})
+
+@api.route('/inventory/rebuild', methods=['POST'])
+def rebuild_inventory():
+    """저장된 스캔으로 현재 프로필의 인덱스/인벤토리 재구성"""
+    return jsonify({"success": True, **get_storage().rebuild_index()})
+
+# 전문 검색 엔드포인트 (스크립트 출력, 서비스 배너, 보고서 요약)
+@api.route('/search', methods=['GET'])
+def search_documents():
+    """
+    현재 프로필의 스캔/보고서 전문 검색
+    예: /api/search?q="Apache httpd"&kind=scan&limit=20
+    쿼리: q(필수, FTS5 문법), kind(scan/report), limit, offset
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "검색어(q)가 필요합니다."}), 400
+    kind = request.args.get('kind')
+    if kind and kind not in ('scan', 'report'):
+        return jsonify({"error": "kind 는 scan 또는 report 여야 합니다."}), 400
+    limit, offset = _page_args(default_limit=20, max_limit=200)
+    return jsonify(get_storage().get_search_index().search(query, limit=limit, offset=offset, kind=kind))
+
+# 토폴로지 엔드포인트 (스캔 저장 시 증분 갱신되는 서버 캐시에서 생성)
+@api.route('/topology', methods=['GET'])
+def get_topology():
+    """
+    현재 프로필의 네트워크 토폴로지 (TopologyNode / TopologyEdge 형식)
+    쿼리: detail(host/subnet, 기본 host), max_nodes(host 모드 호스트 노드 최대 수),
+          prefix(서브넷 묶음 크기, 기본 24), routers(traceroute 라우터 포함, 기본 true)
+    """
+    args = request.args
+    detail = args.get('detail', 'host')
+    if detail not in ('host', 'subnet'):
+        return jsonify({"error": "detail 은 host 또는 subnet 이어야 합니다."}), 400
+    try:
+        max_nodes = max(1, int(args.get('max_nodes', DEFAULT_MAX_NODES)))
+        prefix = min(32, max(8, int(args.get('prefix', DEFAULT_SUBNET_PREFIX))))
+    except ValueError:
+        return jsonify({"error": "max_nodes, prefix 는 정수여야 합니다."}), 400
+
+    vpn_status = _shared_vpn_status()
+    graph = get_storage().get_topology().graph(
+        connection_info=vpn_status["connection_info"] if vpn_status["connected"] else None,
+        detail=detail,
+        max_nodes=max_nodes,
+        subnet_prefix=prefix,
+        include_routers=args.get('routers', 'true').lower() != 'false',
+    )
+    return jsonify(graph)
+
+# 보존 정책 엔드포인트 (현재 프로필)
+@api.route('/retention', methods=['GET'])
+def get_retention():
+    """현재 프로필의 보존 규칙과 보관된 문서 수"""
+    storage = get_storage()
+    archive = storage.get_archive()
+    return jsonify({
+        "profile": storage.get_current_profile(),
+        "rules": storage.get_retention_rules(),
+        "archived": {t: len(archive.entries(t)) for t in ("scans", "reports")},
+        "last_run": current_app.config['RETENTION'].last_run,
+    })
+
+@api.route('/retention', methods=['PUT'])
+def update_retention():
+    """
+    현재 프로필의 보존 규칙 변경
+    본문: {"enabled", "keep_last_per_target", "keep_days", "summary_only_after_days"} 중 바꿀 항목
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON 객체 본문이 필요합니다."}), 400
+    try:
+        rules = get_storage().set_retention_rules(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"rules": rules})
+
+@api.route('/retention/compact', methods=['POST'])
+def compact_retention():
+    """현재 프로필에 보존 규칙을 즉시 적용 (dry_run=1 이면 보관 대상만 반환)"""
+    storage = get_storage()
+    dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'yes')
+    results = current_app.config['RETENTION'].run_once(profiles=[storage.get_current_profile()], dry_run=dry_run)
+    if results is None:
+        return jsonify({"error": "다른 작업자가 압축을 실행 중입니다. 잠시 후 다시 시도하세요."}), 409
+    return jsonify(results[0])
+
+# 정기 스캔 스케줄 엔드포인트
+@api.route('/schedules', methods=['GET'])
+def list_schedules():
+    """스케줄 목록 (각 스케줄의 마지막 실행 포함)"""
+    return jsonify({"schedules": current_app.config['SCHEDULER'].list()})
+
+@api.route('/schedules', methods=['POST'])
+def create_schedule():
+    """
+    스케줄 등록
+
+    요청 예:
+        {"target": "10.0.0.0/24", "ports": "1-1000", "arguments": "-sV", "cron": "0 3 * * *",
+         "profile": "lab", "vpn_config": "lab.ovpn", "jitter_seconds": 300, "catch_up": "once"}
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON 객체 본문이 필요합니다."}), 400
+    try:
+        schedule = current_app.config['SCHEDULER'].create(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(schedule), 201
+
+@api.route('/schedules/<schedule_id>', methods=['GET'])
+def get_schedule(schedule_id):
+    """스케줄 상세 (실행 기록과 이전 실행 대비 변경 사항 포함)"""
+    schedule = current_app.config['SCHEDULER'].get(schedule_id)
+    if schedule is None:
+        return jsonify({"error": f"ID {schedule_id}에 해당하는 스케줄을 찾을 수 없습니다."}), 404
+    return jsonify(schedule)
+
+@api.route('/schedules/<schedule_id>', methods=['PUT'])
+def update_schedule(schedule_id):
+    """스케줄 변경 (본문에 바꿀 항목만, enabled=false 로 일시 중지)"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON 객체 본문이 필요합니다."}), 400
+    try:
+        schedule = current_app.config['SCHEDULER'].update(schedule_id, data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if schedule is None:
+        return jsonify({"error": f"ID {schedule_id}에 해당하는 스케줄을 찾을 수 없습니다."}), 404
+    return jsonify(schedule)
+
+@api.route('/schedules/<schedule_id>', methods=['DELETE'])
+def delete_schedule(schedule_id):
+    """스케줄 삭제 (이미 저장된 스캔은 유지)"""
+    if not current_app.config['SCHEDULER'].delete(schedule_id):
+        return jsonify({"error": f"ID {schedule_id}에 해당하는 스케줄을 찾을 수 없습니다."}), 404
+    return jsonify({"message": f"스케줄 {schedule_id}이(가) 삭제되었습니다."})
+
+@api.route('/schedules/<schedule_id>/run', methods=['POST'])
+def run_schedule(schedule_id):
+    """스케줄을 다음 확인 주기에 한 번 실행 (동시 실행 상한은 그대로 적용)"""
+    schedule = current_app.config['SCHEDULER'].run_now(schedule_id)
+    if schedule is None:
+        return jsonify({"error": f"ID {schedule_id}에 해당하는 스케줄을 찾을 수 없습니다."}), 404
+    return jsonify({"schedule_id": schedule_id, "pending": schedule["pending"]}), 202
+
+def _page_args(default_limit: int = 50, max_limit: int = 1000):
+    """limit/offset 쿼리 파라미터 (잘못된 값은 기본값)"""
+    try:
+        limit = min(max_limit, max(1, int(request.args.get('limit', default_limit))))
+    except ValueError:
+        limit = default_limit
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+    except ValueError:
+        offset = 0
+    return limit, offset
 
 # VPN 관련 엔드포인트 추가
 @api.route('/vpn/configs', methods=['GET'])
@@ -404,7 +821,11 @@ def connect_vpn():
         print(f"VPN 연결 시작: {config_name}")
         result = vpn_manager.connect(config_name)
         print(f"VPN 연결 결과: {result}")
-        
+
+        if result['status'] == 'connected_elsewhere':
+            return jsonify({"error": result['message'], "config": result['config'],
+                            "owner_pid": result['owner_pid']}), 409
+
         if result['status'] == 'error':
             # 더 자세한 오류 정보 추가
             error_msg = result.get('message', '알 수 없는 오류')
@@ -538,10 +959,60 @@ def delete_profile(profile_name):
         
     return jsonify(result)
 
+@api.route('/profiles/<profile_name>/export', methods=['GET'])
+def export_profile_archive(profile_name):
+    """
+    프로필 내보내기: 스캔, 보고서, 보관소, 보존 규칙, VPN 설정을 tar.zst(zstandard 없으면 tar.gz)로 스트리밍
+    """
+    storage = get_storage()
+    if profile_name not in storage.get_profiles():
+        return jsonify({"error": f"프로필 '{profile_name}'을 찾을 수 없습니다."}), 404
+    method, extension = export_format()
+    profile_dir = os.path.join(storage.data_dir, "profiles", profile_name)
+    vpn_base_dir = current_app.config.get('VPN_CONFIGS_DIR')
+    chunks = export_profile(profile_dir, os.path.join(vpn_base_dir, profile_name) if vpn_base_dir else None, profile_name, method)
+    filename = f"{profile_name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return Response(
+        stream_with_context(chunks),
+        mimetype="application/zstd" if method == "zstd" else "application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@api.route('/profiles/import', methods=['POST'])
+def import_profile_archive():
+    """
+    프로필 가져오기: 내보낸 아카이브를 요청 본문(또는 multipart 'file')으로 받아 새 프로필로 추가
+    쿼리: name (새 프로필 이름, 기본값: 내보낸 프로필 이름)
+    """
+    storage = get_storage()
+    if request.mimetype == 'multipart/form-data':
+        if 'file' not in request.files:
+            return jsonify({"error": "파일이 제공되지 않았습니다"}), 400
+        stream = request.files['file'].stream
+    else:
+        stream = request.stream
+    try:
+        result = import_profile(
+            stream,
+            os.path.join(storage.data_dir, "profiles"),
+            current_app.config.get('VPN_CONFIGS_DIR'),
+            name=request.args.get('name') or None,
+        )
+    except ArchiveError as e:
+        return jsonify({"error": str(e)}), 400
+    # 인덱스는 아카이브에 포함되지 않으므로 가져온 파일로 다시 생성
+    result["index"] = storage.rebuild_index(result["profile"])
+    return jsonify(result)
+
 # 네트워크 연결 테스트 엔드포인트 추가
 @api.route('/network/test', methods=['POST'])
 def test_network_connection():
-    """네트워크 연결 테스트 (핑 및 포트스캔)"""
+    """
+    네트워크 연결 테스트 (핑, TCP 연결, traceroute, mini-nmap 을 동시에 실행)
+
+    전체 제한 시간(NETWORK_TEST_DEADLINE, 요청의 'deadline' 으로 변경 가능) 안에
+    끝난 결과만 반환하고, 끝나지 않은 항목은 timed_out 으로 표시합니다.
+    """
     data = request.get_json()
     
     if not data or 'target' not in data:
@@ -549,94 +1020,78 @@ def test_network_connection():
         
     target = data['target']
     port = data.get('port', '80')  # 기본 포트 80
+    deadline = _network_test_deadline(data.get('deadline'))
     
-    results = {}
-    
-    # VPN 연결 상태
-    vpn_status = get_vpn_manager().get_status()
-    results["vpn_status"] = {
-        "connected": vpn_status.get("status") == "connected",
-        "connection_info": vpn_status.get("connection_info", {})
-    }
-    
+    results = {"vpn_status": _network_test_vpn_status()}
     try:
-        import subprocess
-        import socket
-        import time
-        
-        # PING 테스트
-        try:
-            if os.name == 'nt':  # Windows
-                ping_cmd = subprocess.run(['ping', '-n', '1', '-w', '2000', target], 
-                                         capture_output=True, text=True, timeout=3)
-            else:  # Linux/Docker
-                ping_cmd = subprocess.run(['ping', '-c', '1', '-W', '2', target], 
-                                         capture_output=True, text=True, timeout=3)
-                                         
-            results["ping"] = {
-                "success": ping_cmd.returncode == 0,
-                "output": ping_cmd.stdout
-            }
-        except Exception as e:
-            results["ping"] = {"error": str(e)}
-        
-        # TCP 연결 테스트
-        try:
-            start_time = time.time()
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2)
-            result = sock.connect_ex((target, int(port)))
-            elapsed = time.time() - start_time
-            
-            results["tcp_connect"] = {
-                "success": result == 0,
-                "port": port,
-                "elapsed_ms": round(elapsed * 1000, 2),
-                "error_code": result
-            }
-        except Exception as e:
-            results["tcp_connect"] = {"error": str(e)}
-            
-        # traceroute 테스트 (Linux만)
-        if os.name != 'nt':
-            try:
-                traceroute_cmd = subprocess.run(['traceroute', '-w', '1', '-m', '10', target], 
-                                               capture_output=True, text=True, timeout=5)
-                results["traceroute"] = {
-                    "output": traceroute_cmd.stdout
-                }
-            except Exception as e:
-                results["traceroute"] = {"error": str(e)}
-        
-        # mini-nmap 테스트
-        try:
-            scanner = NetworkScanner()
-            scan_result = scanner.scan_target(target, port, "-sV --unprivileged -T4")
-            
-            # 결과 간소화
-            simplified = {
-                "hosts": len(scan_result.get("hosts", [])),
-                "ports": []
-            }
-            
-            for host in scan_result.get("hosts", []):
-                for port_info in host.get("ports", []):
-                    simplified["ports"].append({
-                        "port": port_info.get("port"),
-                        "state": port_info.get("state"),
-                        "service": port_info.get("service"),
-                        "product": port_info.get("product")
-                    })
-                    
-            results["nmap"] = simplified
-        except Exception as e:
-            results["nmap"] = {"error": str(e)}
-            
+        for name, result in run_diagnostics(target, port, deadline):
+            results[name] = result
     except Exception as e:
         results["error"] = str(e)
     
     return jsonify(results)
 
+@api.route('/network/test/stream', methods=['GET'])
+def stream_network_test():
+    """
+    네트워크 연결 테스트 SSE 스트림
+
+    쿼리: target (필수), port (기본 80), deadline (초)
+    이벤트: vpn_status → 완료 순서대로 ping / tcp_connect / traceroute / nmap → done
+    """
+    target = request.args.get('target')
+    if not target:
+        return jsonify({"error": "테스트 대상이 지정되지 않았습니다"}), 400
+
+    port = request.args.get('port', '80')
+    deadline = _network_test_deadline(request.args.get('deadline'))
+    vpn_status = _network_test_vpn_status()
+
+    def _event(name: str, payload: Dict[str, Any]) -> str:
+        return f"event: {name}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+    def generate():
+        yield _event("vpn_status", vpn_status)
+        try:
+            for name, result in run_diagnostics(target, port, deadline):
+                yield _event(name, result)
+        except Exception as e:
+            yield _event("error", {"error": str(e)})
+        yield _event("done", {"target": target})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+def _network_test_deadline(value: Any) -> float:
+    """요청의 제한 시간(초)을 1~60초 범위로 (없거나 잘못되면 기본값)"""
+    try:
+        return min(60.0, max(1.0, float(value)))
+    except (TypeError, ValueError):
+        return NETWORK_TEST_DEADLINE
+
+def _shared_vpn_status() -> Dict[str, Any]:
+    """
+    공유 상태에 기록된 VPN 세션 (VPNManager 를 초기화하지 않음)
+    소유 워커와 OpenVPN 프로세스가 모두 사라진 기록은 연결 안 됨으로 봅니다.
+    """
+    snapshot = current_app.config['SHARED_STATE'].read("vpn")
+    alive = os.name == 'nt' or pid_alive(snapshot.get("owner_pid")) or pid_alive(snapshot.get("pid"))
+    connected = alive and snapshot.get("status") == "connected"
+    return {
+        "connected": connected,
+        "connection_info": snapshot.get("connection_info", {}) if connected else {}
+    }
+
+def _network_test_vpn_status() -> Dict[str, Any]:
+    vpn_status = get_vpn_manager().get_status()
+    return {
+        "connected": vpn_status.get("status") == "connected",
+        "connection_info": vpn_status.get("connection_info", {})
+    }
+
 @api.route('/searchsploit', methods=['GET'])
 def search_exploits_route():
     """Searches for exploits using searchsploit."""
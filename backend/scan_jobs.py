@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+# scan_jobs.py
+# ──────────────────────────────────────────────────────────
+# 스캔 작업 풀
+#  • 여러 대상을 제한된 수의 동시 nmap 프로세스로 병렬 스캔 (배치 스캔)
+#  • 대상별 타임아웃, 결과는 대상마다 save_scan_result 로 저장
+#  • 배치 진행 상황은 배치마다 공유 상태 파일 하나(state/jobs/<batch_id>.json)에 기록
+#      → 어느 워커에서든 조회 가능, 대상 상태가 바뀔 때 그 배치 파일만 다시 씀
+#  • 워커가 재시작되면 죽은 워커가 실행하던 배치는 interrupted 로 정리
+#  • 보고서용 취약점 보강(vulners/vulscan 재스캔)도 같은 풀에서 실행 ("enrichment")
+# ──────────────────────────────────────────────────────────
+import glob
+import os
+import re
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from metrics import SCANS_IN_FLIGHT, SCANS_TOTAL
+import tracing
+from report_builder import build_report_summary
+from scanner import NetworkScanner
+from services import resolve
+from shared_state import SharedStateStore, pid_alive
+
+logger = logging.getLogger(__name__)
+
+# 동시에 실행할 nmap 프로세스 수 (기본: CPU 코어 수)
+SCAN_MAX_WORKERS = int(os.environ.get("SCAN_MAX_WORKERS", os.cpu_count() or 4))
+# 대상 하나당 기본 nmap 타임아웃(초, 0 → 타이밍 모델이 대상별로 추정)
+SCAN_HOST_TIMEOUT = int(os.environ.get("SCAN_HOST_TIMEOUT", "0"))
+# VPN 재연결 중일 때 스캔을 보류하는 최대 시간(초)
+VPN_SCAN_HOLD_TIMEOUT = float(os.environ.get("VPN_SCAN_HOLD_TIMEOUT", "120"))
+# 한 배치에 넣을 수 있는 최대 대상 수
+MAX_BATCH_TARGETS = int(os.environ.get("MAX_BATCH_TARGETS", "1024"))
+# 공유 상태에 보관할 완료된 배치 / 보강 작업 수
+MAX_KEPT_BATCHES = 100
+MAX_KEPT_ENRICHMENTS = 200
+
+_BATCH_ID_RE = re.compile(r"^batch_\d{8}_\d{6}_[0-9a-f]{8}$")
+
+
+def execute_scan(
+    target: str,
+    ports: str,
+    arguments: str,
+    vpn_manager: Any = None,
+    timeout: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    단일 대상 스캔 수행 (VPN 재연결 대기 + nmap 스캔 + VPN 상태 기록)
+
+    POST /api/scan 과 배치 스캔이 같은 경로를 사용합니다.
+
+    Returns:
+        저장 전 스캔 결과 dict (error 포함 가능)
+    """
+    vpn_status: Dict[str, Any] = {}
+    if vpn_manager is not None:
+        with tracing.span("vpn.status") as span:
+            # 터널이 재연결 중이면 복구될 때까지 스캔을 보류 (VPN 밖으로 스캔이 나가지 않도록)
+            if vpn_manager.is_recovering():
+                print(f"VPN 재연결 중: 최대 {VPN_SCAN_HOLD_TIMEOUT}초 동안 스캔을 보류합니다.")
+                if span:
+                    span.set_attribute("waited_for_tunnel", True)
+                vpn_manager.wait_for_tunnel(VPN_SCAN_HOLD_TIMEOUT)
+            vpn_status = vpn_manager.get_status()
+            if span:
+                span.set_attribute("status", vpn_status.get("status"))
+
+    is_vpn_connected = vpn_status.get("status") == "connected"
+    print(f"VPN 연결 상태: {vpn_status.get('status', '알 수 없음')}")
+    if not is_vpn_connected:
+        print("주의: VPN이 연결되어 있지 않습니다. 내부 네트워크나 공개 호스트만 스캔 가능합니다.")
+
+    # Windows 환경에서는 unprivileged 옵션 추가 (VPN 스캔 지원)
+    if os.name == 'nt' and '--unprivileged' not in arguments:
+        arguments = f'{arguments} --unprivileged'
+
+    print(f"스캔 대상: {target}, 포트: {ports}, 옵션: {arguments}")
+
+    with SCANS_IN_FLIGHT.track_inprogress():
+        try:
+            with tracing.span("nmap.init"):
+                scanner = NetworkScanner()
+            with tracing.span("scan.target", target=target, ports=ports, arguments=arguments) as span:
+                scan_result = scanner.scan_target(target, ports, arguments, timeout=timeout)
+                if span and "error" in scan_result:
+                    span.set_error(str(scan_result["error"]))
+        except Exception:
+            SCANS_TOTAL.inc(result="error")
+            raise
+    SCANS_TOTAL.inc(result="error" if "error" in scan_result else "completed")
+
+    # VPN 상태 정보 추가
+    scan_result["vpn_status"] = {
+        "connected": is_vpn_connected,
+        "connection_info": vpn_status.get("connection_info", {}),
+        "config": vpn_status.get("config", None)
+    }
+
+    # 스캔 결과 요약 출력
+    host_count = len(scan_result.get("hosts", []))
+    port_count = sum(len(host.get("ports", [])) for host in scan_result.get("hosts", []))
+    print(f"스캔 결과 요약: {host_count}개 호스트, {port_count}개 포트 발견")
+
+    if "error" in scan_result:
+        print(f"스캔 오류 발생: {scan_result['error']}")
+
+    return scan_result
+
+
+class ScanJobManager:
+    """
+    배치 스캔 작업 관리자
+
+    대상 목록을 스레드 풀에 분배합니다. 각 작업은 별도 nmap 서브프로세스를 띄우므로
+    동시 실행 수(max_workers)가 곧 동시 nmap 프로세스 수입니다.
+    """
+
+    def __init__(self, storage, shared_state, vpn_manager=None, max_workers: Optional[int] = None):
+        """
+        Args:
+            storage: LocalStorage (또는 LazyService)
+            shared_state: SharedStateStore - 보강 작업 상태 (배치는 state_dir/jobs/ 아래 배치별 파일)
+            vpn_manager: VPNManager (또는 LazyService), 없으면 VPN 확인 생략
+            max_workers: 동시 nmap 프로세스 수
+        """
+        self.storage = storage
+        self.shared_state = shared_state
+        # 배치마다 네임스페이스(파일) 하나 → 대상 상태 갱신이 다른 배치 기록을 다시 쓰지 않음
+        self.batches = SharedStateStore(os.path.join(shared_state.state_dir, "jobs"))
+        self.vpn_manager = vpn_manager
+        self.max_workers = max_workers or SCAN_MAX_WORKERS
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scan-job")
+        self._inflight = 0
+        self._inflight_lock = threading.Lock()
+        self._migrate_legacy_batches()
+        self._mark_interrupted()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit_batch(
+        self,
+        targets: List[Any],
+        ports: str = "1-1000",
+        arguments: str = "-sV",
+        timeout: Optional[int] = None,
+        profile: Optional[str] = None,
+        labels: Optional[Dict[str, Any]] = None,
+        on_saved: Optional[Callable[[Dict[str, Any], Optional[str], Optional[Dict[str, Any]]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        배치 스캔 등록
+
+        Args:
+            targets: 대상 문자열 또는 {"target": ..., "ports": ..., "arguments": ...} 목록
+            ports: 대상별 포트가 없을 때 사용할 기본 포트
+            arguments: 대상별 인자가 없을 때 사용할 기본 nmap 인자
+            timeout: 대상 하나당 nmap 타임아웃(초, 없으면 타이밍 모델이 추정)
+            profile: 저장할 프로필 (기본값: 요청 시점의 현재 프로필)
+            labels: 배치와 저장되는 스캔에 함께 기록할 필드 (예: {"schedule_id": ...})
+            on_saved: 대상마다 끝난 뒤 항상 한 번 호출 (item, scan_id, scan_result) - 실패하면 scan_id 가 None 일 수 있음
+
+        Returns:
+            배치 상태 (batch_id 포함)
+
+        Raises:
+            ValueError: 대상 목록이 잘못된 경우
+        """
+        items = self._normalize_targets(targets, ports, arguments)
+        timeout = int(timeout or SCAN_HOST_TIMEOUT) or None
+
+        batch_id = f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        # 저장은 요청 시점의 프로필에 (배치 도중 프로필을 바꿔도 섞이지 않도록)
+        profile = profile or resolve(self.storage).get_current_profile()
+        labels = labels or {}
+
+        batch = {
+            "batch_id": batch_id,
+            "profile": profile,
+            "status": "queued",
+            "created_at": datetime.now().isoformat(),
+            "finished_at": None,
+            "timeout": timeout,
+            "max_workers": self.max_workers,
+            "owner_pid": os.getpid(),
+            **labels,
+            "items": [
+                {**item, "status": "queued", "scan_id": None, "error": None, "duration": None}
+                for item in items
+            ],
+        }
+
+        self.batches.replace(batch_id, batch)
+        self._prune()
+
+        for index, item in enumerate(items):
+            self._executor.submit(self._run_item, batch_id, index, item, profile, timeout, labels, on_saved)
+
+        logger.info(f"배치 스캔 등록: {batch_id} ({len(items)}개 대상, 동시 {self.max_workers}개)")
+        return self.summarize(batch)
+
+    def get_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """배치 진행 상황 조회 (없으면 None)"""
+        if not _BATCH_ID_RE.match(batch_id):
+            return None
+        batch = self.batches.read(batch_id)
+        return self.summarize(batch) if batch else None
+
+    def list_batches(self) -> List[Dict[str, Any]]:
+        """배치 목록 (최신순, 항목 상세 제외)"""
+        batches = [self.summarize(b, include_items=False) for b in self._read_batches()]
+        batches.sort(key=lambda b: b["created_at"], reverse=True)
+        return batches
+
+    def submit_enrichment(self, scan_id: str, report_id: str, profile: str) -> Dict[str, Any]:
+        """
+        취약점 보강 작업 등록
+
+        스캔에 취약점 정보가 없을 때 취약점 스크립트로 추가 스캔한 뒤
+        스캔 결과와 보고서 요약을 갱신합니다.
+
+        Returns:
+            작업 상태 (job_id 포함)
+        """
+        job_id = f"enrich_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        job = {
+            "job_id": job_id,
+            "scan_id": scan_id,
+            "report_id": report_id,
+            "profile": profile,
+            "status": "queued",
+            "created_at": datetime.now().isoformat(),
+            "finished_at": None,
+            "error": None,
+        }
+
+        def _register(state: Dict[str, Any]) -> None:
+            state[job_id] = job
+            finished = sorted(
+                (j for j in state.values() if j.get("finished_at")),
+                key=lambda j: j.get("created_at", ""),
+            )
+            for old in finished[:-MAX_KEPT_ENRICHMENTS] if len(finished) > MAX_KEPT_ENRICHMENTS else []:
+                state.pop(old["job_id"], None)
+
+        self.shared_state.update("enrichment", _register)
+        self._executor.submit(self._run_enrichment, job_id, scan_id, report_id, profile)
+        logger.info(f"취약점 보강 작업 등록: {job_id} (스캔 {scan_id}, 보고서 {report_id})")
+        return job
+
+    def get_enrichment(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """취약점 보강 작업 상태 조회 (없으면 None)"""
+        return self.shared_state.get("enrichment", job_id)
+
+    @property
+    def inflight(self) -> int:
+        """이 워커에서 실행 중인 스캔 수"""
+        return self._inflight
+
+    @staticmethod
+    def summarize(batch: Dict[str, Any], include_items: bool = True) -> Dict[str, Any]:
+        """배치 상태에 집계된 진행률을 붙여 반환"""
+        items = batch.get("items", [])
+        counts = {"queued": 0, "running": 0, "completed": 0, "failed": 0}
+        for item in items:
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        done = counts["completed"] + counts["failed"]
+        summary = {k: v for k, v in batch.items() if k != "items"}
+        summary["progress"] = {
+            "total": len(items),
+            **counts,
+            "percent": round(done * 100.0 / len(items), 1) if items else 100.0,
+        }
+        if include_items:
+            summary["items"] = items
+        return summary
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _normalize_targets(targets: List[Any], ports: str, arguments: str) -> List[Dict[str, str]]:
+        if not isinstance(targets, list) or not targets:
+            raise ValueError("스캔 대상 목록 'targets'가 비어 있습니다.")
+        if len(targets) > MAX_BATCH_TARGETS:
+            raise ValueError(f"한 번에 최대 {MAX_BATCH_TARGETS}개 대상까지 스캔할 수 있습니다.")
+
+        items = []
+        for entry in targets:
+            if isinstance(entry, str):
+                entry = {"target": entry}
+            if not isinstance(entry, dict) or not str(entry.get("target", "")).strip():
+                raise ValueError(f"잘못된 스캔 대상 항목: {entry}")
+            items.append({
+                "target": str(entry["target"]).strip(),
+                "ports": entry.get("ports") or ports or "1-1000",
+                "arguments": entry.get("arguments") or arguments or "-sV",
+            })
+        return items
+
+    def _run_item(self, batch_id: str, index: int, item: Dict[str, str], profile: str,
+                  timeout: Optional[int], labels: Optional[Dict[str, Any]] = None,
+                  on_saved: Optional[Callable] = None) -> None:
+        """대상 하나 스캔 (스레드 풀에서 실행)"""
+        start = time.time()
+        scan_id, scan_result = None, None
+        with self._inflight_lock:
+            self._inflight += 1
+        try:
+            # 상태 기록이 실패해도 on_saved 는 반드시 호출되도록 try 안에서 기록
+            self._update_item(batch_id, index, status="running", started_at=datetime.now().isoformat())
+            with tracing.start_trace("scan.job", target=item["target"], batch_id=batch_id, **(labels or {})) as root:
+                vpn_manager = resolve(self.vpn_manager) if self.vpn_manager is not None else None
+                scan_result = execute_scan(item["target"], item["ports"], item["arguments"], vpn_manager, timeout)
+                scan_result["batch_id"] = batch_id
+                scan_result.update(labels or {})
+
+                file_path = resolve(self.storage).save_scan_result(scan_result, profile=profile)
+                scan_id = os.path.basename(file_path).split(".")[0]
+                if root:
+                    root.set_attribute("scan_id", scan_id)
+
+            error = scan_result.get("error")
+            self._update_item(
+                batch_id, index,
+                status="failed" if error else "completed",
+                scan_id=scan_id,
+                error=error,
+                hosts=len(scan_result.get("hosts", [])),
+                duration=round(time.time() - start, 2),
+            )
+        except Exception as e:
+            logger.error(f"배치 {batch_id} 대상 {item['target']} 스캔 오류: {e}")
+            try:
+                self._update_item(batch_id, index, status="failed", error=str(e), duration=round(time.time() - start, 2))
+            except Exception as update_error:
+                logger.error(f"배치 {batch_id} 상태 기록 오류: {update_error}")
+        finally:
+            with self._inflight_lock:
+                self._inflight -= 1
+            if on_saved is not None:
+                try:
+                    on_saved(item, scan_id, scan_result)
+                except Exception as e:
+                    logger.error(f"배치 {batch_id} 완료 콜백 오류: {e}")
+
+    def _run_enrichment(self, job_id: str, scan_id: str, report_id: str, profile: str) -> None:
+        """취약점 보강 (스레드 풀에서 실행)"""
+        self._update_enrichment(job_id, status="running", started_at=datetime.now().isoformat())
+        with self._inflight_lock:
+            self._inflight += 1
+        try:
+            storage = resolve(self.storage)
+            scan_data = storage.get_scan_by_id(scan_id, profile=profile)
+            if scan_data is None:
+                raise ValueError(f"스캔 ID {scan_id}를 찾을 수 없습니다.")
+
+            enriched = NetworkScanner().check_vulns(scan_data)
+            enriched["vuln_enrichment"] = {"job_id": job_id, "completed_at": datetime.now().isoformat()}
+            # 보강 스캔 동안 다른 워커가 바꾼 필드는 유지하고 보강 결과만 덮어씀 (파일 잠금 안에서 병합)
+            storage.update_scan_result(scan_id, lambda current: {**current, **enriched}, profile=profile)
+
+            summary = build_report_summary(enriched)
+            storage.update_report(
+                report_id,
+                lambda report: {**report, "summary": {**summary, "enrichment": {"status": "completed", "job_id": job_id}}},
+                profile=profile,
+            )
+
+            self._update_enrichment(
+                job_id, status="completed", finished_at=datetime.now().isoformat(),
+                vulnerabilities=summary["total_vulnerabilities"],
+            )
+        except Exception as e:
+            logger.error(f"취약점 보강 작업 {job_id} 오류: {e}")
+            self._update_enrichment(job_id, status="failed", error=str(e), finished_at=datetime.now().isoformat())
+            try:
+                failure = {"status": "failed", "job_id": job_id, "error": str(e)}
+                resolve(self.storage).update_report(
+                    report_id,
+                    lambda report: {**report, "summary": {**(report.get("summary") or {}), "enrichment": failure}},
+                    profile=profile,
+                )
+            except Exception:
+                pass
+        finally:
+            with self._inflight_lock:
+                self._inflight -= 1
+
+    def _update_enrichment(self, job_id: str, **fields: Any) -> None:
+        def _apply(state: Dict[str, Any]) -> None:
+            if job_id in state:
+                state[job_id].update(fields)
+
+        self.shared_state.update("enrichment", _apply)
+
+    def _update_item(self, batch_id: str, index: int, **fields: Any) -> None:
+        def _apply(batch: Dict[str, Any]) -> None:
+            if not batch or batch.get("status") == "interrupted":
+                return
+            batch["items"][index].update(fields)
+            statuses = {item["status"] for item in batch["items"]}
+            if statuses <= {"completed", "failed"}:
+                batch["status"] = "completed"
+                batch["finished_at"] = datetime.now().isoformat()
+            elif "running" in statuses or statuses & {"completed", "failed"}:
+                batch["status"] = "running"
+
+        self.batches.update(batch_id, _apply)
+
+    def _batch_ids(self) -> List[str]:
+        return [os.path.basename(path)[:-len(".json")]
+                for path in glob.glob(os.path.join(self.batches.state_dir, "batch_*.json"))]
+
+    def _read_batches(self) -> List[Dict[str, Any]]:
+        return [batch for batch in (self.batches.read(batch_id) for batch_id in self._batch_ids()) if batch]
+
+    def _prune(self) -> None:
+        """끝난 오래된 배치 파일을 정리 (최근 MAX_KEPT_BATCHES 개만 유지)"""
+        finished = sorted(
+            (b for b in self._read_batches() if b.get("status") in ("completed", "interrupted")),
+            key=lambda b: b.get("created_at", ""),
+        )
+        for batch in finished[:-MAX_KEPT_BATCHES] if len(finished) > MAX_KEPT_BATCHES else []:
+            self.batches.remove(batch["batch_id"])
+
+    def _mark_interrupted(self) -> None:
+        """실행하던 워커가 종료된 배치를 interrupted 로 표시 (남은 대상은 failed)"""
+        for batch_id in self._batch_ids():
+            def _apply(batch: Dict[str, Any]) -> None:
+                if not batch or batch.get("status") not in ("queued", "running") or pid_alive(batch.get("owner_pid")):
+                    return
+                now = datetime.now().isoformat()
+                for item in batch["items"]:
+                    if item["status"] in ("queued", "running"):
+                        item.update(status="failed", error="작업을 실행하던 워커가 종료되었습니다.")
+                batch.update(status="interrupted", finished_at=now)
+                logger.warning(f"배치 {batch_id}: 실행하던 워커(pid {batch.get('owner_pid')})가 종료되어 중단 처리")
+
+            self.batches.update(batch_id, _apply)
+
+    def _migrate_legacy_batches(self) -> None:
+        """이전 버전의 단일 "jobs" 네임스페이스를 배치별 파일로 옮김"""
+        legacy = self.shared_state.read("jobs")
+        if not legacy:
+            return
+
+        def _move(state: Dict[str, Any]) -> Dict[str, Any]:
+            for batch_id, batch in state.items():
+                if _BATCH_ID_RE.match(batch_id):
+                    self.batches.replace(batch_id, batch)
+            return {}
+
+        self.shared_state.update("jobs", _move)
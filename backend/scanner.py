@@ -12,38 +12,81 @@ import os
 import shutil
 import subprocess
 import re
-from typing import Any, Dict, List, Optional
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional, Tuple
 
-import nmap
+from async_scanner import AsyncPortScanner, format_ports, parse_ports
+from discovery import expand_targets, get_discovery, is_multi_host_target, split_target_expression
+from metrics import NMAP_PHASE_SECONDS, NMAP_TIMEOUTS
+import tracing
+from timing import apply_plan, get_timing_model
+
+# 여러 호스트 대상 스캔 시 호스트 탐색 사전 단계 사용 여부 (기본 사용)
+SCAN_HOST_DISCOVERY = os.environ.get("SCAN_HOST_DISCOVERY", "1") != "0"
+# 비-root 모드에서 asyncio connect 스캔으로 열린 포트를 먼저 찾을지 여부 (기본 사용)
+ASYNC_PORT_SCAN = os.environ.get("ASYNC_PORT_SCAN", "1") != "0"
+# connect 스캔으로 대신할 수 없는 nmap 스캔 유형 (UDP, 프로토콜, OS 탐지 등)
+_RAW_ONLY_ARGS = {"-sn", "-sU", "-sO", "-sY", "-sZ", "-sA", "-sW", "-sM", "-sN", "-sF", "-sX", "-O"}
 
 
 class NetworkScanner:
+    # nmap 설치/취약점 스크립트 확인 결과 (프로세스당 한 번만 확인)
+    _environment: Optional[Dict[str, bool]] = None
+    _environment_lock = threading.Lock()
+
     def __init__(self) -> None:
-        # nmap 바이너리 존재 여부 확인
-        if not shutil.which("nmap"):
-            raise RuntimeError(
-                "nmap 실행 파일이 없습니다. apt install nmap (또는 apk/yum) 후 다시 실행하세요."
-            )
+        # python-nmap 은 실제 스캔 객체를 만들 때 임포트 (앱 시작 시간 단축)
+        import nmap
 
+        env = self.probe_environment()
         self.scanner = nmap.PortScanner()
+        self._timeout_error = nmap.PortScannerTimeout
         # Linux 에서 현재 사용자가 root 인지 확인
         self.is_root = os.name != "nt" and hasattr(os, "geteuid") and os.geteuid() == 0
         
-        # Vulners와 Vulscan 스크립트 설치 여부 확인
-        self.has_vulners = self._check_script_exists("vulners")
-        self.has_vulscan = self._check_script_exists("vulscan/vulscan.nse")
-        
-        if not (self.has_vulners and self.has_vulscan):
-            print("주의: 취약점 스크립트가 설치되지 않았습니다. 정확한 CVE 탐지를 위해 설치를 권장합니다.")
-            print("설치 방법:")
-            print("1. Vulners: git clone https://github.com/vulnersCom/nmap-vulners.git")
-            print("2. Vulscan: git clone https://github.com/scipag/vulscan.git")
-            print("3. nmap --script-updatedb 실행")
-        else:
-            print(f"취약점 스크립트 상태: Vulners({'설치됨' if self.has_vulners else '미설치'}), "
-                  f"Vulscan({'설치됨' if self.has_vulscan else '미설치'})")
+        # Vulners와 Vulscan 스크립트 설치 여부 (캐시된 확인 결과 사용)
+        self.has_vulners = env["has_vulners"]
+        self.has_vulscan = env["has_vulscan"]
+
+    @classmethod
+    def probe_environment(cls) -> Dict[str, bool]:
+        """
+        nmap 바이너리와 취약점 스크립트 설치 여부를 확인합니다.
+        nmap --script-help 서브프로세스가 느리므로 결과를 클래스에 캐시합니다.
+        """
+        if cls._environment is not None:
+            return cls._environment
+
+        with cls._environment_lock:
+            if cls._environment is not None:
+                return cls._environment
+
+            # nmap 바이너리 존재 여부 확인
+            if not shutil.which("nmap"):
+                raise RuntimeError(
+                    "nmap 실행 파일이 없습니다. apt install nmap (또는 apk/yum) 후 다시 실행하세요."
+                )
 
-    def _check_script_exists(self, script_name: str) -> bool:
+            has_vulners = cls._check_script_exists("vulners")
+            has_vulscan = cls._check_script_exists("vulscan/vulscan.nse")
+
+            if not (has_vulners and has_vulscan):
+                print("주의: 취약점 스크립트가 설치되지 않았습니다. 정확한 CVE 탐지를 위해 설치를 권장합니다.")
+                print("설치 방법:")
+                print("1. Vulners: git clone https://github.com/vulnersCom/nmap-vulners.git")
+                print("2. Vulscan: git clone https://github.com/scipag/vulscan.git")
+                print("3. nmap --script-updatedb 실행")
+            else:
+                print(f"취약점 스크립트 상태: Vulners({'설치됨' if has_vulners else '미설치'}), "
+                      f"Vulscan({'설치됨' if has_vulscan else '미설치'})")
+
+            cls._environment = {"has_vulners": has_vulners, "has_vulscan": has_vulscan}
+            return cls._environment
+
+    @staticmethod
+    def _check_script_exists(script_name: str) -> bool:
         """특정 nmap 스크립트가 설치되어 있는지 확인"""
         # 1. 파일 시스템에서 직접 확인
         script_path = ""
@@ -84,14 +127,25 @@ class NetworkScanner:
         target: str,
         ports: str = "1-1000",
         arguments: str = "-sC -sV -sS",
+        timeout: Optional[int] = None,
+        discover: Optional[bool] = None,
+        vuln_scan: bool = True,
     ) -> Dict[str, Any]:
         """
         대상 스캔 수행.
 
+        여러 호스트를 포함하는 대상(CIDR/범위/목록)은 먼저 호스트 탐색으로
+        살아있는 호스트를 찾고, 그 호스트에만 정밀 스캔을 수행합니다.
+        비-root 모드에서는 asyncio connect 스캔으로 열린 포트를 먼저 찾고
+        nmap 은 그 포트에만 버전 탐지/스크립트를 수행합니다.
+
         Args:
             target   : IP / 호스트
             ports    : 포트 범위(빈 문자열 → 1-1000)
             arguments: nmap 추가 인자(기본 -sC -sV -sS)
+            timeout  : 정밀 스캔 전체 제한 시간(초, None → 타이밍 모델이 추정)
+            discover : 호스트 탐색 사전 단계 사용 여부 (None → SCAN_HOST_DISCOVERY)
+            vuln_scan: 취약점 스크립트 추가 스캔 허용 여부 (진단처럼 제한 시간이 짧은 호출은 False)
 
         Returns:
             스캔 결과 dict (error 포함 가능)
@@ -115,38 +169,56 @@ class NetworkScanner:
                 arguments += " --unprivileged"
                 print("Windows 환경: --unprivileged 옵션 추가")
 
-            cmd_preview = f"nmap {arguments} -p {ports} {target}"
-            print("실행 명령:", cmd_preview)
+            # ── 1단계: 호스트 탐색 (살아있는 호스트만 정밀 스캔) ──
+            scan_hosts = target
+            discovery_info = None
+            if self._should_discover(target, arguments, discover):
+                with tracing.span("nmap.discovery", target=target) as span, NMAP_PHASE_SECONDS.time(phase="discovery"):
+                    discovery_info = get_discovery().discover(target, privileged=self.is_root)
+                    if span:
+                        span.set_attribute("live_hosts", len(discovery_info["live_hosts"]))
+                        span.set_attribute("cached", bool(discovery_info["cached"]))
+                live_hosts = discovery_info["live_hosts"]
+                print(f"호스트 탐색: {len(live_hosts)}개 호스트 살아있음 "
+                      f"({discovery_info['method']}, 캐시 {'사용' if discovery_info['cached'] else '미사용'})")
+                if not live_hosts:
+                    print("살아있는 호스트가 없어 정밀 스캔을 건너뜁니다.")
+                    return {"target": target, "hosts": [], "discovery": discovery_info}
+                scan_hosts = " ".join(live_hosts)
+                # 이미 살아있음을 확인했으므로 nmap 자체 ping 은 생략
+                if "-Pn" not in arguments:
+                    arguments += " -Pn"
 
-            # python-nmap 호출
-            self.scanner.scan(target, ports, arguments, timeout=90)
+            # ── 2단계(비-root): asyncio connect 스캔으로 열린 포트 탐색 ──
+            port_scan = None
+            if self._use_async_port_scan(arguments):
+                port_scan = self._async_port_scan(scan_hosts, ports)
+            if port_scan is not None:
+                open_hosts = [h for h, r in port_scan["hosts"].items() if r["open"]]
+                if not open_hosts:
+                    print("열린 포트가 없어 nmap 정밀 스캔을 건너뜁니다.")
+                    get_timing_model().record(self._port_scan_rtts(port_scan))
+                    scan_results = self._merge_port_scan({"target": target, "hosts": []}, port_scan)
+                    if discovery_info:
+                        scan_results["discovery"] = discovery_info
+                    return scan_results
+                scan_hosts = " ".join(open_hosts)
+                ports = format_ports(p for h in open_hosts for p in port_scan["hosts"][h]["open"])
+                if "-Pn" not in arguments:
+                    arguments += " -Pn"
 
-            print("nmap 실제 명령:", self.scanner.command_line())
-            
-            # 디버깅: 스캔 결과 원시 데이터 출력
-            print("-------- nmap 스캔 결과 디버깅 시작 --------")
-            print(f"호스트 목록: {self.scanner.all_hosts()}")
-            
-            if self.scanner.all_hosts():
-                for host in self.scanner.all_hosts():
-                    print(f"호스트 {host} 정보:")
-                    print(f"  상태: {self.scanner[host].state()}")
-                    print(f"  사용 가능한 프로토콜: {self.scanner[host].all_protocols()}")
-                    
-                    for proto in self.scanner[host].all_protocols():
-                        print(f"  {proto} 포트: {list(self.scanner[host][proto].keys())}")
-            else:
-                print("스캔 결과: 호스트 정보 없음")
-                
-            print("-------- nmap 스캔 결과 디버깅 끝 --------")
+            # ── 3단계: 정밀 스캔 (적응형 타이밍, 호스트 샤드별 제한 시간) ──
+            scan_results = self._run_planned_scan(target, scan_hosts, ports, arguments, timeout, port_scan)
+            if port_scan is not None:
+                self._merge_port_scan(scan_results, port_scan)
+            if discovery_info:
+                scan_results["discovery"] = discovery_info
             
             # 취약점 스크립트가 결과에 포함되어 있지 않고, 스크립트가 설치되어 있다면
             # 별도로 취약점 스캔 수행
-            scan_results = self._parse_scan_results(target)
-            
-            if self._needs_vuln_scan(scan_results) and (self.has_vulners or self.has_vulscan):
+            if vuln_scan and self._needs_vuln_scan(scan_results) and (self.has_vulners or self.has_vulscan):
                 print("취약점 스크립트로 추가 스캔 수행 중...")
-                vuln_results = self._perform_vuln_scan(target, scan_results)
+                vuln_results = self._perform_vuln_scan(scan_hosts, scan_results)
                 return vuln_results
                 
             return scan_results
@@ -158,6 +230,290 @@ class NetworkScanner:
             traceback.print_exc()
             return {"error": str(exc)}
 
+    def _run_planned_scan(
+        self,
+        target: str,
+        scan_hosts: str,
+        ports: str,
+        arguments: str,
+        timeout: Optional[int],
+        port_scan: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        타이밍 모델로 nmap 옵션/제한 시간을 정하고 호스트 샤드 단위로 스캔합니다.
+        제한 시간을 넘긴 샤드는 connect 스캔으로 찾은 열린 포트만이라도 결과에 남깁니다.
+        """
+        timing_model = get_timing_model()
+        host_list = expand_targets(scan_hosts)
+        plan = timing_model.plan(
+            host_list or [], ports, arguments, privileged=self.is_root,
+            host_count=None if host_list else len(split_target_expression(scan_hosts)),
+        )
+        base_arguments = arguments
+        arguments = apply_plan(arguments, plan)
+        overall = int(timeout) if timeout else plan["timeout"]
+
+        shard_size = plan["shard_size"]
+        shards: List[Optional[List[str]]] = (
+            [host_list[i:i + shard_size] for i in range(0, len(host_list), shard_size)] if host_list else [None]
+        )
+        print(f"타이밍 계획: -T{plan['timing_template']} --min-rate {plan['min_rate']} "
+              f"--max-retries {plan['max_retries']}, 예상 {plan['estimated']}초, 제한 {overall}초, "
+              f"샤드 {len(shards)}개, RTT {str(plan['rtt_ms']) + ' ms' if plan['rtt_ms'] is not None else '기록 없음'}")
+
+        scan_results: Dict[str, Any] = {"target": target, "hosts": []}
+        rtts: Dict[str, float] = self._port_scan_rtts(port_scan) if port_scan else {}
+        timed_out: List[str] = []
+        start = time.time()
+        deadline = start + overall
+
+        for shard in shards:
+            shard_hosts = " ".join(shard) if shard else scan_hosts
+            remaining = deadline - time.time()
+            shard_timeout = remaining
+            if shard and len(shards) > 1:
+                shard_timeout = min(remaining, timing_model.plan(shard, ports, base_arguments, self.is_root)["timeout"])
+            shard_timeout = int(shard_timeout)
+
+            if shard_timeout <= 0:
+                print(f"전체 제한 시간 초과로 샤드를 건너뜁니다: {shard_hosts}")
+                timed_out.append(shard_hosts)
+                scan_results["hosts"].extend(self._salvage_shard(shard, ports, port_scan))
+                continue
+
+            print("실행 명령:", f"nmap {arguments} -p {ports} {shard_hosts}")
+            phase = self._nmap_phase(arguments)
+            try:
+                with tracing.span("nmap.scan", phase=phase, hosts=len(shard) if shard else None,
+                                  ports=ports, timeout=shard_timeout), NMAP_PHASE_SECONDS.time(phase=phase):
+                    self.scanner.scan(shard_hosts, ports, arguments, timeout=shard_timeout)
+            except self._timeout_error:
+                NMAP_TIMEOUTS.inc(phase=phase)
+                print(f"샤드 제한 시간({shard_timeout}초) 초과: {shard_hosts} → 부분 결과 복구")
+                timed_out.append(shard_hosts)
+                scan_results["hosts"].extend(self._salvage_shard(shard, ports, port_scan))
+                continue
+
+            print("nmap 실제 명령:", self.scanner.command_line())
+            self._print_scan_debug()
+
+            with tracing.span("nmap.parse"):
+                shard_rtts, shard_traces = self._extract_host_timing()
+                rtts.update(shard_rtts)
+                for host_block in self._parse_scan_results(target)["hosts"]:
+                    if host_block["host"] in shard_rtts:
+                        host_block["rtt_ms"] = shard_rtts[host_block["host"]]
+                    if host_block["host"] in shard_traces:
+                        host_block["trace"] = shard_traces[host_block["host"]]
+                    scan_results["hosts"].append(host_block)
+
+        elapsed = time.time() - start
+        # 타임아웃으로 끊긴 스캔은 소요 시간을 보정 계수 학습에 쓰지 않음
+        timing_model.record(
+            rtts,
+            estimated=None if timed_out else plan["estimated"],
+            elapsed=None if timed_out else elapsed,
+        )
+        scan_results["scan_stats"] = {
+            "hosts": plan["hosts"],
+            "ports": plan["ports"],
+            "estimated": plan["estimated"],
+            "timeout": overall,
+            "elapsed": round(elapsed, 2),
+            "timing": {k: plan[k] for k in ("timing_template", "min_rate", "max_retries", "host_timeout")},
+            "shards": len(shards),
+            "timed_out_shards": timed_out,
+            "partial": bool(timed_out),
+        }
+        return scan_results
+
+    def _print_scan_debug(self) -> None:
+        """디버깅: 스캔 결과 원시 데이터 출력"""
+        print("-------- nmap 스캔 결과 디버깅 시작 --------")
+        print(f"호스트 목록: {self.scanner.all_hosts()}")
+        
+        if self.scanner.all_hosts():
+            for host in self.scanner.all_hosts():
+                print(f"호스트 {host} 정보:")
+                print(f"  상태: {self.scanner[host].state()}")
+                print(f"  사용 가능한 프로토콜: {self.scanner[host].all_protocols()}")
+                
+                for proto in self.scanner[host].all_protocols():
+                    print(f"  {proto} 포트: {list(self.scanner[host][proto].keys())}")
+        else:
+            print("스캔 결과: 호스트 정보 없음")
+            
+        print("-------- nmap 스캔 결과 디버깅 끝 --------")
+
+    def _extract_host_timing(self) -> Tuple[Dict[str, float], Dict[str, List[Dict[str, Any]]]]:
+        """
+        마지막 nmap XML 출력에서 호스트별 SRTT(ms)와 traceroute 경로(--traceroute 사용 시) 추출
+
+        Returns:
+            ({host: srtt_ms}, {host: [{"ttl", "ip", "hostname", "rtt_ms"}, ...]})
+        """
+        rtts: Dict[str, float] = {}
+        traces: Dict[str, List[Dict[str, Any]]] = {}
+        try:
+            root = ET.fromstring(self.scanner.get_nmap_last_output())
+        except (ET.ParseError, TypeError, ValueError):
+            return rtts, traces
+        for host in root.iter("host"):
+            address = host.find("address")
+            if address is None:
+                continue
+            addr = address.get("addr")
+            times = host.find("times")
+            if times is not None and times.get("srtt"):
+                rtts[addr] = round(int(times.get("srtt")) / 1000.0, 3)
+            trace = host.find("trace")
+            if trace is not None:
+                traces[addr] = [
+                    {
+                        "ttl": int(hop.get("ttl", 0)),
+                        "ip": hop.get("ipaddr"),
+                        "hostname": hop.get("host", ""),
+                        "rtt_ms": float(hop.get("rtt")) if hop.get("rtt") else None,
+                    }
+                    for hop in trace.iter("hop")
+                ]
+        return rtts, traces
+
+    def _salvage_shard(
+        self, shard: Optional[List[str]], ports: str, port_scan: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """제한 시간을 넘긴 샤드의 부분 결과 (connect 스캔으로 확인한 열린 포트만, 서비스 정보 없음)"""
+        if not shard:
+            return []
+        if port_scan is not None:
+            states = port_scan["hosts"]
+        else:
+            try:
+                states = AsyncPortScanner().scan(shard, parse_ports(ports))
+            except Exception as e:
+                print(f"부분 결과 복구 실패: {e}")
+                return []
+
+        blocks = []
+        for host in shard:
+            state = states.get(host)
+            if not state or not state["open"]:
+                continue
+            block = self._bare_host_block(host, state["rtt_ms"])
+            block["partial"] = True
+            block["ports"] = [
+                {"port": p, "state": "open", "service": "unknown", "product": "",
+                 "version": "", "extrainfo": "", "scripts": []}
+                for p in state["open"]
+            ]
+            blocks.append(block)
+        return blocks
+
+    @staticmethod
+    def _bare_host_block(host: str, rtt_ms: Optional[float]) -> Dict[str, Any]:
+        return {
+            "host": host,
+            "state": "up",
+            "os": {"name": "Unknown", "accuracy": "0"},
+            "hostscript": [],
+            "ports": [],
+            "rtt_ms": rtt_ms,
+        }
+
+    @staticmethod
+    def _port_scan_rtts(port_scan: Dict[str, Any]) -> Dict[str, float]:
+        return {h: s["rtt_ms"] for h, s in port_scan["hosts"].items() if s["rtt_ms"] is not None}
+
+    @staticmethod
+    def _should_discover(target: str, arguments: str, discover: Optional[bool]) -> bool:
+        """호스트 탐색 사전 단계가 필요한지 확인"""
+        if discover is None:
+            discover = SCAN_HOST_DISCOVERY
+        if not discover or not is_multi_host_target(target):
+            return False
+        # 사용자가 ping 생략(-Pn) 또는 탐색 전용(-sn) 스캔을 지정한 경우 그대로 실행
+        args = arguments.split()
+        return "-Pn" not in args and "-sn" not in args
+
+    @staticmethod
+    def _nmap_phase(arguments: str) -> str:
+        """
+        메트릭용 nmap 실행 단계 이름
+        nmap 한 번 실행 안의 단계별 시간은 알 수 없으므로 포함된 가장 무거운 단계로 구분
+        """
+        args = arguments.split()
+        if "-sC" in args or "-A" in args or any(a.startswith("--script") for a in args):
+            return "nse"
+        if "-sV" in args:
+            return "version"
+        return "port"
+
+    def _use_async_port_scan(self, arguments: str) -> bool:
+        """raw 소켓 없이 connect 스캔으로 포트 탐색을 대신할 수 있는지 확인"""
+        if not ASYNC_PORT_SCAN or (self.is_root and os.name != "nt"):
+            return False
+        return not (_RAW_ONLY_ARGS & set(arguments.split()))
+
+    @staticmethod
+    def _async_port_scan(scan_hosts: str, ports: str) -> Optional[Dict[str, Any]]:
+        """
+        asyncio connect 스캔으로 호스트별 열린 포트 탐색
+
+        Returns:
+            {"engine", "elapsed", "probes", "hosts": {host: {"open", "closed", "filtered", "rtt_ms"}}}
+            대상/포트 표현식을 전개할 수 없으면 None (nmap 으로 직접 스캔)
+        """
+        hosts = expand_targets(scan_hosts)
+        try:
+            port_list = parse_ports(ports)
+        except ValueError:
+            port_list = []
+        if not hosts or not port_list:
+            return None
+
+        start = time.time()
+        with tracing.span("scan.connect", hosts=len(hosts), ports=len(port_list)):
+            results = AsyncPortScanner().scan(hosts, port_list)
+        elapsed = round(time.time() - start, 3)
+        NMAP_PHASE_SECONDS.observe(elapsed, phase="connect")
+        open_count = sum(len(r["open"]) for r in results.values())
+        print(f"connect 스캔: {len(hosts)}개 호스트 × {len(port_list)}개 포트 → "
+              f"열린 포트 {open_count}개 ({elapsed}초)")
+        return {
+            "engine": "asyncio-connect",
+            "elapsed": elapsed,
+            "probes": len(results) * len(port_list),
+            "hosts": results,
+        }
+
+    @staticmethod
+    def _merge_port_scan(scan_results: Dict[str, Any], port_scan: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        connect 스캔 결과를 스캔 결과에 반영합니다.
+        열린 포트 없이 RST 로만 응답한 호스트도 "up" 으로 추가하고, 호스트별 RTT 를 기록합니다.
+        """
+        states = port_scan["hosts"]
+        listed = set()
+        for host_block in scan_results["hosts"]:
+            listed.add(host_block["host"])
+            rtt = states.get(host_block["host"], {}).get("rtt_ms")
+            if rtt is not None and host_block.get("rtt_ms") is None:
+                host_block["rtt_ms"] = rtt
+
+        for host, state in states.items():
+            # 열린 포트가 있는 호스트는 nmap 결과에 포함되어 있음
+            if host in listed or state["open"] or not state["closed"]:
+                continue
+            scan_results["hosts"].append(NetworkScanner._bare_host_block(host, state["rtt_ms"]))
+
+        scan_results["port_scan"] = {
+            "engine": port_scan["engine"],
+            "elapsed": port_scan["elapsed"],
+            "probes": port_scan["probes"],
+            "open_ports": {h: s["open"] for h, s in states.items() if s["open"]},
+        }
+        return scan_results
+
     def _needs_vuln_scan(self, scan_results: Dict[str, Any]) -> bool:
         """취약점 스캔이 필요한지 확인 (기존 스캔에 취약점 정보가 없는 경우)"""
         for host in scan_results.get("hosts", []):
@@ -191,8 +547,17 @@ class NetworkScanner:
         script_args = ",".join(vuln_scripts)
         
         try:
-            # 취약점 스크립트만으로 추가 스캔 수행
-            self.scanner.scan(target, ports_str, f"-sV --script={script_args}", timeout=120)
+            # 취약점 스크립트만으로 추가 스캔 수행 (제한 시간은 호스트/포트 수와 RTT 로 추정)
+            vuln_arguments = f"-sV --script={script_args}"
+            vuln_timeout = get_timing_model().vuln_timeout(
+                expand_targets(target) or [], len(set(open_ports)), vuln_arguments
+            )
+            try:
+                with tracing.span("nmap.vuln", ports=ports_str, timeout=vuln_timeout), NMAP_PHASE_SECONDS.time(phase="vuln"):
+                    self.scanner.scan(target, ports_str, vuln_arguments, timeout=vuln_timeout)
+            except self._timeout_error:
+                NMAP_TIMEOUTS.inc(phase="vuln")
+                raise
             
             # 원본 결과에 취약점 정보 병합
             vuln_results = original_results
@@ -217,8 +582,9 @@ class NetworkScanner:
             print(f"취약점 스캔 오류: {e}")
             return original_results
 
-    def _parse_vulnerability_data(self, script_data: Dict[str, str]) -> List[Dict[str, Any]]:
-        """Vulners 또는 Vulscan 스크립트 결과에서 취약점 정보 추출"""
+    @staticmethod
+    def _parse_vulnerability_data(script_data: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Vulners 또는 Vulscan 스크립트 결과에서 취약점 정보 추출 (nmap XML 가져오기에서도 사용)"""
         vulnerabilities = []
         
         # Vulners 스크립트 결과 파싱
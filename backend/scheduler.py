@@ -0,0 +1,575 @@
+#!/usr/bin/env python3
+# scheduler.py
+# ──────────────────────────────────────────────────────────
+# 정기 스캔 스케줄러
+#  • 스케줄: 대상/포트/nmap 인자 + 프로필 (+ 선택 VPN 설정) + cron 식
+#      cron: "분 시 일 월 요일" 5필드 (*, 목록, 범위, /간격, jan-dec, sun-sat) 또는 @hourly/@daily/@weekly/@monthly
+#  • 스케줄 목록/실행 기록은 SharedStateStore("schedules") 에 저장 → 어느 워커에서든 조회/수정
+#  • 실행은 여러 gunicorn 워커 중 리더(비차단 flock 을 잡은 워커) 하나만 담당
+#      - 리더가 종료되면 잠금이 풀리고 다른 워커가 다음 주기에 이어받음
+#  • 실행 시각에 스케줄별 지터(jitter_seconds 이내, 실행 시각마다 고정) 추가 → 같은 시각 스케줄 분산
+#  • 전체 동시 실행 상한(SCHEDULER_MAX_CONCURRENT), 같은 스케줄은 겹쳐 실행하지 않음
+#  • 놓친 실행(서버 중지 등) 처리 catch_up
+#      skip : 유예 시간(SCHEDULER_MISFIRE_GRACE) 안이면 한 번, 아니면 건너뜀
+#      once : 몇 번을 놓쳤든 한 번만 실행
+#      all  : 놓친 횟수만큼 차례로 실행 (max_catch_up 까지)
+#  • 스캔은 ScanJobManager 작업 풀에서 실행하고 save_scan_result 로 저장 (schedule_id 기록)
+#  • 실행이 끝나면 같은 스케줄의 이전 스캔과 비교한 변경 사항(diff)을 실행 기록에 저장
+# ──────────────────────────────────────────────────────────
+import calendar
+import os
+import random
+import threading
+import uuid
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from services import resolve
+
+try:
+    import fcntl  # Linux/Mac 전용
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 스케줄 확인 주기(초, 0 이면 스케줄러 비활성화)
+SCHEDULER_TICK = float(os.environ.get("SCHEDULER_TICK", "15"))
+# 예약 스캔 전체 동시 실행 수 (수동/배치 스캔과 별도로 작업 풀 일부만 사용)
+SCHEDULER_MAX_CONCURRENT = int(os.environ.get("SCHEDULER_MAX_CONCURRENT", "2"))
+# catch_up="skip" 일 때 이 시간(초) 안에 놓친 실행은 그대로 실행
+SCHEDULER_MISFIRE_GRACE = float(os.environ.get("SCHEDULER_MISFIRE_GRACE", "300"))
+# 스케줄별 보관할 실행 기록 수
+MAX_KEPT_RUNS = 50
+
+CATCH_UP_POLICIES = ("skip", "once", "all")
+NAMESPACE = "schedules"
+
+_MACROS = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+}
+_MONTH_NAMES = {name: i for i, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+_DOW_NAMES = {name: i for i, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+
+
+class CronSchedule:
+    """5필드 cron 식 (로컬 시각 기준, 분 단위)"""
+
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        fields = _MACROS.get(self.expression.lower(), self.expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 식은 5개 필드(분 시 일 월 요일)여야 합니다: {expression}")
+        self.minutes = self._parse(fields[0], 0, 59)
+        self.hours = self._parse(fields[1], 0, 23)
+        self.days = self._parse(fields[2], 1, 31)
+        self.months = self._parse(fields[3], 1, 12, _MONTH_NAMES)
+        # 요일 7 도 일요일
+        self.weekdays = {d % 7 for d in self._parse(fields[4], 0, 7, _DOW_NAMES)}
+        self._dom_any = fields[2] == "*"
+        self._dow_any = fields[4] == "*"
+
+    @staticmethod
+    def _parse(field: str, low: int, high: int, names: Optional[Dict[str, int]] = None) -> Set[int]:
+        def value(text: str) -> int:
+            text = text.lower()
+            if names and text in names:
+                return names[text]
+            if not text.isdigit() or not low <= int(text) <= high:
+                raise ValueError(f"cron 필드 값 범위 오류: {text} ({low}-{high})")
+            return int(text)
+
+        result: Set[int] = set()
+        for part in field.split(","):
+            base, _, step_text = part.partition("/")
+            step = int(step_text) if step_text.isdigit() and int(step_text) > 0 else None
+            if step_text and step is None:
+                raise ValueError(f"cron 간격 오류: {part}")
+            if base == "*":
+                start, end = low, high
+            elif "-" in base:
+                start, end = (value(v) for v in base.split("-", 1))
+            else:
+                start = value(base)
+                end = high if step else start
+            if start > end:
+                raise ValueError(f"cron 범위 오류: {part}")
+            result.update(range(start, end + 1, step or 1))
+        return result
+
+    def _day_matches(self, dt: datetime) -> bool:
+        dom = dt.day in self.days
+        dow = (dt.weekday() + 1) % 7 in self.weekdays
+        if not self._dom_any and not self._dow_any:
+            # 일/요일이 둘 다 지정되면 둘 중 하나만 맞아도 실행 (표준 cron 동작)
+            return dom or dow
+        return dom if not self._dom_any else dow
+
+    def next_after(self, dt: datetime) -> datetime:
+        """dt 이후(초과) 첫 실행 시각"""
+        t = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t <= limit:
+            if t.month not in self.months:
+                last_day = calendar.monthrange(t.year, t.month)[1]
+                t = t.replace(day=last_day, hour=0, minute=0) + timedelta(days=1)
+                continue
+            if not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            if t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+                continue
+            return t
+        raise ValueError(f"cron 식에 해당하는 실행 시각이 없습니다: {self.expression}")
+
+    def iter_between(self, start: datetime, end: datetime) -> Iterator[datetime]:
+        """start 이후(초과) end 이하의 실행 시각"""
+        t = self.next_after(start)
+        while t <= end:
+            yield t
+            t = self.next_after(t)
+
+
+# ──────────────────────────────────────────────────────────
+# 스캔 비교
+# ──────────────────────────────────────────────────────────
+
+def _host_map(scan: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    return {h.get("host"): h for h in scan.get("hosts", []) or [] if h.get("host") and h.get("state", "up") == "up"}
+
+
+def _open_ports(host: Dict[str, Any]) -> Dict[Any, Dict[str, Any]]:
+    return {p.get("port"): p for p in host.get("ports", []) or [] if p.get("state") == "open"}
+
+
+def _service_label(port: Dict[str, Any]) -> str:
+    return " ".join(v for v in (port.get("service"), port.get("product"), port.get("version")) if v)
+
+
+def diff_scans(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    두 스캔의 변경 사항 (호스트 up, 열린 포트, 서비스/버전, 취약점 기준)
+
+    Returns:
+        {"hosts_added", "hosts_removed", "ports_opened", "ports_closed", "services_changed",
+         "vulnerabilities_added", "vulnerabilities_resolved", "changed"}
+    """
+    before, after = _host_map(previous), _host_map(current)
+    diff: Dict[str, Any] = {
+        "hosts_added": sorted(set(after) - set(before)),
+        "hosts_removed": sorted(set(before) - set(after)),
+        "ports_opened": [],
+        "ports_closed": [],
+        "services_changed": [],
+        "vulnerabilities_added": [],
+        "vulnerabilities_resolved": [],
+    }
+    for addr in sorted(set(before) | set(after)):
+        old_ports = _open_ports(before.get(addr, {}))
+        new_ports = _open_ports(after.get(addr, {}))
+        for port in sorted(set(new_ports) - set(old_ports), key=str):
+            diff["ports_opened"].append({"host": addr, "port": port, "service": _service_label(new_ports[port])})
+        for port in sorted(set(old_ports) - set(new_ports), key=str):
+            diff["ports_closed"].append({"host": addr, "port": port, "service": _service_label(old_ports[port])})
+        for port in sorted(set(old_ports) & set(new_ports), key=str):
+            old_label, new_label = _service_label(old_ports[port]), _service_label(new_ports[port])
+            if old_label != new_label:
+                diff["services_changed"].append({"host": addr, "port": port, "before": old_label, "after": new_label})
+        for port in sorted(set(old_ports) | set(new_ports), key=str):
+            old_vulns = {v.get("cve_id"): v for v in old_ports.get(port, {}).get("vulnerabilities", []) or []}
+            new_vulns = {v.get("cve_id"): v for v in new_ports.get(port, {}).get("vulnerabilities", []) or []}
+            for cve in sorted(set(new_vulns) - set(old_vulns), key=str):
+                diff["vulnerabilities_added"].append(
+                    {"host": addr, "port": port, "cve_id": cve, "cvss_score": new_vulns[cve].get("cvss_score")})
+            for cve in sorted(set(old_vulns) - set(new_vulns), key=str):
+                diff["vulnerabilities_resolved"].append(
+                    {"host": addr, "port": port, "cve_id": cve, "cvss_score": old_vulns[cve].get("cvss_score")})
+    diff["changed"] = any(diff[k] for k in diff)
+    return diff
+
+
+def _diff_counts(diff: Optional[Dict[str, Any]]) -> Optional[Dict[str, int]]:
+    if diff is None:
+        return None
+    return {k: len(v) for k, v in diff.items() if isinstance(v, list)}
+
+
+# ──────────────────────────────────────────────────────────
+# 스케줄러
+# ──────────────────────────────────────────────────────────
+
+def _jitter(schedule_id: str, fire: datetime, jitter_seconds: float) -> float:
+    """실행 시각마다 고정된 지터 (리더가 바뀌어도 같은 값)"""
+    if jitter_seconds <= 0:
+        return 0.0
+    return random.Random(f"{schedule_id}:{fire.isoformat()}").uniform(0, jitter_seconds)
+
+
+class ScanScheduler:
+    """
+    정기 스캔 스케줄러
+
+    스케줄 관리(create/update/delete/run_now)는 어느 워커에서든 호출할 수 있고,
+    실제 실행은 리더 잠금을 잡은 워커의 스레드가 담당합니다.
+    """
+
+    def __init__(self, shared_state, scan_jobs, storage, vpn_manager=None,
+                 tick: float = SCHEDULER_TICK, max_concurrent: int = SCHEDULER_MAX_CONCURRENT):
+        """
+        Args:
+            shared_state: SharedStateStore - 스케줄/실행 기록
+            scan_jobs: ScanJobManager (또는 LazyService)
+            storage: LocalStorage (또는 LazyService) - 이전 스캔 조회(diff), 프로필 확인
+            vpn_manager: VPNManager (또는 LazyService) - vpn_config 가 지정된 스케줄용
+        """
+        self.shared_state = shared_state
+        self.scan_jobs = scan_jobs
+        self.storage = storage
+        self.vpn_manager = vpn_manager
+        self.tick = tick
+        self.max_concurrent = max_concurrent
+        self._lock_path = os.path.join(shared_state.state_dir, "scheduler.lock")
+        self._lock_fd: Optional[int] = None
+        self._running: Set[str] = set()
+        self._running_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # 스케줄 관리
+    # ------------------------------------------------------------------
+
+    def _validate(self, spec: Dict[str, Any], current: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        요청 값 검증 후 저장할 스케줄 필드 반환 (잘못된 값이면 ValueError)
+        변경 시 null 로 보낸 필드는 기본값으로 되돌림 (예: "vpn_config": null → VPN 확인 안 함)
+        """
+        merged = {**(current or {}), **spec}
+        target = str(merged.get("target", "")).strip()
+        if not target:
+            raise ValueError("스캔 대상 'target'이 필요합니다.")
+        cron = str(merged.get("cron", "")).strip()
+        CronSchedule(cron)
+        profile = merged.get("profile") or resolve(self.storage).get_current_profile()
+        if profile not in resolve(self.storage).get_profiles():
+            raise ValueError(f"프로필 '{profile}'이 존재하지 않습니다.")
+        catch_up = merged.get("catch_up") or "skip"
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"catch_up 은 {', '.join(CATCH_UP_POLICIES)} 중 하나여야 합니다.")
+        try:
+            jitter = float(merged.get("jitter_seconds") or 0)
+            max_catch_up = int(merged.get("max_catch_up") or 10)
+            timeout = int(merged["timeout"]) if merged.get("timeout") else None
+        except (TypeError, ValueError):
+            raise ValueError("jitter_seconds, max_catch_up, timeout 은 숫자여야 합니다.") from None
+        if jitter < 0 or max_catch_up < 1:
+            raise ValueError("jitter_seconds 는 0 이상, max_catch_up 은 1 이상이어야 합니다.")
+        return {
+            "name": merged.get("name") or target,
+            "target": target,
+            "ports": merged.get("ports") or "1-1000",
+            "arguments": merged.get("arguments") or "-sV",
+            "timeout": timeout,
+            "profile": profile,
+            "vpn_config": merged.get("vpn_config") or None,
+            "cron": cron,
+            "jitter_seconds": jitter,
+            "catch_up": catch_up,
+            "max_catch_up": max_catch_up,
+            "enabled": bool(merged["enabled"]) if merged.get("enabled") is not None else True,
+        }
+
+    @staticmethod
+    def _plan_next(schedule: Dict[str, Any], after: datetime) -> None:
+        """다음 실행 시각(next_fire)과 지터를 더한 실제 시작 시각(due_at) 계산"""
+        fire = CronSchedule(schedule["cron"]).next_after(after)
+        schedule["next_fire"] = fire.isoformat()
+        schedule["due_at"] = (fire + timedelta(seconds=_jitter(schedule["schedule_id"], fire, schedule["jitter_seconds"]))).isoformat()
+
+    def create(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        """스케줄 등록 (ValueError: 잘못된 값)"""
+        schedule = self._validate(spec)
+        schedule_id = f"sched_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        schedule.update({
+            "schedule_id": schedule_id,
+            "created_at": datetime.now().isoformat(),
+            "pending": 0,
+            "last_scan_id": None,
+            "runs": [],
+        })
+        self._plan_next(schedule, datetime.now())
+        self.shared_state.set(NAMESPACE, schedule_id, schedule)
+        logger.info(f"스케줄 등록: {schedule_id} ({schedule['cron']}, {schedule['target']})")
+        return schedule
+
+    def update(self, schedule_id: str, spec: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """스케줄 변경 (없으면 None, ValueError: 잘못된 값)"""
+        current = self.get(schedule_id)
+        if current is None:
+            return None
+        fields = self._validate(spec, current)
+
+        def _apply(state: Dict[str, Any]) -> None:
+            schedule = state.get(schedule_id)
+            if schedule is None:
+                return
+            replan = fields["cron"] != schedule["cron"] or fields["jitter_seconds"] != schedule["jitter_seconds"]
+            # 일시 중지 중에 지난 실행은 catch_up 대상이 아님 → 다시 켜면 지금부터 계획
+            replan = replan or (fields["enabled"] and not schedule.get("enabled"))
+            schedule.update(fields)
+            if replan or (fields["enabled"] and not schedule.get("next_fire")):
+                self._plan_next(schedule, datetime.now())
+
+        return self.shared_state.update(NAMESPACE, _apply).get(schedule_id)
+
+    def delete(self, schedule_id: str) -> bool:
+        existed = self.get(schedule_id) is not None
+        self.shared_state.delete(NAMESPACE, schedule_id)
+        return existed
+
+    def get(self, schedule_id: str) -> Optional[Dict[str, Any]]:
+        return self.shared_state.get(NAMESPACE, schedule_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """스케줄 목록 (실행 기록 제외, 최근 실행만)"""
+        schedules = []
+        for schedule in self.shared_state.read(NAMESPACE).values():
+            summary = {k: v for k, v in schedule.items() if k != "runs"}
+            summary["last_run"] = schedule["runs"][-1] if schedule.get("runs") else None
+            schedules.append(summary)
+        schedules.sort(key=lambda s: s["created_at"])
+        return schedules
+
+    def run_now(self, schedule_id: str) -> Optional[Dict[str, Any]]:
+        """다음 주기에 한 번 실행하도록 예약 (없으면 None)"""
+        def _apply(state: Dict[str, Any]) -> None:
+            if schedule_id in state:
+                state[schedule_id]["pending"] = state[schedule_id].get("pending", 0) + 1
+
+        return self.shared_state.update(NAMESPACE, _apply).get(schedule_id)
+
+    # ------------------------------------------------------------------
+    # 실행 루프
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self.tick <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="scan-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.tick):
+            try:
+                if self._acquire_leadership():
+                    self.run_pending()
+            except Exception as e:
+                logger.error(f"스케줄러 오류: {e}")
+
+    def _acquire_leadership(self) -> bool:
+        """리더 잠금 (한 번 잡으면 프로세스가 끝날 때까지 유지)"""
+        if self._lock_fd is not None:
+            return True
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+        self._lock_fd = fd
+        logger.info(f"스케줄러 리더: pid {os.getpid()}")
+        self._mark_interrupted()
+        return True
+
+    def _mark_interrupted(self) -> None:
+        """이전 리더가 실행 도중 종료된 기록 정리"""
+        def _apply(state: Dict[str, Any]) -> None:
+            for schedule in state.values():
+                for run in schedule.get("runs", []):
+                    if run.get("status") == "running":
+                        run.update(status="interrupted", finished_at=datetime.now().isoformat())
+
+        self.shared_state.update(NAMESPACE, _apply)
+
+    def run_pending(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        실행 시각이 된 스케줄의 예약 실행 수(pending)를 늘리고, 상한 안에서 실행 시작
+
+        Returns:
+            이번에 시작한 schedule_id 목록
+        """
+        now = now or datetime.now()
+        to_start: List[Dict[str, Any]] = []
+
+        def _apply(state: Dict[str, Any]) -> None:
+            self._release_finished(state)
+            for schedule in state.values():
+                if schedule.get("enabled") and schedule.get("due_at") and datetime.fromisoformat(schedule["due_at"]) <= now:
+                    schedule["pending"] = schedule.get("pending", 0) + self._due_runs(schedule, now)
+                    self._plan_next(schedule, now)
+
+            with self._running_lock:
+                slots = self.max_concurrent - len(self._running)
+                for schedule in sorted(state.values(), key=lambda s: s.get("due_at") or ""):
+                    if slots <= 0:
+                        break
+                    if schedule.get("pending", 0) <= 0 or schedule["schedule_id"] in self._running:
+                        continue
+                    schedule["pending"] -= 1
+                    run = {
+                        "run_id": uuid.uuid4().hex[:8],
+                        "status": "running",
+                        "started_at": now.isoformat(),
+                        "finished_at": None,
+                        "scan_id": None,
+                        "error": None,
+                        "diff": None,
+                    }
+                    schedule.setdefault("runs", []).append(run)
+                    del schedule["runs"][:-MAX_KEPT_RUNS]
+                    self._running.add(schedule["schedule_id"])
+                    to_start.append({**schedule, "run_id": run["run_id"]})
+                    slots -= 1
+
+        self.shared_state.update(NAMESPACE, _apply)
+        for schedule in to_start:
+            # VPN 연결 확인이 오래 걸릴 수 있으므로 별도 스레드에서 작업 풀에 등록
+            threading.Thread(target=self._dispatch, args=(schedule,), name="schedule-dispatch", daemon=True).start()
+        return [s["schedule_id"] for s in to_start]
+
+    def _release_finished(self, state: Dict[str, Any]) -> None:
+        """실행 중 기록이 없는 스케줄을 _running 에서 제거 (완료 처리가 누락되어도 다음 실행이 막히지 않도록)"""
+        with self._running_lock:
+            for schedule_id in list(self._running):
+                runs = state.get(schedule_id, {}).get("runs", [])
+                if not any(run.get("status") == "running" for run in runs):
+                    self._running.discard(schedule_id)
+
+    def _due_runs(self, schedule: Dict[str, Any], now: datetime) -> int:
+        """놓친 실행을 포함해 이번에 예약할 실행 수 (catch_up 정책)"""
+        cron = CronSchedule(schedule["cron"])
+        first = datetime.fromisoformat(schedule["next_fire"])
+        fires = [first]
+        for fire in cron.iter_between(first, now):
+            fires.append(fire)
+            if len(fires) > schedule["max_catch_up"]:
+                break
+        policy = schedule["catch_up"]
+        if policy == "all":
+            return min(len(fires), schedule["max_catch_up"])
+        if policy == "once":
+            return 1
+        # skip: 마지막 실행 시각(지터 포함)에서 유예 시간 안이면 실행
+        latest = fires[-1]
+        delay = (now - latest).total_seconds() - _jitter(schedule["schedule_id"], latest, schedule["jitter_seconds"])
+        if delay <= SCHEDULER_MISFIRE_GRACE:
+            return 1
+        logger.warning(f"스케줄 {schedule['schedule_id']}: 놓친 실행 {len(fires)}회 건너뜀 (catch_up=skip)")
+        return 0
+
+    def _prepare_vpn(self, schedule: Dict[str, Any]) -> None:
+        """스케줄의 VPN 설정으로 연결되어 있는지 확인 (끊겨 있으면 연결, 다른 설정이면 실패)"""
+        if not schedule.get("vpn_config") or self.vpn_manager is None:
+            return
+        vpn = resolve(self.vpn_manager)
+        status = vpn.get_status()
+        if status.get("status") == "connected":
+            if status.get("config") != schedule["vpn_config"]:
+                # 다른 작업이 쓰는 터널을 끊지 않도록 실행하지 않음
+                raise RuntimeError(f"VPN 이 다른 설정({status.get('config')})으로 연결되어 있습니다.")
+            return
+        result = vpn.connect(schedule["vpn_config"])
+        if result.get("status") not in ("success", "connected"):
+            raise RuntimeError(f"VPN 연결 실패: {result.get('message', result.get('status'))}")
+
+    def _dispatch(self, schedule: Dict[str, Any]) -> None:
+        schedule_id, run_id = schedule["schedule_id"], schedule["run_id"]
+        try:
+            self._prepare_vpn(schedule)
+            batch = resolve(self.scan_jobs).submit_batch(
+                [{"target": schedule["target"], "ports": schedule["ports"], "arguments": schedule["arguments"]}],
+                timeout=schedule["timeout"],
+                profile=schedule["profile"],
+                labels={"schedule_id": schedule_id},
+                on_saved=lambda item, scan_id, result: self._on_saved(schedule, run_id, scan_id, result),
+            )
+            self._update_run(schedule_id, run_id, batch_id=batch["batch_id"])
+        except Exception as e:
+            logger.error(f"스케줄 {schedule_id} 실행 오류: {e}")
+            self._finish(schedule_id, run_id, status="failed", error=str(e))
+
+    def _on_saved(self, schedule: Dict[str, Any], run_id: str, scan_id: Optional[str],
+                  scan_result: Optional[Dict[str, Any]]) -> None:
+        """스캔 완료 → 이전 실행 스캔과 비교해 기록 (오류가 나도 실행 슬롯은 항상 반환)"""
+        schedule_id = schedule["schedule_id"]
+        try:
+            if scan_id is None or scan_result is None:
+                self._finish(schedule_id, run_id, status="failed", error="스캔 결과를 저장하지 못했습니다.")
+                return
+            error = scan_result.get("error")
+            diff = None
+            current = self.get(schedule_id) or schedule
+            previous_id = current.get("last_scan_id")
+            if previous_id and not error:
+                try:
+                    previous = resolve(self.storage).get_scan_by_id(previous_id, profile=schedule["profile"])
+                    if previous is not None:
+                        diff = diff_scans(previous, scan_result)
+                except Exception as e:
+                    logger.warning(f"스케줄 {schedule_id}: 이전 스캔 {previous_id} 비교 오류: {e}")
+            self._finish(
+                schedule_id, run_id,
+                status="failed" if error else "completed",
+                error=error,
+                scan_id=scan_id,
+                previous_scan_id=previous_id,
+                diff=diff,
+                diff_counts=_diff_counts(diff),
+                last_scan_id=None if error else scan_id,
+            )
+        finally:
+            self._release(schedule_id)
+
+    def _update_run(self, schedule_id: str, run_id: str, **fields: Any) -> None:
+        def _apply(state: Dict[str, Any]) -> None:
+            for run in state.get(schedule_id, {}).get("runs", []):
+                if run["run_id"] == run_id:
+                    run.update(fields)
+
+        self.shared_state.update(NAMESPACE, _apply)
+
+    def _finish(self, schedule_id: str, run_id: str, last_scan_id: Optional[str] = None, **fields: Any) -> None:
+        def _apply(state: Dict[str, Any]) -> None:
+            schedule = state.get(schedule_id)
+            if schedule is None:
+                return
+            for run in schedule.get("runs", []):
+                if run["run_id"] == run_id:
+                    run.update(fields, finished_at=datetime.now().isoformat())
+            if last_scan_id:
+                schedule["last_scan_id"] = last_scan_id
+
+        try:
+            self.shared_state.update(NAMESPACE, _apply)
+        finally:
+            self._release(schedule_id)
+
+    def _release(self, schedule_id: str) -> None:
+        with self._running_lock:
+            self._running.discard(schedule_id)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# search_index.py
+# ──────────────────────────────────────────────────────────
+# 프로필별 전문 검색 인덱스 (SQLite FTS5: profiles/<p>/index/search.db)
+#  • 스캔: hostscript / 포트 스크립트 출력, 제품/버전/부가 정보
+#  • 보고서: 대상, 대상 IP, 리스크 레벨
+#  • 스캔/보고서 저장 시 증분 갱신, reindex.py 로 전체 재구성
+# 인증서 CN, HTTP 타이틀, 배너 같은 문자열을 스캔 파일을 받지 않고 찾을 수 있습니다.
+# ──────────────────────────────────────────────────────────
+import sqlite3
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(
+    content,
+    kind UNINDEXED,
+    doc_id UNINDEXED,
+    host UNINDEXED,
+    port UNINDEXED,
+    field UNINDEXED,
+    timestamp UNINDEXED,
+    tokenize = "unicode61 tokenchars '-_'"
+);
+-- FTS5 의 UNINDEXED 열은 조건 검색 시 전체 테이블을 훑으므로
+-- 스캔/보고서 ID → FTS rowid 대응을 일반 인덱스가 있는 테이블에 따로 보관 (교체/삭제용)
+CREATE TABLE IF NOT EXISTS document_rows (
+    fts_rowid INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    doc_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS document_rows_doc ON document_rows (kind, doc_id);
+"""
+
+# 스키마 버전 (PRAGMA user_version) - 1: document_rows 추가
+SCHEMA_VERSION = 1
+
+# 검색 결과 스니펫 앞뒤 표시 문자와 길이(토큰 수)
+SNIPPET_OPEN = "["
+SNIPPET_CLOSE = "]"
+SNIPPET_TOKENS = 16
+
+
+def scan_documents(scan_data: Dict[str, Any]) -> Iterator[Tuple[str, Optional[int], str, str]]:
+    """스캔에서 색인할 문서 (host, port, field, content)"""
+    for host in scan_data.get("hosts", []) or []:
+        address = host.get("host", "")
+        for script in host.get("hostscript", []) or []:
+            if script.get("output"):
+                yield address, None, f"hostscript:{script.get('id')}", script["output"]
+        for port in host.get("ports", []) or []:
+            number = port.get("port")
+            service = " ".join(
+                str(port.get(k)) for k in ("service", "product", "version", "extrainfo") if port.get(k)
+            )
+            if service:
+                yield address, number, "service", service
+            for script in port.get("scripts", []) or []:
+                if script.get("output"):
+                    yield address, number, f"script:{script.get('id')}", script["output"]
+
+
+def report_documents(report_data: Dict[str, Any]) -> Iterator[Tuple[str, Optional[int], str, str]]:
+    """보고서에서 색인할 문서 (host, port, field, content)"""
+    summary = report_data.get("summary", {}) or {}
+    text = " ".join(
+        str(v) for v in (
+            summary.get("target"),
+            " ".join(str(ip) for ip in summary.get("target_ips", []) or []),
+            summary.get("risk_level"),
+        ) if v
+    )
+    if text:
+        yield summary.get("target", ""), None, "summary", text
+
+
+class SearchIndex:
+    """
+    전문 검색 인덱스
+
+    사용 예:
+        index = storage.get_search_index()
+        index.search('"example.com"', limit=20)
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                # 이전 버전 인덱스: 기존 FTS 행의 대응표를 한 번만 채움
+                conn.execute("DELETE FROM document_rows")
+                conn.execute("INSERT INTO document_rows (fts_rowid, kind, doc_id) SELECT rowid, kind, doc_id FROM documents")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # 여러 gunicorn 워커가 같은 DB 를 쓰므로 WAL + busy_timeout
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # 갱신
+    # ------------------------------------------------------------------
+
+    def record_scan(self, scan_id: str, scan_data: Dict[str, Any]) -> None:
+        """스캔 색인 (같은 스캔을 다시 색인하면 교체)"""
+        with self._connect() as conn:
+            self._replace(conn, "scan", scan_id, scan_data.get("timestamp", ""), scan_documents(scan_data))
+
+    def record_report(self, report_id: str, report_data: Dict[str, Any]) -> None:
+        """보고서 색인"""
+        with self._connect() as conn:
+            self._replace(conn, "report", report_id, report_data.get("timestamp", ""), report_documents(report_data))
+
+    def remove(self, kind: str, doc_id: str) -> None:
+        """스캔/보고서 색인 제거"""
+        with self._connect() as conn:
+            self._delete(conn, kind, doc_id)
+
+    def rebuild(
+        self,
+        scans: Iterable[Tuple[str, Dict[str, Any]]],
+        reports: Iterable[Tuple[str, Dict[str, Any]]] = (),
+    ) -> int:
+        """전체 재구성. 색인한 문서 수 반환"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM documents")
+            conn.execute("DELETE FROM document_rows")
+            for scan_id, scan_data in scans:
+                self._replace(conn, "scan", scan_id, scan_data.get("timestamp", ""), scan_documents(scan_data))
+            for report_id, report_data in reports:
+                self._replace(conn, "report", report_id, report_data.get("timestamp", ""),
+                              report_documents(report_data))
+            conn.execute("INSERT INTO documents(documents) VALUES ('optimize')")
+            return conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, kind: str, doc_id: str) -> None:
+        """ID 의 FTS 행 삭제 (document_rows 인덱스로 rowid 를 찾아 rowid 로 삭제)"""
+        conn.execute(
+            "DELETE FROM documents WHERE rowid IN "
+            "(SELECT fts_rowid FROM document_rows WHERE kind = ? AND doc_id = ?)",
+            (kind, doc_id),
+        )
+        conn.execute("DELETE FROM document_rows WHERE kind = ? AND doc_id = ?", (kind, doc_id))
+
+    @classmethod
+    def _replace(cls, conn: sqlite3.Connection, kind: str, doc_id: str, timestamp: str,
+                 documents: Iterable[Tuple[str, Optional[int], str, str]]) -> None:
+        cls._delete(conn, kind, doc_id)
+        rowids = []
+        for host, port, field, content in documents:
+            cursor = conn.execute(
+                "INSERT INTO documents (content, kind, doc_id, host, port, field, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (content, kind, doc_id, host, port, field, timestamp),
+            )
+            rowids.append((cursor.lastrowid, kind, doc_id))
+        conn.executemany("INSERT INTO document_rows (fts_rowid, kind, doc_id) VALUES (?, ?, ?)", rowids)
+
+    # ------------------------------------------------------------------
+    # 검색
+    # ------------------------------------------------------------------
+
+    def search(self, query: str, limit: int = 20, offset: int = 0, kind: Optional[str] = None) -> Dict[str, Any]:
+        """
+        전문 검색 (관련도순, 스니펫 포함)
+
+        Args:
+            query: FTS5 질의 (예: nginx, "Apache httpd", ssl-cert AND example)
+                   문법 오류면 전체를 한 구절로 검색
+            limit / offset: 페이지
+            kind: "scan" 또는 "report" 로 제한
+
+        Returns:
+            {"query", "total", "limit", "offset", "results": [{kind, id, host, port, field, timestamp, snippet}]}
+        """
+        try:
+            return self._search(query, limit, offset, kind)
+        except sqlite3.OperationalError:
+            phrase = '"' + query.replace('"', '""') + '"'
+            return {**self._search(phrase, limit, offset, kind), "query": query}
+
+    def _search(self, query: str, limit: int, offset: int, kind: Optional[str]) -> Dict[str, Any]:
+        where = "documents MATCH ?"
+        params: List[Any] = [query]
+        if kind:
+            where += " AND kind = ?"
+            params.append(kind)
+
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM documents WHERE {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"""
+                SELECT kind, doc_id, host, port, field, timestamp,
+                       snippet(documents, 0, ?, ?, '…', ?) AS snippet
+                FROM documents WHERE {where}
+                ORDER BY rank LIMIT ? OFFSET ?
+                """,
+                [SNIPPET_OPEN, SNIPPET_CLOSE, SNIPPET_TOKENS, *params, limit, offset],
+            ).fetchall()
+
+        results = []
+        for row in rows:
+            item = dict(row)
+            item["id"] = item.pop("doc_id")
+            results.append(item)
+        return {"query": query, "total": total, "limit": limit, "offset": offset, "results": results}
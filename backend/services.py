@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# services.py
+# ──────────────────────────────────────────────────────────
+# 핵심 컴포넌트(스토리지, VPN, nmap, searchsploit)의 지연 초기화
+#  • 앱 임포트 시에는 팩토리만 등록하고 실제 생성은 첫 사용 시점에 수행
+#  • 백그라운드 워밍업 스레드가 미리 초기화해 두면 첫 요청도 빠르게 처리
+#  • /api/health 가 각 서비스의 준비 상태를 보고
+# ──────────────────────────────────────────────────────────
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LazyService:
+    """
+    팩토리를 첫 호출 시 한 번만 실행하는 스레드 안전 래퍼
+
+    상태: "pending" → "initializing" → "ready" (실패 시 "failed", 다음 get() 에서 재시도)
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self._factory = factory
+        self._instance: Any = None
+        self._lock = threading.Lock()
+        self.state = "pending"
+        self.error: Optional[str] = None
+        self.init_seconds: Optional[float] = None
+
+    def get(self) -> Any:
+        """인스턴스 반환 (필요하면 이 자리에서 초기화)"""
+        if self.state == "ready":
+            return self._instance
+
+        with self._lock:
+            if self.state != "ready":
+                self.state = "initializing"
+                start = time.perf_counter()
+                try:
+                    self._instance = self._factory()
+                except Exception as e:
+                    self.state = "failed"
+                    self.error = str(e)
+                    logger.error(f"서비스 '{self.name}' 초기화 실패: {e}")
+                    raise
+                self.init_seconds = round(time.perf_counter() - start, 3)
+                self.error = None
+                self.state = "ready"
+                logger.info(f"서비스 '{self.name}' 초기화 완료 ({self.init_seconds}초)")
+        return self._instance
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def status(self) -> Dict[str, Any]:
+        return {"state": self.state, "init_seconds": self.init_seconds, "error": self.error}
+
+
+def resolve(service: Any) -> Any:
+    """LazyService 면 인스턴스를, 아니면 그대로 반환"""
+    return service.get() if isinstance(service, LazyService) else service
+
+
+def start_warmup(services: Iterable[LazyService]) -> threading.Thread:
+    """
+    백그라운드 스레드에서 서비스를 순서대로 초기화합니다.
+    실패한 서비스는 기록만 하고 다음 서비스로 넘어갑니다. (첫 사용 시 재시도)
+    """
+    services = list(services)
+
+    def _warmup() -> None:
+        start = time.perf_counter()
+        for service in services:
+            try:
+                service.get()
+            except Exception:
+                pass
+        logger.info(f"서비스 워밍업 종료 ({time.perf_counter() - start:.2f}초)")
+
+    thread = threading.Thread(target=_warmup, name="service-warmup", daemon=True)
+    thread.start()
+    return thread
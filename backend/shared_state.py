@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# shared_state.py
+# ──────────────────────────────────────────────────────────
+# 여러 gunicorn 워커(프로세스)가 함께 보는 상태 저장소
+#  • 네임스페이스별 JSON 파일 하나 (예: data/state/vpn.json)
+#  • fcntl.flock 파일 잠금으로 프로세스 간 읽기/쓰기 직렬화
+#  • 임시 파일에 쓰고 rename 하므로 읽는 쪽은 항상 완전한 JSON 을 봅니다
+# ──────────────────────────────────────────────────────────
+import json
+import os
+import tempfile
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+try:
+    import fcntl  # Linux/Mac 전용
+except ImportError:  # Windows: 단일 프로세스(개발 서버)에서만 사용
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def file_lock(lock_path: str, exclusive: bool = True) -> Iterator[None]:
+    """
+    lock_path 파일에 대한 프로세스 간 잠금 (advisory flock)
+
+    Args:
+        lock_path: 잠금 파일 경로 (없으면 생성)
+        exclusive: True 면 배타 잠금, False 면 공유(읽기) 잠금
+    """
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+    finally:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def pid_alive(pid: Optional[int]) -> bool:
+    """다른 프로세스(워커)가 살아있는지 확인"""
+    if not pid:
+        return False
+    if os.name == "nt":
+        # Windows 에서 os.kill(pid, 0) 은 프로세스를 종료시키므로 사용하지 않습니다.
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SharedStateStore:
+    """
+    파일 잠금 기반 공유 상태 저장소
+
+    VPN 세션, 스캔 작업 상태처럼 어느 워커가 요청을 받든 같은 값을 봐야 하는
+    작은 상태를 저장합니다. 대용량 데이터는 LocalStorage 를 사용하세요.
+    """
+
+    def __init__(self, state_dir: str):
+        self.state_dir = state_dir
+        os.makedirs(self.state_dir, exist_ok=True)
+        # 같은 프로세스 안의 스레드 간 직렬화 (flock 은 프로세스 간 잠금)
+        self._thread_lock = threading.RLock()
+
+    def _path(self, namespace: str) -> str:
+        return os.path.join(self.state_dir, f"{namespace}.json")
+
+    @contextmanager
+    def _locked(self, namespace: str, exclusive: bool = True) -> Iterator[None]:
+        with self._thread_lock:
+            with file_lock(self._path(namespace) + ".lock", exclusive):
+                yield
+
+    def _read_unlocked(self, namespace: str) -> Dict[str, Any]:
+        path = self._path(namespace)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"공유 상태 '{namespace}' 읽기 오류: {e}")
+            return {}
+
+    def _write_unlocked(self, namespace: str, data: Dict[str, Any]) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.state_dir, prefix=f".{namespace}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(namespace))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def read(self, namespace: str) -> Dict[str, Any]:
+        """네임스페이스 전체를 읽습니다."""
+        with self._locked(namespace, exclusive=False):
+            return self._read_unlocked(namespace)
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        """네임스페이스에서 키 하나를 읽습니다."""
+        return self.read(namespace).get(key, default)
+
+    def replace(self, namespace: str, data: Dict[str, Any]) -> None:
+        """네임스페이스 전체를 교체합니다."""
+        with self._locked(namespace):
+            self._write_unlocked(namespace, data)
+
+    def update(
+        self, namespace: str, mutator: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        잠금을 잡은 채로 읽기-수정-쓰기를 수행합니다.
+
+        Args:
+            namespace: 네임스페이스 이름
+            mutator: 현재 상태 dict 를 받아 제자리 수정하거나 새 dict 를 반환하는 함수
+
+        Returns:
+            저장된 상태
+        """
+        with self._locked(namespace):
+            state = self._read_unlocked(namespace)
+            result = mutator(state)
+            if result is not None:
+                state = result
+            self._write_unlocked(namespace, state)
+            return state
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        """네임스페이스의 키 하나를 저장합니다."""
+        def _set(state: Dict[str, Any]) -> None:
+            state[key] = value
+        self.update(namespace, _set)
+
+    def delete(self, namespace: str, key: str) -> None:
+        """네임스페이스의 키 하나를 삭제합니다."""
+        def _delete(state: Dict[str, Any]) -> None:
+            state.pop(key, None)
+        self.update(namespace, _delete)
+
+    def remove(self, namespace: str) -> None:
+        """
+        네임스페이스 파일과 잠금 파일을 삭제합니다.
+        더 이상 아무도 쓰지 않는 네임스페이스(끝난 배치 등) 정리용입니다.
+        """
+        with self._locked(namespace):
+            try:
+                os.remove(self._path(namespace))
+            except FileNotFoundError:
+                pass
+        try:
+            os.remove(self._path(namespace) + ".lock")
+        except FileNotFoundError:
+            pass
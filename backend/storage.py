@@ -1,9 +1,22 @@
-import json
+import itertools
 import os
-from typing import Dict, List, Any, Optional
+import time
+from typing import Callable, Dict, List, Any, Optional, Union
 from datetime import datetime
 import uuid
 
+import json_provider
+from atomic_io import atomic_write, path_lock, quarantine, recover_directory, write_json
+from metrics import STORAGE_BYTES, STORAGE_SECONDS
+import tracing
+from migrations import DOCUMENT_ID_KEYS, upgrade_document
+from inventory import AssetInventory
+from search_index import SearchIndex
+from topology import TopologyCache
+from retention import ArchiveStore, validate_rules
+from report_builder import stored_scan_summary, summarize_scan
+from shared_state import file_lock
+
 class LocalStorage:
     def __init__(self, data_dir: str = "data"):
         """
@@ -16,9 +29,48 @@ class LocalStorage:
         self._ensure_data_dir_exists()
         # 현재 프로필 상태 파일 경로
         self.profile_state_file = os.path.join(self.data_dir, "profile_state.json")
+        # 프로필별 파생 인덱스 (자산 인벤토리, 전문 검색 - 첫 사용 시 생성)
+        self._derived_indexes: Dict[tuple, Any] = {}
         # 기본 프로필 설정
         if not os.path.exists(self.profile_state_file):
             self._save_profile_state({"current_profile": "default"})
+        # 이전 실행에서 중단된 쓰기로 손상된 파일 격리
+        self.recover()
+    
+    def recover(self) -> Dict[str, int]:
+        """
+        시작 시 복구 검사: 손상된 스캔/보고서 JSON 과 남은 임시 파일을
+        profiles/<p>/quarantine/<scans|reports>/ 로 옮깁니다.
+        
+        이전 검사 이후 바뀐 파일만 파싱하므로 (data/.recovery.json 에 시각 기록)
+        두 번째 워커나 재시작 시에는 거의 비용이 들지 않습니다.
+        
+        Returns:
+            {"checked", "quarantined", "stale_tmp"} 합계
+        """
+        marker_path = os.path.join(self.data_dir, ".recovery.json")
+        totals = {"checked": 0, "quarantined": 0, "stale_tmp": 0}
+        with file_lock(os.path.join(self.data_dir, ".recovery.lock")):
+            try:
+                since = json_provider.read_json(marker_path).get("last_check", 0.0)
+            except Exception:
+                since = 0.0
+            started = time.time()
+            for profile in self.get_profiles():
+                profile_dir = os.path.join(self.data_dir, "profiles", profile)
+                for file_type in ("scans", "reports"):
+                    counts = recover_directory(
+                        os.path.join(profile_dir, file_type),
+                        os.path.join(profile_dir, "quarantine", file_type),
+                        # mtime 해상도/시계 차이를 고려해 약간 겹치게 검사
+                        since=max(0.0, since - 60),
+                    )
+                    for key, value in counts.items():
+                        totals[key] += value
+            write_json(marker_path, {"last_check": started})
+        if totals["quarantined"] or totals["stale_tmp"]:
+            print(f"복구 검사: 손상 파일 {totals['quarantined']}개, 임시 파일 {totals['stale_tmp']}개 격리")
+        return totals
     
     def _ensure_data_dir_exists(self):
         """데이터 디렉토리 존재 여부 확인 및 생성"""
@@ -98,9 +150,8 @@ class LocalStorage:
         """
         if os.path.exists(self.profile_state_file):
             try:
-                with open(self.profile_state_file, 'r', encoding='utf-8') as f:
-                    state = json.load(f)
-                    return state.get("current_profile", "default")
+                state = json_provider.read_json(self.profile_state_file)
+                return state.get("current_profile", "default")
             except Exception as e:
                 print(f"프로필 상태 파일 읽기 오류: {str(e)}")
                 
@@ -245,6 +296,8 @@ class LocalStorage:
         # 프로필 디렉토리 삭제
         try:
             import shutil
+            for key in [k for k in self._derived_indexes if k[1] == profile_name]:
+                self._derived_indexes.pop(key, None)
             shutil.rmtree(profile_dir)
             
             return {
@@ -266,17 +319,17 @@ class LocalStorage:
             state: 저장할 상태 데이터
         """
         try:
-            with open(self.profile_state_file, 'w', encoding='utf-8') as f:
-                json.dump(state, f, ensure_ascii=False, indent=2)
+            write_json(self.profile_state_file, state)
         except Exception as e:
             print(f"프로필 상태 저장 오류: {str(e)}")
     
-    def save_scan_result(self, scan_data: Dict) -> str:
+    def save_scan_result(self, scan_data: Dict, profile: Optional[str] = None) -> str:
         """
         스캔 결과 저장
         
         Args:
             scan_data: 저장할 스캔 데이터
+            profile: 저장할 프로필 (기본값: 현재 프로필)
             
         Returns:
             저장된 파일 경로
@@ -287,24 +340,37 @@ class LocalStorage:
         
         filename = self._generate_filename("scan")
         
-        # 현재 프로필의 스캔 디렉토리에 저장
-        current_profile = self.get_current_profile()
+        # 현재 프로필(또는 지정된 프로필)의 스캔 디렉토리에 저장
+        current_profile = profile or self.get_current_profile()
         profile_scans_dir = os.path.join(self.data_dir, "profiles", current_profile, "scans")
         os.makedirs(profile_scans_dir, exist_ok=True)
         
         file_path = os.path.join(profile_scans_dir, filename)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(scan_data, f, ensure_ascii=False, indent=2)
+        with tracing.span("storage.save_scan_result", profile=current_profile):
+            # 취약점 요약(심각도별 개수, 최대 CVSS, 열린 포트, 서비스, CVE 목록)을 함께 저장
+            with tracing.span("storage.summarize"):
+                scan_data["summary"] = summarize_scan(scan_data)
+            # 스캔 트레이스 안에서 저장하면 지금까지 끝난 단계별 시간을 함께 저장
+            timing = tracing.timing_block()
+            if timing is not None:
+                scan_data["timing"] = timing
+            with tracing.span("storage.write"):
+                scan_data = self._write_document(file_path, "scans", scan_data)
+            
+            with tracing.span("storage.index"):
+                self._index_put(profile_scans_dir, "scans", filename, scan_data)
+                self._index_scan(current_profile, filename.split('.')[0], scan_data)
             
         return file_path
     
-    def save_report(self, report_data: Dict) -> str:
+    def save_report(self, report_data: Dict, profile: Optional[str] = None) -> str:
         """
         보고서 저장
         
         Args:
             report_data: 저장할 보고서 데이터
+            profile: 저장할 프로필 (기본값: 현재 프로필)
             
         Returns:
             저장된 파일 경로
@@ -315,44 +381,175 @@ class LocalStorage:
             
         filename = self._generate_filename("report")
         
-        # 현재 프로필의 보고서 디렉토리에 저장
-        current_profile = self.get_current_profile()
+        # 현재 프로필(또는 지정된 프로필)의 보고서 디렉토리에 저장
+        current_profile = profile or self.get_current_profile()
         profile_reports_dir = os.path.join(self.data_dir, "profiles", current_profile, "reports")
         os.makedirs(profile_reports_dir, exist_ok=True)
         
         file_path = os.path.join(profile_reports_dir, filename)
+        report_data = self._write_document(file_path, "reports", report_data)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, ensure_ascii=False, indent=2)
+        self._index_put(profile_reports_dir, "reports", filename, report_data)
+        self._index_report(current_profile, filename.split('.')[0], report_data)
             
         return file_path
     
-    def get_scan_list(self) -> List[Dict]:
+    def update_scan_result(self, scan_id: str, scan_data: Union[Dict, Callable[[Dict], Dict]],
+                           profile: Optional[str] = None) -> bool:
+        """
+        저장된 스캔 결과 덮어쓰기 (취약점 보강 등)
+        
+        Args:
+            scan_id: 스캔 ID
+            scan_data: 새 스캔 데이터, 또는 저장된 스캔을 받아 새 데이터를 반환하는 함수
+                       (함수는 파일 잠금 안에서 호출 → 다른 워커의 갱신과 섞여도 유실되지 않음)
+            profile: 프로필 (기본값: 현재 프로필)
+            
+        Returns:
+            성공 여부 (스캔이 없으면 False)
+        """
+        current_profile = profile or self.get_current_profile()
+        profile_scans_dir = os.path.join(self.data_dir, "profiles", current_profile, "scans")
+
+        def _modify(current: Dict) -> Dict:
+            updated = scan_data(current) if callable(scan_data) else scan_data
+            updated["summary"] = summarize_scan(updated)
+            return updated
+
+        document = self._update_data_by_id_in_dir(profile_scans_dir, scan_id, _modify, "scans")
+        if document is not None:
+            self._index_scan(current_profile, scan_id, document)
+        return document is not None
+    
+    def update_report(self, report_id: str, report_data: Union[Dict, Callable[[Dict], Dict]],
+                      profile: Optional[str] = None) -> bool:
+        """
+        저장된 보고서 덮어쓰기
+        
+        Args:
+            report_id: 보고서 ID
+            report_data: 새 보고서 데이터, 또는 저장된 보고서를 받아 새 데이터를 반환하는 함수 (파일 잠금 안에서 호출)
+            profile: 프로필 (기본값: 현재 프로필)
+            
+        Returns:
+            성공 여부 (보고서가 없으면 False)
+        """
+        current_profile = profile or self.get_current_profile()
+        profile_reports_dir = os.path.join(self.data_dir, "profiles", current_profile, "reports")
+        document = self._update_data_by_id_in_dir(profile_reports_dir, report_id, report_data, "reports")
+        if document is not None:
+            self._index_report(current_profile, report_id, document)
+        return document is not None
+    
+    @staticmethod
+    def _write_document(file_path: str, file_type: str, data: Dict, lock: bool = True) -> Dict:
+        """
+        스캔/보고서를 API 응답 형식으로 저장 (ID 를 첫 필드로 포함, 공백 없는 JSON)
+        이전 스키마 데이터는 저장 전에 최신 schema_version 으로 변환합니다.
+        
+        Args:
+            lock: False 면 호출자가 이미 path_lock 을 잡고 있음 (읽기-수정-쓰기)
+
+        Returns:
+            ID 와 schema_version 이 포함된 저장 데이터
+        """
+        document, _ = upgrade_document(file_type, os.path.basename(file_path).split('.')[0], data)
+        with STORAGE_SECONDS.time(op="write", kind=file_type):
+            body = json_provider.dumps(document)
+            atomic_write(file_path, body, lock=lock)
+        STORAGE_BYTES.inc(len(body), op="write", kind=file_type)
+        return document
+    
+    def _update_data_by_id_in_dir(self, dir_path: str, data_id: str, data: Union[Dict, Callable[[Dict], Dict]],
+                                  file_type: str) -> Optional[Dict]:
+        """
+        특정 디렉토리의 기존 파일을 ID로 찾아 덮어쓰기
+        읽기-수정-쓰기 전체를 파일별 잠금(path_lock) 안에서 수행해 여러 워커의 갱신이 유실되지 않게 합니다.
+        
+        Args:
+            dir_path: 디렉토리 경로
+            data_id: 데이터 ID (파일명에서 확장자를 뺀 부분)
+            data: 저장할 데이터, 또는 저장된 문서를 받아 새 데이터를 반환하는 함수
+            file_type: 파일 타입 ("scans" 또는 "reports") - 인덱스 갱신용
+            
+        Returns:
+            저장된 문서 (파일이 없거나 실패하면 None)
+        """
+        file_path = os.path.join(dir_path, f"{os.path.basename(data_id)}.json")
+        try:
+            with path_lock(file_path):
+                if not os.path.exists(file_path):
+                    return None
+                if callable(data):
+                    current, _ = upgrade_document(file_type, os.path.basename(data_id), json_provider.read_json(file_path))
+                    data = data(current)
+                document = self._write_document(file_path, file_type, data, lock=False)
+            self._index_put(dir_path, file_type, os.path.basename(file_path), document)
+            return document
+        except Exception as e:
+            print(f"파일 {file_path} 저장 오류: {str(e)}")
+            return None
+    
+    def get_scan_list(self, include_archived: bool = False) -> List[Dict]:
         """
         저장된 모든 스캔 목록 반환
         
+        Args:
+            include_archived: 보존 정책으로 보관된 스캔도 포함
+            
         Returns:
             스캔 메타데이터 목록
         """
-        current_profile = self.get_current_profile()
-        profile_scans_dir = os.path.join(self.data_dir, "profiles", current_profile, "scans")
-        return self._get_file_list_from_dir(profile_scans_dir, "scans")
+        return self.list_entries("scans", include_archived=include_archived)
     
-    def get_report_list(self) -> List[Dict]:
+    def get_report_list(self, include_archived: bool = False) -> List[Dict]:
         """
         저장된 모든 보고서 목록 반환
         
+        Args:
+            include_archived: 보존 정책으로 보관된 보고서도 포함
+            
         Returns:
             보고서 메타데이터 목록
         """
-        current_profile = self.get_current_profile()
-        profile_reports_dir = os.path.join(self.data_dir, "profiles", current_profile, "reports")
-        return self._get_file_list_from_dir(profile_reports_dir, "reports")
+        return self.list_entries("reports", include_archived=include_archived)
+    
+    def list_entries(self, file_type: str, profile: Optional[str] = None, include_archived: bool = False) -> List[Dict]:
+        """
+        프로필의 스캔/보고서 목록 (시간 역순)
+        
+        Args:
+            file_type: "scans" 또는 "reports"
+            profile: 프로필 (기본값: 현재 프로필)
+            include_archived: 보관된 항목도 포함 (항목에 "archived": True 표시)
+        """
+        current_profile = profile or self.get_current_profile()
+        dir_path = os.path.join(self.data_dir, "profiles", current_profile, file_type)
+        result = self._get_file_list_from_dir(dir_path, file_type)
+        if include_archived:
+            live = {item["id"] for item in result}
+            for data_id, entry in self.get_archive(current_profile).entries(file_type).items():
+                if data_id in live:
+                    continue
+                result.append({
+                    "id": data_id,
+                    "filename": f"{data_id}.json",
+                    "path": None,
+                    "timestamp": entry.get("timestamp", "Unknown"),
+                    "target": entry.get("target", "Unknown") if file_type == "scans" else None,
+                    "summary": entry.get("summary", {}),
+                    "archived": True,
+                })
+            result.sort(key=lambda x: x["timestamp"], reverse=True)
+        return result
     
     def _get_file_list_from_dir(self, dir_path: str, file_type: str) -> List[Dict]:
         """
         지정된 디렉토리의 파일 목록 반환
         
+        파일을 매번 열지 않고 프로필별 인덱스(index/<file_type>.json)의 요약을 사용합니다.
+        인덱스에 없는 파일만 읽어서 추가하고, 사라진 파일은 인덱스에서 제거합니다.
+        
         Args:
             dir_path: 디렉토리 경로
             file_type: 파일 타입 ("scans" 또는 "reports")
@@ -366,61 +563,336 @@ class LocalStorage:
             os.makedirs(dir_path, exist_ok=True)
             return result
             
-        for filename in os.listdir(dir_path):
+        entries = self._sync_index(dir_path, file_type)
+        for filename, entry in entries.items():
+            result.append({
+                "id": filename.split('.')[0],
+                "filename": filename,
+                "path": os.path.join(dir_path, filename),
+                "timestamp": entry.get("timestamp", "Unknown"),
+                "target": entry.get("target", "Unknown") if file_type == "scans" else None,
+                "summary": entry.get("summary", {}),
+            })
+                
+        # 시간 역순으로 정렬
+        result.sort(key=lambda x: x["timestamp"], reverse=True)
+        return result
+    
+    # 인덱스 관련 메서드
+    @staticmethod
+    def _index_path(dir_path: str, file_type: str) -> str:
+        """프로필의 scans/reports 디렉토리에 대응하는 인덱스 파일 경로 (profiles/<p>/index/<file_type>.json)"""
+        return os.path.join(os.path.dirname(dir_path), "index", f"{file_type}.json")
+    
+    @staticmethod
+    def _index_entry(file_type: str, data: Dict) -> Dict:
+        """인덱스에 저장할 파일 요약"""
+        if file_type == "scans":
+            return {
+                "timestamp": data.get("timestamp", "Unknown"),
+                "target": data.get("target", "Unknown"),
+                "summary": stored_scan_summary(data),
+                # 보고서 생성 시 스캔을 읽지 않고 보강 필요 여부를 판단하기 위함
+                "vuln_enrichment": "vuln_enrichment" in data,
+            }
+        return {
+            "timestamp": data.get("timestamp", "Unknown"),
+            "summary": data.get("summary", {}),
+            "scan_id": data.get("details", {}).get("scan_id"),
+            "details_ref": bool(data.get("details_ref")),
+        }
+    
+    @staticmethod
+    def _read_index(index_path: str) -> Dict[str, Dict]:
+        try:
+            return json_provider.read_json(index_path).get("entries", {})
+        except (OSError, ValueError):
+            return {}
+    
+    @staticmethod
+    def _write_index(index_path: str, entries: Dict[str, Dict]) -> None:
+        """인덱스 파일을 임시 파일에 쓴 뒤 교체 (읽는 쪽이 반쯤 쓰인 파일을 보지 않도록)
+        인덱스는 원본 파일에서 다시 만들 수 있으므로 fsync 하지 않음"""
+        write_json(index_path, {"version": 1, "entries": entries}, fsync="off")
+    
+    def _sync_index(self, dir_path: str, file_type: str) -> Dict[str, Dict]:
+        """
+        디렉토리 내용과 인덱스를 맞춘 뒤 인덱스 항목 반환 {filename: entry}
+        """
+        index_path = self._index_path(dir_path, file_type)
+        names = {f for f in os.listdir(dir_path) if f.endswith('.json')}
+        entries = self._read_index(index_path)
+        if names == set(entries):
+            return entries
+        
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        with file_lock(f"{index_path}.lock"):
+            entries = self._read_index(index_path)
+            names = {f for f in os.listdir(dir_path) if f.endswith('.json')}
+            for filename in set(entries) - names:
+                entries.pop(filename, None)
+            for filename in names - set(entries):
+                file_path = os.path.join(dir_path, filename)
+                try:
+                    data = json_provider.read_json(file_path)
+                    entries[filename] = self._index_entry(file_type, data)
+                except Exception as e:
+                    # 손상된 파일은 격리해 목록 조회마다 다시 파싱하지 않도록 함
+                    print(f"파일 {filename} 읽기 오류: {str(e)}")
+                    quarantine(file_path, os.path.join(os.path.dirname(dir_path), "quarantine", file_type))
+            self._write_index(index_path, entries)
+        return entries
+    
+    def _index_put(self, dir_path: str, file_type: str, filename: str, data: Dict) -> None:
+        """저장/갱신된 파일의 요약을 인덱스에 반영"""
+        index_path = self._index_path(dir_path, file_type)
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        try:
+            with file_lock(f"{index_path}.lock"):
+                entries = self._read_index(index_path)
+                entries[filename] = self._index_entry(file_type, data)
+                self._write_index(index_path, entries)
+        except Exception as e:
+            # 인덱스는 목록 조회 시 다시 맞춰지므로 실패해도 저장 자체는 유지
+            print(f"인덱스 갱신 오류: {str(e)}")
+    
+    def _index_remove(self, dir_path: str, file_type: str, filename: str) -> None:
+        """삭제된 파일을 인덱스에서 제거"""
+        index_path = self._index_path(dir_path, file_type)
+        if not os.path.exists(index_path):
+            return
+        try:
+            with file_lock(f"{index_path}.lock"):
+                entries = self._read_index(index_path)
+                if entries.pop(filename, None) is not None:
+                    self._write_index(index_path, entries)
+        except Exception as e:
+            print(f"인덱스 갱신 오류: {str(e)}")
+    
+    def rebuild_index(self, profile: Optional[str] = None) -> Dict[str, int]:
+        """
+        프로필의 스캔/보고서 인덱스, 자산 인벤토리, 검색 인덱스, 토폴로지를 처음부터 다시 생성
+        (파일을 직접 수정한 경우 등)
+        
+        Returns:
+            {"scans": 항목 수, "reports": 항목 수, "inventory": 반영한 스캔 수, "search_documents": 문서 수,
+             "topology_hosts": 호스트 수}
+        """
+        current_profile = profile or self.get_current_profile()
+        counts = {}
+        for file_type in ("scans", "reports"):
+            dir_path = os.path.join(self.data_dir, "profiles", current_profile, file_type)
+            os.makedirs(dir_path, exist_ok=True)
+            index_path = self._index_path(dir_path, file_type)
+            if os.path.exists(index_path):
+                os.remove(index_path)
+            counts[file_type] = len(self._sync_index(dir_path, file_type))
+        counts["inventory"] = self.get_inventory(current_profile).rebuild(self.iter_scans(current_profile))
+        counts["search_documents"] = self.get_search_index(current_profile).rebuild(
+            self.iter_scans(current_profile), self.iter_reports(current_profile)
+        )
+        # 토폴로지는 보관된 스캔의 관측도 포함 (요약만 보관된 스캔은 호스트 정보가 없어 건너뜀)
+        counts["topology_hosts"] = self.get_topology(current_profile).rebuild(
+            itertools.chain(self.get_archive(current_profile).iter_documents("scans"), self.iter_scans(current_profile))
+        )
+        return counts
+    
+    def iter_scans(self, profile: Optional[str] = None):
+        """
+        프로필의 모든 스캔을 (scan_id, scan_data) 로 하나씩 읽어서 반환 (시간순)
+        
+        Args:
+            profile: 프로필 (기본값: 현재 프로필)
+        """
+        current_profile = profile or self.get_current_profile()
+        return self._iter_dir(os.path.join(self.data_dir, "profiles", current_profile, "scans"))
+    
+    def iter_reports(self, profile: Optional[str] = None):
+        """
+        프로필의 모든 보고서를 (report_id, report_data) 로 하나씩 읽어서 반환 (시간순)
+        
+        Args:
+            profile: 프로필 (기본값: 현재 프로필)
+        """
+        current_profile = profile or self.get_current_profile()
+        return self._iter_dir(os.path.join(self.data_dir, "profiles", current_profile, "reports"))
+    
+    @staticmethod
+    def _iter_dir(dir_path: str):
+        if not os.path.exists(dir_path):
+            return
+        for filename in sorted(os.listdir(dir_path)):
             if not filename.endswith('.json'):
                 continue
-                
-            file_path = os.path.join(dir_path, filename)
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                file_info = {
-                    "id": filename.split('.')[0],
-                    "filename": filename,
-                    "path": file_path,
-                    "timestamp": data.get("timestamp", "Unknown"),
-                    "target": data.get("target", "Unknown") if file_type == "scans" else None,
-                }
-                
-                if file_type == "reports":
-                    file_info["summary"] = data.get("summary", {})
-                    
-                result.append(file_info)
+                data = json_provider.read_json(os.path.join(dir_path, filename))
             except Exception as e:
                 print(f"파일 {filename} 읽기 오류: {str(e)}")
-                
-        # 시간 역순으로 정렬
-        result.sort(key=lambda x: x["timestamp"], reverse=True)
-        return result
+                continue
+            yield filename.split('.')[0], data
+    
+    # 파생 인덱스(자산 인벤토리, 전문 검색, 토폴로지) 관련 메서드
+    def get_inventory(self, profile: Optional[str] = None) -> AssetInventory:
+        """
+        프로필의 자산 인벤토리 (profiles/<p>/index/inventory.db)
+        
+        Args:
+            profile: 프로필 (기본값: 현재 프로필)
+        """
+        return self._derived_index(AssetInventory, "inventory.db", profile)
+    
+    def get_search_index(self, profile: Optional[str] = None) -> SearchIndex:
+        """
+        프로필의 전문 검색 인덱스 (profiles/<p>/index/search.db)
+        
+        Args:
+            profile: 프로필 (기본값: 현재 프로필)
+        """
+        return self._derived_index(SearchIndex, "search.db", profile)
+    
+    def get_topology(self, profile: Optional[str] = None) -> TopologyCache:
+        """
+        프로필의 토폴로지 캐시 (profiles/<p>/index/topology.json)
+        
+        Args:
+            profile: 프로필 (기본값: 현재 프로필)
+        """
+        return self._derived_index(TopologyCache, "topology.json", profile)
+    
+    def _derived_index(self, index_class, filename: str, profile: Optional[str]):
+        current_profile = profile or self.get_current_profile()
+        key = (filename, current_profile)
+        index = self._derived_indexes.get(key)
+        # 다른 워커가 프로필을 지웠다가 다시 만든 경우 DB 파일부터 다시 생성
+        if index is None or not os.path.exists(index.db_path):
+            index_dir = os.path.join(self.data_dir, "profiles", current_profile, "index")
+            os.makedirs(index_dir, exist_ok=True)
+            index = index_class(os.path.join(index_dir, filename))
+            self._derived_indexes[key] = index
+        return index
+    
+    def _index_scan(self, profile: str, scan_id: str, scan_data: Dict) -> None:
+        """저장/갱신된 스캔을 파생 인덱스에 반영 (실패해도 스캔 저장은 유지)"""
+        try:
+            self.get_inventory(profile).record_scan(scan_id, scan_data)
+        except Exception as e:
+            print(f"자산 인벤토리 갱신 오류: {str(e)}")
+        try:
+            self.get_search_index(profile).record_scan(scan_id, scan_data)
+        except Exception as e:
+            print(f"검색 인덱스 갱신 오류: {str(e)}")
+        try:
+            self.get_topology(profile).record_scan(scan_id, scan_data)
+        except Exception as e:
+            print(f"토폴로지 갱신 오류: {str(e)}")
+    
+    def _unindex_scan(self, profile: str, scan_id: str) -> None:
+        """삭제된 스캔을 파생 인덱스에서 제거"""
+        try:
+            self.get_inventory(profile).remove_scan(scan_id)
+        except Exception as e:
+            print(f"자산 인벤토리 갱신 오류: {str(e)}")
+        try:
+            self.get_search_index(profile).remove("scan", scan_id)
+        except Exception as e:
+            print(f"검색 인덱스 갱신 오류: {str(e)}")
+        try:
+            self.get_topology(profile).remove_scan(scan_id)
+        except Exception as e:
+            print(f"토폴로지 갱신 오류: {str(e)}")
+    
+    def _index_report(self, profile: str, report_id: str, report_data: Dict) -> None:
+        """저장/갱신된 보고서를 검색 인덱스에 반영"""
+        try:
+            self.get_search_index(profile).record_report(report_id, report_data)
+        except Exception as e:
+            print(f"검색 인덱스 갱신 오류: {str(e)}")
+    
+    def _unindex_report(self, profile: str, report_id: str) -> None:
+        """삭제된 보고서를 검색 인덱스에서 제거"""
+        try:
+            self.get_search_index(profile).remove("report", report_id)
+        except Exception as e:
+            print(f"검색 인덱스 갱신 오류: {str(e)}")
     
-    def get_scan_by_id(self, scan_id: str) -> Optional[Dict]:
+    # 보존 정책/보관소 관련 메서드
+    def get_archive(self, profile: Optional[str] = None) -> ArchiveStore:
+        """프로필의 보관소 (profiles/<p>/archive/)"""
+        current_profile = profile or self.get_current_profile()
+        return ArchiveStore(os.path.join(self.data_dir, "profiles", current_profile, "archive"))
+    
+    def get_retention_rules(self, profile: Optional[str] = None) -> Dict:
+        """프로필의 보존 규칙 (profiles/<p>/retention.json, 없으면 비활성화된 기본값)"""
+        current_profile = profile or self.get_current_profile()
+        try:
+            rules = json_provider.read_json(os.path.join(self.data_dir, "profiles", current_profile, "retention.json"))
+        except (OSError, ValueError):
+            rules = {}
+        return validate_rules(rules)
+    
+    def set_retention_rules(self, rules: Dict, profile: Optional[str] = None) -> Dict:
+        """
+        프로필의 보존 규칙 저장 (지정하지 않은 항목은 기존 값 유지)
+        
+        Raises:
+            ValueError: 잘못된 규칙
+        """
+        current_profile = profile or self.get_current_profile()
+        merged = validate_rules({**self.get_retention_rules(current_profile), **rules})
+        write_json(os.path.join(self.data_dir, "profiles", current_profile, "retention.json"), merged)
+        return merged
+    
+    def get_document(self, file_type: str, data_id: str, profile: Optional[str] = None,
+                     include_archived: bool = True) -> Optional[Dict]:
+        """
+        ID로 스캔/보고서 조회 (원본이 없으면 보관소에서 조회)
+        
+        Args:
+            file_type: "scans" 또는 "reports"
+            data_id: 스캔/보고서 ID
+            profile: 조회할 프로필 (기본값: 현재 프로필)
+            include_archived: False 면 원본 파일만 조회
+        """
+        current_profile = profile or self.get_current_profile()
+        dir_path = os.path.join(self.data_dir, "profiles", current_profile, file_type)
+        data = self._get_data_by_id_from_dir(dir_path, data_id)
+        if data is None and include_archived:
+            data = self.get_archive(current_profile).get(file_type, data_id)
+        return data
+    
+    def remove_archived_source(self, file_type: str, data_id: str, profile: str) -> bool:
+        """
+        보관된 문서의 원본 파일과 목록 인덱스 항목 삭제
+        (자산 인벤토리/검색/토폴로지에는 이력으로 남김, 연관 보고서도 삭제하지 않음)
+        """
+        dir_path = os.path.join(self.data_dir, "profiles", profile, file_type)
+        return self._delete_data_by_id_from_dir(dir_path, data_id)
+    
+    def get_scan_by_id(self, scan_id: str, profile: Optional[str] = None) -> Optional[Dict]:
         """
         ID로 스캔 데이터 조회
         
         Args:
             scan_id: 스캔 ID
+            profile: 조회할 프로필 (기본값: 현재 프로필)
             
         Returns:
-            스캔 데이터 또는 None
+            스캔 데이터 또는 None (보관된 스캔 포함)
         """
-        current_profile = self.get_current_profile()
-        profile_scans_dir = os.path.join(self.data_dir, "profiles", current_profile, "scans")
-        return self._get_data_by_id_from_dir(profile_scans_dir, scan_id)
+        return self.get_document("scans", scan_id, profile)
     
-    def get_report_by_id(self, report_id: str) -> Optional[Dict]:
+    def get_report_by_id(self, report_id: str, profile: Optional[str] = None) -> Optional[Dict]:
         """
         ID로 보고서 데이터 조회
         
         Args:
             report_id: 보고서 ID
+            profile: 조회할 프로필 (기본값: 현재 프로필)
             
         Returns:
-            보고서 데이터 또는 None
+            보고서 데이터 또는 None (보관된 보고서 포함)
         """
-        current_profile = self.get_current_profile()
-        profile_reports_dir = os.path.join(self.data_dir, "profiles", current_profile, "reports")
-        return self._get_data_by_id_from_dir(profile_reports_dir, report_id)
+        return self.get_document("reports", report_id, profile)
     
     def _get_data_by_id_from_dir(self, dir_path: str, data_id: str) -> Optional[Dict]:
         """
@@ -433,22 +905,98 @@ class LocalStorage:
         Returns:
             데이터 또는 None
         """
+        file_path = self._find_file_by_id(dir_path, data_id)
+        if file_path is None:
+            return None
+        kind = os.path.basename(dir_path)
+        try:
+            with tracing.span("storage.read", kind=kind), STORAGE_SECONDS.time(op="read", kind=kind):
+                with open(file_path, 'rb') as f:
+                    body = f.read()
+                data = json_provider.loads(body)
+            STORAGE_BYTES.inc(len(body), op="read", kind=kind)
+            return data
+        except Exception as e:
+            print(f"파일 {os.path.basename(file_path)} 읽기 오류: {str(e)}")
+            return None
+    
+    @staticmethod
+    def _find_file_by_id(dir_path: str, data_id: str) -> Optional[str]:
+        """ID 에 해당하는 파일 경로 (<id>.json 을 먼저 확인하고, 없으면 디렉토리 검색)"""
         if not os.path.exists(dir_path):
             os.makedirs(dir_path, exist_ok=True)
             return None
-            
+        
+        file_path = os.path.join(dir_path, f"{data_id}.json")
+        if os.path.isfile(file_path):
+            return file_path
+        
         # 정확한 파일명 검색
         for filename in os.listdir(dir_path):
             if filename.startswith(f"{data_id}.") or filename.split('.')[0] == data_id:
-                file_path = os.path.join(dir_path, filename)
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        return json.load(f)
-                except Exception as e:
-                    print(f"파일 {filename} 읽기 오류: {str(e)}")
-                    return None
+                return os.path.join(dir_path, filename)
         
         return None
+    
+    # HTTP 조건부 요청(ETag)용 경로 조회 (파일을 읽지 않음)
+    def get_scan_path(self, scan_id: str, profile: Optional[str] = None) -> Optional[str]:
+        """스캔 파일 경로 (없으면 None)"""
+        current_profile = profile or self.get_current_profile()
+        return self._find_file_by_id(os.path.join(self.data_dir, "profiles", current_profile, "scans"), scan_id)
+    
+    def get_report_path(self, report_id: str, profile: Optional[str] = None) -> Optional[str]:
+        """보고서 파일 경로 (없으면 None)"""
+        current_profile = profile or self.get_current_profile()
+        return self._find_file_by_id(os.path.join(self.data_dir, "profiles", current_profile, "reports"), report_id)
+    
+    def get_scan_document(self, scan_id: str, profile: Optional[str] = None) -> Optional[str]:
+        """응답 형식으로 저장된 스캔 파일 경로 (이전 형식 파일이거나 없으면 None)"""
+        return self._document_path(self.get_scan_path(scan_id, profile), "scans", scan_id)
+    
+    def get_report_document(self, report_id: str, profile: Optional[str] = None) -> Optional[str]:
+        """응답 형식으로 저장된 보고서 파일 경로 (이전 형식 파일이거나 없으면 None)"""
+        return self._document_path(self.get_report_path(report_id, profile), "reports", report_id)
+    
+    @classmethod
+    def _document_path(cls, file_path: Optional[str], file_type: str, data_id: str) -> Optional[str]:
+        """파일 앞부분만 읽어 ID 가 첫 필드로 저장되어 있는지 확인"""
+        if file_path is None:
+            return None
+        prefix = json_provider.dumps({DOCUMENT_ID_KEYS[file_type]: data_id})[:-1]
+        try:
+            with open(file_path, 'rb') as f:
+                head = f.read(len(prefix) + 1)
+        except OSError:
+            return None
+        return file_path if head in (prefix + b",", prefix + b"}") else None
+    
+    def get_scan_index_entry(self, scan_id: str, profile: Optional[str] = None) -> Dict:
+        """스캔 인덱스 항목 (timestamp, target, summary, vuln_enrichment 등, 없으면 빈 dict)"""
+        current_profile = profile or self.get_current_profile()
+        scans_dir = os.path.join(self.data_dir, "profiles", current_profile, "scans")
+        return self._read_index(self._index_path(scans_dir, "scans")).get(f"{scan_id}.json") or {}
+    
+    def get_report_index_entry(self, report_id: str, profile: Optional[str] = None) -> Dict:
+        """보고서 인덱스 항목 (참조 스캔 ID scan_id, 참조형 여부 details_ref 등, 없으면 빈 dict)"""
+        current_profile = profile or self.get_current_profile()
+        reports_dir = os.path.join(self.data_dir, "profiles", current_profile, "reports")
+        return self._read_index(self._index_path(reports_dir, "reports")).get(f"{report_id}.json") or {}
+    
+    def get_list_paths(self, file_type: str, profile: Optional[str] = None, include_archived: bool = False) -> List[str]:
+        """
+        목록 응답이 의존하는 경로 (scans/reports 디렉토리와 인덱스 파일, 보관소 인덱스)
+        디렉토리 mtime 은 파일 추가/삭제 시, 인덱스 파일은 갱신 시 바뀝니다.
+        """
+        current_profile = profile or self.get_current_profile()
+        dir_path = os.path.join(self.data_dir, "profiles", current_profile, file_type)
+        paths = [dir_path, self._index_path(dir_path, file_type)]
+        if include_archived:
+            paths.append(self.get_archive(current_profile).index_path(file_type))
+        return paths
+    
+    def get_archived_path(self, file_type: str, data_id: str, profile: Optional[str] = None) -> Optional[str]:
+        """보관된 문서가 들어 있는 세그먼트 파일 경로 (보관되지 않았으면 None)"""
+        return self.get_archive(profile).segment_path(file_type, data_id)
         
     def delete_scan_by_id(self, scan_id: str) -> bool:
         """
@@ -469,33 +1017,27 @@ class LocalStorage:
         profile_reports_dir = os.path.join(self.data_dir, "profiles", current_profile, "reports")
         
         if os.path.exists(profile_reports_dir):
-            for filename in os.listdir(profile_reports_dir):
-                if not filename.endswith('.json'):
-                    continue
-                    
-                file_path = os.path.join(profile_reports_dir, filename)
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        report_data = json.load(f)
-                        
-                        # 보고서에 저장된 스캔 ID와 비교 (details에 scan_id가 있는지 확인)
-                        details = report_data.get("details", {})
-                        report_scan_id = details.get("scan_id", "")
-                        
-                        if report_scan_id == scan_id:
-                            reports_to_delete.append(filename.split('.')[0])
-                            print(f"삭제할 스캔 ID {scan_id}와 연관된 보고서 발견: {filename}")
-                except Exception as e:
-                    print(f"보고서 파일 {filename} 읽기 오류: {str(e)}")
+            # 보고서 인덱스에 기록된 스캔 ID(details.scan_id)와 비교 (보고서 파일을 열지 않음)
+            for filename, entry in self._sync_index(profile_reports_dir, "reports").items():
+                if entry.get("scan_id") == scan_id:
+                    reports_to_delete.append(filename.split('.')[0])
+                    print(f"삭제할 스캔 ID {scan_id}와 연관된 보고서 발견: {filename}")
+        for report_id, entry in self.get_archive(current_profile).entries("reports").items():
+            if entry.get("scan_id") == scan_id:
+                reports_to_delete.append(report_id)
+                print(f"삭제할 스캔 ID {scan_id}와 연관된 보관 보고서 발견: {report_id}")
         
         # 2. 연관된 보고서 삭제
         for report_id in reports_to_delete:
             print(f"연관된 보고서 {report_id} 삭제 중...")
             self.delete_report_by_id(report_id)
             
-        # 3. 스캔 데이터 삭제
+        # 3. 스캔 데이터 삭제 (원본이 없으면 보관소 항목 삭제)
         result = self._delete_data_by_id_from_dir(profile_scans_dir, scan_id)
+        if not result:
+            result = self.get_archive(current_profile).remove("scans", scan_id)
         if result:
+            self._unindex_scan(current_profile, scan_id)
             print(f"스캔 ID {scan_id} 삭제 완료")
         else:
             print(f"스캔 ID {scan_id} 삭제 실패 또는 파일 없음")
@@ -514,7 +1056,12 @@ class LocalStorage:
         """
         current_profile = self.get_current_profile()
         profile_reports_dir = os.path.join(self.data_dir, "profiles", current_profile, "reports")
-        return self._delete_data_by_id_from_dir(profile_reports_dir, report_id)
+        result = self._delete_data_by_id_from_dir(profile_reports_dir, report_id)
+        if not result:
+            result = self.get_archive(current_profile).remove("reports", report_id)
+        if result:
+            self._unindex_report(current_profile, report_id)
+        return result
         
     def _delete_data_by_id_from_dir(self, dir_path: str, data_id: str) -> bool:
         """
@@ -537,6 +1084,7 @@ class LocalStorage:
                 try:
                     os.remove(file_path)
                     print(f"파일 {filename} 삭제 완료")
+                    self._index_remove(dir_path, os.path.basename(dir_path), filename)
                     return True
                 except Exception as e:
                     print(f"파일 {filename} 삭제 오류: {str(e)}")
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# timing.py
+# ──────────────────────────────────────────────────────────
+# 적응형 스캔 타이밍/타임아웃 모델
+#  • 호스트 수 × 포트 수, 사용 스크립트(-sV/-sC/취약점 스크립트), 대상별 과거 RTT 로
+#    스캔 비용을 추정해 nmap -T / --min-rate / --max-retries 와
+#    전체 타임아웃을 결정합니다. (고정 90초/120초 대신)
+#  • --host-timeout 은 추가하지 않음: 시간을 넘긴 호스트는 nmap 이 결과를 모두 버리므로
+#    추정이 한 번 빗나가면 느린 호스트가 "결과 없음"이 됨 (실행 시간은 전체 타임아웃이 제한,
+#    필요하면 사용자가 nmap 인자에 직접 지정)
+#  • 대상별 RTT 와 추정치 보정 계수는 스캔이 끝날 때마다 학습 (SharedStateStore "timing")
+#  • 기록이 비어 있으면 저장된 스캔 결과의 rtt_ms 로 한 번 초기화
+# ──────────────────────────────────────────────────────────
+import math
+import os
+import re
+import time
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from async_scanner import parse_ports
+from services import resolve
+
+logger = logging.getLogger(__name__)
+
+# 추정치에 곱할 여유 배수, 타임아웃 하한/상한(초)
+TIMING_SAFETY_FACTOR = float(os.environ.get("TIMING_SAFETY_FACTOR", "2.0"))
+TIMING_MIN_TIMEOUT = int(os.environ.get("TIMING_MIN_TIMEOUT", "60"))
+TIMING_MAX_TIMEOUT = int(os.environ.get("TIMING_MAX_TIMEOUT", "3600"))
+# nmap 한 번에 넘길 최대 호스트 수 (샤드마다 별도 제한 시간)
+SCAN_SHARD_SIZE = int(os.environ.get("SCAN_SHARD_SIZE", "64"))
+# RTT 기록을 유지할 최대 호스트 수
+RTT_HISTORY_LIMIT = 4096
+# 저장된 스캔에서 RTT 기록을 초기화할 때 읽을 최근 스캔 수
+RTT_SEED_SCANS = 50
+# nmap 이 서비스/스크립트 단계를 동시에 처리하는 호스트 수(대략)
+HOST_PARALLELISM = 16
+
+# RTT 구간별 타이밍: (RTT 상한 ms, -T 템플릿, root min-rate, 비-root min-rate, max-retries)
+_TIMING_TIERS = [
+    (50.0, 4, 1000, 300, 2),
+    (200.0, 4, 300, 100, 3),
+    (float("inf"), 3, 100, 50, 4),
+]
+# RTT 기록이 없는 대상 (VPN 너머일 가능성이 높아 보수적으로)
+_UNKNOWN_TIER = (None, 3, 300, 100, 3)
+
+_CALIBRATION_KEY = "_calibration"
+
+
+def count_ports(ports: str) -> int:
+    """nmap 포트 표현식의 포트 수 (해석할 수 없으면 1000)"""
+    try:
+        return len(parse_ports(ports)) or 1000
+    except ValueError:
+        return 1000
+
+
+def script_cost(arguments: str) -> float:
+    """호스트 하나당 서비스/스크립트 단계 예상 시간(초)"""
+    args = arguments.split()
+    script_arg = " ".join(a for a in args if a.startswith("--script"))
+    aggressive = "-A" in args
+    cost = 0.0
+    if aggressive or "-sV" in args or "vulners" in script_arg or "vulscan" in script_arg:
+        cost += 8.0
+    if aggressive or "-sC" in args or "default" in script_arg:
+        cost += 12.0
+    if re.search(r"vuln|vulners|vulscan", script_arg):
+        cost += 20.0
+    if aggressive or "-O" in args:
+        cost += 5.0
+    return cost
+
+
+def apply_plan(arguments: str, plan: Dict[str, Any]) -> str:
+    """사용자가 직접 지정하지 않은 타이밍 옵션만 nmap 인자에 추가 (--host-timeout 은 사용자가 지정한 것만)"""
+    args = arguments.split()
+    if not any(re.match(r"^-T[0-5]$", a) or a == "--timing" for a in args):
+        arguments += f" -T{plan['timing_template']}"
+    if plan.get("min_rate") and "--min-rate" not in args:
+        arguments += f" --min-rate {plan['min_rate']}"
+    if "--max-retries" not in args:
+        arguments += f" --max-retries {plan['max_retries']}"
+    return arguments
+
+
+class TimingModel:
+    """
+    스캔 비용 추정 및 타이밍 결정
+
+    사용 예:
+        model = get_timing_model()
+        plan = model.plan(["10.0.0.5"], ports="1-1000", arguments="-sV")
+        # {"timing_template": 4, "min_rate": 300, "max_retries": 2, "timeout": 95, ...}
+    """
+
+    def __init__(self, shared_state=None, storage=None):
+        """
+        Args:
+            shared_state: SharedStateStore (있으면 RTT 기록을 워커 간 공유)
+            storage: LocalStorage (또는 LazyService) - 저장된 스캔으로 RTT 기록 초기화
+        """
+        self.shared_state = shared_state
+        self.storage = storage
+        self._history: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._seeded = False
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def host_rtt(self, hosts: Iterable[str]) -> Optional[float]:
+        """대상들의 과거 RTT 중 최댓값(ms). 기록이 없으면 None"""
+        history = self._load_history()
+        known = [history[h]["srtt_ms"] for h in hosts if isinstance(history.get(h), dict)]
+        return max(known) if known else None
+
+    def plan(
+        self,
+        hosts: List[str],
+        ports: str,
+        arguments: str,
+        privileged: bool = False,
+        host_count: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        스캔 타이밍 계획 수립
+
+        Args:
+            hosts: 대상 호스트 목록 (RTT 기록 조회용)
+            ports: nmap 포트 표현식
+            arguments: nmap 인자 (스크립트 비용 추정용)
+            privileged: raw 스캔 가능 여부 (min-rate 결정)
+            host_count: 호스트 목록을 전개할 수 없을 때 추정 호스트 수
+
+        Returns:
+            {"timing_template", "min_rate", "max_retries", "host_timeout", "timeout",
+             "estimated", "rtt_ms", "hosts", "ports", "shard_size"}
+        """
+        n_hosts = max(1, host_count or len(hosts))
+        n_ports = count_ports(ports)
+        rtt = self.host_rtt(hosts)
+
+        tier = _UNKNOWN_TIER if rtt is None else next(t for t in _TIMING_TIERS if rtt < t[0])
+        _, template, root_rate, user_rate, retries = tier
+        rate = root_rate if privileged else user_rate
+
+        rtt_s = (rtt if rtt is not None else 200.0) / 1000.0
+        per_host_scripts = script_cost(arguments)
+
+        port_phase = n_hosts * n_ports / rate + rtt_s * (retries + 1)
+        service_phase = math.ceil(n_hosts / HOST_PARALLELISM) * per_host_scripts
+        estimated = (port_phase + service_phase) * self._calibration()
+
+        timeout = self._clamp(estimated * TIMING_SAFETY_FACTOR + 30)
+
+        return {
+            "timing_template": template,
+            "min_rate": rate,
+            "max_retries": retries,
+            # 호스트별 제한은 두지 않음 (모듈 설명 참고)
+            "host_timeout": None,
+            "timeout": timeout,
+            "estimated": round(estimated, 1),
+            "rtt_ms": rtt,
+            "hosts": n_hosts,
+            "ports": n_ports,
+            "shard_size": SCAN_SHARD_SIZE,
+        }
+
+    def vuln_timeout(self, hosts: List[str], open_ports: int, arguments: str) -> int:
+        """취약점 스크립트 추가 스캔의 타임아웃(초)"""
+        rtt_s = (self.host_rtt(hosts) or 200.0) / 1000.0
+        per_port = script_cost(arguments) / 2 + rtt_s * 4
+        estimated = math.ceil(max(1, len(hosts)) / HOST_PARALLELISM) * max(1, open_ports) * per_port
+        return self._clamp(estimated * self._calibration() * TIMING_SAFETY_FACTOR + 30)
+
+    def record(self, rtts: Dict[str, float], estimated: Optional[float] = None,
+               elapsed: Optional[float] = None) -> None:
+        """
+        스캔 결과 학습: 호스트별 RTT(ms)와 추정 대비 실제 소요 시간 비율
+
+        Args:
+            rtts: {host: rtt_ms}
+            estimated: 계획 단계의 추정 시간(초)
+            elapsed: 실제 소요 시간(초, 타임아웃으로 끊긴 스캔은 넘기지 않음)
+        """
+        rtts = {h: float(r) for h, r in rtts.items() if r is not None and r >= 0}
+        ratio = None
+        if estimated and elapsed and estimated > 1:
+            ratio = min(4.0, max(0.25, elapsed / estimated))
+        if not rtts and ratio is None:
+            return
+
+        now = time.time()
+
+        def _apply(state: Dict[str, Any]) -> None:
+            for host, rtt in rtts.items():
+                entry = state.get(host)
+                if isinstance(entry, dict):
+                    entry["srtt_ms"] = round(0.75 * entry["srtt_ms"] + 0.25 * rtt, 3)
+                    entry["samples"] = entry.get("samples", 0) + 1
+                    entry["updated_at"] = now
+                else:
+                    state[host] = {"srtt_ms": round(rtt, 3), "samples": 1, "updated_at": now}
+            if ratio is not None:
+                previous = state.get(_CALIBRATION_KEY, 1.0)
+                state[_CALIBRATION_KEY] = round(0.8 * previous + 0.2 * ratio, 4)
+            self._prune(state)
+
+        with self._lock:
+            if self.shared_state:
+                try:
+                    self._history = self.shared_state.update("timing", _apply)
+                    return
+                except Exception as e:
+                    logger.warning(f"타이밍 기록 저장 오류: {e}")
+            _apply(self._history)
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _clamp(seconds: float) -> int:
+        return int(min(TIMING_MAX_TIMEOUT, max(TIMING_MIN_TIMEOUT, seconds)))
+
+    def _calibration(self) -> float:
+        value = self._load_history().get(_CALIBRATION_KEY, 1.0)
+        return value if isinstance(value, (int, float)) else 1.0
+
+    def _load_history(self) -> Dict[str, Any]:
+        if self.shared_state:
+            try:
+                self._history = self.shared_state.read("timing")
+            except Exception as e:
+                logger.warning(f"타이밍 기록 읽기 오류: {e}")
+        if not self._history and not self._seeded:
+            self._seed_from_storage()
+        return self._history
+
+    def _seed_from_storage(self) -> None:
+        """RTT 기록이 없을 때 저장된 최근 스캔의 호스트별 rtt_ms 로 초기화"""
+        self._seeded = True
+        if self.storage is None:
+            return
+        rtts: Dict[str, float] = {}
+        try:
+            storage = resolve(self.storage)
+            for info in storage.get_scan_list()[:RTT_SEED_SCANS]:
+                scan = storage.get_scan_by_id(info["id"]) or {}
+                for host in scan.get("hosts", []):
+                    if host.get("rtt_ms") is not None and host.get("host") not in rtts:
+                        rtts[host["host"]] = host["rtt_ms"]
+        except Exception as e:
+            logger.warning(f"저장된 스캔에서 RTT 기록 초기화 실패: {e}")
+            return
+        if rtts:
+            logger.info(f"저장된 스캔에서 {len(rtts)}개 호스트의 RTT 기록을 불러왔습니다.")
+            self.record(rtts)
+
+    @staticmethod
+    def _prune(state: Dict[str, Any]) -> None:
+        hosts = [(k, v) for k, v in state.items() if isinstance(v, dict)]
+        if len(hosts) <= RTT_HISTORY_LIMIT:
+            return
+        hosts.sort(key=lambda kv: kv[1].get("updated_at", 0))
+        for host, _ in hosts[:len(hosts) - RTT_HISTORY_LIMIT]:
+            state.pop(host, None)
+
+
+# 프로세스 전역 기본 타이밍 모델 (app.py 에서 공유 상태 저장소와 함께 설정)
+_default_timing_model: Optional[TimingModel] = None
+
+
+def get_timing_model() -> TimingModel:
+    global _default_timing_model
+    if _default_timing_model is None:
+        _default_timing_model = TimingModel()
+    return _default_timing_model
+
+
+def set_default_timing_model(model: TimingModel) -> None:
+    global _default_timing_model
+    _default_timing_model = model
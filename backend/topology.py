@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+# topology.py
+# ──────────────────────────────────────────────────────────
+# 프로필별 네트워크 토폴로지 (GET /api/topology)
+#  • 스캔이 저장될 때마다 호스트별 최신 관측(상태, 열린 포트, 서비스, 취약점 수,
+#    traceroute 경로)을 profiles/<p>/index/topology.json 에 증분 반영
+#      이전 관측도 호스트마다 TOPOLOGY_HOST_HISTORY 개까지 보관 → 스캔을 삭제하면 스캔 파일을
+#      다시 읽지 않고 이전 관측으로 되돌림 (보관소로 옮겨진 스캔의 관측도 그대로 유지)
+#  • 요청 시 캐시된 호스트 목록 + VPN 연결 정보(게이트웨이/라우트)로 노드/엣지 생성
+#    → 프론트가 스캔 문서 전체를 내려받아 그래프를 만들 필요가 없음
+#  • 큰 네트워크용 LOD: 서브넷 단위 묶기, 최대 노드 수 초과분 서브넷으로 접기,
+#    traceroute 중간 라우터 생략
+# 노드/엣지 형식은 front/src/types 의 TopologyNode / TopologyEdge 와 동일합니다.
+# ──────────────────────────────────────────────────────────
+import datetime
+import ipaddress
+import json
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from report_builder import stored_scan_summary
+from shared_state import file_lock
+
+logger = logging.getLogger(__name__)
+
+# 캐시 파일 형식 버전 (다르면 다시 생성)
+TOPOLOGY_VERSION = 1
+
+# 중앙(스캐너) 노드와 VPN 게이트웨이 노드 ID (프론트 기본 토폴로지와 동일한 main-host)
+ROOT_NODE_ID = "main-host"
+GATEWAY_NODE_ID = "vpn-gateway"
+
+# 호스트 노드에 함께 보낼 서비스 이름 최대 개수
+MAX_NODE_SERVICES = 10
+
+# 호스트마다 보관할 이전 관측 수 (최신 관측 제외)
+TOPOLOGY_HOST_HISTORY = int(os.environ.get("TOPOLOGY_HOST_HISTORY", "5"))
+
+# LOD 기본값
+DEFAULT_SUBNET_PREFIX = 24
+DEFAULT_MAX_NODES = 500
+
+
+def _host_entry(scan_id: str, scan_data: Dict[str, Any], host: Dict[str, Any]) -> Dict[str, Any]:
+    """스캔의 호스트 블록 → 캐시 항목"""
+    open_ports = [p for p in host.get("ports", []) or [] if p.get("state") == "open"]
+    summary = stored_scan_summary({"hosts": [host]})
+    address = host.get("host", "")
+    return {
+        "ip": address,
+        "state": host.get("state", "unknown"),
+        "os": (host.get("os") or {}).get("name"),
+        "scan_id": scan_id,
+        "timestamp": scan_data.get("timestamp", ""),
+        "target": scan_data.get("target"),
+        "open_ports": len(open_ports),
+        "services": sorted({p["service"] for p in open_ports if p.get("service")})[:MAX_NODE_SERVICES],
+        "vulnerabilities_count": summary["total_vulnerabilities"],
+        "high_risk_count": summary["severity_counts"]["critical"] + summary["severity_counts"]["high"],
+        "max_cvss": summary["max_cvss"],
+        "risk_level": summary["risk_level"],
+        # 마지막 홉은 호스트 자신이므로 중간 라우터만 저장
+        "trace": [hop["ip"] for hop in host.get("trace", []) or [] if hop.get("ip") and hop["ip"] != address],
+    }
+
+
+def _subnet(ip: str, prefix: int) -> str:
+    try:
+        return str(ipaddress.ip_network(f"{ip}/{prefix}", strict=False))
+    except ValueError:
+        return ip
+
+
+def _vpn_networks(connection_info: Dict[str, Any]) -> List[ipaddress._BaseNetwork]:
+    """'ip route show dev tun0' 라우트 목록에서 VPN 으로 가는 네트워크 추출"""
+    networks = []
+    for route in connection_info.get("routes", []) or []:
+        try:
+            networks.append(ipaddress.ip_network(route.split()[0], strict=False))
+        except (ValueError, IndexError):
+            continue
+    return networks
+
+
+def _compact(node: Dict[str, Any]) -> Dict[str, Any]:
+    """값이 없는 필드 제거 (payload 축소)"""
+    return {k: v for k, v in node.items() if v not in (None, "", [], {})}
+
+
+class TopologyCache:
+    """
+    프로필별 토폴로지 캐시
+
+    사용 예:
+        topology = storage.get_topology()
+        topology.graph(vpn_status["connection_info"], detail="subnet")
+    """
+
+    def __init__(self, db_path: str):
+        # LocalStorage 파생 인덱스 공통 속성명 (캐시 JSON 파일 경로)
+        self.db_path = db_path
+        self._loaded: Optional[Tuple[int, Dict[str, Any]]] = None
+        if not os.path.exists(db_path):
+            with file_lock(f"{db_path}.lock"):
+                if not os.path.exists(db_path):
+                    self._write(self._empty())
+
+    # ------------------------------------------------------------------
+    # 캐시 파일
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _empty() -> Dict[str, Any]:
+        # hosts: IP → 최신 관측, history: IP → 이전 관측 목록 (최신순)
+        return {"version": TOPOLOGY_VERSION, "generation": 0, "updated_at": None, "hosts": {}, "history": {}}
+
+    def _read(self) -> Dict[str, Any]:
+        """캐시 읽기 (파일이 바뀌지 않았으면 메모리에 있는 내용 재사용)"""
+        try:
+            mtime = os.stat(self.db_path).st_mtime_ns
+            if self._loaded and self._loaded[0] == mtime:
+                return self._loaded[1]
+            with open(self.db_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self._empty()
+        if data.get("version") != TOPOLOGY_VERSION:
+            return self._empty()
+        self._loaded = (mtime, data)
+        return data
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        """임시 파일에 쓴 뒤 교체 (읽는 쪽이 반쯤 쓰인 파일을 보지 않도록)"""
+        data["generation"] = data.get("generation", 0) + 1
+        data["updated_at"] = datetime.datetime.now().isoformat()
+        tmp_path = f"{self.db_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.db_path)
+
+    # ------------------------------------------------------------------
+    # 갱신
+    # ------------------------------------------------------------------
+
+    def record_scan(self, scan_id: str, scan_data: Dict[str, Any]) -> int:
+        """스캔의 호스트를 반영 (이미 더 최근 관측이 있는 호스트는 그대로). 갱신한 호스트 수 반환"""
+        with file_lock(f"{self.db_path}.lock"):
+            data = self._read()
+            hosts, history = dict(data["hosts"]), dict(data.get("history", {}))
+            changed = self._merge(hosts, history, scan_id, scan_data)
+            if changed:
+                self._write({**data, "hosts": hosts, "history": history})
+            return changed
+
+    def remove_scan(self, scan_id: str) -> int:
+        """
+        삭제된 스캔 반영. 이 스캔이 최신 관측인 호스트는 보관된 이전 관측으로 되돌리고,
+        남은 관측이 없으면 호스트를 제거합니다. 바뀐 호스트 수 반환
+        """
+        with file_lock(f"{self.db_path}.lock"):
+            data = self._read()
+            hosts, history = dict(data["hosts"]), dict(data.get("history", {}))
+            changed = 0
+            for address in list(hosts):
+                observations = [hosts[address]] + history.get(address, [])
+                remaining = [o for o in observations if o["scan_id"] != scan_id]
+                if len(remaining) == len(observations):
+                    continue
+                changed += 1
+                if remaining:
+                    hosts[address], history[address] = remaining[0], remaining[1:]
+                else:
+                    del hosts[address]
+                    history.pop(address, None)
+            if changed:
+                self._write({**data, "hosts": hosts, "history": history})
+            return changed
+
+    def rebuild(self, scans: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """전체 재구성 (보관된 스캔도 함께 넘겨야 보관소에만 있는 호스트가 유지됨). 호스트 수 반환"""
+        hosts: Dict[str, Dict[str, Any]] = {}
+        history: Dict[str, List[Dict[str, Any]]] = {}
+        for scan_id, scan_data in scans:
+            self._merge(hosts, history, scan_id, scan_data)
+        with file_lock(f"{self.db_path}.lock"):
+            data = self._read()
+            self._write({**data, "hosts": hosts, "history": history})
+        return len(hosts)
+
+    @staticmethod
+    def _merge(hosts: Dict[str, Dict[str, Any]], history: Dict[str, List[Dict[str, Any]]],
+               scan_id: str, scan_data: Dict[str, Any]) -> int:
+        changed = 0
+        for host in scan_data.get("hosts", []) or []:
+            address = host.get("host")
+            if not address:
+                continue
+            entry = _host_entry(scan_id, scan_data, host)
+            observations = [hosts[address]] + history.get(address, []) if address in hosts else []
+            # 같은 스캔의 이전 관측(갱신 전 내용)은 교체
+            observations = [o for o in observations if o["scan_id"] != scan_id]
+            # 이번 스캔에 traceroute 가 없으면 더 이전에 관측한 경로 유지
+            if not entry["trace"]:
+                entry["trace"] = next((o["trace"] for o in observations
+                                       if o["timestamp"] <= entry["timestamp"] and o.get("trace")), [])
+            observations.append(entry)
+            observations.sort(key=lambda o: o["timestamp"], reverse=True)
+            kept = observations[:TOPOLOGY_HOST_HISTORY + 1]
+            if not any(o is entry for o in kept):
+                continue
+            hosts[address], history[address] = kept[0], kept[1:]
+            changed += 1
+        return changed
+
+    # ------------------------------------------------------------------
+    # 그래프
+    # ------------------------------------------------------------------
+
+    def graph(
+        self,
+        connection_info: Optional[Dict[str, Any]] = None,
+        detail: str = "host",
+        max_nodes: int = DEFAULT_MAX_NODES,
+        subnet_prefix: int = DEFAULT_SUBNET_PREFIX,
+        include_routers: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        토폴로지 그래프 생성
+
+        Args:
+            connection_info: VPN 연결 정보 (VPNManager._get_connection_info 형식, 연결 안 됨이면 None)
+            detail: "host" (호스트별 노드) 또는 "subnet" (서브넷별 노드)
+            max_nodes: host 모드에서 호스트 노드 최대 수 (초과분은 위험도 낮은 순으로 서브넷 노드로 접음)
+            subnet_prefix: 서브넷 묶음 크기 (기본 /24)
+            include_routers: traceroute 중간 라우터 노드 포함 여부
+
+        Returns:
+            {"generation", "updated_at", "detail", "nodes": [TopologyNode], "edges": [TopologyEdge],
+             "stats": {"hosts", "host_nodes", "subnet_nodes", "router_nodes"}}
+        """
+        data = self._read()
+        builder = _GraphBuilder(connection_info or {}, include_routers)
+
+        entries = sorted(
+            data["hosts"].values(),
+            key=lambda e: (e["max_cvss"] or 0, e["vulnerabilities_count"], e["open_ports"]),
+            reverse=True,
+        )
+        if detail == "subnet":
+            expanded, collapsed = [], entries
+        else:
+            expanded, collapsed = entries[:max_nodes], entries[max_nodes:]
+
+        for entry in expanded:
+            builder.add_host(entry)
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in collapsed:
+            groups.setdefault(_subnet(entry["ip"], subnet_prefix), []).append(entry)
+        for subnet, members in groups.items():
+            builder.add_subnet(subnet, members)
+
+        return {
+            "generation": data["generation"],
+            "updated_at": data["updated_at"],
+            "detail": detail,
+            "nodes": list(builder.nodes.values()),
+            "edges": list(builder.edges.values()),
+            "stats": {
+                "hosts": len(entries),
+                "host_nodes": len(expanded),
+                "subnet_nodes": len(groups),
+                "router_nodes": builder.router_count,
+            },
+        }
+
+
+class _GraphBuilder:
+    """노드/엣지 누적 (ID 기준 중복 제거)"""
+
+    def __init__(self, connection_info: Dict[str, Any], include_routers: bool):
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.edges: Dict[str, Dict[str, Any]] = {}
+        self.include_routers = include_routers
+        self.router_count = 0
+
+        self.nodes[ROOT_NODE_ID] = _compact({
+            "id": ROOT_NODE_ID,
+            "label": "Host",
+            "type": "host",
+            "state": "up",
+            "ip_address": connection_info.get("local_ip"),
+            "description": "Host 노드",
+            "custom_data": {"role": "central"},
+        })
+
+        self.gateway = connection_info.get("gateway") or None
+        self.vpn_networks = _vpn_networks(connection_info)
+        if self.gateway:
+            self.nodes[GATEWAY_NODE_ID] = {
+                "id": GATEWAY_NODE_ID,
+                "label": f"VPN {self.gateway}",
+                "type": "custom",
+                "state": "up",
+                "ip_address": self.gateway,
+                "description": "VPN 게이트웨이",
+                "custom_data": _compact({"role": "gateway", "routes": connection_info.get("routes")}),
+            }
+            self._edge(ROOT_NODE_ID, GATEWAY_NODE_ID, "VPN")
+
+    def _edge(self, source: str, target: str, label: Optional[str] = None) -> None:
+        edge_id = f"{source}->{target}"
+        if edge_id not in self.edges:
+            self.edges[edge_id] = _compact({"id": edge_id, "source": source, "target": target, "label": label})
+
+    def _uplink(self, ip: str) -> str:
+        """호스트가 연결될 첫 노드 (VPN 라우트에 속하면 게이트웨이, 아니면 중앙 노드)"""
+        if not self.gateway:
+            return ROOT_NODE_ID
+        if not self.vpn_networks:
+            return GATEWAY_NODE_ID
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return ROOT_NODE_ID
+        return GATEWAY_NODE_ID if any(address in net for net in self.vpn_networks) else ROOT_NODE_ID
+
+    def _path(self, entry: Dict[str, Any]) -> str:
+        """traceroute 경로를 따라 라우터 노드를 추가하고 마지막 노드 ID 반환"""
+        parent = self._uplink(entry["ip"])
+        if not self.include_routers:
+            return parent
+        for hop in entry.get("trace", []):
+            if hop == self.gateway:
+                parent = GATEWAY_NODE_ID
+                continue
+            node_id = f"router-{hop}"
+            if node_id not in self.nodes:
+                self.nodes[node_id] = {
+                    "id": node_id,
+                    "label": hop,
+                    "type": "custom",
+                    "state": "up",
+                    "ip_address": hop,
+                    "custom_data": {"role": "router"},
+                }
+                self.router_count += 1
+            self._edge(parent, node_id)
+            parent = node_id
+        return parent
+
+    def add_host(self, entry: Dict[str, Any]) -> None:
+        node_id = f"host-{entry['ip']}"
+        self.nodes[node_id] = _compact({
+            "id": node_id,
+            "label": entry["ip"],
+            "type": "host",
+            "state": entry["state"],
+            "scan_id": entry["scan_id"],
+            "timestamp": entry["timestamp"],
+            "target": entry["target"],
+            "risk_level": entry["risk_level"],
+            "vulnerabilities_count": entry["vulnerabilities_count"],
+            "high_risk_count": entry["high_risk_count"],
+            "ip_address": entry["ip"],
+            "description": entry["os"],
+            "custom_data": _compact({
+                "role": "node",
+                "open_ports": entry["open_ports"],
+                "services": entry["services"],
+                "max_cvss": entry["max_cvss"],
+            }),
+        })
+        self._edge(self._path(entry), node_id)
+
+    def add_subnet(self, subnet: str, members: List[Dict[str, Any]]) -> None:
+        node_id = f"subnet-{subnet}"
+        scores = [m["max_cvss"] for m in members if m["max_cvss"] is not None]
+        self.nodes[node_id] = _compact({
+            "id": node_id,
+            "label": f"{subnet} ({len(members)})",
+            "type": "custom",
+            "state": "up" if any(m["state"] == "up" for m in members) else "down",
+            "vulnerabilities_count": sum(m["vulnerabilities_count"] for m in members),
+            "high_risk_count": sum(m["high_risk_count"] for m in members),
+            "description": f"호스트 {len(members)}개",
+            "custom_data": _compact({
+                "role": "subnet",
+                "hosts": len(members),
+                "open_ports": sum(m["open_ports"] for m in members),
+                "max_cvss": max(scores) if scores else None,
+            }),
+        })
+        # 같은 서브넷 호스트는 대부분 경로가 같으므로 가장 위험한 호스트의 경로를 사용
+        self._edge(self._path(members[0]), node_id)
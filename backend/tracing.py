@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# tracing.py
+# ──────────────────────────────────────────────────────────
+# 스캔 수명 주기 트레이싱 (수집기 없이 로컬 파일)
+#  • start_trace(): 스캔 하나의 루트 스팬 (POST /api/scan, 배치/예약 스캔 작업)
+#    span(): 그 안의 단계 스팬 (VPN 상태 확인, 호스트 탐색, nmap 실행, 파싱, 저장 ...)
+#      현재 트레이스는 contextvars 로 전달 → 트레이스 밖에서 호출한 span() 은 아무것도 하지 않음
+#  • 트레이스가 끝나면 OTLP JSON 형식(resourceSpans) 한 줄로 TRACE_FILE 에 추가
+#      OpenTelemetry Collector 의 otlpjsonfile 수신기 등으로 그대로 읽을 수 있음
+#      TRACE_FILE_MAX_BYTES 를 넘으면 .1 로 교체 (이전 파일 하나만 유지)
+#  • LocalStorage.save_scan_result 가 저장 시점까지 끝난 스팬을 스캔의 "timing" 블록으로 함께 저장
+#      (문서 쓰기/인덱스 갱신 스팬은 저장 이후에 끝나므로 트레이스 파일에만 기록)
+# ──────────────────────────────────────────────────────────
+import contextvars
+import os
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import json_provider
+from shared_state import file_lock
+
+logger = logging.getLogger(__name__)
+
+# 트레이싱 사용 여부 (TRACING=0 이면 스팬을 만들지 않고 timing 블록도 저장하지 않음)
+TRACING_ENABLED = os.environ.get("TRACING", "1") != "0"
+TRACE_FILE = os.environ.get(
+    "TRACE_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "traces", "scans.jsonl")
+)
+TRACE_FILE_MAX_BYTES = int(os.environ.get("TRACE_FILE_MAX_BYTES", str(50 * 1024 * 1024)))
+SERVICE_NAME = "portsookhee"
+
+_write_lock = threading.Lock()
+
+
+class Span:
+    """진행 중이거나 끝난 스팬 하나"""
+
+    __slots__ = ("trace", "name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: "_Trace", name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = {k: v for k, v in attributes.items() if v is not None}
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        """예외 없이 실패로 끝난 단계 표시 (예: 스캔 결과의 error)"""
+        self.error = message
+
+    def _finish(self) -> None:
+        self.end_ns = time.time_ns()
+        self.trace.spans.append(self)
+
+    def to_timing(self) -> Dict[str, Any]:
+        """스캔 timing 블록 항목 (루트 시작 기준 ms)"""
+        entry = {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ms": round((self.start_ns - self.trace.start_ns) / 1e6, 3),
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+        }
+        if self.attributes:
+            entry["attributes"] = self.attributes
+        if self.error:
+            entry["error"] = self.error
+        return entry
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _Trace:
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.start_ns = time.time_ns()
+        self.spans: List[Span] = []
+
+
+_current_trace: contextvars.ContextVar[Optional[_Trace]] = contextvars.ContextVar("trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("span", default=None)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()]
+
+
+@contextmanager
+def _run_span(trace: _Trace, name: str, attributes: Dict[str, Any]) -> Iterator[Span]:
+    parent = _current_span.get()
+    current = Span(trace, name, parent.span_id if parent else None, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set_error(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _current_span.reset(token)
+        current._finish()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    현재 트레이스 안의 단계 스팬 (트레이스 밖이면 None 을 넘기고 아무것도 기록하지 않음)
+
+    예:
+        with tracing.span("nmap.scan", hosts=3) as s:
+            ...
+            if s: s.set_attribute("open_ports", n)
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    with _run_span(trace, name, attributes) as current:
+        yield current
+
+
+@contextmanager
+def start_trace(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    새 트레이스의 루트 스팬 (이미 트레이스 안이면 일반 스팬으로 동작)
+    끝나면 트레이스 전체를 TRACE_FILE 에 기록합니다.
+    """
+    if not TRACING_ENABLED:
+        yield None
+        return
+    if _current_trace.get() is not None:
+        with span(name, **attributes) as current:
+            yield current
+        return
+
+    trace = _Trace()
+    trace_token = _current_trace.set(trace)
+    try:
+        with _run_span(trace, name, attributes) as root:
+            yield root
+    finally:
+        _current_trace.reset(trace_token)
+        _export(trace)
+
+
+def current_trace_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.trace_id if trace else None
+
+
+def timing_block() -> Optional[Dict[str, Any]]:
+    """
+    현재 트레이스에서 지금까지 끝난 스팬 (스캔 문서의 "timing" 블록, 트레이스 밖이면 None)
+
+    Returns:
+        {"trace_id", "started_at", "elapsed_ms", "spans": [{"name", "span_id", "parent_id",
+         "start_ms", "duration_ms", "attributes", "error"}]}
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return None
+    finished = sorted(list(trace.spans), key=lambda s: s.start_ns)
+    return {
+        "trace_id": trace.trace_id,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(trace.start_ns / 1e9)),
+        "elapsed_ms": round((time.time_ns() - trace.start_ns) / 1e6, 3),
+        "spans": [s.to_timing() for s in finished],
+    }
+
+
+def _export(trace: _Trace) -> None:
+    """트레이스를 OTLP JSON(ExportTraceServiceRequest) 한 줄로 추가 (실패해도 스캔에는 영향 없음)"""
+    record = {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME, "process.pid": os.getpid()})},
+            "scopeSpans": [{
+                "scope": {"name": "portsookhee.tracing"},
+                "spans": [s.to_otlp() for s in sorted(trace.spans, key=lambda s: s.start_ns)],
+            }],
+        }],
+    }
+    line = json_provider.dumps(record) + b"\n"
+    try:
+        os.makedirs(os.path.dirname(TRACE_FILE), exist_ok=True)
+        with _write_lock:
+            _rotate_if_needed()
+            # O_APPEND 한 번의 write → 여러 워커가 같은 파일에 써도 줄이 섞이지 않음
+            fd = os.open(TRACE_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+    except OSError as e:
+        logger.warning(f"트레이스 기록 오류: {e}")
+
+
+def _rotate_if_needed() -> None:
+    try:
+        if os.path.getsize(TRACE_FILE) < TRACE_FILE_MAX_BYTES:
+            return
+    except OSError:
+        return
+    with file_lock(TRACE_FILE + ".lock"):
+        # 다른 워커가 먼저 교체했으면 건너뜀
+        try:
+            if os.path.getsize(TRACE_FILE) < TRACE_FILE_MAX_BYTES:
+                return
+        except OSError:
+            return
+        os.replace(TRACE_FILE, TRACE_FILE + ".1")
@@ -2,7 +2,9 @@
 # vpn_manager.py
 # ──────────────────────────────────────────────────────────
 import os
+import random
 import subprocess
+import threading
 import time
 from typing import Dict, List, Optional, Any, Tuple
 import logging
@@ -12,6 +14,10 @@ import signal
 import json
 import traceback
 import re
+import uuid
+
+from metrics import VPN_CONNECT_SECONDS, VPN_STATE_TRANSITIONS
+from shared_state import SharedStateStore, pid_alive
 
 # --------- 로깅 설정 ----------
 logging.basicConfig(
@@ -21,6 +27,22 @@ logging.basicConfig(
 logger = logging.getLogger("vpn_manager")
 # --------------------------------
 
+# --------- 터널 헬스 키퍼 설정 ----------
+# 연결 상태 점검 주기(초)
+HEALTH_CHECK_INTERVAL = float(os.environ.get("VPN_HEALTH_INTERVAL", "5"))
+# 재연결 지수 백오프: 첫 대기 시간과 최대 대기 시간(초)
+RECONNECT_BASE_DELAY = float(os.environ.get("VPN_RECONNECT_BASE_DELAY", "1"))
+RECONNECT_MAX_DELAY = float(os.environ.get("VPN_RECONNECT_MAX_DELAY", "60"))
+# 최대 재연결 시도 횟수 (0 = 무제한)
+RECONNECT_MAX_ATTEMPTS = int(os.environ.get("VPN_RECONNECT_MAX_ATTEMPTS", "0"))
+# OpenVPN 자체 재시작(SIGUSR1 soft restart)을 기다려 주는 시간(초)
+SOFT_RESTART_GRACE = float(os.environ.get("VPN_SOFT_RESTART_GRACE", "20"))
+
+# OpenVPN 이 터널을 재시작할 때 남기는 로그 패턴
+SOFT_RESTART_MARKERS = ("SIGUSR1[soft", "Restart pause", "Inactivity timeout")
+INIT_COMPLETED_MARKER = "Initialization Sequence Completed"
+# ----------------------------------------
+
 
 class VPNManager:
     """
@@ -28,15 +50,42 @@ class VPNManager:
     """
 
     def __init__(
-        self, config_dir: str, storage_manager=None, log_path: str = "openvpn.log"
+        self,
+        config_dir: str,
+        storage_manager=None,
+        log_path: str = "openvpn.log",
+        shared_state: Optional[SharedStateStore] = None,
     ):
         """초기화"""
         self.base_config_dir = config_dir
         self.storage_manager = storage_manager  # 스토리지 매니저 참조
+        # 여러 워커가 VPN 세션을 함께 보기 위한 공유 상태 저장소 (gunicorn 배포 시)
+        self.shared_state = shared_state
         self.session: Dict[str, Any] = {}
         self._reset_session()
         self.log_path = log_path
 
+        # 헬스 키퍼(자동 재연결) 상태
+        # _desired: 사용자가 유지하길 원하는 연결 (설정 이름 + 파싱된 실행 명령어/인증 파일)
+        self._desired: Optional[Dict[str, Any]] = None
+        self._connect_lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self._tunnel_ready = threading.Event()
+        self._keeper_wakeup = threading.Event()
+        self._keeper_stop = threading.Event()
+        self._keeper_thread: Optional[threading.Thread] = None
+        self._lost_at: Optional[float] = None
+        self._soft_restart_at: Optional[float] = None
+        self.reconnect_stats: Dict[str, Any] = {
+            "losses": 0,
+            "attempts": 0,
+            "successes": 0,
+            "failures": 0,
+            "last_loss_reason": None,
+            "last_loss_at": None,
+            "latencies": [],  # 최근 재연결 소요 시간(초)
+        }
+
         # Windows 용 OpenVPN 기본 경로 후보
         self.openvpn_paths = [
             r"C:\Program Files\OpenVPN\bin\openvpn.exe",
@@ -46,7 +95,11 @@ class VPNManager:
 
         # 서버 시작 시, 이전 세션의 잔여 OpenVPN 프로세스가 있을 수 있으므로 정리합니다.
         # 이는 서버 재시작 후 연결 시 발생할 수 있는 충돌을 방지합니다.
-        self._cleanup_stale_processes()
+        # 단, 다른 워커가 소유한 살아있는 연결은 건드리지 않습니다.
+        if self._shared_owner_alive():
+            logger.info("다른 워커가 VPN 연결을 관리 중이므로 잔여 프로세스 정리를 건너뜁니다.")
+        else:
+            self._cleanup_stale_processes()
 
         # Docker 환경에서 OpenVPN 설치 확인 및 설치 시도
         if os.name != "nt" and not self._is_openvpn_installed():
@@ -73,27 +126,68 @@ class VPNManager:
     # ===================================================================
 
     def connect(self, config_name: str) -> Dict:
-        """지정된 설정으로 VPN 연결을 시도합니다."""
-        if self.session["status"] != "disconnected":
-            self.disconnect()
+        """
+        지정된 설정으로 VPN 연결을 시도합니다.
+        다른 워커가 살아있는 연결을 소유하고 있으면 그 터널을 건드리지 않고
+        {"status": "connected_elsewhere"} 를 반환합니다. (먼저 disconnect 로 종료 요청)
+        """
+        shared_view = self._shared_status_view()
+        if shared_view is not None and self._shared_owner_alive():
+            owner_pid = self._read_shared_state().get("owner_pid")
+            logger.warning(f"VPN 연결 요청 거부: 워커 {owner_pid} 가 연결({shared_view['config']})을 관리 중")
+            return {
+                "status": "connected_elsewhere",
+                "message": f"다른 워커(PID {owner_pid})가 VPN 연결({shared_view['config']})을 관리 중입니다. "
+                           f"연결을 종료한 뒤 다시 시도하세요.",
+                "config": shared_view["config"],
+                "owner_pid": owner_pid,
+            }
 
-        logger.info(f"==== VPN 연결 시작: {config_name} ====")
+        # 새 연결 요청은 기존 자동 재연결 대상을 대체합니다.
+        self._desired = None
+        self._stop_keeper()
 
-        # 1. 설정 파일 경로 확인
-        config_path = self._find_config_file(config_name)
-        if not config_path:
-            return {"status": "error", "message": f"설정 파일 '{config_name}'을(를) 찾을 수 없습니다."}
+        with self._connect_lock:
+            # 이 워커의 연결 또는 소유 워커가 사라진 채 남은 연결이 있으면 먼저 정리
+            if self.session["status"] != "disconnected" or self._shared_status_view() is not None:
+                self._teardown()
+
+            logger.info(f"==== VPN 연결 시작: {config_name} ====")
 
-        # 2. OpenVPN 실행 명령어 생성 (인증 포함)
-        command, error_msg = self._build_connect_command(config_path, config_name)
-        if error_msg:
-            return {"status": "error", "message": error_msg}
+            # 1. 설정 파일 경로 확인
+            config_path = self._find_config_file(config_name)
+            if not config_path:
+                return {"status": "error", "message": f"설정 파일 '{config_name}'을(를) 찾을 수 없습니다."}
 
-        # 3. OpenVPN 프로세스 시작 및 모니터링
-        return self._start_and_monitor_process(command, config_name)
+            # 2. OpenVPN 실행 명령어 생성 (인증 포함)
+            command, error_msg = self._build_connect_command(config_path, config_name)
+            if error_msg:
+                return {"status": "error", "message": error_msg}
+
+            # 3. OpenVPN 프로세스 시작 및 모니터링
+            result = self._start_and_monitor_process(command, config_name)
+
+        # 연결에 성공하면 파싱된 명령어를 보관하고 헬스 키퍼를 시작합니다.
+        if result["status"] == "success":
+            self._desired = {
+                "config_name": config_name,
+                "command": command,
+                "intent_id": uuid.uuid4().hex,
+            }
+            self._tunnel_ready.set()
+            self._start_keeper()
+        self._publish_state()
+        return result
 
     def disconnect(self) -> Dict:
-        """현재 VPN 연결을 종료합니다."""
+        """현재 VPN 연결을 종료합니다. (자동 재연결도 함께 중단)"""
+        self._desired = None
+        self._stop_keeper()
+        self._tunnel_ready.clear()
+        return self._teardown()
+
+    def _teardown(self) -> Dict:
+        """OpenVPN 프로세스를 종료하고 세션을 초기화합니다. (재연결 의도는 유지)"""
         logger.info("VPN 연결 종료 시도...")
         process = self.session.get("process")
 
@@ -120,24 +214,39 @@ class VPNManager:
                 logger.error(f"프로세스 종료 중 오류 발생: {e}")
 
         # 만약의 경우를 대비해 시스템에 남아있는 모든 openvpn 프로세스 정리
-        self._cleanup_stale_processes()
-        
+        # 단, 다른 살아있는 워커가 소유한 터널은 pkill 하지 않음 → 아래 공유 상태 갱신(의도 철회)을 보고
+        # 소유 워커의 헬스 키퍼가 자기 프로세스를 종료합니다.
+        if self._shared_owner_alive():
+            logger.info("다른 워커가 소유한 VPN 연결이므로 종료 요청만 공유 상태에 기록합니다.")
+        else:
+            self._cleanup_stale_processes()
+
         self._reset_session()
+        self._publish_state()
         return {"status": "success", "message": "VPN 연결이 종료되었습니다."}
 
     def get_status(self) -> Dict:
         """현재 VPN 연결 상태 반환"""
+        # 다른 워커가 연결을 소유하고 있으면 공유 상태를 그대로 보여줍니다.
+        shared_view = self._shared_status_view()
+        if shared_view is not None:
+            return shared_view
+
         self._read_logs_from_process()
 
         # 연결 중에 프로세스가 예기치 않게 종료된 경우
         if self.session["status"] == "connecting" and self.session["process"] and self.session["process"].poll() is not None:
-            self.session["status"] = "error"
+            self._set_status("error")
             logger.warning("연결 중 프로세스가 예기치 않게 종료되었습니다.")
 
         # 연결된 상태에서 TUN 인터페이스가 사라진 경우 (연결 끊김 감지)
         if self.session["status"] == "connected" and not self._check_tun_interface():
             logger.warning("VPN 연결(tun 인터페이스)이 끊어진 것을 감지했습니다.")
-            self.disconnect() # 세션을 완전히 정리
+            if self._desired:
+                # 헬스 키퍼가 같은 설정으로 재연결합니다.
+                self._on_tunnel_lost("tun 인터페이스 소실")
+            else:
+                self.disconnect() # 세션을 완전히 정리
         
         # 연결된 상태라면, 항상 최신 연결 정보를 가져와서 갱신합니다.
         # 이렇게 하면, 최초 정보 로딩 실패 시에도 후속 상태 조회에서 복구할 수 있습니다.
@@ -148,12 +257,16 @@ class VPNManager:
             "status": self.session["status"],
             "config": self.session["config_name"],
             "connection_info": self.session["connection_info"],
+            "auto_reconnect": self._desired is not None,
+            "reconnect": self.get_reconnect_metrics(),
         }
 
         # 연결 실패 또는 오류 시 로그 일부를 메시지로 포함
         if self.session["status"] in ["error", "disconnected"]:
              log_excerpt = "\n".join(self.session["logs"][-15:])
              status_info["message"] = f"현재 연결되지 않았습니다.\n{log_excerpt}"
+        elif self.session["status"] == "reconnecting":
+             status_info["message"] = f"VPN 터널이 끊어져 재연결 중입니다. ({self.reconnect_stats['last_loss_reason']})"
 
         return status_info
 
@@ -161,6 +274,48 @@ class VPNManager:
         """연결 상태를 boolean으로 반환"""
         return self._check_tun_interface() and self.session["status"] == "connected"
 
+    def is_recovering(self) -> bool:
+        """헬스 키퍼가 터널을 복구 중인지 여부"""
+        shared_view = self._shared_status_view()
+        if shared_view is not None:
+            return shared_view["auto_reconnect"] and shared_view["status"] in ("reconnecting", "connecting")
+        if self._desired is None:
+            return False
+        return self._lost_at is not None or self.session["status"] in ("reconnecting", "connecting")
+
+    def wait_for_tunnel(self, timeout: float) -> bool:
+        """
+        터널이 복구 중이면 최대 timeout 초 동안 재연결 완료를 기다립니다.
+        스캔 요청은 이 메서드로 대기한 뒤 VPN 경유로 실행됩니다.
+
+        Returns:
+            대기 종료 시점에 VPN이 연결되어 있는지 여부
+        """
+        deadline = time.time() + timeout
+        while self.is_recovering():
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                logger.warning(f"VPN 재연결 대기 시간 초과 ({timeout}초)")
+                break
+            self._tunnel_ready.wait(min(remaining, 0.5))
+        return self.get_status()["status"] == "connected"
+
+    def get_reconnect_metrics(self) -> Dict[str, Any]:
+        """재연결 횟수 및 지연 시간 통계 반환"""
+        stats = self.reconnect_stats
+        latencies = stats["latencies"]
+        return {
+            "losses": stats["losses"],
+            "attempts": stats["attempts"],
+            "successes": stats["successes"],
+            "failures": stats["failures"],
+            "last_loss_reason": stats["last_loss_reason"],
+            "last_loss_at": stats["last_loss_at"],
+            "last_latency_s": latencies[-1] if latencies else None,
+            "avg_latency_s": round(sum(latencies) / len(latencies), 3) if latencies else None,
+            "max_latency_s": max(latencies) if latencies else None,
+        }
+
     def list_configs(self) -> List[Dict]:
         profile_dir = self.get_profile_vpn_dir()
         logger.info(f"VPN 설정 목록 디렉토리: {profile_dir}")
@@ -267,12 +422,21 @@ class VPNManager:
         except Exception as e:
             logger.warning(f"잔여 프로세스 정리 중 오류 발생: {e}")
 
+    def _set_status(self, status: str) -> None:
+        """세션 상태 변경 (상태 전환 메트릭 기록)"""
+        previous = self.session.get("status", "disconnected")
+        if previous != status:
+            VPN_STATE_TRANSITIONS.inc(**{"from": previous, "to": status})
+        self.session["status"] = status
+
     def _reset_session(self):
         """현재 연결 세션을 초기화합니다."""
+        if self.session:
+            self._set_status("disconnected")
         self.session = {
             "process": None,
             "config_name": None,
-            "status": "disconnected",  # "disconnected", "connecting", "connected", "error"
+            "status": "disconnected",  # "disconnected", "connecting", "connected", "reconnecting", "error"
             "logs": [],
             "connection_info": {},
         }
@@ -315,14 +479,21 @@ class VPNManager:
         return command, None
     
     def _start_and_monitor_process(self, command: List[str], config_name: str) -> Dict:
-        """프로세스를 시작하고, 연결 완료 또는 실패를 모니터링합니다."""
+        """프로세스를 시작하고, 연결 완료 또는 실패를 모니터링합니다. (소요 시간 메트릭 기록)"""
+        with VPN_CONNECT_SECONDS.time(result="error") as labels:
+            result = self._run_openvpn(command, config_name)
+            labels["result"] = result["status"]
+        return result
+
+    def _run_openvpn(self, command: List[str], config_name: str) -> Dict:
+        """OpenVPN 프로세스를 시작하고 연결 완료/실패/타임아웃까지 대기합니다."""
         try:
             logger.info(f"OpenVPN 실행 명령어: {' '.join(command)}")
             
             # 새 세션 시작
             self._reset_session()
             self.session["config_name"] = config_name
-            self.session["status"] = "connecting"
+            self._set_status("connecting")
 
             process = subprocess.Popen(
                 command,
@@ -343,11 +514,11 @@ class VPNManager:
                 self._read_logs_from_process()
 
                 # 성공 케이스
-                if "Initialization Sequence Completed" in "\n".join(self.session["logs"]):
+                if INIT_COMPLETED_MARKER in "\n".join(self.session["logs"]):
                     logger.info("연결 초기화 시퀀스 완료. 네트워크 인터페이스 설정을 위해 1초 대기...")
                     time.sleep(1) # OS가 tun 인터페이스를 설정하고 IP를 할당할 시간을 줍니다.
 
-                    self.session["status"] = "connected"
+                    self._set_status("connected")
                     self.session["connection_info"] = self._get_connection_info()
                     logger.info(f"VPN 연결 성공: {config_name}")
                     return {"status": "success", "message": "VPN이 성공적으로 연결되었습니다."}
@@ -356,19 +527,19 @@ class VPNManager:
                 if process.poll() is not None:
                     log_excerpt = "\n".join(self.session["logs"][-15:])
                     logger.error(f"OpenVPN 프로세스가 예기치 않게 종료되었습니다. 종료 코드: {process.poll()}")
-                    self.disconnect()
+                    self._teardown()
                     return {"status": "error", "message": f"OpenVPN 프로세스 종료됨. 로그:\n{log_excerpt}"}
                 
                 time.sleep(0.5)
 
             # 타임아웃 케이스
             log_excerpt = "\n".join(self.session["logs"][-15:])
-            self.disconnect()
+            self._teardown()
             return {"status": "error", "message": f"VPN 연결 시간 초과. 로그:\n{log_excerpt}"}
 
         except Exception as e:
             logger.error(f"OpenVPN 실행 중 예외 발생: {str(e)}\n{traceback.format_exc()}")
-            self.disconnect()
+            self._teardown()
             return {"status": "error", "message": f"VPN 연결 중 예외 발생: {str(e)}"}
 
     def _read_logs_from_process(self) -> None:
@@ -386,17 +557,281 @@ class VPNManager:
 
         try:
             # 한번에 읽을 수 있는 모든 로그를 가져옴
-            output = process.stdout.read()
+            with self._log_lock:
+                output = process.stdout.read()
             if output:
                 new_logs = [log for log in output.strip().split('\n') if log]
                 self.session["logs"].extend(new_logs)
                 # 메모리 관리를 위해 최근 200줄의 로그만 유지
                 self.session["logs"] = self.session["logs"][-200:]
+                self._handle_log_events(new_logs)
         except (TypeError, BlockingIOError):
             pass # 읽을 데이터가 없을 때 발생하는 정상적인 예외
         except Exception as e:
             logger.warning(f"프로세스 로그 읽기 오류: {e}")
+
+    def _handle_log_events(self, new_logs: List[str]) -> None:
+        """OpenVPN 로그에서 터널 재시작/복구 이벤트를 감지합니다."""
+        if not self._desired:
+            return
+
+        status = self.session["status"]
+        if status == "connected" and any(m in line for line in new_logs for m in SOFT_RESTART_MARKERS):
+            # OpenVPN 이 자체적으로 재시작 중 -> 프로세스는 살려두고 복구를 기다립니다.
+            self._soft_restart_at = time.time()
+            self._on_tunnel_lost("OpenVPN 터널 재시작 이벤트")
+        elif status == "reconnecting" and any(INIT_COMPLETED_MARKER in line for line in new_logs):
+            logger.info("OpenVPN 자체 재시작으로 터널이 복구되었습니다.")
+            self._mark_recovered()
+
+    # ===================================================================
+    # Tunnel Health Keeper
+    # ===================================================================
+
+    def _start_keeper(self) -> None:
+        """헬스 키퍼 스레드 시작 (이미 실행 중이면 무시)"""
+        if self._keeper_thread and self._keeper_thread.is_alive():
+            return
+        self._keeper_stop.clear()
+        self._keeper_wakeup.clear()
+        self._keeper_thread = threading.Thread(
+            target=self._keeper_loop, name="vpn-health-keeper", daemon=True
+        )
+        self._keeper_thread.start()
+        logger.info("VPN 헬스 키퍼 시작")
+
+    def _stop_keeper(self) -> None:
+        """헬스 키퍼 스레드 중단"""
+        thread = self._keeper_thread
+        if not thread:
+            return
+        self._keeper_stop.set()
+        self._keeper_wakeup.set()
+        if thread is not threading.current_thread():
+            thread.join(timeout=HEALTH_CHECK_INTERVAL + 1)
+        self._keeper_thread = None
+        logger.info("VPN 헬스 키퍼 중단")
+
+    def _keeper_loop(self) -> None:
+        """주기적으로(또는 이벤트 발생 시 즉시) 터널 상태를 점검하고 필요하면 재연결합니다."""
+        while not self._keeper_stop.is_set():
+            self._keeper_wakeup.wait(HEALTH_CHECK_INTERVAL)
+            self._keeper_wakeup.clear()
+            if self._keeper_stop.is_set() or not self._desired:
+                break
+            if self._intent_revoked():
+                self._release_revoked_session()
+                break
+
+            try:
+                self._read_logs_from_process()
+
+                if self.session["status"] == "connected":
+                    reason = self._detect_tunnel_loss()
+                    if reason:
+                        self._on_tunnel_lost(reason)
+
+                if self.session["status"] == "reconnecting":
+                    if self._soft_restart_pending():
+                        continue
+                    self._reconnect_with_backoff()
+            except Exception as e:
+                logger.error(f"헬스 키퍼 오류: {e}\n{traceback.format_exc()}")
+
+    def _detect_tunnel_loss(self) -> Optional[str]:
+        """터널 손실 사유를 반환합니다. 정상이면 None."""
+        process = self.session.get("process")
+        if process is not None and process.poll() is not None:
+            return f"OpenVPN 프로세스 종료 (코드: {process.poll()})"
+        if not self._check_tun_interface():
+            return "tun 인터페이스 소실"
+        return None
+
+    def _soft_restart_pending(self) -> bool:
+        """OpenVPN 자체 재시작이 아직 유예 시간 내에 진행 중인지 확인"""
+        if self._soft_restart_at is None:
+            return False
+        process = self.session.get("process")
+        alive = process is not None and process.poll() is None
+        if alive and time.time() - self._soft_restart_at < SOFT_RESTART_GRACE:
+            return True
+        self._soft_restart_at = None
+        return False
+
+    def _on_tunnel_lost(self, reason: str) -> None:
+        """터널 손실을 기록하고 헬스 키퍼를 깨웁니다."""
+        if self.session["status"] == "reconnecting":
+            return
+        if self._intent_revoked():
+            self._release_revoked_session()
+            return
+        logger.warning(f"VPN 터널 손실 감지: {reason}")
+        self._set_status("reconnecting")
+        self._tunnel_ready.clear()
+        self._lost_at = time.time()
+        self.reconnect_stats["losses"] += 1
+        self.reconnect_stats["last_loss_reason"] = reason
+        self.reconnect_stats["last_loss_at"] = self._lost_at
+        self._publish_state()
+        self._keeper_wakeup.set()
+
+    def _mark_recovered(self) -> None:
+        """재연결 완료 처리 및 지연 시간 기록"""
+        self._set_status("connected")
+        self.session["connection_info"] = self._get_connection_info()
+        self._soft_restart_at = None
+        if self._lost_at is not None:
+            latency = round(time.time() - self._lost_at, 3)
+            latencies = self.reconnect_stats["latencies"]
+            latencies.append(latency)
+            # 최근 50건만 유지
+            self.reconnect_stats["latencies"] = latencies[-50:]
+            logger.info(f"VPN 재연결 완료 (소요 시간: {latency}초)")
+        self._lost_at = None
+        self._tunnel_ready.set()
+        self._publish_state()
+
+    def _reconnect_with_backoff(self) -> None:
+        """저장된 명령어로 지수 백오프를 적용해 재연결을 반복합니다."""
+        delay = RECONNECT_BASE_DELAY
+        attempt = 0
+
+        while self._desired and not self._keeper_stop.is_set():
+            if self._intent_revoked():
+                self._release_revoked_session()
+                return
+            if RECONNECT_MAX_ATTEMPTS and attempt >= RECONNECT_MAX_ATTEMPTS:
+                logger.error(f"VPN 재연결 {attempt}회 실패, 자동 재연결을 중단합니다.")
+                self._desired = None
+                self._teardown()
+                self._set_status("error")
+                self._publish_state()
+                return
+
+            attempt += 1
+            self.reconnect_stats["attempts"] += 1
+            desired = self._desired
+            logger.info(f"VPN 재연결 시도 {attempt}회차: {desired['config_name']}")
+
+            with self._connect_lock:
+                if self._desired is not desired:
+                    return  # 재연결 도중 사용자가 연결을 변경/종료함
+                self._teardown()
+                result = self._start_and_monitor_process(desired["command"], desired["config_name"])
+
+            if result["status"] == "success":
+                self.reconnect_stats["successes"] += 1
+                self._mark_recovered()
+                return
+
+            self.reconnect_stats["failures"] += 1
+            self._set_status("reconnecting")
+            self.session["config_name"] = desired["config_name"]
+            self._publish_state()
+            # 여러 인스턴스가 동시에 재시도하지 않도록 약간의 지터를 더합니다.
+            wait = delay + random.uniform(0, delay * 0.1)
+            logger.warning(f"VPN 재연결 실패, {wait:.1f}초 후 재시도: {result.get('message', '')[:200]}")
+            if self._keeper_stop.wait(wait):
+                return
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
     
+    # ===================================================================
+    # Shared State (multi-worker)
+    # ===================================================================
+
+    def _publish_state(self) -> None:
+        """현재 세션 상태를 공유 저장소에 기록해 다른 워커가 볼 수 있게 합니다."""
+        if not self.shared_state:
+            return
+        process = self.session.get("process")
+        owns_process = process is not None and process.poll() is None
+        snapshot = {
+            "status": self.session["status"],
+            "config_name": self.session["config_name"],
+            "connection_info": self.session["connection_info"],
+            "logs": self.session["logs"][-50:],
+            "pid": process.pid if owns_process else None,
+            "owner_pid": os.getpid() if owns_process or self._desired else None,
+            "intent_id": self._desired["intent_id"] if self._desired else None,
+            "reconnect": self.get_reconnect_metrics(),
+            "updated_at": time.time(),
+        }
+        try:
+            self.shared_state.replace("vpn", snapshot)
+        except Exception as e:
+            logger.warning(f"VPN 공유 상태 기록 오류: {e}")
+
+    def _read_shared_state(self) -> Dict[str, Any]:
+        if not self.shared_state:
+            return {}
+        try:
+            return self.shared_state.read("vpn")
+        except Exception as e:
+            logger.warning(f"VPN 공유 상태 읽기 오류: {e}")
+            return {}
+
+    def _shared_owner_alive(self) -> bool:
+        """다른 워커가 VPN 연결을 소유하고 있고 그 워커가 살아있는지 확인"""
+        owner_pid = self._read_shared_state().get("owner_pid")
+        return bool(owner_pid) and owner_pid != os.getpid() and pid_alive(owner_pid)
+
+    def _shared_status_view(self) -> Optional[Dict]:
+        """
+        이 워커가 연결을 소유하지 않을 때, 소유 워커가 공유한 상태를 반환합니다.
+        이 워커가 소유자이거나 공유된 연결이 없으면 None.
+        """
+        if not self.shared_state or self.session.get("process") is not None or self._desired:
+            return None
+
+        snapshot = self._read_shared_state()
+        owner_pid = snapshot.get("owner_pid")
+        if not owner_pid or owner_pid == os.getpid():
+            return None
+        # 소유 워커와 OpenVPN 프로세스가 모두 사라졌다면 유효하지 않은 상태
+        if not pid_alive(owner_pid) and not pid_alive(snapshot.get("pid")):
+            return None
+
+        status_info = {
+            "status": snapshot.get("status", "disconnected"),
+            "config": snapshot.get("config_name"),
+            "connection_info": snapshot.get("connection_info", {}),
+            "auto_reconnect": snapshot.get("intent_id") is not None and pid_alive(owner_pid),
+            "reconnect": snapshot.get("reconnect", {}),
+        }
+        if status_info["status"] in ["error", "disconnected"]:
+            log_excerpt = "\n".join(snapshot.get("logs", [])[-15:])
+            status_info["message"] = f"현재 연결되지 않았습니다.\n{log_excerpt}"
+        elif status_info["status"] == "reconnecting":
+            reason = status_info["reconnect"].get("last_loss_reason")
+            status_info["message"] = f"VPN 터널이 끊어져 재연결 중입니다. ({reason})"
+        return status_info
+
+    def _intent_revoked(self) -> bool:
+        """다른 워커가 연결을 종료하거나 새 연결로 교체했는지 확인"""
+        if not self.shared_state or not self._desired:
+            return False
+        return self._read_shared_state().get("intent_id") != self._desired["intent_id"]
+
+    def _release_revoked_session(self) -> None:
+        """
+        다른 워커가 연결을 가져간 경우, 공유 상태와 잔여 프로세스를 건드리지 않고
+        이 워커의 로컬 세션만 정리합니다.
+        """
+        logger.info("다른 워커가 VPN 연결을 변경/종료하여 이 워커의 헬스 키퍼를 중단합니다.")
+        self._desired = None
+        self._tunnel_ready.clear()
+        self._lost_at = None
+        process = self.session.get("process")
+        if process and process.poll() is None:
+            try:
+                if os.name != 'nt':
+                    os.killpg(os.getpgid(process.pid), signal.SIGTERM)
+                else:
+                    process.terminate()
+            except Exception as e:
+                logger.warning(f"로컬 OpenVPN 프로세스 종료 오류: {e}")
+        self._reset_session()
+
     # ===================================================================
     # Internal Utilities
     # ===================================================================